@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.accounts.application.use_cases.resolve_merchant_next_step import (
+    ResolveMerchantNextStepCommand,
+    ResolveMerchantNextStepUseCase,
+)
+from apps.accounts.domain.post_auth_state_machine import MerchantNextStep
+
+
+def _cache_key(user_id: int) -> str:
+    return f"onboarding:next_step:{user_id}"
+
+
+class MerchantNextStepCache:
+    """
+    Per-user cache of the post-auth "next step" (used by `OnboardingRedirectMiddleware`).
+
+    Invalidated by signals on AccountProfile/OnboardingProfile/TenantMembership/StoreProfile/Tenant/User,
+    so users already on DASHBOARD add no onboarding queries per request.
+    """
+
+    @staticmethod
+    def get(user) -> MerchantNextStep:
+        key = _cache_key(user.pk)
+        cached = cache.get(key)
+        if cached:
+            try:
+                return MerchantNextStep(cached)
+            except ValueError:
+                pass
+
+        step = ResolveMerchantNextStepUseCase.execute(
+            ResolveMerchantNextStepCommand(user=user, otp_required=False)
+        ).step
+        if step == MerchantNextStep.DASHBOARD:
+            timeout = int(getattr(settings, "ONBOARDING_NEXT_STEP_CACHE_SECONDS", 3600) or 3600)
+        else:
+            # Users mid-onboarding change step often; keep their entry short-lived as a safety net.
+            timeout = 60
+        cache.set(key, step.value, timeout=timeout)
+        return step
+
+    @staticmethod
+    def invalidate(*user_ids: int | None) -> None:
+        keys = [_cache_key(user_id) for user_id in user_ids if user_id]
+        if keys:
+            cache.delete_many(keys)
@@ -11,6 +11,8 @@ class AccountsConfig(AppConfig):
     def ready(self) -> None:
         from apps.accounts.domain.hybrid_policies import is_testing_otp_allowed
 
+        from . import signals  # noqa: F401
+
         env = (getattr(settings, "ENVIRONMENT", "") or "").strip().lower()
         if env in {"prod", "production"}:
             if getattr(settings, "DEBUG", False):
@@ -15,10 +15,7 @@ EN:
 from django.shortcuts import redirect
 from django.urls import reverse
 
-from apps.accounts.application.use_cases.resolve_merchant_next_step import (
-    ResolveMerchantNextStepCommand,
-    ResolveMerchantNextStepUseCase,
-)
+from apps.accounts.application.services.next_step_cache import MerchantNextStepCache
 from apps.accounts.domain.post_auth_state_machine import MerchantNextStep
 
 
@@ -41,9 +38,7 @@ class OnboardingRedirectMiddleware:
                 or request.path.startswith("/media/")
             )
             if not allowed:
-                step = ResolveMerchantNextStepUseCase.execute(
-                    ResolveMerchantNextStepCommand(user=request.user, otp_required=False)
-                ).step
+                step = MerchantNextStepCache.get(request.user)
                 if step != MerchantNextStep.DASHBOARD:
                     return redirect(_next_step_url(step))
 
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts.application.services.next_step_cache import MerchantNextStepCache
+from apps.accounts.models import AccountProfile, OnboardingProfile
+from apps.tenants.models import StoreProfile, Tenant, TenantMembership
+
+
+@receiver(post_save, sender=AccountProfile)
+@receiver(post_delete, sender=AccountProfile)
+@receiver(post_save, sender=OnboardingProfile)
+@receiver(post_delete, sender=OnboardingProfile)
+@receiver(post_save, sender=TenantMembership)
+@receiver(post_delete, sender=TenantMembership)
+def _invalidate_user_next_step(sender, instance, **kwargs):
+    MerchantNextStepCache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=StoreProfile)
+@receiver(post_delete, sender=StoreProfile)
+def _invalidate_owner_next_step(sender, instance: StoreProfile, **kwargs):
+    MerchantNextStepCache.invalidate(instance.owner_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def _invalidate_account_next_step(sender, instance, created: bool, **kwargs):
+    if not created:
+        MerchantNextStepCache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Tenant)
+def _invalidate_tenant_members_next_step(sender, instance: Tenant, created: bool, **kwargs):
+    # `has_store` depends on `tenant.is_active`; only deactivation/reactivation can change it.
+    if created:
+        return
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "is_active" not in update_fields:
+        return
+    user_ids = set(TenantMembership.objects.filter(tenant=instance).values_list("user_id", flat=True))
+    user_ids.update(StoreProfile.objects.filter(tenant=instance).values_list("owner_id", flat=True))
+    MerchantNextStepCache.invalidate(*user_ids)
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient
 
+from apps.accounts.application.services.next_step_cache import MerchantNextStepCache
+from apps.accounts.domain.post_auth_state_machine import MerchantNextStep
 from apps.accounts.models import AccountProfile, OTPLog
 from apps.emails.application.services.crypto import CredentialCrypto
 from apps.emails.models import GlobalEmailSettings
+from apps.tenants.models import Tenant, TenantMembership
 
 
 class AccountsAuthApiTests(TestCase):
@@ -312,3 +318,34 @@ class AccountsTestOtpPolicyTests(TestCase):
         with self.assertRaises(ValueError):
             VerifyEmailOtpUseCase.execute(VerifyEmailOtpCommand(user=user, code="12345"))
         self.assertFalse(OTPLog.objects.filter(identifier="verifyprod@example.com").exists())
+
+
+class MerchantNextStepCacheTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="0500000099", email="cached@example.com", password="StrongPass12345!"
+        )
+        self.profile = AccountProfile.objects.create(
+            user=self.user,
+            full_name="Cached Merchant",
+            phone="0500000099",
+            country="SA",
+            business_types=["fashion"],
+            accepted_terms_at=timezone.now(),
+        )
+        tenant = Tenant.objects.create(slug="cached-store", name="Cached Store", is_active=True)
+        TenantMembership.objects.create(tenant=tenant, user=self.user, role=TenantMembership.ROLE_OWNER)
+
+    def test_dashboard_step_is_served_from_cache(self):
+        self.assertEqual(MerchantNextStepCache.get(self.user), MerchantNextStep.DASHBOARD)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(MerchantNextStepCache.get(self.user), MerchantNextStep.DASHBOARD)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_profile_save_invalidates_cached_step(self):
+        self.assertEqual(MerchantNextStepCache.get(self.user), MerchantNextStep.DASHBOARD)
+        self.profile.full_name = ""
+        self.profile.save(update_fields=["full_name"])
+        self.assertEqual(MerchantNextStepCache.get(self.user), MerchantNextStep.COMPLETE_PROFILE)
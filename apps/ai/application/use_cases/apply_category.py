@@ -5,7 +5,9 @@ from dataclasses import dataclass
 from django.db import transaction
 
 from apps.catalog.models import Category, Product
+from apps.catalog.services.search_index import index_products
 from apps.tenants.domain.tenant_context import TenantContext
+from apps.tenants.services.storefront_cache import bump_catalog_version
 
 
 @dataclass(frozen=True)
@@ -29,4 +31,6 @@ class ApplyCategoryUseCase:
         if not category:
             return False
         product.categories.add(category)
+        index_products([product.id])
+        bump_catalog_version(product.store_id)
         return True
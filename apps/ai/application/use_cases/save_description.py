@@ -43,5 +43,6 @@ class SaveProductDescriptionUseCase:
             if product.description_ar and not cmd.force:
                 return SaveProductDescriptionResult(product=product, saved=False, reason="already_exists")
             product.description_ar = text
+        # The product's post_save reindexes it and bumps the catalog version.
         product.save(update_fields=["description_ar", "description_en"])
         return SaveProductDescriptionResult(product=product, saved=True, reason=None)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from django.contrib import messages
-from django.core.cache import cache
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 from django.utils.translation import gettext as _
@@ -22,6 +21,7 @@ from apps.ai.application.use_cases.save_description import (
 )
 from apps.ai.application.use_cases.visual_search import VisualSearchCommand, VisualSearchUseCase
 from apps.catalog.models import Product
+from apps.security.rate_limiter import RateLimitRule, get_rate_limiter
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.tenants.interfaces.web.decorators import tenant_access_required
 
@@ -43,16 +43,17 @@ def _build_tenant_context(request: HttpRequest) -> TenantContext:
     return TenantContext(tenant_id=tenant_id, currency=currency, user_id=user_id, session_key=session_key)
 
 
+AI_WEB_RATE_RULE = RateLimitRule(
+    key="ai_web",
+    pattern="",
+    methods=("POST",),
+    limit=AI_WEB_RATE_LIMIT,
+    window=AI_WEB_RATE_PERIOD_SECONDS,
+)
+
+
 def _allow_ai_request(store_id: int, feature: str) -> bool:
-    key = f"ai:rl:{store_id}:{feature}"
-    count = cache.get(key)
-    if count is None:
-        cache.set(key, 1, timeout=AI_WEB_RATE_PERIOD_SECONDS)
-        return True
-    if count >= AI_WEB_RATE_LIMIT:
-        return False
-    cache.set(key, count + 1, timeout=AI_WEB_RATE_PERIOD_SECONDS)
-    return True
+    return get_rate_limiter().hit(AI_WEB_RATE_RULE, f"{store_id}:{feature}").allowed
 
 
 @tenant_access_required
@@ -9,6 +9,8 @@ from django.utils import timezone
 
 from apps.analytics.domain.policies import hash_identifier
 from apps.analytics.domain.types import AssignmentDTO
+from apps.analytics.infrastructure.experiment_registry import get_experiment_registry
+from apps.analytics.infrastructure.exposure_log import get_exposure_log
 from apps.analytics.models import Experiment, ExperimentAssignment
 from apps.tenants.domain.tenant_context import TenantContext
 
@@ -27,6 +29,8 @@ class AssignVariantUseCase:
         key = (cmd.experiment_key or "").strip()
         if not key:
             return AssignmentDTO(experiment_key="", variant="A", assigned=False)
+        if getattr(settings, "ANALYTICS_EXPERIMENT_ASSIGNMENT", "stored") == "stateless":
+            return _assign_stateless(cmd, key)
 
         exp = Experiment.objects.filter(key=key).first()
         if not exp:
@@ -84,6 +88,33 @@ class AssignVariantUseCase:
         return AssignmentDTO(experiment_key=key, variant=variant, assigned=True)
 
 
+def _assign_stateless(cmd: AssignVariantCommand, key: str) -> AssignmentDTO:
+    """
+    Variant from the hash alone, against this worker's cached definitions; the exposure is queued for a
+    bulk insert. Changing weights re-buckets identities, since earlier assignments are not read back.
+    """
+    exp = get_experiment_registry().get(key)
+    if exp is None or not exp.is_live(tenant_id=cmd.tenant_ctx.tenant_id, now=timezone.now()):
+        return AssignmentDTO(experiment_key=key, variant="A", assigned=False)
+
+    actor_id = cmd.actor_id if cmd.actor_id is not None else cmd.tenant_ctx.user_id
+    session_key = cmd.session_key if cmd.session_key is not None else cmd.tenant_ctx.session_key
+    identity = str(actor_id) if actor_id is not None else (session_key or "")
+    if not identity:
+        return AssignmentDTO(experiment_key=key, variant="A", assigned=False)
+
+    variant = _choose_variant(key=key, identity=identity, variants=dict(exp.variants))
+    actor_hash = hash_identifier(actor_id) if actor_id is not None else ""
+    get_exposure_log().record(
+        experiment_id=exp.id,
+        tenant_id=cmd.tenant_ctx.tenant_id,
+        actor_hash=actor_hash,
+        session_hash="" if actor_hash else hash_identifier(session_key),
+        variant=variant,
+    )
+    return AssignmentDTO(experiment_key=key, variant=variant, assigned=True)
+
+
 def _choose_variant(*, key: str, identity: str, variants: dict) -> str:
     weights = {str(k): int(v) for k, v in (variants or {"A": 100}).items() if int(v) > 0}
     if not weights:
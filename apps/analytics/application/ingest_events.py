@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from django.conf import settings
+
+from apps.analytics.application.track_event import after_events_stored, get_event_sink
+from apps.analytics.domain.types import EventDTO
+from apps.analytics.infrastructure.db_sink import build_event_rows
+
+
+class BatchTooLargeError(ValueError):
+    pass
+
+
+def ingest_max_events() -> int:
+    return max(1, int(getattr(settings, "ANALYTICS_INGEST_MAX_EVENTS", 100) or 100))
+
+
+@dataclass(frozen=True)
+class IngestEventsCommand:
+    tenant_id: int
+    events: Sequence[EventDTO]
+
+
+@dataclass(frozen=True)
+class IngestEventsResult:
+    accepted: int
+    rejected: list[dict] = field(default_factory=list)
+
+
+class IngestEventsUseCase:
+    @staticmethod
+    def execute(cmd: IngestEventsCommand) -> IngestEventsResult:
+        if len(cmd.events) > ingest_max_events():
+            raise BatchTooLargeError(f"At most {ingest_max_events()} events per batch.")
+        rows, errors = build_event_rows(tenant_id=cmd.tenant_id, events=cmd.events)
+        if rows:
+            get_event_sink().store_rows(rows)
+        rejected = {index for index, _error in errors}
+        after_events_stored(cmd.tenant_id, [event for index, event in enumerate(cmd.events) if index not in rejected])
+        return IngestEventsResult(
+            accepted=len(rows), rejected=[{"index": index, "error": error} for index, error in errors]
+        )
@@ -2,14 +2,19 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from apps.analytics.infrastructure.copurchase import recommend_neighbors
+from apps.analytics.infrastructure.recommendation_cache import Computed, cached_snapshot, store_snapshot
 from apps.analytics.infrastructure.rules.recommendation_rules import (
     recommend_for_cart,
     recommend_for_home,
     recommend_for_product,
 )
 from apps.analytics.models import RecommendationSnapshot
+from apps.cart.models import CartItem
 from apps.tenants.domain.tenant_context import TenantContext
 
+CONTEXT_HOME = "HOME"
+
 
 @dataclass(frozen=True)
 class RecommendProductsCommand:
@@ -25,18 +30,51 @@ class RecommendProductsUseCase:
         tenant_id = cmd.tenant_ctx.tenant_id
         object_id = cmd.object_id
 
-        recommended: list[int] = []
+        if context == "CART" and object_id:
+            # Cart contents change between calls, so cart recommendations are computed (one indexed lookup)
+            # and returned without being stored.
+            recommended, strategy = _recommend_for_cart(tenant_id, int(object_id))
+            return RecommendationSnapshot(
+                tenant_id=tenant_id,
+                context=context,
+                object_id=str(object_id),
+                recommended_ids_json=recommended,
+                strategy=strategy,
+            )
         if context == "PRODUCT_DETAIL" and object_id:
-            recommended = recommend_for_product(tenant_id=tenant_id, product_id=int(object_id))
-        elif context == "CART" and object_id:
-            recommended = recommend_for_cart(tenant_id=tenant_id, cart_id=int(object_id))
-        else:
-            recommended = recommend_for_home(tenant_id=tenant_id)
-
-        return RecommendationSnapshot.objects.create(
-            tenant_id=tenant_id,
-            context=context,
-            object_id=str(object_id) if object_id is not None else "",
-            recommended_ids_json=recommended,
-            strategy=RecommendationSnapshot.STRATEGY_RULES_V1,
+            product_id = int(object_id)
+            return cached_snapshot(
+                tenant_id=tenant_id,
+                context=context,
+                object_id=str(product_id),
+                compute=lambda: _recommend_for_product(tenant_id, product_id),
+            )
+        return cached_snapshot(
+            tenant_id=tenant_id, context=CONTEXT_HOME, object_id="", compute=lambda: _recommend_for_home(tenant_id)
         )
+
+    @staticmethod
+    def precompute_home(tenant_id: int) -> RecommendationSnapshot:
+        """Store a fresh HOME snapshot so storefront requests never compute it."""
+        return store_snapshot(tenant_id, CONTEXT_HOME, "", lambda: _recommend_for_home(tenant_id))
+
+
+def _recommend_for_product(tenant_id: int, product_id: int) -> Computed:
+    recommended = recommend_neighbors(tenant_id=tenant_id, product_ids=[product_id])
+    if recommended:
+        return recommended, RecommendationSnapshot.STRATEGY_COPURCHASE_V1
+    return recommend_for_product(tenant_id=tenant_id, product_id=product_id), RecommendationSnapshot.STRATEGY_RULES_V1
+
+
+def _recommend_for_cart(tenant_id: int, cart_id: int) -> Computed:
+    cart_products = list(
+        CartItem.objects.filter(cart_id=cart_id, cart__store_id=tenant_id).values_list("product_id", flat=True)
+    )
+    recommended = recommend_neighbors(tenant_id=tenant_id, product_ids=cart_products)
+    if recommended:
+        return recommended, RecommendationSnapshot.STRATEGY_COPURCHASE_V1
+    return recommend_for_cart(tenant_id=tenant_id, cart_id=cart_id), RecommendationSnapshot.STRATEGY_RULES_V1
+
+
+def _recommend_for_home(tenant_id: int) -> Computed:
+    return recommend_for_home(tenant_id=tenant_id), RecommendationSnapshot.STRATEGY_RULES_V1
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import timedelta
 
-from django.db.models import Count
+from django.utils import timezone
 
-from apps.analytics.models import Event
+from apps.analytics.infrastructure.rollups import event_series, event_totals, unrolled_events
 from apps.tenants.domain.tenant_context import TenantContext
 
+SERIES_DAYS = 30
+
 
 @dataclass(frozen=True)
 class ReportKpisCommand:
@@ -16,6 +19,16 @@ class ReportKpisCommand:
 class ReportKpisUseCase:
     @staticmethod
     def execute(cmd: ReportKpisCommand) -> dict:
-        qs = Event.objects.filter(tenant_id=cmd.tenant_ctx.tenant_id)
-        by_name = list(qs.values("event_name").annotate(total=Count("id")).order_by("-total")[:20])
-        return {"events_total": qs.count(), "events_by_name": by_name}
+        tenant_id = cmd.tenant_ctx.tenant_id
+        tail = unrolled_events(tenant_id)
+        totals = event_totals(tenant_id=tenant_id, tail=tail)
+        by_name = sorted(
+            ({"event_name": name, "total": total} for name, total in totals.items()),
+            key=lambda row: (-row["total"], row["event_name"]),
+        )[:20]
+        since = timezone.now().date() - timedelta(days=SERIES_DAYS - 1)
+        return {
+            "events_total": sum(totals.values()),
+            "events_by_name": by_name,
+            "daily": event_series(tenant_id=tenant_id, start=since, granularity="day", tail=tail),
+        }
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from apps.analytics.infrastructure.order_rollups import order_series, orders_watermark, series_totals
+from apps.tenants.domain.tenant_context import TenantContext
+
+DEFAULT_DAYS = 30
+
+
+@dataclass(frozen=True)
+class ReportRevenueCommand:
+    tenant_ctx: TenantContext
+    granularity: str = "day"
+    start: date | None = None
+    end: date | None = None
+
+
+class ReportRevenueUseCase:
+    @staticmethod
+    def execute(cmd: ReportRevenueCommand) -> dict:
+        end = cmd.end or timezone.localdate()
+        start = cmd.start or end - timedelta(days=DEFAULT_DAYS - 1)
+        series = order_series(
+            tenant_id=cmd.tenant_ctx.tenant_id, start=start, end=end, granularity=(cmd.granularity or "day").lower()
+        )
+        final_through = orders_watermark()
+        return {
+            "granularity": (cmd.granularity or "day").lower(),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "final_through": final_through.isoformat() if final_through else None,
+            "totals": series_totals(series),
+            "items": series,
+        }
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from apps.analytics.infrastructure.store_stats import DailyStats, stats_day, store_stats_range
+from apps.tenants.domain.tenant_context import TenantContext
+
+DEFAULT_DAYS = 30
+
+
+@dataclass(frozen=True)
+class ReportStoreStatsCommand:
+    tenant_ctx: TenantContext
+    start: date | None = None
+    end: date | None = None
+
+
+class ReportStoreStatsUseCase:
+    @staticmethod
+    def execute(cmd: ReportStoreStatsCommand) -> list[DailyStats]:
+        end = cmd.end or stats_day()
+        start = cmd.start or end - timedelta(days=DEFAULT_DAYS - 1)
+        return store_stats_range(cmd.tenant_ctx.tenant_id, start, end)
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
+from typing import Sequence
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
 from django.utils import timezone
 
+from apps.analytics.domain.ports import EventSinkPort, WarehouseSinkPort
 from apps.analytics.domain.types import EventDTO
 from apps.analytics.domain.policies import (
     hash_identifier,
@@ -12,8 +18,11 @@ from apps.analytics.domain.policies import (
     redact_properties,
     validate_event_name,
 )
+from apps.analytics.infrastructure.buffered_sink import BufferedEventSink
 from apps.analytics.infrastructure.db_sink import DbEventSink
-from apps.analytics.infrastructure.warehouse_stub import WarehouseStub
+from apps.analytics.infrastructure.fraud_features import record_order_ip
+from apps.analytics.infrastructure.warehouse import ParquetWarehouseSink
+from apps.observability.metrics import registry
 from apps.tenants.domain.tenant_context import TenantContext
 
 
@@ -23,15 +32,93 @@ class TrackEventCommand:
     event: EventDTO
 
 
+def build_event_sink(name: str) -> EventSinkPort:
+    if name == "sync":
+        return DbEventSink()
+    if name == "buffered":
+        sink = BufferedEventSink()
+        registry.register_gauges("telemetry_buffer", sink.metrics)
+        return sink
+    raise ValueError(f"Unknown analytics event sink: {name}")
+
+
+_lock = threading.Lock()
+_sink: EventSinkPort | None = None
+_warehouse: WarehouseSinkPort | None = None
+
+
+def get_event_sink() -> EventSinkPort:
+    """Process-wide sink from `ANALYTICS_EVENT_SINK` ("sync" inserts in the caller's transaction)."""
+    global _sink
+    sink = _sink
+    if sink is not None:
+        return sink
+    with _lock:
+        if _sink is None:
+            _sink = build_event_sink(getattr(settings, "ANALYTICS_EVENT_SINK", "sync"))
+        return _sink
+
+
+def get_warehouse_sink() -> WarehouseSinkPort:
+    global _warehouse
+    warehouse = _warehouse
+    if warehouse is not None:
+        return warehouse
+    with _lock:
+        if _warehouse is None:
+            _warehouse = ParquetWarehouseSink()
+        return _warehouse
+
+
+def reset_event_sink() -> None:
+    global _sink, _warehouse
+    with _lock:
+        if _warehouse is not None:
+            _warehouse.flush()
+        _sink = None
+        _warehouse = None
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(sender, setting, **kwargs):
+    if setting.startswith("ANALYTICS_"):
+        reset_event_sink()
+
+
 class TrackEventUseCase:
     @staticmethod
     def execute(cmd: TrackEventCommand) -> int:
-        event_id = DbEventSink.store_event(tenant_id=cmd.tenant_id, event=cmd.event)
-        if getattr(settings, "ANALYTICS_WAREHOUSE_ENABLED", False):
-            WarehouseStub.send_event(tenant_id=cmd.tenant_id, event=_sanitize_event(cmd.event))
+        event_id = get_event_sink().store_event(tenant_id=cmd.tenant_id, event=cmd.event)
+        after_events_stored(cmd.tenant_id, [cmd.event])
         return event_id
 
 
+def after_events_stored(tenant_id: int, events: Sequence[EventDTO]) -> None:
+    """Follow-up shared by single and batch ingestion, for events the sink accepted (as sent, not sanitized)."""
+    for event in events:
+        if event.event_name == "order.placed" and event.object_id is not None:
+            _record_order_ip(tenant_id, event)
+    if events and getattr(settings, "ANALYTICS_WAREHOUSE_ENABLED", False):
+        _send_to_warehouse(tenant_id, [_sanitize_event(event) for event in events])
+
+
+def _record_order_ip(tenant_id: int, event: EventDTO) -> None:
+    ip_hash = hash_identifier(event.ip_address) if event.ip_address else ""
+    occurred_at = event.occurred_at or timezone.now()
+    transaction.on_commit(lambda: record_order_ip(tenant_id, event.object_id, ip_hash, at=occurred_at), robust=True)
+
+
+def _send_to_warehouse(tenant_id: int, events: list[EventDTO]) -> None:
+    """Hand sanitized events to the warehouse once the transaction commits (rolled-back events never land)."""
+
+    def _send() -> None:
+        warehouse = get_warehouse_sink()
+        for event in events:
+            warehouse.send_event(tenant_id=tenant_id, event=event)
+
+    transaction.on_commit(_send, robust=True)
+
+
 def safe_track_event(*, tenant_id: int, event: EventDTO) -> None:
     try:
         TrackEventUseCase.execute(TrackEventCommand(tenant_id=tenant_id, event=event))
@@ -9,6 +9,9 @@ class EventSinkPort(Protocol):
     def store_event(self, *, tenant_id: int, event: EventDTO) -> int:
         ...
 
+    def store_rows(self, rows: list[dict]) -> int:
+        ...
+
 
 class WarehouseSinkPort(Protocol):
     def send_event(self, *, tenant_id: int, event: EventDTO) -> None:
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+"""
+Buffered telemetry sink.
+
+AR:
+- يتم التحقق من الحدث وتجهيزه داخل الطلب، ثم يُضاف إلى طابور محدود في ذاكرة العامل بعد نجاح المعاملة فقط.
+- خيط خلفي يكتب الطابور بـ `bulk_create` عند بلوغ `ANALYTICS_BUFFER_FLUSH_SIZE` حدثاً أو مرور
+  `ANALYTICS_BUFFER_FLUSH_SECONDS` على أقدم حدث.
+- عند امتلاء الطابور تُسقط الأحداث الجديدة وتُعدّ (ضغط عكسي)؛ المقاييس متاحة عبر `/metrics`.
+- اختيارياً (`ANALYTICS_SPOOL_DIR`) يُلحق كل حدث بملف JSONL، فيعيد `replay_telemetry_journal` أحداث عامل توقف
+  قبل الكتابة.
+
+EN:
+- Events are validated and hashed in the request, then queued in a bounded per-worker buffer on commit.
+- A background thread writes the buffer with `bulk_create` once `ANALYTICS_BUFFER_FLUSH_SIZE` events are
+  queued or the oldest has waited `ANALYTICS_BUFFER_FLUSH_SECONDS`.
+- A full buffer drops new events and counts them (backpressure); counters are exported on `/metrics`.
+- Optionally (`ANALYTICS_SPOOL_DIR`) every event is appended to a JSONL journal segment, deleted once its
+  events are inserted; `replay_telemetry_journal` loads segments left behind by a dead worker.
+- Segments are named after a random per-process owner id, never the pid (pids are reused in containers). The
+  owner holds an exclusive lock on `events-{owner}.lock` while alive, which is how replay tells dead owners
+  apart.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from apps.analytics.domain.types import EventDTO
+from apps.analytics.infrastructure.db_sink import build_event_row
+from apps.analytics.models import Event
+
+try:
+    import fcntl
+except Exception:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger("analytics.telemetry")
+
+SEGMENT_PREFIX = "events-"
+
+
+def _setting_int(name: str, default: int) -> int:
+    return max(1, int(getattr(settings, name, default) or default))
+
+
+def segment_owner(path: Path) -> str:
+    """Writer id encoded in a segment name (`events-{owner}-{seq}.jsonl`)."""
+    return path.name[len(SEGMENT_PREFIX):].split("-", 1)[0]
+
+
+def owner_lock_path(spool_dir: Path, owner: str) -> Path:
+    return spool_dir / f"{SEGMENT_PREFIX}{owner}.lock"
+
+
+def owner_alive(spool_dir: Path, owner: str) -> bool:
+    """Whether the writer `owner` still holds its lock. Without `fcntl` every owner is assumed alive."""
+    path = owner_lock_path(spool_dir, owner)
+    if not path.exists():
+        return False
+    if fcntl is None:
+        return True
+    with path.open("a") as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(handle, fcntl.LOCK_UN)
+    return False
+
+
+def load_segment(path: Path) -> list[dict]:
+    rows = []
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # A worker killed mid-write leaves a truncated last line.
+                continue
+            row["occurred_at"] = parse_datetime(row["occurred_at"])
+            rows.append(row)
+    return rows
+
+
+def insert_rows(rows: list[dict], *, batch_size: int = 500) -> int:
+    Event.objects.bulk_create([Event(**row) for row in rows], batch_size=batch_size)
+    return len(rows)
+
+
+class BufferedEventSink:
+    def __init__(
+        self,
+        *,
+        capacity: int | None = None,
+        flush_size: int | None = None,
+        flush_seconds: float | None = None,
+        spool_dir: str | None = None,
+        background: bool = True,
+    ):
+        self.capacity = capacity or _setting_int("ANALYTICS_BUFFER_MAX_EVENTS", 10000)
+        self.flush_size = min(flush_size or _setting_int("ANALYTICS_BUFFER_FLUSH_SIZE", 500), self.capacity)
+        self.flush_seconds = float(flush_seconds or _setting_int("ANALYTICS_BUFFER_FLUSH_SECONDS", 2))
+        spool_dir = getattr(settings, "ANALYTICS_SPOOL_DIR", "") if spool_dir is None else spool_dir
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self.background = background
+        self._atexit_registered = False
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        # Also runs in a forked child: the parent's queued events and journal belong to the parent.
+        self._pid = os.getpid()
+        self._owner = uuid.uuid4().hex
+        self._owner_lock = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._buffer: deque[tuple[float, dict]] = deque()
+        self._thread: threading.Thread | None = None
+        self._journal = None
+        self._segment: Path | None = None
+        self._segment_seq = 0
+        self._pending_segments: list[Path] = []
+        self._enqueued = 0
+        self._flushed = 0
+        self._dropped = 0
+        self._flush_failures = 0
+        self._high_watermark = 0
+        self._last_flush_ms = 0.0
+
+    # -- request side ---------------------------------------------------------------------------------
+
+    def store_event(self, *, tenant_id: int, event: EventDTO) -> int:
+        """Validate now, queue once the caller's transaction commits. Buffered events have no id yet (0)."""
+        row = build_event_row(tenant_id=tenant_id, event=event)
+        transaction.on_commit(lambda: self.enqueue(row))
+        return 0
+
+    def store_rows(self, rows: list[dict]) -> int:
+        """Queue already built rows once the caller's transaction commits. Returns rows handed over."""
+        transaction.on_commit(lambda: [self.enqueue(row) for row in rows])
+        return len(rows)
+
+    def _check_fork(self) -> None:
+        if os.getpid() != self._pid:
+            self._reset_state()
+
+    def enqueue(self, row: dict) -> bool:
+        self._check_fork()
+        with self._cond:
+            if len(self._buffer) >= self.capacity:
+                self._dropped += 1
+                return False
+            self._buffer.append((time.monotonic(), row))
+            self._enqueued += 1
+            self._high_watermark = max(self._high_watermark, len(self._buffer))
+            if self.spool_dir is not None:
+                self._append_journal(row)
+            if len(self._buffer) >= self.flush_size:
+                self._cond.notify()
+        if self.background:
+            self._ensure_thread()
+        return True
+
+    # -- journal --------------------------------------------------------------------------------------
+
+    def _append_journal(self, row: dict) -> None:
+        try:
+            if self._journal is None:
+                self.spool_dir.mkdir(parents=True, exist_ok=True)
+                self._lock_owner()
+                self._segment_seq += 1
+                self._segment = self.spool_dir / f"{SEGMENT_PREFIX}{self._owner}-{self._segment_seq:06d}.jsonl"
+                # "x": a segment is only ever written by the owner that created it.
+                self._journal = self._segment.open("x", encoding="utf-8")
+            self._journal.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n")
+            self._journal.flush()
+        except OSError as exc:
+            # The journal is best effort; the event is still in memory.
+            logger.warning("telemetry_journal_failed", extra={"error_code": exc.__class__.__name__})
+
+    def _lock_owner(self) -> None:
+        """Hold `events-{owner}.lock` for the life of the process so replay leaves our segments alone."""
+        if self._owner_lock is not None:
+            return
+        handle = owner_lock_path(self.spool_dir, self._owner).open("x")
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._owner_lock = handle
+
+    def _rotate_journal(self) -> Path | None:
+        """Close the segment holding the events being drained; new events start a fresh one."""
+        segment, journal = self._segment, self._journal
+        self._segment = self._journal = None
+        if journal is not None:
+            journal.close()
+        return segment
+
+    # -- flushing -------------------------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Insert everything queued so far. On failure the events are requeued (capacity permitting)."""
+        self._check_fork()
+        with self._flush_lock:
+            with self._cond:
+                batch = [row for _queued_at, row in self._buffer]
+                queued_at = [queued for queued, _row in self._buffer]
+                self._buffer.clear()
+                segment = self._rotate_journal()
+            if segment is not None:
+                self._pending_segments.append(segment)
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                insert_rows(batch, batch_size=self.flush_size)
+            except Exception as exc:
+                logger.warning("telemetry_flush_failed", extra={"error_code": exc.__class__.__name__})
+                with self._cond:
+                    self._flush_failures += 1
+                    room = max(self.capacity - len(self._buffer), 0)
+                    self._dropped += max(len(batch) - room, 0)
+                    self._buffer.extendleft(reversed(list(zip(queued_at, batch))[:room]))
+                return 0
+
+            # Requeued events from an earlier failed flush were part of this batch, so their segments go too.
+            for path in self._pending_segments:
+                path.unlink(missing_ok=True)
+            self._pending_segments.clear()
+            with self._cond:
+                self._flushed += len(batch)
+                self._last_flush_ms = (time.perf_counter() - started) * 1000
+            return len(batch)
+
+    def _due(self) -> bool:
+        return bool(self._buffer) and (
+            len(self._buffer) >= self.flush_size or time.monotonic() - self._buffer[0][0] >= self.flush_seconds
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due():
+                    timeout = self.flush_seconds
+                    if self._buffer:
+                        timeout = max(self.flush_seconds - (time.monotonic() - self._buffer[0][0]), 0.01)
+                    self._cond.wait(timeout)
+            try:
+                if not self.flush() and self._buffer:
+                    # The insert failed and the events were requeued: back off instead of spinning.
+                    time.sleep(self.flush_seconds)
+            finally:
+                connection.close()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                self._atexit_registered = True
+                atexit.register(self.flush)
+
+    # -- metrics --------------------------------------------------------------------------------------
+
+    def metrics(self) -> dict[str, float]:
+        with self._cond:
+            oldest = time.monotonic() - self._buffer[0][0] if self._buffer else 0.0
+            return {
+                "depth": len(self._buffer),
+                "capacity": self.capacity,
+                "high_watermark": self._high_watermark,
+                "enqueued_total": self._enqueued,
+                "flushed_total": self._flushed,
+                "dropped_total": self._dropped,
+                "flush_failures_total": self._flush_failures,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "oldest_age_seconds": round(oldest, 3),
+            }
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+"""
+Item-to-item co-purchase recommender.
+
+AR:
+- `update_copurchase_model` يقرأ الطلبات الجديدة (بعد العلامة المائية) كسلال مشتريات، واختيارياً أحداث
+  `cart.item_added` و `product.viewed` مجمّعة لكل زائر بوزن أقل، ويضيفها إلى مصفوفة تزامن متفرقة لكل متجر
+  (`ProductCooccurrence`).
+- المنتجات التي تغيّرت يُعاد حساب جيرانها بدرجة جيب التمام، ويُحفظ أفضل K في `ProductNeighbor`.
+- التوصية وقت الطلب قراءة مفهرسة واحدة من `ProductNeighbor`.
+
+EN:
+- `update_copurchase_model` turns orders past their `RollupWatermark` into baskets (and, when
+  `ANALYTICS_RECS_EVENT_WEIGHT` > 0, `cart.item_added` / `product.viewed` events grouped per visitor, at that
+  weight) and adds the basket×product product `BᵀWB` to the tenant's sparse co-occurrence matrix.
+- Products touched by a run get their neighbour list recomputed: cosine score `w(p,q) / sqrt(w(p,p)·w(q,q))`,
+  best `ANALYTICS_RECS_TOP_K` kept in `ProductNeighbor`. Neighbour lists of untouched products keep their old
+  scores until they are touched again or the model is rebuilt (`--rebuild`).
+- Serving is one indexed read of `ProductNeighbor`.
+- Uses NumPy/SciPy sparse matrices when installed and an equivalent pure-Python path otherwise.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Sequence
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Sum
+from django.utils import timezone
+
+from apps.analytics.infrastructure.rollups import rollup_lag
+from apps.analytics.models import Event, ProductCooccurrence, ProductNeighbor, RollupWatermark
+from apps.catalog.models import Product
+from apps.orders.models import Order, OrderItem
+
+try:  # optional dependency
+    import numpy as np
+    from scipy import sparse
+except Exception:  # pragma: no cover
+    np = None
+    sparse = None
+
+ORDERS_WATERMARK = "recs.copurchase.orders"
+EVENTS_WATERMARK = "recs.copurchase.events"
+BASKET_EVENTS = ("cart.item_added", "product.viewed")
+# Bulk/wholesale baskets pair everything with everything and drown real co-purchase signal.
+MAX_BASKET_ITEMS = 50
+CHUNK_SIZE = 5000
+ID_BATCH = 500
+
+# (product ids, basket weight)
+Basket = tuple[Sequence[int], float]
+Pair = tuple[int, int]
+
+
+def recs_top_k() -> int:
+    return max(1, int(getattr(settings, "ANALYTICS_RECS_TOP_K", 20) or 20))
+
+
+def recs_event_weight() -> float:
+    return float(getattr(settings, "ANALYTICS_RECS_EVENT_WEIGHT", 0.0) or 0.0)
+
+
+# -- matrix math ------------------------------------------------------------------------------------
+
+
+def cooccurrence(baskets: Iterable[Basket]) -> dict[Pair, float]:
+    """Upper triangle (diagonal included) of `BᵀWB` for weighted baskets, as `{(p, q): weight}` with p <= q."""
+    prepared = []
+    for products, weight in baskets:
+        products = sorted(set(products))
+        if products and len(products) <= MAX_BASKET_ITEMS and weight > 0:
+            prepared.append((products, float(weight)))
+    if not prepared:
+        return {}
+    if sparse is not None:
+        return _cooccurrence_sparse(prepared)
+
+    pairs: dict[Pair, float] = defaultdict(float)
+    for products, weight in prepared:
+        for index, product_id in enumerate(products):
+            for other_id in products[index:]:
+                pairs[(product_id, other_id)] += weight
+    return dict(pairs)
+
+
+def _cooccurrence_sparse(baskets: list[tuple[list[int], float]]) -> dict[Pair, float]:
+    lengths = np.fromiter((len(products) for products, _ in baskets), dtype=np.int64, count=len(baskets))
+    flat = np.fromiter((pid for products, _ in baskets for pid in products), dtype=np.int64, count=int(lengths.sum()))
+    products, columns = np.unique(flat, return_inverse=True)
+    rows = np.repeat(np.arange(len(baskets)), lengths)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(flat)), (rows, columns)), shape=(len(baskets), len(products))
+    )
+    weights = sparse.diags(np.fromiter((weight for _, weight in baskets), dtype=np.float64, count=len(baskets)))
+    matrix = sparse.triu(incidence.T @ weights @ incidence).tocoo()
+    return {
+        (int(products[row]), int(products[col])): float(value)
+        for row, col, value in zip(matrix.row, matrix.col, matrix.data)
+    }
+
+
+def rank_neighbors(
+    pairs: Iterable[tuple[int, int, float]], diagonal: dict[int, float], products: Iterable[int], k: int
+) -> dict[int, list[tuple[int, float]]]:
+    """
+    Best `k` neighbours of each of `products` by cosine score, from upper-triangle off-diagonal `pairs` and
+    the diagonal. Ties go to the lower product id.
+    """
+    wanted = set(products)
+    sources, targets, scores = [], [], []
+    for product_id, other_id, weight in pairs:
+        norm = math.sqrt(diagonal.get(product_id, 0.0) * diagonal.get(other_id, 0.0))
+        if product_id == other_id or weight <= 0 or not norm:
+            continue
+        for source, target in ((product_id, other_id), (other_id, product_id)):
+            if source in wanted:
+                sources.append(source)
+                targets.append(target)
+                scores.append(weight / norm)
+    ranked: dict[int, list[tuple[int, float]]] = {product_id: [] for product_id in wanted}
+    if not sources:
+        return ranked
+
+    if np is not None:
+        src, dst, score = np.array(sources), np.array(targets), np.array(scores)
+        order = np.lexsort((dst, -score, src))
+        src, dst, score = src[order], dst[order], score[order]
+        starts = np.r_[True, src[1:] != src[:-1]]
+        position = np.arange(len(src)) - np.maximum.accumulate(np.where(starts, np.arange(len(src)), 0))
+        keep = position < k
+        for source, target, value in zip(src[keep].tolist(), dst[keep].tolist(), score[keep].tolist()):
+            ranked[source].append((target, value))
+        return ranked
+
+    for source, target, value in sorted(zip(sources, targets, scores), key=lambda row: (row[0], -row[2], row[1])):
+        if len(ranked[source]) < k:
+            ranked[source].append((target, value))
+    return ranked
+
+
+# -- reading baskets --------------------------------------------------------------------------------
+
+
+def _before_cutoff(rows: list[tuple], cutoff: datetime, at: int) -> list[tuple]:
+    for index, row in enumerate(rows):
+        if row[at] > cutoff:
+            return rows[:index]
+    return rows
+
+
+def _order_chunk(after_id: int, cutoff: datetime, chunk_size: int) -> tuple[dict[int, list[Basket]], int, bool]:
+    orders = list(Order.objects.filter(id__gt=after_id).order_by("id").values_list("id", "created_at")[:chunk_size])
+    fetched = len(orders)
+    orders = _before_cutoff(orders, cutoff, 1)
+    if not orders:
+        return {}, after_id, True
+    last_id = orders[-1][0]
+
+    items: dict[tuple[int, int], list[int]] = defaultdict(list)
+    rows = (
+        OrderItem.objects.filter(order_id__gt=after_id, order_id__lte=last_id)
+        .exclude(order__status="cancelled")
+        .values_list("order_id", "order__store_id", "product_id")
+    )
+    for order_id, tenant_id, product_id in rows:
+        items[(tenant_id, order_id)].append(product_id)
+    baskets: dict[int, list[Basket]] = defaultdict(list)
+    for (tenant_id, _order_id), products in items.items():
+        baskets[tenant_id].append((products, 1.0))
+    return baskets, last_id, len(orders) < fetched or fetched < chunk_size
+
+
+def _event_chunk(after_id: int, cutoff: datetime, chunk_size: int) -> tuple[dict[int, list[Basket]], int, bool]:
+    events = list(
+        Event.objects.filter(id__gt=after_id, event_name__in=BASKET_EVENTS, object_type="PRODUCT")
+        .order_by("id")
+        .values_list("id", "occurred_at", "tenant_id", "actor_id_hash", "session_key_hash", "object_id")[:chunk_size]
+    )
+    fetched = len(events)
+    events = _before_cutoff(events, cutoff, 1)
+    if not events:
+        return {}, after_id, True
+
+    # A visitor's activity inside one chunk is one basket; anonymous events without a session are skipped.
+    visits: dict[tuple[int, str], list[int]] = defaultdict(list)
+    for _id, _at, tenant_id, actor_hash, session_hash, object_id in events:
+        identity = actor_hash or session_hash
+        try:
+            product_id = int(object_id)
+        except (TypeError, ValueError):
+            continue
+        if identity:
+            visits[(tenant_id, identity)].append(product_id)
+    weight = recs_event_weight()
+    baskets: dict[int, list[Basket]] = defaultdict(list)
+    for (tenant_id, _identity), products in visits.items():
+        baskets[tenant_id].append((products, weight))
+    return baskets, events[-1][0], len(events) < fetched or fetched < chunk_size
+
+
+# -- persistence ------------------------------------------------------------------------------------
+
+
+def _batches(ids: Iterable[int]) -> Iterable[list[int]]:
+    ids = sorted(ids)
+    for start in range(0, len(ids), ID_BATCH):
+        yield ids[start:start + ID_BATCH]
+
+
+def _merge_cooccurrence(tenant_id: int, pairs: dict[Pair, float]) -> None:
+    by_product: dict[int, dict[int, float]] = defaultdict(dict)
+    for (product_id, other_id), weight in pairs.items():
+        by_product[product_id][other_id] = weight
+    changed, created = [], []
+    for batch in _batches(by_product):
+        existing = {
+            (row.product_id, row.other_id): row
+            for row in ProductCooccurrence.objects.select_for_update().filter(tenant_id=tenant_id, product_id__in=batch)
+        }
+        for product_id in batch:
+            for other_id, weight in by_product[product_id].items():
+                row = existing.get((product_id, other_id))
+                if row is None:
+                    created.append(
+                        ProductCooccurrence(tenant_id=tenant_id, product_id=product_id, other_id=other_id, weight=weight)
+                    )
+                else:
+                    row.weight += weight
+                    changed.append(row)
+    if changed:
+        ProductCooccurrence.objects.bulk_update(changed, ["weight"], batch_size=500)
+    if created:
+        ProductCooccurrence.objects.bulk_create(created, batch_size=500)
+
+
+@transaction.atomic
+def refresh_neighbors(tenant_id: int, product_ids: Iterable[int], *, k: int | None = None) -> int:
+    """Recompute and store the neighbour lists of `product_ids`. Returns rows written."""
+    k = k or recs_top_k()
+    written = 0
+    for batch in _batches(set(product_ids)):
+        rows = ProductCooccurrence.objects.filter(tenant_id=tenant_id).filter(
+            Q(product_id__in=batch) | Q(other_id__in=batch)
+        )
+        pairs, diagonal = [], {}
+        for product_id, other_id, weight in rows.values_list("product_id", "other_id", "weight"):
+            if product_id == other_id:
+                diagonal[product_id] = weight
+            else:
+                pairs.append((product_id, other_id, weight))
+        counterparts = {pid for pair in pairs for pid in pair[:2]} - diagonal.keys()
+        for ids in _batches(counterparts):
+            diagonal.update(
+                ProductCooccurrence.objects.filter(tenant_id=tenant_id, product_id__in=ids, other_id=F("product_id"))
+                .values_list("product_id", "weight")
+            )
+
+        ranked = rank_neighbors(pairs, diagonal, batch, k)
+        ProductNeighbor.objects.filter(tenant_id=tenant_id, product_id__in=batch).delete()
+        neighbors = [
+            ProductNeighbor(tenant_id=tenant_id, product_id=product_id, rank=rank, neighbor_id=neighbor_id, score=score)
+            for product_id, ranked_neighbors in ranked.items()
+            for rank, (neighbor_id, score) in enumerate(ranked_neighbors, start=1)
+        ]
+        ProductNeighbor.objects.bulk_create(neighbors, batch_size=500)
+        written += len(neighbors)
+    return written
+
+
+def update_copurchase_model(
+    *, rebuild: bool = False, chunk_size: int = CHUNK_SIZE, now: datetime | None = None
+) -> dict[str, int]:
+    """
+    Fold orders (and weighted visitor events) past their watermarks into the co-occurrence matrix, one
+    transaction per chunk, then refresh the neighbour lists of every product they touched. `rebuild`
+    starts over from an empty model. Returns counts of baskets, tenants and refreshed products.
+    """
+    cutoff = (now or timezone.now()) - rollup_lag()
+    if rebuild:
+        with transaction.atomic():
+            ProductCooccurrence.objects.all().delete()
+            ProductNeighbor.objects.all().delete()
+            RollupWatermark.objects.filter(name__in=(ORDERS_WATERMARK, EVENTS_WATERMARK)).delete()
+
+    sources = [(ORDERS_WATERMARK, _order_chunk)]
+    if recs_event_weight() > 0:
+        sources.append((EVENTS_WATERMARK, _event_chunk))
+
+    touched: dict[int, set[int]] = defaultdict(set)
+    baskets_total = 0
+    for name, read_chunk in sources:
+        RollupWatermark.objects.get_or_create(name=name)
+        done = False
+        while not done:
+            with transaction.atomic():
+                # The row lock also keeps concurrent runs from folding the same chunk twice.
+                watermark = RollupWatermark.objects.select_for_update().get(name=name)
+                baskets, last_id, done = read_chunk(watermark.last_id, cutoff, chunk_size)
+                for tenant_id, tenant_baskets in baskets.items():
+                    pairs = cooccurrence(tenant_baskets)
+                    _merge_cooccurrence(tenant_id, pairs)
+                    touched[tenant_id].update(product_id for product_id, other_id in pairs if product_id == other_id)
+                    baskets_total += len(tenant_baskets)
+                if last_id != watermark.last_id:
+                    watermark.last_id = last_id
+                    watermark.save(update_fields=["last_id", "updated_at"])
+
+    for tenant_id, product_ids in touched.items():
+        refresh_neighbors(tenant_id, product_ids)
+    return {
+        "baskets": baskets_total,
+        "tenants": len(touched),
+        "products": sum(len(product_ids) for product_ids in touched.values()),
+    }
+
+
+# -- serving ----------------------------------------------------------------------------------------
+
+
+def recommend_neighbors(*, tenant_id: int, product_ids: Sequence[int], limit: int = 8) -> list[int]:
+    """
+    Active co-purchase neighbours of `product_ids`, excluding the products themselves: by rank for one
+    product, by summed score for several. One indexed query.
+    """
+    if not product_ids:
+        return []
+    active = Product.objects.filter(store_id=tenant_id, is_active=True, id=OuterRef("neighbor_id"))
+    rows = (
+        ProductNeighbor.objects.filter(tenant_id=tenant_id, product_id__in=product_ids)
+        .exclude(neighbor_id__in=product_ids)
+        .filter(Exists(active))
+    )
+    if len(product_ids) == 1:
+        return list(rows.order_by("rank").values_list("neighbor_id", flat=True)[:limit])
+    ranked = rows.values("neighbor_id").annotate(total=Sum("score")).order_by("-total", "neighbor_id")
+    return list(ranked.values_list("neighbor_id", flat=True)[:limit])
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Sequence
+
 from django.utils import timezone
 
 from apps.analytics.domain.types import EventDTO
@@ -11,25 +13,84 @@ from apps.analytics.domain.policies import (
     validate_event_name,
 )
 
+OBJECT_TYPE_MAX_LENGTH = Event._meta.get_field("object_type").max_length
+OBJECT_ID_MAX_LENGTH = Event._meta.get_field("object_id").max_length
+
+
+def build_event_row(*, tenant_id: int, event: EventDTO) -> dict:
+    """Validated, redacted and hashed `Event` field values; raises `ValueError` for an invalid event."""
+    return {
+        "tenant_id": tenant_id,
+        "event_name": validate_event_name(event.event_name),
+        "actor_type": normalize_actor_type(event.actor_type),
+        "actor_id_hash": hash_identifier(event.actor_id),
+        "session_key_hash": hash_identifier(event.session_key),
+        "object_type": (event.object_type or "").upper(),
+        "object_id": str(event.object_id) if event.object_id is not None else "",
+        "properties_json": redact_properties(event.properties),
+        "user_agent": (event.user_agent or "")[:255],
+        "ip_hash": hash_identifier(event.ip_address),
+        "occurred_at": event.occurred_at or timezone.now(),
+    }
+
+
+def build_event_rows(*, tenant_id: int, events: Sequence[EventDTO]) -> tuple[list[dict], list[tuple[int, str]]]:
+    """
+    `build_event_row` for a batch: each distinct event name is validated and each distinct identifier
+    hashed once. Returns the valid rows and `(index, error)` for the rejected events.
+    """
+    names: dict[str, str | None] = {}
+    for name in {event.event_name for event in events}:
+        try:
+            names[name] = validate_event_name(name)
+        except ValueError:
+            names[name] = None
+    hashes: dict[str | int | None, str] = {}
+
+    def _hash(value: str | int | None) -> str:
+        if value not in hashes:
+            hashes[value] = hash_identifier(value)
+        return hashes[value]
+
+    now = timezone.now()
+    rows: list[dict] = []
+    errors: list[tuple[int, str]] = []
+    for index, event in enumerate(events):
+        event_name = names[event.event_name]
+        if event_name is None:
+            errors.append((index, "Invalid event name."))
+            continue
+        object_type = (event.object_type or "").upper()
+        object_id = str(event.object_id) if event.object_id is not None else ""
+        if len(object_type) > OBJECT_TYPE_MAX_LENGTH or len(object_id) > OBJECT_ID_MAX_LENGTH:
+            errors.append((index, "Invalid object reference."))
+            continue
+        rows.append(
+            {
+                "tenant_id": tenant_id,
+                "event_name": event_name,
+                "actor_type": normalize_actor_type(event.actor_type),
+                "actor_id_hash": _hash(event.actor_id),
+                "session_key_hash": _hash(event.session_key),
+                "object_type": object_type,
+                "object_id": object_id,
+                "properties_json": redact_properties(event.properties),
+                "user_agent": (event.user_agent or "")[:255],
+                "ip_hash": _hash(event.ip_address),
+                "occurred_at": event.occurred_at or now,
+            }
+        )
+    return rows, errors
+
 
 class DbEventSink:
     @staticmethod
     def store_event(*, tenant_id: int, event: EventDTO) -> int:
-        event_name = validate_event_name(event.event_name)
-        actor_type = normalize_actor_type(event.actor_type)
-        properties = redact_properties(event.properties)
-
-        created = Event.objects.create(
-            tenant_id=tenant_id,
-            event_name=event_name,
-            actor_type=actor_type,
-            actor_id_hash=hash_identifier(event.actor_id),
-            session_key_hash=hash_identifier(event.session_key),
-            object_type=(event.object_type or "").upper(),
-            object_id=str(event.object_id) if event.object_id is not None else "",
-            properties_json=properties,
-            user_agent=(event.user_agent or "")[:255],
-            ip_hash=hash_identifier(event.ip_address),
-            occurred_at=event.occurred_at or timezone.now(),
-        )
+        created = Event.objects.create(**build_event_row(tenant_id=tenant_id, event=event))
         return created.id
+
+    @staticmethod
+    def store_rows(rows: list[dict]) -> int:
+        """Insert already built rows (`build_event_rows`) with one `bulk_create`."""
+        Event.objects.bulk_create([Event(**row) for row in rows], batch_size=500)
+        return len(rows)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+"""
+In-process experiment definitions.
+
+AR:
+- يحمّل كل worker التجارب الجارية (RUNNING) مرة واحدة في جدول ثابت، ويُعاد التحميل فقط عند تغيّر مفتاح الإصدار
+  المشترك في الـ cache (يُحدَّث عند حفظ أو حذف أي تجربة) أو بعد `ANALYTICS_EXPERIMENTS_MAX_AGE_SECONDS`.
+
+EN:
+- Each worker keeps the RUNNING experiments in one immutable table, reloaded only when the shared cache
+  version (bumped on every experiment save/delete) changes or after `ANALYTICS_EXPERIMENTS_MAX_AGE_SECONDS`
+  (a safety net for queryset `.update()` calls that bypass signals).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+
+from apps.analytics.models import Experiment
+from apps.core.version_stamps import bump_version, current_version
+
+EXPERIMENTS_VERSION_CACHE_KEY = "analytics:experiments:version"
+
+
+@dataclass(frozen=True)
+class ExperimentDefinition:
+    id: int
+    key: str
+    tenant_id: int | None
+    variants: tuple[tuple[str, int], ...]
+    start_at: datetime | None
+    end_at: datetime | None
+
+    def is_live(self, *, tenant_id: int, now: datetime) -> bool:
+        if self.tenant_id and self.tenant_id != tenant_id:
+            return False
+        if self.start_at and now < self.start_at:
+            return False
+        return not (self.end_at and now > self.end_at)
+
+
+@dataclass(frozen=True)
+class ExperimentRegistry:
+    version: str
+    loaded_at: float
+    by_key: dict[str, ExperimentDefinition]
+
+    def get(self, key: str) -> ExperimentDefinition | None:
+        return self.by_key.get(key)
+
+
+_lock = threading.Lock()
+_registry: ExperimentRegistry | None = None
+
+
+def _max_age_seconds() -> int:
+    return int(getattr(settings, "ANALYTICS_EXPERIMENTS_MAX_AGE_SECONDS", 300) or 300)
+
+
+def _current_version() -> str:
+    return str(current_version(EXPERIMENTS_VERSION_CACHE_KEY))
+
+
+def _load(version: str) -> ExperimentRegistry:
+    by_key = {}
+    for exp in Experiment.objects.filter(status=Experiment.STATUS_RUNNING).order_by("id"):
+        variants = tuple((str(name), int(weight)) for name, weight in (exp.variants_json or {"A": 100}).items())
+        by_key[exp.key] = ExperimentDefinition(
+            id=exp.id,
+            key=exp.key,
+            tenant_id=exp.tenant_id,
+            variants=variants,
+            start_at=exp.start_at,
+            end_at=exp.end_at,
+        )
+    return ExperimentRegistry(version=version, loaded_at=time.monotonic(), by_key=by_key)
+
+
+def _fresh(registry: ExperimentRegistry | None, version: str) -> bool:
+    return (
+        registry is not None
+        and registry.version == version
+        and time.monotonic() - registry.loaded_at < _max_age_seconds()
+    )
+
+
+def get_experiment_registry() -> ExperimentRegistry:
+    """This worker's running experiments; one cache read per call, SQL only after an invalidation."""
+    global _registry
+
+    version = _current_version()
+    registry = _registry
+    if _fresh(registry, version):
+        return registry
+    with _lock:
+        if _fresh(_registry, version):
+            return _registry
+        _registry = _load(version)
+        return _registry
+
+
+def bump_experiments_version() -> None:
+    """Invalidate every worker's registry, now and again once the write is committed."""
+    bump_version(EXPERIMENTS_VERSION_CACHE_KEY)
+
+
+def reset_experiment_registry() -> None:
+    global _registry
+    with _lock:
+        _registry = None
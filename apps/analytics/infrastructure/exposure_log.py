@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+"""
+Experiment exposure log.
+
+- Stateless assignment records each exposure here instead of reading/writing `ExperimentAssignment` in the
+  request; a background thread bulk-inserts them every `ANALYTICS_EXPOSURE_FLUSH_SECONDS`.
+- An identity is logged at most once per experiment per `ANALYTICS_EXPOSURE_WINDOW_SECONDS` in a worker;
+  repeats across workers hit the `uq_experiment_assignment_identity` constraint and are ignored.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from apps.analytics.models import ExperimentAssignment
+
+logger = logging.getLogger("analytics.telemetry")
+
+# (experiment_id, actor_id_hash, session_key_hash)
+ExposureKey = tuple[int, str, str]
+
+
+class ExposureLog:
+    def __init__(
+        self,
+        *,
+        window_seconds: int | None = None,
+        flush_seconds: int | None = None,
+        max_tracked: int = 100_000,
+        background: bool = True,
+    ):
+        self.window_seconds = window_seconds or int(getattr(settings, "ANALYTICS_EXPOSURE_WINDOW_SECONDS", 3600) or 3600)
+        self.flush_seconds = flush_seconds or int(getattr(settings, "ANALYTICS_EXPOSURE_FLUSH_SECONDS", 5) or 5)
+        self.max_tracked = max_tracked
+        self.background = background
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        # A forked worker starts empty; the parent's pending exposures are the parent's to write.
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._seen: dict[ExposureKey, float] = {}
+        self._pending: list[ExperimentAssignment] = []
+        self._thread: threading.Thread | None = None
+        self.logged = 0
+        self.deduplicated = 0
+
+    def record(self, *, experiment_id: int, tenant_id: int, actor_hash: str, session_hash: str, variant: str) -> bool:
+        """Queue an exposure unless this identity was already logged in the window. Never touches the DB."""
+        if os.getpid() != self._pid:
+            self._reset_state()
+        key = (experiment_id, actor_hash, session_hash)
+        now = time.monotonic()
+        with self._lock:
+            last = self._seen.get(key)
+            if last is not None and now - last < self.window_seconds:
+                self.deduplicated += 1
+                return False
+            if len(self._seen) >= self.max_tracked:
+                self._seen.clear()
+            self._seen[key] = now
+            self._pending.append(
+                ExperimentAssignment(
+                    experiment_id=experiment_id,
+                    tenant_id=tenant_id,
+                    actor_id_hash=actor_hash,
+                    session_key_hash=session_hash,
+                    variant=variant,
+                    assigned_at=timezone.now(),
+                )
+            )
+        if self.background:
+            self._ensure_thread()
+        return True
+
+    def flush(self) -> int:
+        if os.getpid() != self._pid:
+            self._reset_state()
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            ExperimentAssignment.objects.bulk_create(pending, batch_size=500, ignore_conflicts=True)
+        except Exception as exc:
+            # Exposures are analytics only; a failed batch is dropped rather than retried forever.
+            logger.warning("exposure_flush_failed", extra={"error_code": exc.__class__.__name__})
+            return 0
+        self.logged += len(pending)
+        return len(pending)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+                self._prune()
+            finally:
+                connection.close()
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            self._seen = {key: seen_at for key, seen_at in self._seen.items() if seen_at >= cutoff}
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            first_start = self._thread is None
+            self._thread = threading.Thread(target=self._run, name="experiment-exposures", daemon=True)
+            self._thread.start()
+        if first_start:
+            atexit.register(self.flush)
+
+
+_exposures: ExposureLog | None = None
+_exposures_lock = threading.Lock()
+
+
+def get_exposure_log() -> ExposureLog:
+    global _exposures
+    if _exposures is None:
+        with _exposures_lock:
+            if _exposures is None:
+                _exposures = ExposureLog()
+    return _exposures
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+"""
+Streaming fraud features.
+
+AR:
+- لكل متجر صف `OrderAmountStats` يُحدَّث عند إنشاء كل طلب (بعد الـ commit): العدد والمجموع الدقيق والمتوسط والتباين
+  بخوارزمية Welford (ودمج Chan للدفعات).
+- عدّادات نافذة منزلقة في الـ cache بدلو لكل دقيقة: المدفوعات الفاشلة لكل متجر، والطلبات لكل `ip_hash`.
+- تقييم الاحتيال يقرأ صفاً واحداً ومجموعة مفاتيح ثابتة العدد، فلا تنمو تكلفته مع تاريخ المتجر.
+
+EN:
+- One `OrderAmountStats` row per tenant, updated when each order commits: count, exact sum, and Welford
+  mean/M2 (batches are merged with Chan's parallel formula).
+- Sliding-window counters live in the cache as one key per minute bucket: failed payments per tenant and
+  placed orders per `ip_hash`. A window read is one `get_many` over a fixed number of keys, so windows are
+  exact to the minute.
+- Fraud scoring reads one row and a constant number of cache keys, whatever the store's history.
+- `backfill_fraud_features` rebuilds everything from orders, payment intents and events.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.analytics.models import Event, OrderAmountStats
+from apps.orders.models import Order
+from apps.payments.models import PaymentIntent
+
+BUCKET_SECONDS = 60
+FAILED_PAYMENTS_WINDOW = timedelta(minutes=15)
+ORDERS_PER_IP_WINDOW = timedelta(minutes=10)
+ORDER_IP_TTL_SECONDS = 24 * 3600
+
+
+def _bucket(moment: datetime) -> int:
+    return int(moment.timestamp()) // BUCKET_SECONDS
+
+
+def _failed_key(tenant_id: int, bucket: int) -> str:
+    return f"fraud:failed:{tenant_id}:{bucket}"
+
+
+def _ip_key(tenant_id: int, ip_hash: str, bucket: int) -> str:
+    return f"fraud:ip:{tenant_id}:{ip_hash}:{bucket}"
+
+
+def _order_ip_key(tenant_id: int, order_id: int | str) -> str:
+    return f"fraud:order_ip:{tenant_id}:{order_id}"
+
+
+def _incr(key: str, amount: int, window: timedelta) -> None:
+    # The bucket outlives its window by one bucket so the oldest partial minute is still readable.
+    cache.add(key, 0, int(window.total_seconds()) + BUCKET_SECONDS)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        cache.set(key, amount, int(window.total_seconds()) + BUCKET_SECONDS)
+
+
+def _window_sum(keys_for: Callable[[int], str], window: timedelta, now: datetime | None) -> int:
+    now = now or timezone.now()
+    first, last = _bucket(now - window), _bucket(now)
+    values = cache.get_many([keys_for(bucket) for bucket in range(first, last + 1)])
+    return sum(int(value) for value in values.values())
+
+
+# -- order amounts ----------------------------------------------------------------------------------
+
+
+def _welford(amounts: Iterable[Decimal]) -> tuple[int, Decimal, float, float]:
+    count, total, mean, m2 = 0, Decimal("0"), 0.0, 0.0
+    for amount in amounts:
+        count += 1
+        total += amount
+        delta = float(amount) - mean
+        mean += delta / count
+        m2 += delta * (float(amount) - mean)
+    return count, total, mean, m2
+
+
+@transaction.atomic
+def record_order_amounts(tenant_id: int, amounts: Iterable[Decimal]) -> None:
+    """Fold new order totals into the tenant's running statistics."""
+    count, total, mean, m2 = _welford(Decimal(str(amount)) for amount in amounts)
+    if not count:
+        return
+    OrderAmountStats.objects.get_or_create(tenant_id=tenant_id)
+    stats = OrderAmountStats.objects.select_for_update().get(tenant_id=tenant_id)
+    combined = stats.count + count
+    delta = mean - stats.mean
+    stats.mean += delta * count / combined
+    stats.m2 += m2 + delta * delta * stats.count * count / combined
+    stats.count = combined
+    stats.total += total
+    stats.save(update_fields=["count", "total", "mean", "m2", "updated_at"])
+
+
+def mean_excluding(tenant_id: int, amount: Decimal) -> Decimal | None:
+    """Mean order amount of the tenant's other orders, assuming `amount` (this order) is already recorded."""
+    row = OrderAmountStats.objects.filter(tenant_id=tenant_id).values_list("count", "total").first()
+    if not row or row[0] < 2:
+        return None
+    count, total = row
+    return (total - amount) / (count - 1)
+
+
+# -- sliding windows --------------------------------------------------------------------------------
+
+
+def record_failed_payment(tenant_id: int, *, at: datetime | None = None) -> None:
+    _incr(_failed_key(tenant_id, _bucket(at or timezone.now())), 1, FAILED_PAYMENTS_WINDOW)
+
+
+def recent_failed_payments(tenant_id: int, *, now: datetime | None = None) -> int:
+    return _window_sum(lambda bucket: _failed_key(tenant_id, bucket), FAILED_PAYMENTS_WINDOW, now)
+
+
+def record_order_ip(tenant_id: int, order_id: int | str, ip_hash: str, *, at: datetime | None = None) -> None:
+    # An empty hash is cached too, so scoring an order placed without an IP never falls back to SQL.
+    cache.set(_order_ip_key(tenant_id, order_id), ip_hash, ORDER_IP_TTL_SECONDS)
+    if not ip_hash:
+        return
+    _incr(_ip_key(tenant_id, ip_hash, _bucket(at or timezone.now())), 1, ORDERS_PER_IP_WINDOW)
+
+
+def order_ip(tenant_id: int, order_id: int | str) -> str | None:
+    return cache.get(_order_ip_key(tenant_id, order_id))
+
+
+def recent_orders_from_ip(tenant_id: int, ip_hash: str, *, now: datetime | None = None) -> int:
+    return _window_sum(lambda bucket: _ip_key(tenant_id, ip_hash, bucket), ORDERS_PER_IP_WINDOW, now)
+
+
+# -- backfill ---------------------------------------------------------------------------------------
+
+
+def _set_window(counts: dict[str, int], window: timedelta) -> None:
+    if counts:
+        cache.set_many(counts, int(window.total_seconds()) + BUCKET_SECONDS)
+
+
+def backfill_fraud_features(*, tenant_ids: Iterable[int] | None = None, now: datetime | None = None) -> int:
+    """Rebuild amount statistics and the current windows from the source tables. Returns tenants rebuilt."""
+    now = now or timezone.now()
+    if tenant_ids is None:
+        tenant_ids = Order.objects.order_by().values_list("store_id", flat=True).distinct()
+    tenant_ids = sorted(set(tenant_ids))
+
+    for tenant_id in tenant_ids:
+        amounts = Order.objects.filter(store_id=tenant_id).order_by("id").values_list("total_amount", flat=True)
+        count, total, mean, m2 = _welford(amounts.iterator(chunk_size=5000))
+        OrderAmountStats.objects.update_or_create(
+            tenant_id=tenant_id, defaults={"count": count, "total": total, "mean": mean, "m2": m2}
+        )
+
+        failed: dict[str, int] = {}
+        for created_at in PaymentIntent.objects.filter(
+            store_id=tenant_id,
+            status="failed",
+            created_at__gte=now - FAILED_PAYMENTS_WINDOW - timedelta(seconds=BUCKET_SECONDS),
+        ).values_list("created_at", flat=True):
+            key = _failed_key(tenant_id, _bucket(created_at))
+            failed[key] = failed.get(key, 0) + 1
+        _set_window(failed, FAILED_PAYMENTS_WINDOW)
+
+        per_ip: dict[str, int] = {}
+        order_ips: dict[str, str] = {}
+        placed = Event.objects.filter(
+            tenant_id=tenant_id, event_name="order.placed", occurred_at__gte=now - timedelta(seconds=ORDER_IP_TTL_SECONDS)
+        ).order_by("id")
+        for object_id, ip_hash, occurred_at in placed.values_list("object_id", "ip_hash", "occurred_at"):
+            order_ips.setdefault(_order_ip_key(tenant_id, object_id), ip_hash)
+            if ip_hash and occurred_at >= now - ORDERS_PER_IP_WINDOW - timedelta(seconds=BUCKET_SECONDS):
+                key = _ip_key(tenant_id, ip_hash, _bucket(occurred_at))
+                per_ip[key] = per_ip.get(key, 0) + 1
+        if order_ips:
+            cache.set_many(order_ips, ORDER_IP_TTL_SECONDS)
+        _set_window(per_ip, ORDERS_PER_IP_WINDOW)
+    return len(tenant_ids)
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+"""
+Order revenue rollups.
+
+AR:
+- `roll_up_orders` يعيد حساب الأيام غير النهائية فقط (بعد العلامة المائية `RollupWatermark`) من الطلبات المدفوعة غير
+  الملغاة: عدد الطلبات والإيرادات والعملاء المميزون والعملاء الجدد لكل متجر ويوم، ثم الأسابيع والأشهر التي تشملها.
+- آخر `ANALYTICS_ORDER_ROLLUP_RESTATE_DAYS` أيام تُعاد في كل تشغيل لالتقاط الدفع أو الإلغاء المتأخر.
+- الأيام النهائية التي يتغيّر فيها دفع طلب أو حالته أو مبلغه تُسجَّل في `OrderRollupDirtyDay` وتُعاد في التشغيل
+  التالي.
+- تعريف الإيراد مشترك مع لوحة التاجر (`revenue.py`).
+- `order_series` يقرأ صفوف الفترة المطلوبة فقط، فتكلفة مخطط لسنتين لا تعتمد على عدد الطلبات.
+
+EN:
+- `roll_up_orders` recomputes only the days after the `RollupWatermark` (a date ordinal) from paid,
+  non-cancelled orders: order count, revenue, distinct customers and first-time customers per tenant and
+  local day; then the ISO weeks and months those days fall in, merged from the day rows.
+- The last `ANALYTICS_ORDER_ROLLUP_RESTATE_DAYS` days stay open and are recomputed on every run. Older days
+  are final, except that the order signals record a final day in `OrderRollupDirtyDay` when one of its
+  orders is paid, cancelled or repriced late; the next run restates those days and their weeks and months.
+- Revenue is defined once (`revenue.py`) and shared with the merchant dashboard stats.
+- A customer is new in the bucket holding their first paid order in the store. Week and month distinct
+  customers come from merged HyperLogLog sketches, so `returning = customers - new` is an estimate there.
+- `order_series` reads one row per bucket in the range, so a two-year chart costs the same whatever the
+  order volume.
+"""
+
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from apps.analytics.domain.sketch import empty_sketch, sketch_add, sketch_estimate, sketch_merge
+from apps.analytics.infrastructure.revenue import revenue_orders
+from apps.analytics.models import OrderRollup, OrderRollupDirtyDay, RollupWatermark
+
+ORDERS_WATERMARK = "analytics.orders.days"
+CHUNK_DAYS = 31
+ID_BATCH = 500
+MAX_RANGE_DAYS = 5 * 366
+GRANULARITIES = (OrderRollup.GRANULARITY_DAY, OrderRollup.GRANULARITY_WEEK, OrderRollup.GRANULARITY_MONTH)
+
+
+def restate_days() -> int:
+    return max(1, int(getattr(settings, "ANALYTICS_ORDER_ROLLUP_RESTATE_DAYS", 3) or 3))
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    if granularity == OrderRollup.GRANULARITY_WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == OrderRollup.GRANULARITY_MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, granularity: str) -> date:
+    if granularity == OrderRollup.GRANULARITY_WEEK:
+        return start + timedelta(days=7)
+    if granularity == OrderRollup.GRANULARITY_MONTH:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _bucket_end(start: date, granularity: str) -> date:
+    return _next_bucket(start, granularity) - timedelta(days=1)
+
+
+def _local_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _customer_hash(customer_id: int) -> str:
+    return hashlib.sha256(f"customer:{customer_id}".encode()).hexdigest()
+
+
+@dataclass
+class OrderBucket:
+    orders: int = 0
+    revenue: Decimal = Decimal("0.00")
+    customers: set[int] = field(default_factory=set)
+    new_customers: int = 0
+    sketch: bytearray = field(default_factory=empty_sketch)
+
+
+# -- rollup -----------------------------------------------------------------------------------------
+
+
+def _first_orders(customer_ids: set[int]) -> dict[int, int]:
+    first: dict[int, int] = {}
+    ids = sorted(customer_ids)
+    for start in range(0, len(ids), ID_BATCH):
+        first.update(
+            revenue_orders()
+            .filter(customer_id__in=ids[start:start + ID_BATCH])
+            .values("customer_id")
+            .annotate(first_id=Min("id"))
+            .values_list("customer_id", "first_id")
+        )
+    return first
+
+
+def _fold_days(start: date, end: date) -> dict[tuple[int, date], OrderBucket]:
+    """Day buckets for paid orders created in local days [start, end]."""
+    rows = list(
+        revenue_orders()
+        .filter(created_at__gte=_local_start(start), created_at__lt=_local_start(end + timedelta(days=1)))
+        .values_list("id", "store_id", "customer_id", "total_amount", "created_at")
+    )
+    first = _first_orders({row[2] for row in rows})
+    buckets: dict[tuple[int, date], OrderBucket] = defaultdict(OrderBucket)
+    for order_id, tenant_id, customer_id, amount, created_at in rows:
+        bucket = buckets[(tenant_id, timezone.localdate(created_at))]
+        bucket.orders += 1
+        bucket.revenue += amount or Decimal("0.00")
+        if customer_id not in bucket.customers:
+            bucket.customers.add(customer_id)
+            sketch_add(bucket.sketch, _customer_hash(customer_id))
+        if first.get(customer_id) == order_id:
+            bucket.new_customers += 1
+    return buckets
+
+
+def _replace(granularity: str, start: date, end: date, rows: list[OrderRollup]) -> None:
+    """Swap every bucket of `granularity` starting in [start, end] for `rows` (all tenants)."""
+    OrderRollup.objects.filter(granularity=granularity, bucket_start__gte=start, bucket_start__lte=end).delete()
+    OrderRollup.objects.bulk_create(rows, batch_size=500)
+
+
+def _roll_up_days(start: date, end: date) -> int:
+    now = timezone.now()
+    rows = [
+        OrderRollup(
+            tenant_id=tenant_id,
+            granularity=OrderRollup.GRANULARITY_DAY,
+            bucket_start=day,
+            orders=bucket.orders,
+            revenue=bucket.revenue,
+            customers=len(bucket.customers),
+            new_customers=bucket.new_customers,
+            customer_sketch=bytes(bucket.sketch),
+            updated_at=now,
+        )
+        for (tenant_id, day), bucket in _fold_days(start, end).items()
+    ]
+    _replace(OrderRollup.GRANULARITY_DAY, start, end, rows)
+    return sum(row.orders for row in rows)
+
+
+def _roll_up_periods(granularity: str, start: date, end: date) -> None:
+    """Rebuild the `granularity` buckets overlapping [start, end] from the day rows."""
+    first = bucket_start(start, granularity)
+    merged: dict[tuple[int, date], OrderBucket] = defaultdict(OrderBucket)
+    day_rows = OrderRollup.objects.filter(
+        granularity=OrderRollup.GRANULARITY_DAY, bucket_start__gte=first, bucket_start__lte=end
+    ).values_list("tenant_id", "bucket_start", "orders", "revenue", "new_customers", "customer_sketch")
+    for tenant_id, day, orders, revenue, new_customers, sketch in day_rows:
+        bucket = merged[(tenant_id, bucket_start(day, granularity))]
+        bucket.orders += orders
+        bucket.revenue += revenue
+        bucket.new_customers += new_customers
+        sketch_merge(bucket.sketch, sketch)
+    now = timezone.now()
+    rows = [
+        OrderRollup(
+            tenant_id=tenant_id,
+            granularity=granularity,
+            bucket_start=period,
+            orders=bucket.orders,
+            revenue=bucket.revenue,
+            # A sketch never undercounts the first-time customers it contains.
+            customers=max(sketch_estimate(bucket.sketch), bucket.new_customers),
+            new_customers=bucket.new_customers,
+            customer_sketch=bytes(bucket.sketch),
+            updated_at=now,
+        )
+        for (tenant_id, period), bucket in merged.items()
+    ]
+    _replace(granularity, first, end, rows)
+
+
+def mark_order_day_dirty(tenant_id: int, day: date) -> None:
+    """
+    Record (on commit) that an order created on `day` changed its revenue. Days still inside the restate
+    window are recomputed anyway, so only final days are recorded.
+    """
+    if not tenant_id or day > timezone.localdate() - timedelta(days=restate_days()):
+        return
+    transaction.on_commit(
+        lambda: OrderRollupDirtyDay.objects.bulk_create(
+            [OrderRollupDirtyDay(tenant_id=tenant_id, day=day)], ignore_conflicts=True
+        ),
+        robust=True,
+    )
+
+
+def _restate_dirty_days(open_start: date | None) -> int:
+    """
+    Recompute the final days recorded as dirty (those before `open_start`, the first open day being rolled
+    up; all of them when None), then the weeks and months holding them.
+    """
+    dirty = OrderRollupDirtyDay.objects.values_list("id", "day")
+    if open_start is not None:
+        dirty = dirty.filter(day__lt=open_start)
+    dirty = list(dirty)
+    if not dirty:
+        return 0
+    days = sorted({day for _id, day in dirty})
+    folded = sum(_roll_up_days(day, day) for day in days)
+    for granularity in (OrderRollup.GRANULARITY_WEEK, OrderRollup.GRANULARITY_MONTH):
+        for period in sorted({bucket_start(day, granularity) for day in days}):
+            if open_start is not None and period >= bucket_start(open_start, granularity):
+                continue  # Rebuilt with the open days below.
+            _roll_up_periods(granularity, period, _bucket_end(period, granularity))
+    OrderRollupDirtyDay.objects.filter(id__in=[row_id for row_id, _day in dirty]).delete()
+    return folded
+
+
+def roll_up_orders(*, today: date | None = None, rebuild: bool = False, chunk_days: int = CHUNK_DAYS) -> int:
+    """
+    Restate dirty final days, then recompute the open days (after the watermark, through `today`) and the
+    weeks and months they touch. The watermark then moves to `today - restate_days()`. Returns paid orders
+    in the recomputed days.
+    """
+    today = today or timezone.localdate()
+    if rebuild:
+        with transaction.atomic():
+            OrderRollup.objects.all().delete()
+            OrderRollupDirtyDay.objects.all().delete()
+            RollupWatermark.objects.filter(name=ORDERS_WATERMARK).delete()
+    RollupWatermark.objects.get_or_create(name=ORDERS_WATERMARK)
+
+    with transaction.atomic():
+        # The row lock also keeps concurrent runs from replacing each other's buckets.
+        watermark = RollupWatermark.objects.select_for_update().get(name=ORDERS_WATERMARK)
+        if watermark.last_id:
+            start = date.fromordinal(watermark.last_id) + timedelta(days=1)
+        else:
+            earliest = revenue_orders().aggregate(first=Min("created_at"))["first"]
+            start = timezone.localdate(earliest) if earliest else today
+
+        if start > today:
+            return _restate_dirty_days(None)
+        folded = _restate_dirty_days(start)
+        chunk_start = start
+        while chunk_start <= today:
+            chunk_end = min(chunk_start + timedelta(days=max(1, chunk_days) - 1), today)
+            folded += _roll_up_days(chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+        for granularity in (OrderRollup.GRANULARITY_WEEK, OrderRollup.GRANULARITY_MONTH):
+            _roll_up_periods(granularity, start, today)
+
+        final = (today - timedelta(days=restate_days())).toordinal()
+        if final > watermark.last_id:
+            watermark.last_id = final
+            watermark.save(update_fields=["last_id", "updated_at"])
+    return folded
+
+
+def orders_watermark() -> date | None:
+    last = RollupWatermark.objects.filter(name=ORDERS_WATERMARK).values_list("last_id", flat=True).first()
+    return date.fromordinal(last) if last else None
+
+
+# -- read path --------------------------------------------------------------------------------------
+
+
+def order_series(*, tenant_id: int, start: date, end: date, granularity: str = "day") -> list[dict]:
+    """
+    Orders, revenue, AOV and new vs returning customers per bucket overlapping [start, end], with empty
+    buckets filled in. One indexed query.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    if end < start:
+        raise ValueError("end must not be before start.")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Range is limited to {MAX_RANGE_DAYS} days.")
+
+    first = bucket_start(start, granularity)
+    rows = {
+        row[0]: row[1:]
+        for row in OrderRollup.objects.filter(
+            tenant_id=tenant_id, granularity=granularity, bucket_start__gte=first, bucket_start__lte=end
+        ).values_list("bucket_start", "orders", "revenue", "customers", "new_customers")
+    }
+    series = []
+    period = first
+    while period <= end:
+        orders, revenue, customers, new_customers = rows.get(period, (0, Decimal("0.00"), 0, 0))
+        series.append(
+            {
+                "bucket": period.isoformat(),
+                "orders": orders,
+                "revenue": str(revenue),
+                "aov": str((revenue / orders).quantize(Decimal("0.01")) if orders else Decimal("0.00")),
+                "new_customers": new_customers,
+                "returning_customers": max(customers - new_customers, 0),
+            }
+        )
+        period = _next_bucket(period, granularity)
+    return series
+
+
+def series_totals(series: Iterable[dict]) -> dict:
+    orders = revenue = 0
+    for row in series:
+        orders += row["orders"]
+        revenue += Decimal(row["revenue"])
+    revenue = Decimal(revenue).quantize(Decimal("0.01"))
+    return {
+        "orders": orders,
+        "revenue": str(revenue),
+        "aov": str((revenue / orders).quantize(Decimal("0.01")) if orders else Decimal("0.00")),
+    }
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+"""
+Recommendation snapshot cache.
+
+AR:
+- آخر `RecommendationSnapshot` لكل (متجر، سياق، معرّف) يُقدَّم كما هو طالما عمره أقل من
+  `ANALYTICS_RECS_SNAPSHOT_TTL_SECONDS`، دون إعادة الحساب أو الكتابة.
+- عند انتهاء الصلاحية يحسب طلب واحد فقط (يحمل قفلاً قصيراً في الـ cache) بينما تُقدَّم النسخة القديمة للبقية؛
+  وإن لم توجد نسخة بعد، تُحسب التوصيات للطلب دون حفظها.
+- توحيد الحساب بين الـ workers يتطلب CACHES مشتركاً (مثل Redis)؛ مع LocMem الافتراضي يكون القفل لكل عملية فقط.
+- `prune_snapshots` يحذف اللقطات التي حلّت محلها لقطة أحدث، والأقدم من مدة الاحتفاظ.
+
+EN:
+- The latest `RecommendationSnapshot` per (tenant, context, object_id) is served as-is while younger than
+  `ANALYTICS_RECS_SNAPSHOT_TTL_SECONDS`: one indexed read, no recomputation, no write.
+- Misses are coalesced: one request (holding a short cache lock) recomputes and stores while the others
+  serve the expired snapshot, or on a cold miss compute their own result without storing it.
+- The lock only coalesces across workers with a shared CACHES backend (e.g. Redis); with the default
+  LocMem cache it is per-process.
+- `prune_snapshots` deletes snapshots superseded by a newer one for the same key, and any older than
+  `ANALYTICS_RECS_SNAPSHOT_RETENTION_DAYS`.
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from apps.analytics.models import RecommendationSnapshot
+
+LOCK_SECONDS = 30
+PRUNE_BATCH = 5000
+
+# (recommended ids, strategy)
+Computed = tuple[list[int], str]
+
+
+def snapshot_ttl() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "ANALYTICS_RECS_SNAPSHOT_TTL_SECONDS", 3600) or 0))
+
+
+def snapshot_retention() -> timedelta:
+    return timedelta(days=int(getattr(settings, "ANALYTICS_RECS_SNAPSHOT_RETENTION_DAYS", 7) or 7))
+
+
+def _lock_key(tenant_id: int, context: str, object_id: str) -> str:
+    return f"analytics:recs:lock:{tenant_id}:{context}:{object_id}"
+
+
+def latest_snapshot(tenant_id: int, context: str, object_id: str) -> RecommendationSnapshot | None:
+    return (
+        RecommendationSnapshot.objects.filter(tenant_id=tenant_id, context=context, object_id=object_id)
+        .order_by("-created_at", "-id")
+        .first()
+    )
+
+
+def is_fresh(snapshot: RecommendationSnapshot | None, now: datetime | None = None) -> bool:
+    return snapshot is not None and snapshot.created_at > (now or timezone.now()) - snapshot_ttl()
+
+
+def store_snapshot(tenant_id: int, context: str, object_id: str, compute: Callable[[], Computed]) -> RecommendationSnapshot:
+    recommended, strategy = compute()
+    return RecommendationSnapshot.objects.create(
+        tenant_id=tenant_id,
+        context=context,
+        object_id=object_id,
+        recommended_ids_json=recommended,
+        strategy=strategy,
+    )
+
+
+def cached_snapshot(
+    *, tenant_id: int, context: str, object_id: str, compute: Callable[[], Computed]
+) -> RecommendationSnapshot:
+    """Serve the fresh snapshot for the key, or let one caller `compute()` and store a new one."""
+    latest = latest_snapshot(tenant_id, context, object_id)
+    if is_fresh(latest):
+        return latest
+
+    lock_key = _lock_key(tenant_id, context, object_id)
+    if not cache.add(lock_key, 1, timeout=LOCK_SECONDS):
+        # Another request is already recomputing this key.
+        if latest is not None:
+            return latest
+        # Cold miss: answer this request without blocking on the holder, and leave the stored row to it.
+        recommended, strategy = compute()
+        return RecommendationSnapshot(
+            tenant_id=tenant_id,
+            context=context,
+            object_id=object_id,
+            recommended_ids_json=recommended,
+            strategy=strategy,
+        )
+    try:
+        return store_snapshot(tenant_id, context, object_id, compute)
+    finally:
+        cache.delete(lock_key)
+
+
+def prune_snapshots(*, now: datetime | None = None, batch_size: int = PRUNE_BATCH) -> int:
+    """Delete superseded and expired-past-retention snapshots in batches. Returns rows deleted."""
+    cutoff = (now or timezone.now()) - snapshot_retention()
+    newer = RecommendationSnapshot.objects.filter(
+        tenant_id=OuterRef("tenant_id"),
+        context=OuterRef("context"),
+        object_id=OuterRef("object_id"),
+        created_at__gt=OuterRef("created_at"),
+    )
+    deleted = 0
+    for stale in (
+        RecommendationSnapshot.objects.filter(created_at__lt=cutoff),
+        RecommendationSnapshot.objects.filter(Exists(newer)),
+    ):
+        while True:
+            ids = list(stale.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += RecommendationSnapshot.objects.filter(id__in=ids).delete()[0]
+    return deleted
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+"""
+Revenue definition shared by the merchant dashboard (`store_stats`) and the revenue series (`order_rollups`).
+
+AR:
+- إيراد اليوم هو مجموع `total_amount` للطلبات المدفوعة غير الملغاة التي أُنشئت في ذلك اليوم (بالتوقيت المحلي).
+- الدفع أو الإلغاء المتأخر يغيّر إيراد يوم إنشاء الطلب، لا يوم الدفع.
+
+EN:
+- A day's revenue is the `total_amount` of paid, non-cancelled orders created that (local) day.
+- A late payment or cancellation changes the revenue of the order's creation day, not of the day it happened.
+"""
+
+from decimal import Decimal
+
+from apps.orders.models import Order
+
+PAID = "paid"
+CANCELLED = "cancelled"
+
+
+def revenue_orders():
+    """Orders that count towards revenue."""
+    return Order.objects.filter(payment_status=PAID).exclude(status=CANCELLED)
+
+
+def order_revenue(*, status: str, payment_status: str, total_amount) -> Decimal:
+    """One order's contribution to its creation day's revenue."""
+    if payment_status != PAID or status == CANCELLED:
+        return Decimal("0.00")
+    return total_amount or Decimal("0.00")
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+"""
+Event rollups.
+
+AR:
+- `roll_up_events` يجمع الأحداث الخام الجديدة (بعد العلامة المائية `RollupWatermark`) في جداول
+  `EventRollupHourly` و `EventRollupDaily`: عدد الأحداث ومخطط تقريبي (HyperLogLog) للفاعلين المميزين.
+- المؤشرات والسلاسل الزمنية تقرأ الجداول المجمّعة، وتضيف فقط الأحداث التي لم تُجمّع بعد (فوق العلامة المائية)،
+  فتكلفة لوحة التحكم لا تعتمد على حجم الأحداث الخام.
+
+EN:
+- `roll_up_events` folds raw events past the `RollupWatermark` into `EventRollupHourly` / `EventRollupDaily`:
+  an event count and a HyperLogLog sketch of distinct actors per tenant, event name and bucket.
+- KPI and time-series reads use the rollups plus only the not-yet-rolled tail above the watermark, so
+  dashboard cost does not grow with raw event volume.
+- Events younger than `ANALYTICS_ROLLUP_LAG_SECONDS` are left for the next run, giving transactions that
+  took an id earlier time to commit before the watermark passes them.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.analytics.domain.sketch import empty_sketch, sketch_add, sketch_estimate, sketch_merge
+from apps.analytics.models import Event, EventRollupDaily, EventRollupHourly, RollupWatermark
+
+EVENTS_WATERMARK = "analytics.events"
+ROLLUP_CHUNK_SIZE = 5000
+FOLD_FIELDS = ("id", "tenant_id", "event_name", "occurred_at", "actor_id_hash", "session_key_hash")
+
+
+@dataclass
+class Bucket:
+    count: int = 0
+    sketch: bytearray = field(default_factory=empty_sketch)
+
+    def merge(self, count: int, sketch) -> None:
+        self.count += count
+        sketch_merge(self.sketch, sketch)
+
+
+# (tenant_id, bucket_start, event_name)
+BucketKey = tuple[int, datetime | date, str]
+
+
+def rollup_lag() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "ANALYTICS_ROLLUP_LAG_SECONDS", 60) or 0))
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def fold_events(rows: Iterable[tuple]) -> tuple[dict[BucketKey, Bucket], dict[BucketKey, Bucket]]:
+    """Aggregate `FOLD_FIELDS` tuples into hourly and daily buckets."""
+    hourly: dict[BucketKey, Bucket] = {}
+    daily: dict[BucketKey, Bucket] = {}
+    for _id, tenant_id, event_name, occurred_at, actor_hash, session_hash in rows:
+        hour = hour_bucket(occurred_at)
+        identity = actor_hash or session_hash
+        for buckets, key in ((hourly, (tenant_id, hour, event_name)), (daily, (tenant_id, hour.date(), event_name))):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = Bucket()
+            bucket.count += 1
+            if identity:
+                sketch_add(bucket.sketch, identity)
+    return hourly, daily
+
+
+def _merge_into(model, buckets: dict[BucketKey, Bucket]) -> None:
+    if not buckets:
+        return
+    tenant_ids = {key[0] for key in buckets}
+    starts = {key[1] for key in buckets}
+    existing = {
+        (row.tenant_id, row.bucket_start, row.event_name): row
+        for row in model.objects.select_for_update().filter(tenant_id__in=tenant_ids, bucket_start__in=starts)
+    }
+    now = timezone.now()
+    changed, created = [], []
+    for key, bucket in buckets.items():
+        row = existing.get(key)
+        if row is None:
+            created.append(
+                model(
+                    tenant_id=key[0],
+                    bucket_start=key[1],
+                    event_name=key[2],
+                    count=bucket.count,
+                    actor_sketch=bytes(bucket.sketch),
+                    updated_at=now,
+                )
+            )
+            continue
+        row.count += bucket.count
+        row.actor_sketch = bytes(sketch_merge(bytearray(row.actor_sketch or empty_sketch()), bucket.sketch))
+        row.updated_at = now
+        changed.append(row)
+    if changed:
+        model.objects.bulk_update(changed, ["count", "actor_sketch", "updated_at"], batch_size=500)
+    if created:
+        model.objects.bulk_create(created, batch_size=500)
+
+
+def events_watermark() -> int:
+    return RollupWatermark.objects.filter(name=EVENTS_WATERMARK).values_list("last_id", flat=True).first() or 0
+
+
+def roll_up_events(*, chunk_size: int = ROLLUP_CHUNK_SIZE, now: datetime | None = None) -> int:
+    """Fold raw events past the watermark into the rollup tables, one transaction per chunk. Returns events."""
+    cutoff = (now or timezone.now()) - rollup_lag()
+    RollupWatermark.objects.get_or_create(name=EVENTS_WATERMARK)
+    folded = 0
+    while True:
+        with transaction.atomic():
+            # The row lock also keeps concurrent runs from folding the same chunk twice.
+            watermark = RollupWatermark.objects.select_for_update().get(name=EVENTS_WATERMARK)
+            rows = list(
+                Event.objects.filter(id__gt=watermark.last_id).order_by("id").values_list(*FOLD_FIELDS)[:chunk_size]
+            )
+            fetched = len(rows)
+            for index, row in enumerate(rows):
+                if row[3] > cutoff:
+                    rows = rows[:index]
+                    break
+            if not rows:
+                return folded
+            hourly, daily = fold_events(rows)
+            _merge_into(EventRollupHourly, hourly)
+            _merge_into(EventRollupDaily, daily)
+            watermark.last_id = rows[-1][0]
+            watermark.save(update_fields=["last_id", "updated_at"])
+            folded += len(rows)
+        if len(rows) < fetched or fetched < chunk_size:
+            return folded
+
+
+def event_series(
+    *,
+    tenant_id: int,
+    start: datetime | date,
+    granularity: str = "day",
+    event_name: str = "",
+    tail: list[tuple] | None = None,
+) -> list[dict]:
+    """
+    Per-bucket event counts and distinct-actor estimates from `start` on, read from the rollups plus the
+    unrolled tail (`unrolled_events`, pass it in to share one read). `granularity` is "hour" or "day".
+    """
+    if granularity not in ("hour", "day"):
+        raise ValueError(f"Unknown granularity: {granularity}")
+    model = EventRollupHourly if granularity == "hour" else EventRollupDaily
+    rows = model.objects.filter(tenant_id=tenant_id, bucket_start__gte=start)
+    if event_name:
+        rows = rows.filter(event_name=event_name)
+
+    merged: dict[datetime | date, Bucket] = {}
+    for bucket_start, count, sketch in rows.values_list("bucket_start", "count", "actor_sketch"):
+        merged.setdefault(bucket_start, Bucket()).merge(count, sketch)
+    if tail is None:
+        tail = unrolled_events(tenant_id)
+    hourly, daily = fold_events(row for row in tail if not event_name or row[2] == event_name)
+    for (_tenant, bucket_start, _name), bucket in (hourly if granularity == "hour" else daily).items():
+        if bucket_start >= start:
+            merged.setdefault(bucket_start, Bucket()).merge(bucket.count, bucket.sketch)
+    return [
+        {"bucket": bucket_start, "events": bucket.count, "actors": sketch_estimate(bucket.sketch)}
+        for bucket_start, bucket in sorted(merged.items())
+    ]
+
+
+def unrolled_events(tenant_id: int) -> list[tuple]:
+    """`FOLD_FIELDS` of the tenant's events above the watermark (bounded by how often the rollup runs)."""
+    watermark = RollupWatermark.objects.filter(name=EVENTS_WATERMARK).values("last_id")[:1]
+    return list(
+        Event.objects.filter(tenant_id=tenant_id, id__gt=Coalesce(Subquery(watermark), Value(0))).values_list(
+            *FOLD_FIELDS
+        )
+    )
+
+
+def event_totals(*, tenant_id: int, tail: list[tuple] | None = None) -> dict[str, int]:
+    """All-time event count per event name."""
+    totals = dict(
+        EventRollupDaily.objects.filter(tenant_id=tenant_id)
+        .values("event_name")
+        .annotate(total=Sum("count"))
+        .values_list("event_name", "total")
+    )
+    for _id, _tenant, event_name, *_rest in unrolled_events(tenant_id) if tail is None else tail:
+        totals[event_name] = totals.get(event_name, 0) + 1
+    return totals
@@ -8,6 +8,12 @@ from django.db.models import Avg
 from django.utils import timezone
 
 from apps.analytics.domain.types import RiskScoreDTO
+from apps.analytics.infrastructure.fraud_features import (
+    mean_excluding,
+    order_ip,
+    recent_failed_payments,
+    recent_orders_from_ip,
+)
 from apps.analytics.models import Event
 from apps.orders.models import Order
 from apps.payments.models import PaymentIntent
@@ -20,6 +26,40 @@ class FraudRuleResult:
 
 
 def evaluate_fraud_rules(*, tenant_id: int, order: Order) -> FraudRuleResult:
+    """Same rules as `evaluate_fraud_rules_by_scan`, read from the maintained features in `fraud_features`."""
+    score = 0
+    reasons: list[str] = []
+
+    avg_amount = mean_excluding(tenant_id, order.total_amount)
+    if avg_amount and order.total_amount > avg_amount * Decimal("3"):
+        score += 40
+        reasons.append("high_order_amount")
+
+    if recent_failed_payments(tenant_id) >= 3:
+        score += 25
+        reasons.append("many_failed_payments")
+
+    ip_hash = order_ip(tenant_id, order.id)
+    if ip_hash is None:
+        # Older than the cached order -> ip map: fall back to the order's own event.
+        ip_hash = _order_event_ip(tenant_id, order.id)
+    if ip_hash and recent_orders_from_ip(tenant_id, ip_hash) >= 3:
+        score += 20
+        reasons.append("multiple_orders_same_ip")
+
+    return FraudRuleResult(score=min(score, 100), reasons=reasons)
+
+
+def _order_event_ip(tenant_id: int, order_id: int) -> str | None:
+    return Event.objects.filter(
+        tenant_id=tenant_id,
+        event_name="order.placed",
+        object_id=str(order_id),
+    ).values_list("ip_hash", flat=True).first()
+
+
+def evaluate_fraud_rules_by_scan(*, tenant_id: int, order: Order) -> FraudRuleResult:
+    """Reference implementation over the source tables (parity checks and `backfill_fraud_features`)."""
     score = 0
     reasons: list[str] = []
 
@@ -42,11 +82,7 @@ def evaluate_fraud_rules(*, tenant_id: int, order: Order) -> FraudRuleResult:
         score += 25
         reasons.append("many_failed_payments")
 
-    ip_hash = Event.objects.filter(
-        tenant_id=tenant_id,
-        event_name="order.placed",
-        object_id=str(order.id),
-    ).values_list("ip_hash", flat=True).first()
+    ip_hash = _order_event_ip(tenant_id, order.id)
     if ip_hash:
         recent_same_ip = Event.objects.filter(
             tenant_id=tenant_id,
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+"""
+Per-store daily dashboard stats.
+
+AR:
+- صف `StoreDailyStats` لكل متجر ويوم: الإيرادات والطلبات والطلبات المدفوعة (تدفقات اليوم)، والشحنات النشطة
+  والمنتجات والمراجعات المعلّقة (قيم لحظية؛ آخر صف يحمل القيم الحالية).
+- الإيرادات بنفس تعريف سلسلة الإيرادات (`revenue.py`): الطلبات المدفوعة غير الملغاة حسب يوم الإنشاء.
+- مسارات الكتابة (الطلبات، المدفوعات، الشحنات، المراجعات، المنتجات) تضيف فروقاً بتعبيرات `F()` بعد الـ commit.
+- `reconcile_store_stats` يعيد حساب الأيام الأخيرة من الجداول الأصلية كل ليلة لتصحيح أي انحراف.
+
+EN:
+- One `StoreDailyStats` row per store and day: revenue, orders and paid orders are flows for the day;
+  active shipments, products and pending reviews are gauges (the latest row holds the current values, and
+  a new day's row starts from the previous row's gauges).
+- Revenue uses the same definition as the revenue series (`revenue.py`): paid, non-cancelled orders by
+  creation day.
+- Write paths add deltas with `F()` increments once their transaction commits, so a dashboard read is one
+  indexed row instead of aggregates over payments, orders, shipments, products and reviews.
+- `reconcile_store_stats` recomputes recent days from the source tables (nightly) and corrects any drift
+  from writes that bypass signals.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.analytics.infrastructure.revenue import revenue_orders
+from apps.analytics.models import StoreDailyStats
+from apps.catalog.models import Product
+from apps.orders.models import Order
+from apps.reviews.models import Review
+from apps.shipping.models import Shipment
+from apps.tenants.models import Tenant
+
+FLOWS = ("revenue", "orders", "paid_orders")
+GAUGES = ("active_shipments", "products", "pending_reviews")
+INACTIVE_SHIPMENT_STATUSES = ("delivered", "cancelled")
+MAX_RANGE_DAYS = 366
+
+
+@dataclass(frozen=True)
+class DailyStats:
+    day: date
+    revenue: Decimal = Decimal("0.00")
+    orders: int = 0
+    paid_orders: int = 0
+    active_shipments: int = 0
+    products: int = 0
+    pending_reviews: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "day": self.day.isoformat(),
+            "revenue": str(self.revenue),
+            "orders": self.orders,
+            "paid_orders": self.paid_orders,
+            "active_shipments": self.active_shipments,
+            "products": self.products,
+            "pending_reviews": self.pending_reviews,
+        }
+
+
+def stats_day(moment: datetime | None = None) -> date:
+    return timezone.localdate(moment) if moment else timezone.localdate()
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+# -- write path -------------------------------------------------------------------------------------
+
+
+def _create_row(store_id: int, day: date) -> None:
+    carried = (
+        StoreDailyStats.objects.filter(store_id=store_id, day__lt=day).order_by("-day").values(*GAUGES).first() or {}
+    )
+    try:
+        with transaction.atomic():
+            StoreDailyStats.objects.create(store_id=store_id, day=day, **carried)
+    except IntegrityError:
+        pass  # Another worker created it first.
+
+
+def apply_store_stats(store_id: int, day: date, deltas: dict) -> None:
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not store_id or not deltas:
+        return
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    rows = StoreDailyStats.objects.filter(store_id=store_id, day=day)
+    if not rows.update(**updates, updated_at=timezone.now()):
+        _create_row(store_id, day)
+        rows.update(**updates, updated_at=timezone.now())
+
+
+def bump_store_stats(store_id: int | None, *, day: date | None = None, **deltas) -> None:
+    """
+    Add `deltas` to the store's row once the current transaction commits. Flows go to `day` (the source
+    record's creation day); gauges always go to today's row.
+    """
+    if not store_id:
+        return
+    flows = {name: deltas.pop(name) for name in FLOWS if name in deltas}
+    if deltas.keys() - set(GAUGES):
+        raise ValueError(f"Unknown store stats: {sorted(deltas.keys() - set(GAUGES))}")
+
+    def _apply() -> None:
+        today = stats_day()
+        flow_day = day or today
+        if flow_day == today:
+            apply_store_stats(store_id, today, {**flows, **deltas})
+            return
+        apply_store_stats(store_id, flow_day, flows)
+        apply_store_stats(store_id, today, deltas)
+
+    transaction.on_commit(_apply, robust=True)
+
+
+# -- reconcile --------------------------------------------------------------------------------------
+
+
+def _flows_for(store_id: int, day: date) -> dict:
+    start, end = _day_bounds(day)
+    orders = Order.objects.filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
+    revenue = (
+        revenue_orders()
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .aggregate(total=Sum("total_amount"))["total"]
+    )
+    return {
+        "revenue": revenue or Decimal("0.00"),
+        "orders": orders.count(),
+        "paid_orders": orders.filter(payment_status="paid").count(),
+    }
+
+
+def _gauges_for(store_id: int) -> dict:
+    return {
+        "active_shipments": Shipment.objects.filter(order__store_id=store_id)
+        .exclude(status__in=INACTIVE_SHIPMENT_STATUSES)
+        .count(),
+        "products": Product.objects.filter(store_id=store_id).count(),
+        "pending_reviews": Review.objects.filter(product__store_id=store_id, status="pending").count(),
+    }
+
+
+def reconcile_store_stats(
+    *, store_ids: Iterable[int] | None = None, days: int = 2, today: date | None = None
+) -> int:
+    """
+    Recompute the last `days` days' flows and today's gauges from the source tables (default: all active
+    stores). Returns stores reconciled.
+    """
+    today = today or stats_day()
+    if store_ids is None:
+        store_ids = Tenant.objects.filter(is_active=True).order_by("id").values_list("id", flat=True)
+    store_ids = list(store_ids)
+    for store_id in store_ids:
+        with transaction.atomic():
+            for offset in range(max(1, days) - 1, -1, -1):
+                day = today - timedelta(days=offset)
+                values = _flows_for(store_id, day)
+                if day == today:
+                    values.update(_gauges_for(store_id))
+                StoreDailyStats.objects.update_or_create(store_id=store_id, day=day, defaults=values)
+    return len(store_ids)
+
+
+# -- read path --------------------------------------------------------------------------------------
+
+
+def _from_row(day: date, row: StoreDailyStats | None) -> DailyStats:
+    if row is None:
+        return DailyStats(day=day)
+    gauges = {name: getattr(row, name) for name in GAUGES}
+    if row.day != day:
+        return DailyStats(day=day, **gauges)
+    return DailyStats(day=day, **{name: getattr(row, name) for name in FLOWS}, **gauges)
+
+
+def store_stats_for_day(store_id: int, day: date | None = None) -> DailyStats:
+    """The day's flows plus gauges as of that day. One query."""
+    day = day or stats_day()
+    row = StoreDailyStats.objects.filter(store_id=store_id, day__lte=day).order_by("-day").first()
+    return _from_row(day, row)
+
+
+def store_stats_range(store_id: int, start: date, end: date) -> list[DailyStats]:
+    """One entry per day in [start, end]; days without a row carry the previous gauges. Two queries."""
+    if end < start:
+        raise ValueError("end must not be before start.")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"Range is limited to {MAX_RANGE_DAYS} days.")
+    rows = {row.day: row for row in StoreDailyStats.objects.filter(store_id=store_id, day__gte=start, day__lte=end)}
+    latest = StoreDailyStats.objects.filter(store_id=store_id, day__lt=start).order_by("-day").first()
+    series = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        latest = rows.get(day, latest)
+        series.append(_from_row(day, latest))
+    return series
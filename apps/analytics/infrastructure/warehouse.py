@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+"""
+Local columnar warehouse for analytics events.
+
+AR:
+- الأحداث المنقّاة (`_sanitize_event`) تُسلَّم بعد نجاح المعاملة، وتُجمع في الذاكرة ويكتبها خيط خلفي دفعات كملفات
+  Parquet مقسّمة حسب التاريخ والمتجر:
+  `{ANALYTICS_WAREHOUSE_DIR}/events/date=YYYY-MM-DD/tenant=N/part-*.parquet`.
+- `compact_warehouse` يدمج الملفات الصغيرة في كل قسم في ملف واحد مرتب حسب الوقت.
+- `query_events` يقرأ الأعمدة المطلوبة فقط، ويتخطى الأقسام ومجموعات الصفوف التي لا تطابق الفلتر، فتعمل التقارير
+  الثقيلة بعيداً عن قاعدة بيانات المعاملات.
+
+EN:
+- Sanitized events (`_sanitize_event`) are handed over once their transaction commits, batched in memory and
+  written by a background thread as Parquet files partitioned by date and tenant:
+  `{ANALYTICS_WAREHOUSE_DIR}/events/date=YYYY-MM-DD/tenant=N/part-*.parquet`.
+- `compact_warehouse` merges a partition's small files into one file sorted by `occurred_at`.
+- `query_events` reads only the requested columns and skips partitions and row groups that cannot match the
+  filter, so heavy reports run off the OLTP database.
+- Requires `pyarrow`; files are written to a dot-prefixed temp name and renamed, so readers never see a
+  partial file.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.analytics.domain.types import EventDTO
+
+try:  # optional dependency
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = None
+
+logger = logging.getLogger("analytics.warehouse")
+
+EVENTS_TABLE = "events"
+COMPACT_MIN_FILES = 4
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def _schema():
+    return pa.schema(
+        [
+            ("event_name", pa.string()),
+            ("actor_type", pa.string()),
+            ("actor_id_hash", pa.string()),
+            ("session_key_hash", pa.string()),
+            ("object_type", pa.string()),
+            ("object_id", pa.string()),
+            ("properties_json", pa.string()),
+            ("user_agent", pa.string()),
+            ("ip_hash", pa.string()),
+            ("occurred_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("date", pa.string()), ("tenant", pa.int64())]), flavor="hive")
+
+
+def warehouse_root() -> Path:
+    return Path(getattr(settings, "ANALYTICS_WAREHOUSE_DIR", "") or Path(settings.BASE_DIR) / "var" / "warehouse")
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for the analytics warehouse (ANALYTICS_WAREHOUSE_ENABLED).")
+
+
+def _partition_dir(root: Path, day: date, tenant_id: int) -> Path:
+    return root / EVENTS_TABLE / f"date={day.isoformat()}" / f"tenant={tenant_id}"
+
+
+def _write_atomic(table, directory: Path, name: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / name
+    temp = directory / f".{name}.tmp"
+    pq.write_table(table, temp, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+    os.replace(temp, target)
+    return target
+
+
+def _row(event: EventDTO) -> dict:
+    occurred_at = event.occurred_at.astimezone(dt_timezone.utc)
+    return {
+        "event_name": event.event_name,
+        "actor_type": event.actor_type,
+        "actor_id_hash": str(event.actor_id or ""),
+        "session_key_hash": str(event.session_key or ""),
+        "object_type": event.object_type or "",
+        "object_id": event.object_id or "",
+        "properties_json": json.dumps(event.properties or {}, cls=DjangoJSONEncoder, separators=(",", ":")),
+        "user_agent": event.user_agent or "",
+        "ip_hash": str(event.ip_address or ""),
+        "occurred_at": occurred_at,
+    }
+
+
+class ParquetWarehouseSink:
+    """
+    Per-worker batch of sanitized events, written as one file per (date, tenant) partition. Callers hand
+    events over once their transaction commits; a background thread writes the batch when it reaches
+    `batch_size` or its oldest event is `flush_seconds` old, so request threads never write Parquet.
+    With `background=False` (tests, commands) a due batch is written by the sending thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        root: Path | str | None = None,
+        batch_size: int | None = None,
+        flush_seconds: int | None = None,
+        background: bool = True,
+    ):
+        _require_pyarrow()
+        self.root = Path(root) if root else warehouse_root()
+        self.batch_size = max(1, batch_size or int(getattr(settings, "ANALYTICS_WAREHOUSE_BATCH_SIZE", 1000) or 1000))
+        self.flush_seconds = max(
+            1, flush_seconds or int(getattr(settings, "ANALYTICS_WAREHOUSE_FLUSH_SECONDS", 60) or 60)
+        )
+        self.background = background
+        self._reset_state()
+        atexit.register(self.flush)
+
+    def _reset_state(self) -> None:
+        # A forked worker starts empty; the parent's pending rows are the parent's to write.
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pending: dict[tuple[date, int], list[dict]] = defaultdict(list)
+        self._count = 0
+        self._first_at = 0.0
+
+    def _check_fork(self) -> None:
+        if os.getpid() != self._pid:
+            self._reset_state()
+
+    def send_event(self, *, tenant_id: int, event: EventDTO) -> None:
+        row = _row(event)
+        self._check_fork()
+        with self._cond:
+            if not self._count:
+                self._first_at = time.monotonic()
+            self._pending[(row["occurred_at"].date(), tenant_id)].append(row)
+            self._count += 1
+            due = self._due()
+            if due:
+                self._cond.notify()
+        if self.background:
+            self._ensure_thread()
+        elif due:
+            self.flush()
+
+    def _due(self) -> bool:
+        return bool(self._count) and (
+            self._count >= self.batch_size or time.monotonic() - self._first_at >= self.flush_seconds
+        )
+
+    def flush(self) -> list[Path]:
+        self._check_fork()
+        with self._flush_lock:
+            with self._cond:
+                pending, self._pending, self._count = self._pending, defaultdict(list), 0
+            written = []
+            if not pending:
+                return written
+            schema = _schema()
+            for (day, tenant_id), rows in pending.items():
+                table = pa.Table.from_pylist(rows, schema=schema)
+                name = f"part-{time.time_ns()}-{self._pid}.parquet"
+                written.append(_write_atomic(table, _partition_dir(self.root, day, tenant_id), name))
+            return written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due():
+                    timeout = self.flush_seconds
+                    if self._count:
+                        timeout = max(self.flush_seconds - (time.monotonic() - self._first_at), 0.01)
+                    self._cond.wait(timeout)
+            try:
+                self.flush()
+            except Exception as exc:
+                # The batch is lost (the OLTP copy is not); keep the thread alive for the next one.
+                logger.warning("warehouse_flush_failed", extra={"error_code": exc.__class__.__name__})
+                time.sleep(self.flush_seconds)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="warehouse-flush", daemon=True)
+            self._thread.start()
+
+
+def compact_warehouse(
+    *, root: Path | str | None = None, min_files: int = COMPACT_MIN_FILES, before: date | None = None
+) -> int:
+    """
+    Merge partitions holding at least `min_files` files (only dates before `before`, if given) into one file
+    each. Files written while compaction runs are left for the next run. Returns partitions compacted.
+    """
+    _require_pyarrow()
+    base = (Path(root) if root else warehouse_root()) / EVENTS_TABLE
+    compacted = 0
+    for date_dir in sorted(base.glob("date=*")):
+        if before is not None and date_dir.name[len("date="):] >= before.isoformat():
+            continue
+        for partition in sorted(date_dir.glob("tenant=*")):
+            files = sorted(partition.glob("*.parquet"))
+            if len(files) < min_files:
+                continue
+            table = pa.concat_tables([pq.read_table(path, schema=_schema()) for path in files])
+            table = table.sort_by("occurred_at")
+            _write_atomic(table, partition, f"compact-{time.time_ns()}.parquet")
+            for path in files:
+                path.unlink(missing_ok=True)
+            compacted += 1
+    return compacted
+
+
+def query_events(
+    *,
+    columns: Sequence[str],
+    tenant_id: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    event_names: Iterable[str] | None = None,
+    root: Path | str | None = None,
+):
+    """
+    Scan the warehouse as a `pyarrow.Table` with only `columns` (plus the `date`/`tenant` partition keys if
+    asked for). Tenant and date bounds prune directories; `occurred_at` and `event_name` are pushed down
+    to Parquet row-group statistics. `end` is exclusive.
+    """
+    _require_pyarrow()
+    base = (Path(root) if root else warehouse_root()) / EVENTS_TABLE
+    if not base.exists():
+        return pa.table({name: pa.array([], type=_column_type(name)) for name in columns})
+    dataset = ds.dataset(base, format="parquet", schema=_schema_with_partitions(), partitioning=_partitioning())
+
+    predicate = None
+
+    def _and(expression):
+        nonlocal predicate
+        predicate = expression if predicate is None else predicate & expression
+
+    if tenant_id is not None:
+        _and(ds.field("tenant") == tenant_id)
+    if start is not None:
+        start = start.astimezone(dt_timezone.utc)
+        _and(ds.field("date") >= start.date().isoformat())
+        _and(ds.field("occurred_at") >= pa.scalar(start, type=pa.timestamp("us", tz="UTC")))
+    if end is not None:
+        end = end.astimezone(dt_timezone.utc)
+        _and(ds.field("date") <= end.date().isoformat())
+        _and(ds.field("occurred_at") < pa.scalar(end, type=pa.timestamp("us", tz="UTC")))
+    if event_names is not None:
+        _and(ds.field("event_name").isin(list(event_names)))
+    return dataset.to_table(columns=list(columns), filter=predicate)
+
+
+def _schema_with_partitions():
+    schema = _schema()
+    return schema.append(pa.field("date", pa.string())).append(pa.field("tenant", pa.int64()))
+
+
+def _column_type(name: str):
+    return _schema_with_partitions().field(name).type
+
+
+def event_counts(*, tenant_id: int, start: datetime, end: datetime, root: Path | str | None = None) -> list[dict]:
+    """Events and distinct actors per day and event name, read from the warehouse only."""
+    table = query_events(
+        columns=["date", "event_name", "actor_id_hash", "session_key_hash"],
+        tenant_id=tenant_id,
+        start=start,
+        end=end,
+        root=root,
+    )
+    if not table.num_rows:
+        return []
+    identity = pc.if_else(pc.equal(table["actor_id_hash"], ""), table["session_key_hash"], table["actor_id_hash"])
+    # Anonymous events without a session are counted as events but not as actors.
+    identity = pc.if_else(pc.equal(identity, ""), pa.scalar(None, pa.string()), identity)
+    table = table.append_column("identity", identity)
+    grouped = table.group_by(["date", "event_name"]).aggregate(
+        [("event_name", "count"), ("identity", "count_distinct")]
+    )
+    rows = [
+        {
+            "date": row["date"],
+            "event_name": row["event_name"],
+            "events": row["event_name_count"],
+            "actors": row["identity_count_distinct"],
+        }
+        for row in grouped.to_pylist()
+    ]
+    return sorted(rows, key=lambda row: (row["date"], -row["events"], row["event_name"]))
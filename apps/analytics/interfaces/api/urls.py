@@ -1,11 +1,22 @@
 from django.urls import path
 
-from .views import ExperimentAssignmentAPI, RecommendationsAPI, RiskAssessmentAPI, TrackEventAPI
+from .views import (
+    ExperimentAssignmentAPI,
+    RecommendationsAPI,
+    RevenueSeriesAPI,
+    RiskAssessmentAPI,
+    StoreStatsAPI,
+    TrackEventAPI,
+    TrackEventBatchAPI,
+)
 
 
 urlpatterns = [
     path("events", TrackEventAPI.as_view(), name="api_events"),
+    path("events/batch", TrackEventBatchAPI.as_view(), name="api_events_batch"),
     path("experiments/<str:key>/assignment", ExperimentAssignmentAPI.as_view(), name="api_experiment_assignment"),
     path("recommendations", RecommendationsAPI.as_view(), name="api_recommendations"),
     path("risk/<int:order_id>", RiskAssessmentAPI.as_view(), name="api_risk_assessment"),
+    path("stats/daily", StoreStatsAPI.as_view(), name="api_store_daily_stats"),
+    path("stats/revenue", RevenueSeriesAPI.as_view(), name="api_revenue_series"),
 ]
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import json
+import zlib
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.views import APIView
 
 from apps.analytics.application.assign_variant import AssignVariantCommand, AssignVariantUseCase
+from apps.analytics.application.ingest_events import BatchTooLargeError, IngestEventsCommand, IngestEventsUseCase
 from apps.analytics.application.recommend_products import RecommendProductsCommand, RecommendProductsUseCase
+from apps.analytics.application.report_revenue import ReportRevenueCommand, ReportRevenueUseCase
+from apps.analytics.application.report_store_stats import ReportStoreStatsCommand, ReportStoreStatsUseCase
 from apps.analytics.application.score_transaction import ScoreTransactionCommand, ScoreTransactionUseCase
 from apps.analytics.application.track_event import TrackEventCommand, TrackEventUseCase
 from apps.analytics.domain.types import EventDTO
@@ -47,6 +57,90 @@ class TrackEventAPI(APIView):
         return api_response(success=True, data={"tracked": True})
 
 
+CLIENT_CLOCK_MAX_AGE = timedelta(days=1)
+
+
+def _ingest_max_bytes() -> int:
+    return max(1024, int(getattr(settings, "ANALYTICS_INGEST_MAX_BYTES", 262144) or 262144))
+
+
+def _read_batch_body(request) -> bytes:
+    """Raw (optionally gzip/deflate encoded) body, decompressed up to `ANALYTICS_INGEST_MAX_BYTES`."""
+    limit = _ingest_max_bytes()
+    body = request.body
+    encoding = (request.headers.get("Content-Encoding") or "identity").strip().lower()
+    if encoding in ("gzip", "deflate"):
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | (16 if encoding == "gzip" else 0))
+        try:
+            body = decompressor.decompress(body, limit + 1)
+        except zlib.error as exc:
+            raise ValueError("Invalid compressed body.") from exc
+    elif encoding != "identity":
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+    if len(body) > limit:
+        raise BatchTooLargeError(f"Batch body exceeds {limit} bytes.")
+    return body
+
+
+def _client_time(value, now):
+    # Client clocks are trusted only within the last day; anything else is stamped with receive time.
+    occurred_at = parse_datetime(value) if isinstance(value, str) else None
+    if occurred_at is None or timezone.is_naive(occurred_at):
+        return now
+    return occurred_at if now - CLIENT_CLOCK_MAX_AGE <= occurred_at <= now else now
+
+
+class TrackEventBatchAPI(APIView):
+    def post(self, request):
+        tenant_ctx = _build_tenant_context(request)
+        try:
+            payload = json.loads(_read_batch_body(request) or b"{}")
+        except BatchTooLargeError as exc:
+            return api_response(
+                success=False, errors=[str(exc)], status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        except ValueError as exc:
+            return api_response(success=False, errors=[str(exc)], status_code=status.HTTP_400_BAD_REQUEST)
+        items = payload.get("events") if isinstance(payload, dict) else payload
+        if not isinstance(items, list):
+            return api_response(
+                success=False, errors=["Expected a list of events."], status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        authenticated = request.user.is_authenticated
+        actor_type = str(payload.get("actor_type") or "").strip().upper() if isinstance(payload, dict) else ""
+        actor_type = actor_type or ("CUSTOMER" if authenticated else "ANON")
+        actor_id = request.user.id if authenticated else None
+        user_agent = request.META.get("HTTP_USER_AGENT", "")
+        ip_address = request.META.get("REMOTE_ADDR", "")
+        now = timezone.now()
+        events = []
+        for item in items:
+            item = item if isinstance(item, dict) else {}
+            properties = item.get("properties")
+            events.append(
+                EventDTO(
+                    event_name=str(item.get("event_name") or "").strip(),
+                    actor_type=actor_type,
+                    actor_id=actor_id,
+                    session_key=tenant_ctx.session_key,
+                    object_type=item.get("object_type"),
+                    object_id=item.get("object_id"),
+                    properties=properties if isinstance(properties, dict) else {},
+                    user_agent=user_agent,
+                    ip_address=ip_address,
+                    occurred_at=_client_time(item.get("occurred_at"), now),
+                )
+            )
+        try:
+            result = IngestEventsUseCase.execute(IngestEventsCommand(tenant_id=tenant_ctx.tenant_id, events=events))
+        except BatchTooLargeError as exc:
+            return api_response(
+                success=False, errors=[str(exc)], status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        return api_response(success=True, data={"accepted": result.accepted, "rejected": result.rejected})
+
+
 class ExperimentAssignmentAPI(APIView):
     def get(self, request, key: str):
         tenant_ctx = _build_tenant_context(request)
@@ -105,3 +199,40 @@ class RiskAssessmentAPI(APIView):
                 "reasons": result.reasons,
             },
         )
+
+
+class StoreStatsAPI(APIView):
+    def get(self, request):
+        tenant_ctx = _build_tenant_context(request)
+        try:
+            start = request.query_params.get("start")
+            end = request.query_params.get("end")
+            days = ReportStoreStatsUseCase.execute(
+                ReportStoreStatsCommand(
+                    tenant_ctx=tenant_ctx,
+                    start=date.fromisoformat(start) if start else None,
+                    end=date.fromisoformat(end) if end else None,
+                )
+            )
+        except ValueError as exc:
+            return api_response(success=False, errors=[str(exc)], status_code=status.HTTP_400_BAD_REQUEST)
+        return api_response(success=True, data={"items": [day.as_dict() for day in days]})
+
+
+class RevenueSeriesAPI(APIView):
+    def get(self, request):
+        tenant_ctx = _build_tenant_context(request)
+        try:
+            start = request.query_params.get("start")
+            end = request.query_params.get("end")
+            report = ReportRevenueUseCase.execute(
+                ReportRevenueCommand(
+                    tenant_ctx=tenant_ctx,
+                    granularity=request.query_params.get("granularity") or "day",
+                    start=date.fromisoformat(start) if start else None,
+                    end=date.fromisoformat(end) if end else None,
+                )
+            )
+        except ValueError as exc:
+            return api_response(success=False, errors=[str(exc)], status_code=status.HTTP_400_BAD_REQUEST)
+        return api_response(success=True, data=report)
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.infrastructure.fraud_features import backfill_fraud_features
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-tenant fraud features (order amount stats, failed-payment and per-IP windows)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", type=int, action="append", dest="tenants", help="Repeatable; default all.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rebuilt = backfill_fraud_features(tenant_ids=options["tenants"])
+        self.stdout.write(f"rebuilt fraud features for {rebuilt} tenants in {time.perf_counter() - started:.2f}s")
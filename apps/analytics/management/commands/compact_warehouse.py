@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.infrastructure.warehouse import COMPACT_MIN_FILES, compact_warehouse
+
+
+class Command(BaseCommand):
+    help = "Merge small Parquet files of each analytics warehouse partition (schedule nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-files", type=int, default=COMPACT_MIN_FILES)
+        parser.add_argument("--before", default="", help="Only dates before YYYY-MM-DD (e.g. skip today).")
+
+    def handle(self, *args, **options):
+        before = None
+        if options["before"]:
+            try:
+                before = date.fromisoformat(options["before"])
+            except ValueError as exc:
+                raise CommandError("--before must be YYYY-MM-DD") from exc
+        try:
+            compacted = compact_warehouse(min_files=max(2, options["min_files"]), before=before)
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f"compacted {compacted} partitions")
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.application.recommend_products import RecommendProductsUseCase
+from apps.analytics.infrastructure.recommendation_cache import prune_snapshots
+from apps.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Precompute HOME recommendations for active tenants and prune superseded snapshots (schedule hourly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", type=int, action="append", dest="tenants", help="Repeatable; default all active.")
+        parser.add_argument("--skip-prune", action="store_true")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        tenant_ids = options["tenants"] or Tenant.objects.filter(is_active=True).order_by("id").values_list("id", flat=True)
+        computed = 0
+        for tenant_id in tenant_ids:
+            RecommendProductsUseCase.precompute_home(tenant_id)
+            computed += 1
+        pruned = 0 if options["skip_prune"] else prune_snapshots()
+        self.stdout.write(
+            f"precomputed HOME for {computed} tenants, pruned {pruned} snapshots "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.infrastructure.store_stats import reconcile_store_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute recent StoreDailyStats rows from orders, payments, shipments, products and reviews (nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", type=int, action="append", dest="stores", help="Repeatable; default all active.")
+        parser.add_argument("--days", type=int, default=2, help="Days to recompute, ending today.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        reconciled = reconcile_store_stats(store_ids=options["stores"], days=options["days"])
+        self.stdout.write(f"reconciled {reconciled} stores in {time.perf_counter() - started:.2f}s")
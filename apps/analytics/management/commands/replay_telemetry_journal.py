@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.infrastructure.buffered_sink import (
+    SEGMENT_PREFIX,
+    insert_rows,
+    load_segment,
+    owner_alive,
+    owner_lock_path,
+    segment_owner,
+)
+
+
+class Command(BaseCommand):
+    help = "Insert telemetry journal segments left behind by workers that died before flushing (run on boot)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spool-dir", default="", help="Defaults to ANALYTICS_SPOOL_DIR.")
+        parser.add_argument(
+            "--all", action="store_true", help="Also replay segments of running workers (only with workers stopped)."
+        )
+
+    def handle(self, *args, **options):
+        spool_dir = options["spool_dir"] or getattr(settings, "ANALYTICS_SPOOL_DIR", "")
+        if not spool_dir:
+            raise CommandError("No journal directory: set ANALYTICS_SPOOL_DIR or pass --spool-dir.")
+        spool_dir = Path(spool_dir)
+        by_owner: dict[str, list[Path]] = defaultdict(list)
+        for path in sorted(spool_dir.glob(f"{SEGMENT_PREFIX}*.jsonl")):
+            by_owner[segment_owner(path)].append(path)
+        for lock in spool_dir.glob(f"{SEGMENT_PREFIX}*.lock"):
+            by_owner.setdefault(lock.name[len(SEGMENT_PREFIX):-len(".lock")], [])
+
+        replayed = events = skipped = 0
+        for owner, segments in sorted(by_owner.items()):
+            if not options["all"] and owner_alive(spool_dir, owner):
+                skipped += len(segments)
+                continue
+            for path in segments:
+                rows = load_segment(path)
+                if rows:
+                    events += insert_rows(rows)
+                path.unlink(missing_ok=True)
+                replayed += 1
+            owner_lock_path(spool_dir, owner).unlink(missing_ok=True)
+        self.stdout.write(f"replayed {events} events from {replayed} segments ({skipped} skipped)")
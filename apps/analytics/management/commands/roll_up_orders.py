@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.infrastructure.order_rollups import orders_watermark, roll_up_orders
+
+
+class Command(BaseCommand):
+    help = "Recompute open days of the order revenue rollups and the weeks/months they touch (schedule hourly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Drop all order rollups and rebuild from history.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        folded = roll_up_orders(rebuild=options["rebuild"])
+        self.stdout.write(
+            f"rolled up {folded} paid orders in {time.perf_counter() - started:.2f}s "
+            f"(final through {orders_watermark() or '-'})"
+        )
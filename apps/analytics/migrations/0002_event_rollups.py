@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRollupDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_id', models.IntegerField()),
+                ('event_name', models.CharField(max_length=120)),
+                ('bucket_start', models.DateField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('actor_sketch', models.BinaryField(blank=True, default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EventRollupHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_id', models.IntegerField()),
+                ('event_name', models.CharField(max_length=120)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('actor_sketch', models.BinaryField(blank=True, default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=60, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='eventrollupdaily',
+            constraint=models.UniqueConstraint(fields=('tenant_id', 'bucket_start', 'event_name'), name='uq_event_rollup_daily'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventrolluphourly',
+            constraint=models.UniqueConstraint(fields=('tenant_id', 'bucket_start', 'event_name'), name='uq_event_rollup_hourly'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_order_amount_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_id', models.IntegerField()),
+                ('product_id', models.IntegerField()),
+                ('other_id', models.IntegerField()),
+                ('weight', models.FloatField(default=0.0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_id', models.IntegerField()),
+                ('product_id', models.IntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('neighbor_id', models.IntegerField()),
+                ('score', models.FloatField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='productcooccurrence',
+            index=models.Index(fields=['tenant_id', 'other_id'], name='analytics_p_tenant__c21b4e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='productcooccurrence',
+            constraint=models.UniqueConstraint(fields=('tenant_id', 'product_id', 'other_id'), name='uq_product_cooccurrence'),
+        ),
+        migrations.AddConstraint(
+            model_name='productneighbor',
+            constraint=models.UniqueConstraint(fields=('tenant_id', 'product_id', 'rank'), name='uq_product_neighbor_rank'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_product_neighbors'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recommendationsnapshot',
+            index=models.Index(fields=['tenant_id', 'context', 'object_id', 'created_at'], name='analytics_r_tenant__ecc711_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_recommendation_snapshot_lookup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_id', models.IntegerField()),
+                ('day', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders', models.IntegerField(default=0)),
+                ('paid_orders', models.IntegerField(default=0)),
+                ('active_shipments', models.IntegerField(default=0)),
+                ('products', models.IntegerField(default=0)),
+                ('pending_reviews', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='storedailystats',
+            constraint=models.UniqueConstraint(fields=('store_id', 'day'), name='uq_store_daily_stats'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Count
+from django.utils import timezone
+
+INACTIVE_SHIPMENT_STATUSES = ("delivered", "cancelled")
+
+
+def backfill_store_gauges(apps, schema_editor):
+    """Seed today's row with each existing store's gauges, so signal deltas start from the real counts."""
+    Tenant = apps.get_model("tenants", "Tenant")
+    Product = apps.get_model("catalog", "Product")
+    Shipment = apps.get_model("shipping", "Shipment")
+    Review = apps.get_model("reviews", "Review")
+    StoreDailyStats = apps.get_model("analytics", "StoreDailyStats")
+
+    def counts(queryset, store_field):
+        return dict(queryset.values_list(store_field).annotate(total=Count("id")).order_by())
+
+    products = counts(Product.objects.all(), "store_id")
+    shipments = counts(Shipment.objects.exclude(status__in=INACTIVE_SHIPMENT_STATUSES), "order__store_id")
+    reviews = counts(Review.objects.filter(status="pending"), "product__store_id")
+
+    today = timezone.localdate()
+    existing = set(StoreDailyStats.objects.filter(day=today).values_list("store_id", flat=True))
+    for store_id in Tenant.objects.values_list("id", flat=True):
+        gauges = {
+            "active_shipments": shipments.get(store_id, 0),
+            "products": products.get(store_id, 0),
+            "pending_reviews": reviews.get(store_id, 0),
+        }
+        if store_id in existing:
+            StoreDailyStats.objects.filter(store_id=store_id, day=today).update(**gauges)
+        else:
+            StoreDailyStats.objects.create(store_id=store_id, day=today, **gauges)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_order_rollups'),
+        ('catalog', '0006_stock_reservations'),
+        ('orders', '0004_order_external_reference'),
+        ('reviews', '0001_initial'),
+        ('shipping', '0001_initial'),
+        ('tenants', '0011_store_domain_status_updates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_store_gauges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_backfill_store_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderRollupDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_id', models.IntegerField()),
+                ('day', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='orderrollupdirtyday',
+            constraint=models.UniqueConstraint(fields=('tenant_id', 'day'), name='uq_order_rollup_dirty_day'),
+        ),
+    ]
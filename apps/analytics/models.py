@@ -38,6 +38,57 @@ class Event(models.Model):
         return f"{self.tenant_id}:{self.event_name}"
 
 
+class EventRollupHourly(models.Model):
+    """Event count and distinct-actor sketch per tenant, event name and hour (see `infrastructure/rollups.py`)."""
+
+    tenant_id = models.IntegerField()
+    event_name = models.CharField(max_length=120)
+    bucket_start = models.DateTimeField()
+    count = models.PositiveBigIntegerField(default=0)
+    actor_sketch = models.BinaryField(blank=True, default=b"")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant_id", "bucket_start", "event_name"], name="uq_event_rollup_hourly"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tenant_id}:{self.event_name}@{self.bucket_start:%Y-%m-%d %H}"
+
+
+class EventRollupDaily(models.Model):
+    tenant_id = models.IntegerField()
+    event_name = models.CharField(max_length=120)
+    bucket_start = models.DateField()
+    count = models.PositiveBigIntegerField(default=0)
+    actor_sketch = models.BinaryField(blank=True, default=b"")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant_id", "bucket_start", "event_name"], name="uq_event_rollup_daily"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tenant_id}:{self.event_name}@{self.bucket_start}"
+
+
+class RollupWatermark(models.Model):
+    """Highest raw row id folded into a rollup; rows above it are read raw until the next run."""
+
+    name = models.CharField(max_length=60, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name}:{self.last_id}"
+
+
 class Experiment(models.Model):
     STATUS_DRAFT = "DRAFT"
     STATUS_RUNNING = "RUNNING"
@@ -116,8 +167,147 @@ class RiskAssessment(models.Model):
         return f"{self.tenant_id}:{self.order_id}:{self.level}"
 
 
+class OrderAmountStats(models.Model):
+    """Per-tenant running order-amount statistics (Welford mean/M2 plus an exact sum) for fraud scoring."""
+
+    tenant_id = models.IntegerField(unique=True)
+    count = models.PositiveBigIntegerField(default=0)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.tenant_id}:n={self.count}"
+
+
+class StoreDailyStats(models.Model):
+    """
+    Merchant dashboard counters per store and day (see `infrastructure/store_stats.py`). Revenue, orders and
+    paid orders are flows for the day; active shipments, products and pending reviews are gauges as of the
+    end of the day (the latest row holds the current values).
+    """
+
+    store_id = models.IntegerField()
+    day = models.DateField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders = models.IntegerField(default=0)
+    paid_orders = models.IntegerField(default=0)
+    active_shipments = models.IntegerField(default=0)
+    products = models.IntegerField(default=0)
+    pending_reviews = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["store_id", "day"], name="uq_store_daily_stats"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.store_id}@{self.day}"
+
+
+class OrderRollup(models.Model):
+    """
+    Paid orders per tenant and day/week/month (see `infrastructure/order_rollups.py`): count, revenue,
+    distinct customers (exact for days, sketch-estimated for weeks and months) and first-time customers.
+    """
+
+    GRANULARITY_DAY = "day"
+    GRANULARITY_WEEK = "week"
+    GRANULARITY_MONTH = "month"
+
+    GRANULARITY_CHOICES = [
+        (GRANULARITY_DAY, "Day"),
+        (GRANULARITY_WEEK, "Week"),
+        (GRANULARITY_MONTH, "Month"),
+    ]
+
+    tenant_id = models.IntegerField()
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateField()
+    orders = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    customers = models.PositiveIntegerField(default=0)
+    new_customers = models.PositiveIntegerField(default=0)
+    customer_sketch = models.BinaryField(blank=True, default=b"")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant_id", "granularity", "bucket_start"], name="uq_order_rollup_bucket"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tenant_id}:{self.granularity}@{self.bucket_start}"
+
+
+class OrderRollupDirtyDay(models.Model):
+    """A final (pre-watermark) day whose orders changed revenue; `roll_up_orders` restates it and deletes the row."""
+
+    tenant_id = models.IntegerField()
+    day = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tenant_id", "day"], name="uq_order_rollup_dirty_day"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tenant_id}@{self.day}"
+
+
+class ProductCooccurrence(models.Model):
+    """
+    Upper triangle (`product_id <= other_id`) of a tenant's sparse product co-occurrence matrix; the
+    diagonal holds each product's total basket weight (see `infrastructure/copurchase.py`).
+    """
+
+    tenant_id = models.IntegerField()
+    product_id = models.IntegerField()
+    other_id = models.IntegerField()
+    weight = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tenant_id", "product_id", "other_id"], name="uq_product_cooccurrence"),
+        ]
+        indexes = [
+            models.Index(fields=["tenant_id", "other_id"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tenant_id}:{self.product_id}x{self.other_id}"
+
+
+class ProductNeighbor(models.Model):
+    """Top-K co-purchase neighbours of a product, ranked from 1 by cosine score."""
+
+    tenant_id = models.IntegerField()
+    product_id = models.IntegerField()
+    rank = models.PositiveSmallIntegerField()
+    neighbor_id = models.IntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tenant_id", "product_id", "rank"], name="uq_product_neighbor_rank"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tenant_id}:{self.product_id}#{self.rank}->{self.neighbor_id}"
+
+
 class RecommendationSnapshot(models.Model):
     STRATEGY_RULES_V1 = "RULES_V1"
+    STRATEGY_COPURCHASE_V1 = "COPURCHASE_V1"
 
     tenant_id = models.IntegerField(db_index=True)
     context = models.CharField(max_length=40)
@@ -129,6 +319,7 @@ class RecommendationSnapshot(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["tenant_id", "context", "created_at"]),
+            models.Index(fields=["tenant_id", "context", "object_id", "created_at"]),
         ]
 
     def __str__(self) -> str:
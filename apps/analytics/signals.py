@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.analytics.infrastructure.experiment_registry import bump_experiments_version
+from apps.analytics.infrastructure.fraud_features import record_order_amounts
+from apps.analytics.infrastructure.order_rollups import mark_order_day_dirty
+from apps.analytics.infrastructure.revenue import order_revenue
+from apps.analytics.infrastructure.store_stats import INACTIVE_SHIPMENT_STATUSES, bump_store_stats, stats_day
+from apps.analytics.models import Experiment
+from apps.catalog.models import Product
+from apps.orders.models import Order
+from apps.reviews.models import Review
+from apps.shipping.models import Shipment
+
+
+@receiver(post_save, sender=Experiment)
+@receiver(post_delete, sender=Experiment)
+def _experiment_changed(sender, instance: Experiment, **kwargs):
+    bump_experiments_version()
+
+
+@receiver(post_save, sender=Order)
+def _order_created(sender, instance: Order, created: bool, **kwargs):
+    # Bulk-created orders (external ingestion) record their amounts themselves.
+    if created:
+        store_id, amount = instance.store_id, instance.total_amount
+        transaction.on_commit(lambda: record_order_amounts(store_id, [amount]), robust=True)
+
+
+# -- store daily stats ------------------------------------------------------------------------------
+# Each pre_save remembers the persisted values the stats depend on, so post_save can bump by the difference.
+# Saves whose `update_fields` leave those values alone skip the extra SELECT and the bump.
+
+ORDER_STATS_FIELDS = ("payment_status", "status", "total_amount")
+SHIPMENT_STATS_FIELDS = ("status",)
+REVIEW_STATS_FIELDS = ("status",)
+
+
+def _untouched(update_fields, fields: tuple[str, ...]) -> bool:
+    return update_fields is not None and not set(fields).intersection(update_fields)
+
+
+def _remember(instance, update_fields, fields: tuple[str, ...]) -> None:
+    if instance._state.adding or _untouched(update_fields, fields):
+        instance._stats_pre_save = None
+        return
+    instance._stats_pre_save = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(pre_save, sender=Order)
+def _order_stats_pre_save(sender, instance: Order, update_fields=None, **kwargs):
+    _remember(instance, update_fields, ORDER_STATS_FIELDS)
+
+
+@receiver(post_save, sender=Order)
+def _order_stats_saved(sender, instance: Order, created: bool, update_fields=None, **kwargs):
+    if not created and _untouched(update_fields, ORDER_STATS_FIELDS):
+        return
+    paid = int(instance.payment_status == "paid")
+    revenue = order_revenue(
+        status=instance.status, payment_status=instance.payment_status, total_amount=instance.total_amount
+    )
+    day = stats_day(instance.created_at)
+    if created:
+        bump_store_stats(instance.store_id, day=day, orders=1, paid_orders=paid, revenue=revenue)
+        return
+    before = getattr(instance, "_stats_pre_save", None)
+    if not before:
+        return
+    was_paid = int(before["payment_status"] == "paid")
+    revenue_delta = revenue - order_revenue(**before)
+    if paid != was_paid or revenue_delta:
+        bump_store_stats(instance.store_id, day=day, paid_orders=paid - was_paid, revenue=revenue_delta)
+    if revenue_delta:
+        mark_order_day_dirty(instance.store_id, day)
+
+
+@receiver(post_delete, sender=Order)
+def _order_stats_deleted(sender, instance: Order, **kwargs):
+    paid = int(instance.payment_status == "paid")
+    revenue = order_revenue(
+        status=instance.status, payment_status=instance.payment_status, total_amount=instance.total_amount
+    )
+    day = stats_day(instance.created_at)
+    bump_store_stats(instance.store_id, day=day, orders=-1, paid_orders=-paid, revenue=-revenue)
+    if revenue:
+        mark_order_day_dirty(instance.store_id, day)
+
+
+@receiver(pre_save, sender=Shipment)
+def _shipment_stats_pre_save(sender, instance: Shipment, update_fields=None, **kwargs):
+    _remember(instance, update_fields, SHIPMENT_STATS_FIELDS)
+
+
+@receiver(post_save, sender=Shipment)
+def _shipment_stats_saved(sender, instance: Shipment, created: bool, update_fields=None, **kwargs):
+    if not created and _untouched(update_fields, SHIPMENT_STATS_FIELDS):
+        return
+    before = getattr(instance, "_stats_pre_save", None)
+    active = int(instance.status not in INACTIVE_SHIPMENT_STATUSES)
+    was_active = int(bool(before) and before["status"] not in INACTIVE_SHIPMENT_STATUSES)
+    if active != was_active:
+        bump_store_stats(instance.order.store_id, active_shipments=active - was_active)
+
+
+@receiver(post_delete, sender=Shipment)
+def _shipment_stats_deleted(sender, instance: Shipment, **kwargs):
+    if instance.status not in INACTIVE_SHIPMENT_STATUSES:
+        bump_store_stats(instance.order.store_id, active_shipments=-1)
+
+
+@receiver(post_save, sender=Product)
+def _product_stats_saved(sender, instance: Product, created: bool, **kwargs):
+    if created:
+        bump_store_stats(instance.store_id, products=1)
+
+
+@receiver(post_delete, sender=Product)
+def _product_stats_deleted(sender, instance: Product, **kwargs):
+    bump_store_stats(instance.store_id, products=-1)
+
+
+@receiver(pre_save, sender=Review)
+def _review_stats_pre_save(sender, instance: Review, update_fields=None, **kwargs):
+    _remember(instance, update_fields, REVIEW_STATS_FIELDS)
+
+
+@receiver(post_save, sender=Review)
+def _review_stats_saved(sender, instance: Review, created: bool, update_fields=None, **kwargs):
+    if not created and _untouched(update_fields, REVIEW_STATS_FIELDS):
+        return
+    before = getattr(instance, "_stats_pre_save", None)
+    pending = int(instance.status == "pending")
+    was_pending = int(bool(before) and before["status"] == "pending")
+    if pending != was_pending:
+        bump_store_stats(instance.product.store_id, pending_reviews=pending - was_pending)
+
+
+@receiver(post_delete, sender=Review)
+def _review_stats_deleted(sender, instance: Review, **kwargs):
+    if instance.status == "pending":
+        # Reviews go before their product in a cascade, so the product row is still readable here.
+        store_id = Product.objects.filter(pk=instance.product_id).values_list("store_id", flat=True).first()
+        bump_store_stats(store_id, pending_reviews=-1)
@@ -0,0 +1,844 @@
+from __future__ import annotations
+
+import gzip
+import json
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from apps.analytics.application.assign_variant import AssignVariantCommand, AssignVariantUseCase, _choose_variant
+from apps.analytics.application.ingest_events import BatchTooLargeError, IngestEventsCommand, IngestEventsUseCase
+from apps.analytics.application.recommend_products import RecommendProductsCommand, RecommendProductsUseCase
+from apps.analytics.application.report_kpis import ReportKpisCommand, ReportKpisUseCase
+from apps.analytics.application.report_revenue import ReportRevenueCommand, ReportRevenueUseCase
+from apps.analytics.application.report_store_stats import ReportStoreStatsCommand, ReportStoreStatsUseCase
+from apps.analytics.application.track_event import (
+    TrackEventCommand,
+    TrackEventUseCase,
+    _sanitize_event,
+    get_event_sink,
+)
+from apps.analytics.domain.types import EventDTO
+from apps.analytics.infrastructure import copurchase, exposure_log
+from apps.analytics.infrastructure.buffered_sink import BufferedEventSink
+from apps.analytics.infrastructure.db_sink import DbEventSink, build_event_row, build_event_rows
+from apps.analytics.infrastructure.experiment_registry import reset_experiment_registry
+from apps.analytics.infrastructure.fraud_features import backfill_fraud_features
+from apps.analytics.infrastructure.order_rollups import order_series, orders_watermark, roll_up_orders
+from apps.analytics.infrastructure.recommendation_cache import _lock_key, prune_snapshots
+from apps.analytics.infrastructure.rollups import event_series, events_watermark, roll_up_events
+from apps.analytics.infrastructure.rules.fraud_rules import evaluate_fraud_rules, evaluate_fraud_rules_by_scan
+from apps.analytics.infrastructure.store_stats import reconcile_store_stats, store_stats_for_day, store_stats_range
+from apps.analytics.infrastructure.warehouse import (
+    ParquetWarehouseSink,
+    compact_warehouse,
+    event_counts,
+    pa,
+    query_events,
+)
+from apps.analytics.interfaces.api.views import _read_batch_body
+from apps.analytics.models import (
+    Event,
+    EventRollupDaily,
+    EventRollupHourly,
+    Experiment,
+    ExperimentAssignment,
+    OrderAmountStats,
+    OrderRollupDirtyDay,
+    ProductCooccurrence,
+    ProductNeighbor,
+    RecommendationSnapshot,
+    StoreDailyStats,
+)
+from apps.catalog.models import Product
+from apps.customers.models import Customer
+from apps.orders.models import Order, OrderItem
+from apps.payments.models import Payment, PaymentIntent
+from apps.reviews.models import Review
+from apps.shipping.models import Shipment
+from apps.tenants.domain.tenant_context import TenantContext
+from apps.tenants.models import Tenant, TenantMembership
+
+
+def _event(name: str = "cart.item_added") -> EventDTO:
+    return EventDTO(event_name=name, actor_type="ANON", actor_id=None, session_key="s1", properties={"qty": 1})
+
+
+class StoreOrdersMixin:
+    """A store (`self.tenant`) with one customer, and `_create_order` for orders in it."""
+
+    store_slug = "store"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.tenant = Tenant.objects.create(slug=self.store_slug, name=self.store_slug.title(), is_active=True)
+        self.customer = self._create_customer(self.store_slug)
+
+    def _create_customer(self, name: str) -> Customer:
+        return Customer.objects.create(store_id=self.tenant.id, email=f"{name}@example.com", full_name=name.title())
+
+    def _create_order(self, *, customer: Customer | None = None, **fields) -> Order:
+        return Order.objects.create(
+            store_id=self.tenant.id,
+            order_number=str(uuid.uuid4())[:12],
+            customer=customer or self.customer,
+            **fields,
+        )
+
+
+class BufferedEventSinkTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+
+    def _sink(self, **kwargs) -> BufferedEventSink:
+        options = {"capacity": 100, "flush_size": 10, "flush_seconds": 60, "spool_dir": "", "background": False}
+        options.update(kwargs)
+        return BufferedEventSink(**options)
+
+    def test_sync_sink_is_the_default(self):
+        self.assertIsInstance(get_event_sink(), DbEventSink)
+        TrackEventUseCase.execute(TrackEventCommand(tenant_id=1, event=_event()))
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_events_are_queued_on_commit_and_bulk_inserted(self):
+        sink = self._sink()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.assertEqual(sink.store_event(tenant_id=1, event=_event()), 0)
+        self.assertEqual(sink.metrics()["depth"], 0)
+
+        for callback in callbacks:
+            callback()
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(4):
+                sink.store_event(tenant_id=1, event=_event())
+        self.assertEqual(sink.metrics()["depth"], 5)
+        with self.assertNumQueries(1):
+            self.assertEqual(sink.flush(), 5)
+        self.assertNotEqual(Event.objects.first().session_key_hash, "s1")
+
+        with self.assertRaises(ValueError):
+            sink.store_event(tenant_id=1, event=_event(""))
+
+    def test_full_buffer_drops_and_counts(self):
+        sink = self._sink(capacity=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(5):
+                sink.store_event(tenant_id=1, event=_event())
+        metrics = sink.metrics()
+        self.assertEqual((metrics["depth"], metrics["dropped_total"], metrics["high_watermark"]), (3, 2, 3))
+        sink.flush()
+        self.assertEqual((Event.objects.count(), sink.metrics()["flushed_total"]), (3, 3))
+
+    def _segments(self) -> list[Path]:
+        return sorted(Path(self.spool.name).glob("*.jsonl"))
+
+    def test_journal_is_deleted_after_flush_and_replayed_after_a_crash(self):
+        sink = self._sink(spool_dir=self.spool.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                sink.store_event(tenant_id=1, event=_event())
+        self.assertEqual(len(self._segments()), 1)
+        sink.flush()
+        self.assertEqual(self._segments(), [])
+
+        # A worker that dies before flushing leaves its segment behind; the kernel drops its owner lock.
+        crashed = self._sink(spool_dir=self.spool.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                crashed.store_event(tenant_id=1, event=_event("checkout.started"))
+        crashed._owner_lock.close()
+
+        out = StringIO()
+        call_command("replay_telemetry_journal", spool_dir=self.spool.name, stdout=out)
+        self.assertIn("replayed 3 events from 1 segments", out.getvalue())
+        self.assertEqual(Event.objects.filter(event_name="checkout.started").count(), 3)
+        self.assertEqual(self._segments(), [])
+        self.assertEqual([path.name for path in Path(self.spool.name).glob("*.lock")], [f"events-{sink._owner}.lock"])
+
+    def test_live_owner_segments_are_not_replayed_even_with_the_same_pid(self):
+        first = self._sink(spool_dir=self.spool.name)
+        second = self._sink(spool_dir=self.spool.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.store_event(tenant_id=1, event=_event())
+            second.store_event(tenant_id=1, event=_event())
+        self.assertEqual(len(self._segments()), 2)
+
+        out = StringIO()
+        call_command("replay_telemetry_journal", spool_dir=self.spool.name, stdout=out)
+        self.assertIn("replayed 0 events from 0 segments (2 skipped)", out.getvalue())
+        self.assertEqual((first.flush(), second.flush()), (1, 1))
+        self.assertEqual(Event.objects.count(), 2)
+
+    @override_settings(ANALYTICS_EVENT_SINK="buffered")
+    def test_setting_selects_buffered_sink(self):
+        self.assertIsInstance(get_event_sink(), BufferedEventSink)
+
+    @override_settings(ANALYTICS_WAREHOUSE_ENABLED=True)
+    def test_warehouse_copy_is_sent_only_on_commit(self):
+        with mock.patch("apps.analytics.application.track_event.get_warehouse_sink") as warehouse:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                TrackEventUseCase.execute(TrackEventCommand(tenant_id=1, event=_event()))
+            warehouse.return_value.send_event.assert_not_called()
+            for callback in callbacks:
+                callback()
+        self.assertEqual(warehouse.return_value.send_event.call_count, 1)
+
+
+class IngestEventsTests(TestCase):
+    def test_batch_is_validated_per_event_and_inserted_once(self):
+        events = [_event(), _event("Not An Event"), _event("checkout.started"), _event()]
+        events.append(
+            EventDTO(event_name="product.viewed", actor_type="ANON", actor_id=None, session_key="s1", object_id="x" * 65)
+        )
+        with self.assertNumQueries(1):
+            result = IngestEventsUseCase.execute(IngestEventsCommand(tenant_id=1, events=events))
+        self.assertEqual(result.accepted, 3)
+        self.assertEqual([item["index"] for item in result.rejected], [1, 4])
+        self.assertEqual(Event.objects.count(), 3)
+
+        rows, _ = build_event_rows(tenant_id=1, events=[_event()])
+        expected = build_event_row(tenant_id=1, event=_event())
+        rows[0].pop("occurred_at"), expected.pop("occurred_at")
+        self.assertEqual(rows[0], expected)
+
+    @override_settings(ANALYTICS_INGEST_MAX_EVENTS=2)
+    def test_oversized_batch_is_refused(self):
+        with self.assertRaises(BatchTooLargeError):
+            IngestEventsUseCase.execute(IngestEventsCommand(tenant_id=1, events=[_event()] * 3))
+        self.assertFalse(Event.objects.exists())
+
+    @override_settings(ANALYTICS_EVENT_SINK="buffered")
+    def test_buffered_sink_queues_rows_on_commit(self):
+        sink = get_event_sink()
+        with self.captureOnCommitCallbacks(execute=True):
+            IngestEventsUseCase.execute(IngestEventsCommand(tenant_id=1, events=[_event(), _event()]))
+        self.assertEqual(sink.metrics()["depth"], 2)
+
+    @override_settings(ANALYTICS_INGEST_MAX_BYTES=2048)
+    def test_gzip_body_is_decompressed_within_limit(self):
+        body = json.dumps({"events": [{"event_name": "cart.item_added"}]}).encode()
+        request = RequestFactory().post(
+            "/api/events/batch", gzip.compress(body), content_type="application/json", HTTP_CONTENT_ENCODING="gzip"
+        )
+        self.assertEqual(_read_batch_body(request), body)
+
+        bomb = RequestFactory().post(
+            "/api/events/batch",
+            gzip.compress(b" " * 100_000),
+            content_type="application/json",
+            HTTP_CONTENT_ENCODING="gzip",
+        )
+        with self.assertRaises(BatchTooLargeError):
+            _read_batch_body(bomb)
+
+    def test_order_ip_is_not_recorded_under_a_shared_hash_when_missing(self):
+        order_event = EventDTO(
+            event_name="order.placed", actor_type="CUSTOMER", actor_id=1, session_key="s1", object_id=7
+        )
+        with mock.patch("apps.analytics.application.track_event.record_order_ip") as record:
+            with self.captureOnCommitCallbacks(execute=True):
+                IngestEventsUseCase.execute(IngestEventsCommand(tenant_id=1, events=[order_event]))
+        self.assertEqual(record.call_args.args[:3], (1, 7, ""))
+
+
+@override_settings(ALLOWED_HOSTS=[".w-sala.com"], ANALYTICS_INGEST_MAX_EVENTS=3, ANALYTICS_INGEST_MAX_BYTES=2048)
+class TrackEventBatchAPITests(TestCase):
+    url = "/api/events/batch"
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="batch", name="Batch", is_active=True)
+        user = get_user_model().objects.create_user(username="batch", password="pass12345")
+        TenantMembership.objects.create(tenant=self.tenant, user=user)
+        self.client = Client(HTTP_HOST="batch.w-sala.com")
+        self.client.force_login(user)
+
+    def _post(self, body, **extra):
+        if not isinstance(body, (bytes, str)):
+            body = json.dumps(body)
+        return self.client.post(self.url, body, content_type="application/json", **extra)
+
+    def test_accepts_valid_events_and_reports_rejected_ones(self):
+        old = (datetime.now(dt_timezone.utc) - timedelta(days=3)).isoformat()
+        events = [
+            {"event_name": "cart.item_added", "occurred_at": old},
+            {"event_name": "Bad Name"},
+            "not an object",
+        ]
+        response = self._post({"events": events})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["accepted"], 1)
+        self.assertEqual([item["index"] for item in response.json()["data"]["rejected"]], [1, 2])
+        event = Event.objects.get(tenant_id=self.tenant.id)
+        # Client clocks older than a day are replaced by the receive time.
+        self.assertGreater(event.occurred_at, datetime.now(dt_timezone.utc) - timedelta(minutes=1))
+
+        body = gzip.compress(json.dumps([{"event_name": "product.viewed"}]).encode())
+        gzipped = self._post(body, HTTP_CONTENT_ENCODING="gzip")
+        self.assertEqual(gzipped.json()["data"]["accepted"], 1)
+
+    def test_malformed_and_oversized_batches_are_refused(self):
+        self.assertEqual(self._post("{not json").status_code, 400)
+        self.assertEqual(self._post({"events": {"event_name": "cart.item_added"}}).status_code, 400)
+        self.assertEqual(self._post(b"x", HTTP_CONTENT_ENCODING="br").status_code, 400)
+        self.assertEqual(self._post([{"event_name": "cart.item_added"}] * 4).status_code, 413)
+        self.assertEqual(self._post({"events": [], "padding": "x" * 4096}).status_code, 413)
+        self.assertFalse(Event.objects.exists())
+
+    def test_batches_are_rate_limited_by_their_own_rule(self):
+        rules = [dict(rule) for rule in settings.SECURITY_RATE_LIMITS]
+        for rule in rules:
+            if rule["key"] == "events_batch":
+                rule["limit"] = 1
+        with override_settings(SECURITY_RATE_LIMITS=rules, SECURITY_RATE_LIMIT_STORE="cache"):
+            self.assertEqual(self._post([]).status_code, 200)
+            self.assertEqual(self._post([]).status_code, 429)
+            single = self.client.post("/api/events", {"event_name": "cart.item_added"}, content_type="application/json")
+            self.assertEqual(single.status_code, 200)
+
+
+class EventRollupTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.start = datetime(2026, 3, 1, 9, 15, tzinfo=dt_timezone.utc)
+
+    def _events(self, name: str, actors: range, at: datetime, tenant_id: int = 7) -> None:
+        Event.objects.bulk_create(
+            [
+                Event(
+                    **build_event_row(
+                        tenant_id=tenant_id,
+                        event=EventDTO(event_name=name, actor_type="CUSTOMER", actor_id=actor, session_key=None, occurred_at=at),
+                    )
+                )
+                for actor in actors
+            ]
+        )
+
+    def _kpis(self) -> dict:
+        ctx = TenantContext(tenant_id=7, currency="SAR", user_id=None, session_key=None)
+        return ReportKpisUseCase.execute(ReportKpisCommand(tenant_ctx=ctx))
+
+    def test_rollups_fold_incrementally_behind_a_watermark(self):
+        self._events("product.viewed", range(40), self.start)
+        self._events("product.viewed", range(20, 60), self.start + timedelta(hours=1))
+        self._events("cart.item_added", range(5), self.start + timedelta(hours=1))
+        self._events("product.viewed", range(3), self.start, tenant_id=8)
+
+        now = self.start + timedelta(hours=3)
+        self.assertEqual(roll_up_events(chunk_size=50, now=now), 88)
+        self.assertEqual(events_watermark(), Event.objects.order_by("-id").values_list("id", flat=True).first())
+        self.assertEqual(EventRollupHourly.objects.filter(tenant_id=7).count(), 3)
+        day = EventRollupDaily.objects.get(tenant_id=7, event_name="product.viewed")
+        self.assertEqual(day.count, 80)
+
+        series = event_series(tenant_id=7, start=self.start.date(), event_name="product.viewed")
+        self.assertEqual(series[0]["events"], 80)
+        self.assertTrue(57 <= series[0]["actors"] <= 63)
+
+        # Newer events are read raw until the next run, then merged into the existing rows.
+        self._events("product.viewed", range(2), self.start + timedelta(hours=1))
+        with self.assertNumQueries(3):
+            kpis = self._kpis()
+        self.assertEqual(kpis["events_total"], 87)
+        self.assertEqual(kpis["events_by_name"][0], {"event_name": "product.viewed", "total": 82})
+        self.assertEqual(roll_up_events(now=now), 2)
+        self.assertEqual(EventRollupDaily.objects.get(tenant_id=7, event_name="product.viewed").count, 82)
+        self.assertEqual(self._kpis()["events_total"], 87)
+
+    def test_recent_events_wait_for_the_lag(self):
+        self._events("product.viewed", range(3), self.start)
+        self._events("product.viewed", range(2), self.start + timedelta(minutes=30))
+        self.assertEqual(roll_up_events(now=self.start + timedelta(minutes=30, seconds=10)), 3)
+        self.assertEqual(self._kpis()["events_total"], 5)
+        self.assertEqual(roll_up_events(now=self.start + timedelta(hours=1)), 2)
+
+
+@override_settings(ANALYTICS_EXPERIMENT_ASSIGNMENT="stateless")
+class StatelessAssignmentTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        reset_experiment_registry()
+        self.exposures = exposure_log.ExposureLog(background=False)
+        previous, exposure_log._exposures = exposure_log._exposures, self.exposures
+        self.addCleanup(setattr, exposure_log, "_exposures", previous)
+        self.experiment = Experiment.objects.create(
+            key="checkout-cta", status=Experiment.STATUS_RUNNING, variants_json={"A": 50, "B": 50}
+        )
+
+    def _assign(self, session_key: str, tenant_id: int = 3):
+        ctx = TenantContext(tenant_id=tenant_id, currency="SAR", user_id=None, session_key=session_key)
+        return AssignVariantUseCase.execute(AssignVariantCommand(tenant_ctx=ctx, experiment_key="checkout-cta"))
+
+    def test_assignment_is_hashed_without_queries_and_exposures_are_bulk_logged(self):
+        self._assign("warm-up")
+        with self.assertNumQueries(0):
+            results = [self._assign(f"s{index % 20}") for index in range(60)]
+        self.assertTrue(all(result.assigned for result in results))
+        self.assertEqual(
+            results[5].variant, _choose_variant(key="checkout-cta", identity="s5", variants={"A": 50, "B": 50})
+        )
+        self.assertEqual(self.exposures.deduplicated, 40)
+
+        self.assertEqual(self.exposures.flush(), 21)
+        self.assertEqual(ExperimentAssignment.objects.filter(experiment=self.experiment, tenant_id=3).count(), 21)
+
+    def test_saving_an_experiment_invalidates_cached_definitions(self):
+        self.assertTrue(self._assign("s1").assigned)
+        self.experiment.status = Experiment.STATUS_PAUSED
+        self.experiment.save()
+        result = self._assign("s1")
+        self.assertEqual((result.variant, result.assigned), ("A", False))
+
+
+class FraudFeatureTests(StoreOrdersMixin, TestCase):
+    store_slug = "fraud"
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def _order(self, amount: str, ip: str = "") -> Order:
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self._create_order(total_amount=Decimal(amount))
+            event = EventDTO(
+                event_name="order.placed",
+                actor_type="CUSTOMER",
+                actor_id=None,
+                session_key=None,
+                object_type="ORDER",
+                object_id=order.id,
+                ip_address=ip,
+            )
+            TrackEventUseCase.execute(TrackEventCommand(tenant_id=self.tenant.id, event=event))
+        return order
+
+    def test_running_stats_match_a_full_recompute(self):
+        amounts = ["10.00", "12.50", "11.00", "9.75", "250.00", "14.20"]
+        for amount in amounts:
+            self._order(amount)
+        live = OrderAmountStats.objects.get(tenant_id=self.tenant.id)
+        backfill_fraud_features(tenant_ids=[self.tenant.id])
+        rebuilt = OrderAmountStats.objects.get(tenant_id=self.tenant.id)
+        self.assertEqual((live.count, live.total), (6, sum(Decimal(a) for a in amounts)))
+        self.assertEqual((rebuilt.count, rebuilt.total), (live.count, live.total))
+        self.assertAlmostEqual(live.mean, rebuilt.mean, places=9)
+        self.assertAlmostEqual(live.variance, rebuilt.variance, places=6)
+
+    def test_scores_match_the_table_scan_rules(self):
+        orders = [self._order(amount, ip="10.0.0.1") for amount in ("20.00", "22.00", "18.00")]
+        orders += [self._order("500.00", ip="10.0.0.2"), self._order("21.00")]
+        for index in range(3):
+            PaymentIntent.objects.create(
+                store_id=self.tenant.id,
+                order=orders[0],
+                provider_code="dummy",
+                amount=Decimal("20.00"),
+                status="failed",
+                idempotency_key=f"failed-{index}",
+            )
+        backfill_fraud_features(tenant_ids=[self.tenant.id])
+
+        for order in orders:
+            with self.assertNumQueries(1):
+                streaming = evaluate_fraud_rules(tenant_id=self.tenant.id, order=order)
+            self.assertEqual(streaming, evaluate_fraud_rules_by_scan(tenant_id=self.tenant.id, order=order))
+        self.assertEqual(
+            evaluate_fraud_rules(tenant_id=self.tenant.id, order=orders[0]).reasons,
+            ["many_failed_payments", "multiple_orders_same_ip"],
+        )
+        self.assertIn("high_order_amount", evaluate_fraud_rules(tenant_id=self.tenant.id, order=orders[3]).reasons)
+
+
+class CoPurchaseRecommenderTests(StoreOrdersMixin, TestCase):
+    store_slug = "recs"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.products = [
+            Product.objects.create(store_id=self.tenant.id, sku=f"SKU-{index}", name=f"P{index}", price="10.00")
+            for index in range(5)
+        ]
+        self.later = datetime.now(dt_timezone.utc) + timedelta(hours=1)
+
+    def _order(self, *indexes: int, status: str = "pending") -> Order:
+        order = self._create_order(status=status)
+        for index in indexes:
+            OrderItem.objects.create(order=order, product=self.products[index], quantity=1, price=Decimal("10.00"))
+        return order
+
+    def _cooccurrence(self) -> dict:
+        return {
+            (row.product_id, row.other_id): row.weight
+            for row in ProductCooccurrence.objects.filter(tenant_id=self.tenant.id)
+        }
+
+    def _neighbors(self, index: int) -> list[int]:
+        return list(
+            ProductNeighbor.objects.filter(tenant_id=self.tenant.id, product_id=self.products[index].id)
+            .order_by("rank")
+            .values_list("neighbor_id", flat=True)
+        )
+
+    def test_incremental_updates_match_a_rebuild(self):
+        p = [product.id for product in self.products]
+        self._order(0, 1)
+        self._order(0, 1, 2)
+        self._order(0, 3, status="cancelled")
+        first = copurchase.update_copurchase_model(now=self.later)
+        self.assertEqual(first["baskets"], 2)
+        self.assertEqual(self._neighbors(0), [p[1], p[2]])
+
+        self._order(0, 2)
+        self._order(0, 2)
+        self._order(3, 4)
+        second = copurchase.update_copurchase_model(now=self.later)
+        self.assertEqual((second["baskets"], second["products"]), (3, 4))
+        self.assertEqual(self._neighbors(0), [p[2], p[1]])
+        incremental = self._cooccurrence()
+
+        copurchase.update_copurchase_model(rebuild=True, now=self.later)
+        self.assertEqual(self._cooccurrence(), incremental)
+        self.assertEqual(incremental[(p[0], p[0])], 4.0)
+        self.assertNotIn((p[0], p[3]), incremental)
+        self.assertEqual(self._neighbors(0), [p[2], p[1]])
+        self.assertEqual(self._neighbors(4), [p[3]])
+
+    def test_sparse_and_python_paths_agree(self):
+        baskets = [([1, 2, 3], 1.0), ([2, 3], 1.0), ([3, 1, 3], 0.5), (list(range(100)), 1.0), ([4], 1.0)]
+        pairs = copurchase.cooccurrence(baskets)
+        diagonal = {p: w for (p, q), w in pairs.items() if p == q}
+        entries = [(p, q, w) for (p, q), w in pairs.items()]
+        ranked = copurchase.rank_neighbors(entries, diagonal, [1, 2, 3, 4], 2)
+        with mock.patch.object(copurchase, "sparse", None), mock.patch.object(copurchase, "np", None):
+            self.assertEqual(copurchase.cooccurrence(baskets), pairs)
+            self.assertEqual(copurchase.rank_neighbors(entries, diagonal, [1, 2, 3, 4], 2), ranked)
+        self.assertEqual(pairs[(1, 3)], 1.5)
+        self.assertEqual([neighbor for neighbor, _score in ranked[3]], [2, 1])
+        self.assertEqual(ranked[4], [])
+
+    def test_use_case_serves_neighbors_with_one_lookup(self):
+        self._order(0, 1, 2)
+        self._order(0, 1)
+        self._order(0, 3)
+        copurchase.update_copurchase_model(now=self.later)
+        Product.objects.filter(id=self.products[3].id).update(is_active=False)
+        tenant_ctx = TenantContext(tenant_id=self.tenant.id, currency="SAR", user_id=None, session_key="s")
+
+        # Snapshot lookup, neighbour lookup, snapshot insert.
+        with self.assertNumQueries(3):
+            snapshot = RecommendProductsUseCase.execute(
+                RecommendProductsCommand(tenant_ctx=tenant_ctx, context="PRODUCT_DETAIL", object_id=self.products[0].id)
+            )
+        self.assertEqual(snapshot.strategy, RecommendationSnapshot.STRATEGY_COPURCHASE_V1)
+        self.assertEqual(snapshot.recommended_ids_json, [self.products[1].id, self.products[2].id])
+
+        fallback = RecommendProductsUseCase.execute(
+            RecommendProductsCommand(tenant_ctx=tenant_ctx, context="PRODUCT_DETAIL", object_id=self.products[4].id)
+        )
+        self.assertEqual(fallback.strategy, RecommendationSnapshot.STRATEGY_RULES_V1)
+
+
+class RecommendationCacheTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="recs-cache", name="Recs cache", is_active=True)
+        self.tenant_ctx = TenantContext(tenant_id=self.tenant.id, currency="SAR", user_id=None, session_key="s")
+
+    def _home(self) -> RecommendationSnapshot:
+        return RecommendProductsUseCase.execute(RecommendProductsCommand(tenant_ctx=self.tenant_ctx, context="home"))
+
+    def test_fresh_snapshot_is_served_without_recompute(self):
+        first = self._home()
+        with self.assertNumQueries(1):
+            second = self._home()
+        self.assertEqual(second.id, first.id)
+        self.assertEqual((second.context, second.object_id), ("HOME", ""))
+        self.assertEqual(RecommendationSnapshot.objects.filter(tenant_id=self.tenant.id).count(), 1)
+
+    @override_settings(ANALYTICS_RECS_SNAPSHOT_TTL_SECONDS=60)
+    def test_expired_snapshot_is_served_while_another_request_recomputes(self):
+        expired = self._home()
+        RecommendationSnapshot.objects.filter(id=expired.id).update(
+            created_at=datetime.now(dt_timezone.utc) - timedelta(minutes=5)
+        )
+        cache.add(_lock_key(self.tenant.id, "HOME", ""), 1, 30)
+        self.assertEqual(self._home().id, expired.id)
+
+        cache.delete(_lock_key(self.tenant.id, "HOME", ""))
+        refreshed = self._home()
+        self.assertNotEqual(refreshed.id, expired.id)
+        self.assertEqual(self._home().id, refreshed.id)
+
+    def test_cold_miss_under_a_held_lock_is_computed_without_storing(self):
+        cache.add(_lock_key(self.tenant.id, "HOME", ""), 1, 30)
+        try:
+            snapshot = self._home()
+        finally:
+            cache.delete(_lock_key(self.tenant.id, "HOME", ""))
+        self.assertIsNone(snapshot.id)
+        self.assertEqual(snapshot.strategy, RecommendationSnapshot.STRATEGY_RULES_V1)
+        self.assertFalse(RecommendationSnapshot.objects.filter(tenant_id=self.tenant.id).exists())
+
+
+        snapshot = RecommendProductsUseCase.execute(
+            RecommendProductsCommand(tenant_ctx=self.tenant_ctx, context="CART", object_id=12345)
+        )
+        self.assertIsNone(snapshot.pk)
+        self.assertEqual(snapshot.object_id, "12345")
+        self.assertFalse(RecommendationSnapshot.objects.exists())
+
+    def test_precompute_home_and_prune_superseded(self):
+        inactive = Tenant.objects.create(slug="recs-off", name="Off", is_active=False)
+        old = datetime.now(dt_timezone.utc) - timedelta(days=30)
+        stale = RecommendationSnapshot.objects.create(tenant_id=self.tenant.id, context="PRODUCT_DETAIL", object_id="9")
+        RecommendationSnapshot.objects.filter(id=stale.id).update(created_at=old)
+        out = StringIO()
+        call_command("precompute_recommendations", stdout=out)
+        call_command("precompute_recommendations", stdout=out)
+
+        self.assertEqual(RecommendationSnapshot.objects.filter(tenant_id=self.tenant.id, context="HOME").count(), 1)
+        self.assertFalse(RecommendationSnapshot.objects.filter(tenant_id=inactive.id).exists())
+        self.assertFalse(RecommendationSnapshot.objects.filter(id=stale.id).exists())
+        self.assertEqual(prune_snapshots(), 0)
+
+
+class StoreDailyStatsTests(StoreOrdersMixin, TestCase):
+    store_slug = "stats"
+
+    def _values(self, stats) -> tuple:
+        return (
+            stats.revenue,
+            stats.orders,
+            stats.paid_orders,
+            stats.active_shipments,
+            stats.products,
+            stats.pending_reviews,
+        )
+
+    def test_write_paths_match_reconcile(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            products = [
+                Product.objects.create(store_id=self.tenant.id, sku=f"ST-{index}", name=f"S{index}", price="5.00")
+                for index in range(3)
+            ]
+            Product.objects.filter(id=products[2].id).delete()
+            orders = [self._create_order(total_amount=amount) for amount in (Decimal("40.00"), Decimal("9.00"))]
+            orders[0].payment_status = "paid"
+            orders[0].save(update_fields=["payment_status"])
+            payment = Payment.objects.create(order=orders[0], method="card", amount=Decimal("40.00"))
+            payment.status = "success"
+            payment.save(update_fields=["status"])
+            Payment.objects.create(order=orders[1], method="card", amount=Decimal("9.00"), status="failed")
+            shipments = [Shipment.objects.create(order=order, carrier="aramex") for order in orders]
+            shipments[0].status = "delivered"
+            shipments[0].save(update_fields=["status"])
+            reviews = [
+                Review.objects.create(product=products[0], customer=self.customer, rating=5),
+                Review.objects.create(product=products[1], customer=self.customer, rating=3),
+            ]
+            reviews[0].status = "approved"
+            reviews[0].save(update_fields=["status"])
+
+        with self.assertNumQueries(1):
+            live = store_stats_for_day(self.tenant.id)
+        self.assertEqual(self._values(live), (Decimal("40.00"), 2, 1, 1, 2, 1))
+
+        StoreDailyStats.objects.filter(store_id=self.tenant.id).update(orders=99, products=0)
+        reconcile_store_stats(store_ids=[self.tenant.id])
+        self.assertEqual(self._values(store_stats_for_day(self.tenant.id)), self._values(live))
+
+    def test_saves_that_skip_tracked_fields_skip_the_stats(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self._create_order()
+            shipment = Shipment.objects.create(order=order, carrier="aramex")
+
+        shipment.tracking_number = "TRK-1"
+        with self.assertNumQueries(1):
+            shipment.save(update_fields=["tracking_number"])
+        self.assertEqual(self._values(store_stats_for_day(self.tenant.id))[3], 1)
+
+    def test_migration_backfills_gauges_of_existing_stores(self):
+        backfill = import_module("apps.analytics.migrations.0008_backfill_store_daily_stats").backfill_store_gauges
+        product = Product.objects.create(store_id=self.tenant.id, sku="BF-1", name="B", price="5.00")
+        Product.objects.create(store_id=self.tenant.id, sku="BF-2", name="B", price="5.00")
+        Review.objects.create(product=product, customer=self.customer, rating=4)
+        StoreDailyStats.objects.all().delete()
+
+        backfill(django_apps, None)
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(id=product.id).delete()
+        self.assertEqual(self._values(store_stats_for_day(self.tenant.id))[3:], (0, 1, 0))
+
+    def test_range_carries_gauges_across_days_without_rows(self):
+        today = date(2026, 3, 10)
+        StoreDailyStats.objects.create(
+            store_id=self.tenant.id, day=today - timedelta(days=3), revenue=Decimal("12.00"), orders=2, products=7
+        )
+        StoreDailyStats.objects.create(store_id=self.tenant.id, day=today - timedelta(days=1), orders=1, products=8)
+        tenant_ctx = TenantContext(tenant_id=self.tenant.id, currency="SAR")
+
+        with self.assertNumQueries(2):
+            days = ReportStoreStatsUseCase.execute(
+                ReportStoreStatsCommand(tenant_ctx=tenant_ctx, start=today - timedelta(days=2), end=today)
+            )
+        self.assertEqual([(day.orders, day.products) for day in days], [(0, 7), (1, 8), (0, 8)])
+        self.assertEqual(days[0].as_dict()["revenue"], "0.00")
+        with self.assertRaises(ValueError):
+            store_stats_range(self.tenant.id, today, today - timedelta(days=1))
+
+
+class OrderRollupTests(StoreOrdersMixin, TestCase):
+    store_slug = "revenue"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.customers = [self.customer] + [self._create_customer(f"c{index}") for index in (1, 2)]
+
+    def _order(self, day: date, customer: int, amount: str, *, paid: bool = True, status: str = "pending") -> Order:
+        order = self._create_order(
+            customer=self.customers[customer],
+            total_amount=Decimal(amount),
+            payment_status="paid" if paid else "pending",
+            status=status,
+        )
+        order.created_at = datetime.combine(day, datetime.min.time(), tzinfo=dt_timezone.utc) + timedelta(hours=12)
+        Order.objects.filter(id=order.id).update(created_at=order.created_at)
+        return order
+
+    def _series(self, granularity: str, start: date, end: date) -> list[tuple]:
+        return [
+            (row["bucket"], row["orders"], row["revenue"], row["new_customers"], row["returning_customers"])
+            for row in order_series(tenant_id=self.tenant.id, start=start, end=end, granularity=granularity)
+            if row["orders"]
+        ]
+
+    def test_day_week_month_buckets(self):
+        self._order(date(2026, 3, 2), 0, "100.00")
+        self._order(date(2026, 3, 2), 1, "50.00")
+        self._order(date(2026, 3, 2), 1, "70.00", paid=False)
+        self._order(date(2026, 3, 4), 0, "30.00")
+        self._order(date(2026, 3, 10), 1, "20.00")
+        self._order(date(2026, 3, 10), 2, "10.00")
+        self._order(date(2026, 3, 10), 0, "99.00", status="cancelled")
+
+        self.assertEqual(roll_up_orders(today=date(2026, 3, 10)), 5)
+        self.assertEqual(orders_watermark(), date(2026, 3, 7))
+        self.assertEqual(
+            self._series("day", date(2026, 3, 1), date(2026, 3, 10)),
+            [("2026-03-02", 2, "150.00", 2, 0), ("2026-03-04", 1, "30.00", 0, 1), ("2026-03-10", 2, "30.00", 1, 1)],
+        )
+        self.assertEqual(
+            self._series("week", date(2026, 3, 4), date(2026, 3, 10)),
+            [("2026-03-02", 3, "180.00", 2, 0), ("2026-03-09", 2, "30.00", 1, 1)],
+        )
+        self.assertEqual(self._series("month", date(2026, 3, 1), date(2026, 3, 10)), [("2026-03-01", 5, "210.00", 3, 0)])
+
+    def test_open_days_are_restated_and_reads_are_one_query(self):
+        late = self._order(date(2026, 3, 9), 0, "40.00", paid=False)
+        self._order(date(2026, 3, 2), 1, "25.00")
+        roll_up_orders(today=date(2026, 3, 10))
+        Order.objects.filter(id=late.id).update(payment_status="paid")
+        roll_up_orders(today=date(2026, 3, 11))
+        self.assertEqual(orders_watermark(), date(2026, 3, 8))
+        self.assertEqual(self._series("day", date(2026, 3, 9), date(2026, 3, 9)), [("2026-03-09", 1, "40.00", 1, 0)])
+
+        tenant_ctx = TenantContext(tenant_id=self.tenant.id, currency="SAR")
+        with self.assertNumQueries(2):
+            report = ReportRevenueUseCase.execute(
+                ReportRevenueCommand(
+                    tenant_ctx=tenant_ctx, granularity="month", start=date(2024, 3, 12), end=date(2026, 3, 11)
+                )
+            )
+        self.assertEqual(len(report["items"]), 25)
+        self.assertEqual(report["totals"], {"orders": 2, "revenue": "65.00", "aov": "32.50"})
+        with self.assertRaises(ValueError):
+            order_series(tenant_id=self.tenant.id, start=date(2026, 1, 1), end=date(2026, 1, 2), granularity="year")
+
+    def test_late_payment_on_a_final_day_is_restated(self):
+        late = self._order(date(2026, 3, 2), 0, "40.00", paid=False)
+        self._order(date(2026, 3, 3), 1, "15.00")
+        roll_up_orders(today=date(2026, 3, 10))
+        with self.captureOnCommitCallbacks(execute=True):
+            late.payment_status = "paid"
+            late.save(update_fields=["payment_status"])
+        self.assertEqual(list(OrderRollupDirtyDay.objects.values_list("day", flat=True)), [date(2026, 3, 2)])
+
+        roll_up_orders(today=date(2026, 3, 11))
+        self.assertFalse(OrderRollupDirtyDay.objects.exists())
+        self.assertEqual(self._series("day", date(2026, 3, 2), date(2026, 3, 2)), [("2026-03-02", 1, "40.00", 1, 0)])
+        self.assertEqual(self._series("week", date(2026, 3, 2), date(2026, 3, 8)), [("2026-03-02", 2, "55.00", 2, 0)])
+        self.assertEqual(self._series("month", date(2026, 3, 1), date(2026, 3, 11)), [("2026-03-01", 2, "55.00", 2, 0)])
+        # The dashboard counts the same revenue on the same day.
+        self.assertEqual(store_stats_for_day(self.tenant.id, date(2026, 3, 2)).revenue, Decimal("40.00"))
+
+
+@skipUnless(pa is not None, "pyarrow is not installed")
+class WarehouseTests(SimpleTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.day = datetime(2026, 3, 1, 10, tzinfo=dt_timezone.utc)
+
+    def _send(self, sink, *, tenant_id: int, name: str, actor: int | None, at: datetime) -> None:
+        event = EventDTO(event_name=name, actor_type="CUSTOMER", actor_id=actor, session_key=None, occurred_at=at)
+        sink.send_event(tenant_id=tenant_id, event=_sanitize_event(event))
+
+    def test_batches_are_partitioned_compacted_and_queried(self):
+        sink = ParquetWarehouseSink(root=self.root.name, batch_size=3, background=False)
+        for batch in range(4):
+            self._send(sink, tenant_id=1, name="product.viewed", actor=batch, at=self.day)
+            self._send(sink, tenant_id=1, name="cart.item_added", actor=batch, at=self.day + timedelta(hours=1))
+            self._send(sink, tenant_id=2, name="product.viewed", actor=batch, at=self.day + timedelta(days=1))
+        sink.flush()
+
+        events = Path(self.root.name) / "events"
+        partition = events / "date=2026-03-01" / "tenant=1"
+        self.assertEqual(len(list(partition.glob("*.parquet"))), 4)
+        self.assertTrue((events / "date=2026-03-02" / "tenant=2").is_dir())
+        self.assertEqual(compact_warehouse(root=self.root.name, before=date(2026, 3, 2)), 1)
+        self.assertEqual(len(list(partition.glob("*.parquet"))), 1)
+
+        table = query_events(
+            columns=["event_name", "occurred_at"],
+            tenant_id=1,
+            start=self.day + timedelta(minutes=30),
+            end=self.day + timedelta(days=2),
+            root=self.root.name,
+        )
+        self.assertEqual(table.column_names, ["event_name", "occurred_at"])
+        self.assertEqual(set(table["event_name"].to_pylist()), {"cart.item_added"})
+
+        counts = event_counts(tenant_id=1, start=self.day, end=self.day + timedelta(days=1), root=self.root.name)
+        self.assertEqual(
+            [(row["event_name"], row["events"], row["actors"]) for row in counts],
+            [("cart.item_added", 4, 4), ("product.viewed", 4, 4)],
+        )
+
+    def test_background_thread_flushes_a_quiet_batch(self):
+        sink = ParquetWarehouseSink(root=self.root.name, batch_size=100, flush_seconds=1)
+        self._send(sink, tenant_id=3, name="product.viewed", actor=1, at=self.day)
+        partition = Path(self.root.name) / "events" / "date=2026-03-01" / "tenant=3"
+        deadline = time.monotonic() + 5
+        while not list(partition.glob("*.parquet")) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(list(partition.glob("*.parquet"))), 1)
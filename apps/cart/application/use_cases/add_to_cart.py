@@ -7,7 +7,7 @@ from django.db import transaction
 from apps.cart.domain.dtos import CartSummary
 from apps.cart.domain.errors import CartError
 from apps.cart.domain.policies import ensure_positive_quantity
-from apps.cart.infrastructure.repositories import get_or_create_cart
+from apps.cart.infrastructure.repositories import get_cart_store
 from apps.catalog.models import Product
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.analytics.application.telemetry import TelemetryService, actor_from_tenant_ctx
@@ -36,20 +36,7 @@ class AddToCartUseCase:
         if not product:
             raise CartError("Product not found.")
 
-        cart = get_or_create_cart(cmd.tenant_ctx)
-        item = cart.items.filter(product_id=product.id).first()
-        if item:
-            item.quantity = item.quantity + quantity
-            item.unit_price_snapshot = product.price
-            item.save(update_fields=["quantity", "unit_price_snapshot"])
-        else:
-            cart.items.create(
-                product=product,
-                quantity=quantity,
-                unit_price_snapshot=product.price,
-            )
-        cart.currency = cmd.tenant_ctx.currency or cart.currency
-        cart.save(update_fields=["currency", "updated_at"])
+        cart = get_cart_store().add_item(cmd.tenant_ctx, product, quantity)
         TelemetryService.track(
             event_name="cart.item_added",
             tenant_ctx=cmd.tenant_ctx,
@@ -57,4 +44,4 @@ class AddToCartUseCase:
             object_ref=ObjectRef(object_type="PRODUCT", object_id=product.id),
             properties={"quantity": quantity},
         )
-        return GetCartUseCase.execute(cmd.tenant_ctx)
+        return GetCartUseCase.summarize(cart, cmd.tenant_ctx)
@@ -6,7 +6,7 @@ from django.db import transaction
 
 from apps.cart.domain.errors import CartNotFoundError
 from apps.cart.domain.policies import assert_cart_access
-from apps.cart.infrastructure.repositories import find_cart
+from apps.cart.infrastructure.repositories import get_cart_store
 from apps.tenants.domain.tenant_context import TenantContext
 
 
@@ -19,8 +19,9 @@ class ClearCartUseCase:
     @staticmethod
     @transaction.atomic
     def execute(cmd: ClearCartCommand) -> None:
-        cart = find_cart(cmd.tenant_ctx)
+        store = get_cart_store()
+        cart = store.load(cmd.tenant_ctx)
         if not cart:
             raise CartNotFoundError("Cart not found.")
         assert_cart_access(cart, cmd.tenant_ctx)
-        cart.items.all().delete()
+        store.clear(cmd.tenant_ctx, cart)
@@ -5,7 +5,7 @@ from decimal import Decimal
 
 from apps.cart.domain.dtos import CartItemDTO, CartSummary
 from apps.cart.domain.policies import safe_decimal
-from apps.cart.infrastructure.repositories import find_cart, list_cart_items
+from apps.cart.infrastructure.repositories import CartSnapshot, get_cart_store
 from apps.tenants.domain.tenant_context import TenantContext
 
 
@@ -17,25 +17,28 @@ class GetCartCommand:
 class GetCartUseCase:
     @staticmethod
     def execute(tenant_ctx: TenantContext) -> CartSummary:
-        cart = find_cart(tenant_ctx)
+        return GetCartUseCase.summarize(get_cart_store().load(tenant_ctx), tenant_ctx)
+
+    @staticmethod
+    def summarize(cart: CartSnapshot | None, tenant_ctx: TenantContext) -> CartSummary:
         if not cart:
             return CartSummary(cart_id=None, currency=tenant_ctx.currency or "SAR", items=[], subtotal=Decimal("0"), total=Decimal("0"))
 
         items = []
         subtotal = Decimal("0")
-        for item in list_cart_items(cart):
-            unit_price = safe_decimal(item.unit_price_snapshot)
-            line_total = unit_price * item.quantity
+        for line in cart.lines:
+            unit_price = safe_decimal(line.unit_price)
+            line_total = unit_price * line.quantity
             subtotal += line_total
             items.append(
                 CartItemDTO(
-                    id=item.id,
-                    product_id=item.product_id,
-                    name=getattr(item.product, "name", ""),
-                    quantity=item.quantity,
+                    id=line.id,
+                    product_id=line.product_id,
+                    name=line.name,
+                    quantity=line.quantity,
                     unit_price=unit_price,
                     line_total=line_total,
                 )
             )
         total = subtotal
-        return CartSummary(cart_id=cart.id, currency=cart.currency, items=items, subtotal=subtotal, total=total)
+        return CartSummary(cart_id=cart.cart_id, currency=cart.currency, items=items, subtotal=subtotal, total=total)
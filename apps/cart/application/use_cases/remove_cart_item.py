@@ -6,7 +6,7 @@ from django.db import transaction
 
 from apps.cart.domain.errors import CartNotFoundError
 from apps.cart.domain.policies import assert_cart_access
-from apps.cart.infrastructure.repositories import find_cart
+from apps.cart.infrastructure.repositories import get_cart_store
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.analytics.application.telemetry import TelemetryService, actor_from_tenant_ctx
 from apps.analytics.domain.types import ObjectRef
@@ -24,12 +24,13 @@ class RemoveCartItemUseCase:
     @staticmethod
     @transaction.atomic
     def execute(cmd: RemoveCartItemCommand):
-        cart = find_cart(cmd.tenant_ctx)
+        store = get_cart_store()
+        cart = store.load(cmd.tenant_ctx)
         if not cart:
             raise CartNotFoundError("Cart not found.")
         assert_cart_access(cart, cmd.tenant_ctx)
 
-        item = cart.items.filter(id=cmd.item_id).first()
+        item = next((line for line in cart.lines if line.id == cmd.item_id), None)
         if not item:
             raise CartNotFoundError("Cart item not found.")
         TelemetryService.track(
@@ -39,5 +40,5 @@ class RemoveCartItemUseCase:
             object_ref=ObjectRef(object_type="PRODUCT", object_id=item.product_id),
             properties={"quantity": item.quantity},
         )
-        item.delete()
-        return GetCartUseCase.execute(cmd.tenant_ctx)
+        cart = store.remove_item(cmd.tenant_ctx, cart, item.id)
+        return GetCartUseCase.summarize(cart, cmd.tenant_ctx)
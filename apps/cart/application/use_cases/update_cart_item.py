@@ -6,7 +6,7 @@ from django.db import transaction
 
 from apps.cart.domain.errors import CartNotFoundError
 from apps.cart.domain.policies import assert_cart_access, ensure_positive_quantity
-from apps.cart.infrastructure.repositories import find_cart
+from apps.cart.infrastructure.repositories import get_cart_store
 from apps.tenants.domain.tenant_context import TenantContext
 
 from .get_cart import GetCartUseCase
@@ -24,14 +24,11 @@ class UpdateCartItemUseCase:
     @transaction.atomic
     def execute(cmd: UpdateCartItemCommand):
         quantity = ensure_positive_quantity(cmd.quantity)
-        cart = find_cart(cmd.tenant_ctx)
+        store = get_cart_store()
+        cart = store.load(cmd.tenant_ctx)
         if not cart:
             raise CartNotFoundError("Cart not found.")
         assert_cart_access(cart, cmd.tenant_ctx)
 
-        item = cart.items.filter(id=cmd.item_id).first()
-        if not item:
-            raise CartNotFoundError("Cart item not found.")
-        item.quantity = quantity
-        item.save(update_fields=["quantity"])
-        return GetCartUseCase.execute(cmd.tenant_ctx)
+        cart = store.set_quantity(cmd.tenant_ctx, cart, cmd.item_id, quantity)
+        return GetCartUseCase.summarize(cart, cmd.tenant_ctx)
@@ -1,8 +1,34 @@
 from __future__ import annotations
 
+"""
+Cart storage.
+
+AR:
+- `DatabaseCartStore`: السلة في جداول `Cart` / `CartItem` مباشرة (السلوك الأصلي).
+- `CachedGuestCartStore`: سلال الزوار تُحفظ في الـ cache كبنية مختصرة لكل (متجر، جلسة)، ولا تُكتب في قاعدة
+  البيانات إلا عند بدء الدفع أو بالكتابة المؤجلة الدورية (`flush_guest_carts`). سلال المستخدمين المسجلين تبقى في القاعدة.
+- الاختيار عبر `CART_STORE_BACKEND` ("db" أو "cache").
+
+EN:
+- `DatabaseCartStore`: carts live in `Cart` / `CartItem` (original behaviour).
+- `CachedGuestCartStore`: guest carts live in the cache as a compact structure per (store, session) and reach
+  the database only at checkout start or via the periodic write-behind (`flush_guest_carts`). Signed-in
+  users' carts stay in the database.
+- Selected with `CART_STORE_BACKEND` ("db" or "cache").
+"""
+
+import time
+from dataclasses import dataclass
+from decimal import Decimal
 from typing import Iterable
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.cart.domain.errors import CartNotFoundError
 from apps.cart.models import Cart, CartItem
+from apps.catalog.models import Product
 from apps.tenants.domain.tenant_context import TenantContext
 
 
@@ -32,5 +58,350 @@ def find_cart(tenant_ctx: TenantContext) -> Cart | None:
     return Cart.objects.filter(store_id=tenant_ctx.tenant_id, session_key=tenant_ctx.session_key).first()
 
 
-def list_cart_items(cart: Cart) -> Iterable[CartItem]:
+def list_cart_items(cart: Cart | int) -> Iterable[CartItem]:
     return CartItem.objects.select_related("product").filter(cart=cart).order_by("id")
+
+
+@dataclass(frozen=True)
+class CartLine:
+    id: int
+    product_id: int
+    name: str
+    quantity: int
+    unit_price: Decimal
+
+
+@dataclass(frozen=True)
+class CartSnapshot:
+    """Backend-neutral view of a cart. `cart_id` is None for a guest cart not yet written to the database."""
+
+    cart_id: int | None
+    store_id: int
+    user_id: int | None
+    session_key: str | None
+    currency: str
+    lines: tuple[CartLine, ...]
+
+
+class CartStore:
+    """Cart storage backend. Mutations return the updated snapshot so callers need not reload it."""
+
+    def load(self, tenant_ctx: TenantContext) -> CartSnapshot | None:
+        raise NotImplementedError
+
+    def add_item(self, tenant_ctx: TenantContext, product: Product, quantity: int) -> CartSnapshot:
+        raise NotImplementedError
+
+    def set_quantity(self, tenant_ctx: TenantContext, cart: CartSnapshot, item_id: int, quantity: int) -> CartSnapshot:
+        raise NotImplementedError
+
+    def remove_item(self, tenant_ctx: TenantContext, cart: CartSnapshot, item_id: int) -> CartSnapshot:
+        raise NotImplementedError
+
+    def clear(self, tenant_ctx: TenantContext, cart: CartSnapshot) -> None:
+        raise NotImplementedError
+
+    def flush(self, tenant_ctx: TenantContext, *, pin: bool = False) -> int | None:
+        """
+        Make sure the cart is in `Cart` / `CartItem` and return its id. `pin=True` (checkout start) keeps it
+        written through from then on, since checkout reads the database rows.
+        """
+        raise NotImplementedError
+
+
+def _find_line(cart: CartSnapshot, item_id: int) -> CartLine:
+    line = next((line for line in cart.lines if line.id == item_id), None)
+    if line is None:
+        raise CartNotFoundError("Cart item not found.")
+    return line
+
+
+class DatabaseCartStore(CartStore):
+    @staticmethod
+    def _snapshot(cart: Cart) -> CartSnapshot:
+        return CartSnapshot(
+            cart_id=cart.id,
+            store_id=cart.store_id,
+            user_id=cart.user_id,
+            session_key=cart.session_key,
+            currency=cart.currency,
+            lines=tuple(
+                CartLine(
+                    id=item.id,
+                    product_id=item.product_id,
+                    name=getattr(item.product, "name", ""),
+                    quantity=item.quantity,
+                    unit_price=Decimal(str(item.unit_price_snapshot or "0")),
+                )
+                for item in list_cart_items(cart)
+            ),
+        )
+
+    def load(self, tenant_ctx: TenantContext) -> CartSnapshot | None:
+        cart = find_cart(tenant_ctx)
+        return self._snapshot(cart) if cart else None
+
+    def add_item(self, tenant_ctx: TenantContext, product: Product, quantity: int) -> CartSnapshot:
+        cart = get_or_create_cart(tenant_ctx)
+        item = cart.items.filter(product_id=product.id).first()
+        if item:
+            item.quantity = item.quantity + quantity
+            item.unit_price_snapshot = product.price
+            item.save(update_fields=["quantity", "unit_price_snapshot"])
+        else:
+            cart.items.create(
+                product=product,
+                quantity=quantity,
+                unit_price_snapshot=product.price,
+            )
+        cart.currency = tenant_ctx.currency or cart.currency
+        cart.save(update_fields=["currency", "updated_at"])
+        return self._snapshot(cart)
+
+    def set_quantity(self, tenant_ctx: TenantContext, cart: CartSnapshot, item_id: int, quantity: int) -> CartSnapshot:
+        _find_line(cart, item_id)
+        CartItem.objects.filter(cart_id=cart.cart_id, id=item_id).update(quantity=quantity)
+        return self.load(tenant_ctx)
+
+    def remove_item(self, tenant_ctx: TenantContext, cart: CartSnapshot, item_id: int) -> CartSnapshot:
+        _find_line(cart, item_id)
+        CartItem.objects.filter(cart_id=cart.cart_id, id=item_id).delete()
+        return self.load(tenant_ctx)
+
+    def clear(self, tenant_ctx: TenantContext, cart: CartSnapshot) -> None:
+        CartItem.objects.filter(cart_id=cart.cart_id).delete()
+
+    def flush(self, tenant_ctx: TenantContext, *, pin: bool = False) -> int | None:
+        cart = find_cart(tenant_ctx)
+        return cart.id if cart else None
+
+
+# Guest carts are registered in one-minute buckets when they first become dirty; the write-behind
+# flusher walks the buckets that have closed since its last run.
+DIRTY_BUCKET_SECONDS = 60
+DIRTY_WATERMARK_KEY = "cart:guest:dirty:watermark"
+
+
+def _cart_ttl() -> int:
+    return int(getattr(settings, "CART_CACHE_TTL_SECONDS", 7 * 24 * 3600) or 7 * 24 * 3600)
+
+
+def dirty_bucket(moment: float | None = None) -> int:
+    return int((moment if moment is not None else time.time()) // DIRTY_BUCKET_SECONDS)
+
+
+def _dirty_count_key(bucket: int) -> str:
+    return f"cart:guest:dirty:{bucket}"
+
+
+def _dirty_slot_key(bucket: int, slot: int) -> str:
+    return f"cart:guest:dirty:{bucket}:{slot}"
+
+
+class CachedGuestCartStore(CartStore):
+    """
+    Guest cart state is `{"id": cart_id | None, "cur": currency, "v": version, "pin": bool,
+    "items": [[product_id, quantity, unit_price, name], ...]}`; line ids are product ids (unique per cart).
+    The version last written to the database is kept under a separate key, so flushing never overwrites
+    a concurrent edit.
+    """
+
+    def __init__(self, database: DatabaseCartStore | None = None) -> None:
+        self.database = database or DatabaseCartStore()
+
+    @staticmethod
+    def state_key(store_id: int, session_key: str) -> str:
+        return f"cart:guest:{store_id}:{session_key}"
+
+    @staticmethod
+    def _flushed_key(key: str) -> str:
+        return f"{key}:flushed"
+
+    @staticmethod
+    def _is_guest(tenant_ctx: TenantContext) -> bool:
+        return not tenant_ctx.user_id and bool(tenant_ctx.session_key)
+
+    def _snapshot(self, tenant_ctx: TenantContext, state: dict) -> CartSnapshot:
+        return CartSnapshot(
+            cart_id=state.get("id"),
+            store_id=tenant_ctx.tenant_id,
+            user_id=None,
+            session_key=tenant_ctx.session_key,
+            currency=state.get("cur") or tenant_ctx.currency or "SAR",
+            lines=tuple(
+                CartLine(id=product_id, product_id=product_id, name=name, quantity=quantity, unit_price=Decimal(price))
+                for product_id, quantity, price, name in state.get("items", [])
+            ),
+        )
+
+    def _state(self, tenant_ctx: TenantContext) -> dict | None:
+        key = self.state_key(tenant_ctx.tenant_id, tenant_ctx.session_key)
+        state = cache.get(key)
+        if state is not None:
+            return state
+        # Not cached (first visit after a deploy, or evicted after a flush): warm from the database rows.
+        cart = find_cart(tenant_ctx)
+        if cart is None:
+            return None
+        state = {
+            "id": cart.id,
+            "cur": cart.currency,
+            "v": 0,
+            "pin": False,
+            "items": [
+                [item.product_id, item.quantity, str(item.unit_price_snapshot), getattr(item.product, "name", "")]
+                for item in list_cart_items(cart)
+            ],
+        }
+        cache.set_many({key: state, self._flushed_key(key): 0}, _cart_ttl())
+        return state
+
+    def _save(self, tenant_ctx: TenantContext, state: dict) -> CartSnapshot:
+        key = self.state_key(tenant_ctx.tenant_id, tenant_ctx.session_key)
+        was_clean = state["v"] == (cache.get(self._flushed_key(key)) or 0)
+        state["v"] += 1
+        cache.set(key, state, _cart_ttl())
+        if state.get("pin"):
+            self.flush(tenant_ctx)
+        elif was_clean:
+            self._mark_dirty(tenant_ctx)
+        return self._snapshot(tenant_ctx, state)
+
+    @staticmethod
+    def _mark_dirty(tenant_ctx: TenantContext) -> None:
+        bucket = dirty_bucket()
+        count_key = _dirty_count_key(bucket)
+        cache.add(count_key, 0, _cart_ttl())
+        slot = cache.incr(count_key)
+        cache.set(_dirty_slot_key(bucket, slot), (tenant_ctx.tenant_id, tenant_ctx.session_key), _cart_ttl())
+
+    def load(self, tenant_ctx: TenantContext) -> CartSnapshot | None:
+        if not self._is_guest(tenant_ctx):
+            return self.database.load(tenant_ctx)
+        state = self._state(tenant_ctx)
+        return self._snapshot(tenant_ctx, state) if state is not None else None
+
+    def add_item(self, tenant_ctx: TenantContext, product: Product, quantity: int) -> CartSnapshot:
+        if not self._is_guest(tenant_ctx):
+            return self.database.add_item(tenant_ctx, product, quantity)
+        state = self._state(tenant_ctx) or {"id": None, "cur": tenant_ctx.currency, "v": 0, "pin": False, "items": []}
+        for line in state["items"]:
+            if line[0] == product.id:
+                line[1] += quantity
+                line[2] = str(product.price)
+                line[3] = product.name
+                break
+        else:
+            state["items"].append([product.id, quantity, str(product.price), product.name])
+        state["cur"] = tenant_ctx.currency or state["cur"]
+        return self._save(tenant_ctx, state)
+
+    def set_quantity(self, tenant_ctx: TenantContext, cart: CartSnapshot, item_id: int, quantity: int) -> CartSnapshot:
+        if not self._is_guest(tenant_ctx):
+            return self.database.set_quantity(tenant_ctx, cart, item_id, quantity)
+        _find_line(cart, item_id)
+        state = self._state(tenant_ctx)
+        for line in state["items"]:
+            if line[0] == item_id:
+                line[1] = quantity
+        return self._save(tenant_ctx, state)
+
+    def remove_item(self, tenant_ctx: TenantContext, cart: CartSnapshot, item_id: int) -> CartSnapshot:
+        if not self._is_guest(tenant_ctx):
+            return self.database.remove_item(tenant_ctx, cart, item_id)
+        _find_line(cart, item_id)
+        state = self._state(tenant_ctx)
+        state["items"] = [line for line in state["items"] if line[0] != item_id]
+        return self._save(tenant_ctx, state)
+
+    def clear(self, tenant_ctx: TenantContext, cart: CartSnapshot) -> None:
+        if not self._is_guest(tenant_ctx):
+            return self.database.clear(tenant_ctx, cart)
+        state = self._state(tenant_ctx)
+        if state is not None:
+            state["items"] = []
+            self._save(tenant_ctx, state)
+
+    def flush(self, tenant_ctx: TenantContext, *, pin: bool = False) -> int | None:
+        if not self._is_guest(tenant_ctx):
+            return self.database.flush(tenant_ctx)
+        key = self.state_key(tenant_ctx.tenant_id, tenant_ctx.session_key)
+        state = self._state(tenant_ctx)
+        if state is None:
+            return None
+        if pin and not state.get("pin"):
+            state["pin"] = True
+            cache.set(key, state, _cart_ttl())
+        if state.get("id") and state["v"] == (cache.get(self._flushed_key(key)) or 0):
+            return state["id"]
+
+        cart = self._write(tenant_ctx, state)
+        if state.get("id") != cart.id:
+            state["id"] = cart.id
+            cache.set(key, state, _cart_ttl())
+        cache.set(self._flushed_key(key), state["v"], _cart_ttl())
+        return cart.id
+
+    @staticmethod
+    @transaction.atomic
+    def _write(tenant_ctx: TenantContext, state: dict) -> Cart:
+        cart = get_or_create_cart(tenant_ctx)
+        lines = {product_id: (quantity, price) for product_id, quantity, price, _name in state["items"]}
+        # Products deleted since they were added cannot be written (CartItem.product is PROTECT).
+        live = set(
+            Product.objects.filter(store_id=tenant_ctx.tenant_id, id__in=lines).values_list("id", flat=True)
+        )
+        CartItem.objects.filter(cart=cart).exclude(product_id__in=live).delete()
+        if live:
+            CartItem.objects.bulk_create(
+                [
+                    CartItem(cart=cart, product_id=product_id, quantity=lines[product_id][0], unit_price_snapshot=lines[product_id][1])
+                    for product_id in live
+                ],
+                update_conflicts=True,
+                unique_fields=["cart", "product"],
+                update_fields=["quantity", "unit_price_snapshot"],
+            )
+        cart.currency = state.get("cur") or cart.currency
+        cart.save(update_fields=["currency", "updated_at"])
+        return cart
+
+    def flush_dirty(self, *, until_bucket: int | None = None) -> int:
+        """Write-behind: flush guest carts registered in closed buckets since the last run. Returns carts written."""
+        until_bucket = dirty_bucket() - 1 if until_bucket is None else until_bucket
+        oldest = until_bucket - _cart_ttl() // DIRTY_BUCKET_SECONDS
+        start = max(int(cache.get(DIRTY_WATERMARK_KEY) or oldest) + 1, oldest)
+        buckets = range(start, until_bucket + 1)
+        counts: dict[str, int] = {}
+        for offset in range(0, len(buckets), 500):
+            counts.update(cache.get_many([_dirty_count_key(bucket) for bucket in buckets[offset : offset + 500]]))
+
+        flushed = 0
+        for bucket in buckets:
+            count = counts.get(_dirty_count_key(bucket)) or 0
+            if not count:
+                continue
+            slots = cache.get_many([_dirty_slot_key(bucket, slot) for slot in range(1, count + 1)])
+            for store_id, session_key in set(slots.values()):
+                tenant_ctx = TenantContext(tenant_id=store_id, currency="", user_id=None, session_key=session_key)
+                key = self.state_key(store_id, session_key)
+                state = cache.get(key)
+                if state is None or state["v"] == (cache.get(self._flushed_key(key)) or 0):
+                    continue
+                self.flush(tenant_ctx)
+                flushed += 1
+            cache.delete_many([_dirty_count_key(bucket), *slots])
+        cache.set(DIRTY_WATERMARK_KEY, max(until_bucket, start - 1), None)
+        return flushed
+
+
+def build_cart_store(name: str) -> CartStore:
+    if name == "db":
+        return DatabaseCartStore()
+    if name == "cache":
+        return CachedGuestCartStore()
+    raise ValueError(f"Unknown cart store: {name}")
+
+
+def get_cart_store() -> CartStore:
+    return build_cart_store(getattr(settings, "CART_STORE_BACKEND", "db"))
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.cart.infrastructure.repositories import CachedGuestCartStore
+
+
+class Command(BaseCommand):
+    help = "Write-behind: persist cache-resident guest carts changed since the last run (schedule every few minutes)."
+
+    def handle(self, *args, **options):
+        if getattr(settings, "CART_STORE_BACKEND", "db") != "cache":
+            self.stdout.write("CART_STORE_BACKEND is not 'cache'; nothing to flush")
+            return
+        flushed = CachedGuestCartStore().flush_dirty()
+        self.stdout.write(f"flushed {flushed} guest carts")
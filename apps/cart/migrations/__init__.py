@@ -1 +0,0 @@
-*** End Patch"} file:?? Wait apply_patch expects file content. Let's create.
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.cart.application.use_cases.add_to_cart import AddToCartCommand, AddToCartUseCase
+from apps.cart.application.use_cases.get_cart import GetCartUseCase
+from apps.cart.application.use_cases.remove_cart_item import RemoveCartItemCommand, RemoveCartItemUseCase
+from apps.cart.application.use_cases.update_cart_item import UpdateCartItemCommand, UpdateCartItemUseCase
+from apps.cart.infrastructure.repositories import CachedGuestCartStore, dirty_bucket
+from apps.cart.models import Cart, CartItem
+from apps.catalog.models import Product
+from apps.checkout.application.use_cases.start_checkout import StartCheckoutCommand, StartCheckoutUseCase
+from apps.tenants.domain.tenant_context import TenantContext
+from apps.tenants.models import Tenant
+
+
+class CartStoreTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="carts", name="Carts", is_active=True)
+        self.tea, self.cup = Product.objects.bulk_create(
+            [
+                Product(store_id=self.tenant.id, sku="TEA", name="Tea", price=Decimal("4.00")),
+                Product(store_id=self.tenant.id, sku="CUP", name="Cup", price=Decimal("2.50")),
+            ]
+        )
+        self.ctx = TenantContext(tenant_id=self.tenant.id, currency="SAR", user_id=None, session_key="guest-1")
+
+    def _add(self, product, quantity=1):
+        return AddToCartUseCase.execute(AddToCartCommand(tenant_ctx=self.ctx, product_id=product.id, quantity=quantity))
+
+    def test_database_backend_writes_every_change(self):
+        summary = self._add(self.tea, 2)
+        item_id = summary.items[0].id
+        self.assertEqual(CartItem.objects.get(id=item_id).quantity, 2)
+
+        summary = UpdateCartItemUseCase.execute(UpdateCartItemCommand(tenant_ctx=self.ctx, item_id=item_id, quantity=5))
+        self.assertEqual(summary.subtotal, Decimal("20.00"))
+        RemoveCartItemUseCase.execute(RemoveCartItemCommand(tenant_ctx=self.ctx, item_id=item_id))
+        self.assertFalse(CartItem.objects.exists())
+
+    @override_settings(CART_STORE_BACKEND="cache")
+    def test_guest_cart_stays_in_cache_until_write_behind(self):
+        self._add(self.tea)
+        with CaptureQueriesContext(connection) as ctx:
+            summary = self._add(self.cup, 3)
+        self.assertFalse([q["sql"] for q in ctx.captured_queries if '"cart_cart' in q["sql"]])
+        self.assertEqual(summary.subtotal, Decimal("11.50"))
+        summary = UpdateCartItemUseCase.execute(
+            UpdateCartItemCommand(tenant_ctx=self.ctx, item_id=self.tea.id, quantity=2)
+        )
+        self.assertEqual([(item.name, item.quantity) for item in summary.items], [("Tea", 2), ("Cup", 3)])
+        self.assertFalse(Cart.objects.exists())
+
+        # Buckets still open are left for the next run.
+        self.assertEqual(CachedGuestCartStore().flush_dirty(until_bucket=dirty_bucket() - 1), 0)
+        self.assertEqual(CachedGuestCartStore().flush_dirty(until_bucket=dirty_bucket()), 1)
+        cart = Cart.objects.get(store_id=self.tenant.id, session_key="guest-1")
+        self.assertEqual(
+            dict(cart.items.values_list("product_id", "quantity")), {self.tea.id: 2, self.cup.id: 3}
+        )
+        self.assertEqual(GetCartUseCase.execute(self.ctx).cart_id, cart.id)
+
+        # A cart evicted before the next write-behind falls back to its last flushed rows.
+        RemoveCartItemUseCase.execute(RemoveCartItemCommand(tenant_ctx=self.ctx, item_id=self.cup.id))
+        cache.delete(CachedGuestCartStore.state_key(self.tenant.id, "guest-1"))
+        self.assertEqual(CachedGuestCartStore().flush_dirty(until_bucket=dirty_bucket() + 1), 0)
+        self.assertEqual(len(GetCartUseCase.execute(self.ctx).items), 2)
+
+    @override_settings(CART_STORE_BACKEND="cache")
+    def test_checkout_start_flushes_and_pins_the_cart(self):
+        self._add(self.tea, 2)
+        session = StartCheckoutUseCase.execute(StartCheckoutCommand(tenant_ctx=self.ctx))
+        self.assertEqual(list(CartItem.objects.filter(cart_id=session.cart_id).values_list("quantity", flat=True)), [2])
+
+        # Once checkout has started, edits are written through for the order to read.
+        self._add(self.cup)
+        UpdateCartItemUseCase.execute(UpdateCartItemCommand(tenant_ctx=self.ctx, item_id=self.tea.id, quantity=1))
+        self.assertEqual(
+            dict(CartItem.objects.filter(cart_id=session.cart_id).values_list("product_id", "quantity")),
+            {self.tea.id: 1, self.cup.id: 1},
+        )
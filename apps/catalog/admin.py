@@ -1,7 +1,8 @@
 
 from django.contrib import admin
-from .models import Product, Category, Inventory
+from .models import Product, Category, Inventory, StockReservation
 
 admin.site.register(Product)
 admin.site.register(Category)
 admin.site.register(Inventory)
+admin.site.register(StockReservation)
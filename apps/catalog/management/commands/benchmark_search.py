@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import random
+import time
+from itertools import accumulate
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.catalog.models import Product
+from apps.catalog.services.search_index import index_products, search_products
+
+WORDS_AR = ["قهوة", "عربية", "مكتبة", "إبريق", "شاي", "أخضر", "عطر", "عود", "تمر", "سكري", "حقيبة", "جلدية"]
+WORDS_EN = ["coffee", "kettle", "perfume", "dates", "bag", "leather", "green", "tea", "gift", "box", "lamp"]
+_LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+
+def _vocabulary(size: int = 5000) -> list[str]:
+    """Real catalogs have a long-tail vocabulary; draw names from a Zipf-like distribution over it."""
+    words = WORDS_AR + WORDS_EN
+    while len(words) < size:
+        words.append("".join(random.choice(_LETTERS) for _ in range(random.randint(3, 7))))
+    return words
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Seed a synthetic store inside a rolled-back transaction and report search latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=300)
+        parser.add_argument("--store-id", type=int, default=990_001)
+        parser.add_argument("--budget-ms", type=float, default=50.0, help="p95 latency budget.")
+
+    def handle(self, *args, **options):
+        random.seed(7)
+        count: int = options["products"]
+        store_id: int = options["store_id"]
+        try:
+            with transaction.atomic():
+                self._seed(store_id, count)
+                self._run(store_id, options["queries"], options["budget_ms"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, store_id: int, count: int) -> None:
+        start = time.perf_counter()
+        self.words = _vocabulary()
+        self.cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(self.words))))
+        batch: list[Product] = []
+        for i in range(count):
+            name = " ".join(random.choices(self.words, cum_weights=self.cum_weights, k=3))
+            batch.append(
+                Product(store_id=store_id, sku=f"BENCH-{i:06d}", name=name, price=Decimal("10.00"), is_active=True)
+            )
+            if len(batch) == 2000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Product.objects.bulk_create(batch)
+        seeded = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index_products(Product.objects.filter(store_id=store_id).values_list("id", flat=True))
+        self.stdout.write(
+            f"seeded {count} products in {seeded:.1f}s, indexed in {time.perf_counter() - start:.1f}s"
+        )
+
+    def _run(self, store_id: int, queries: int, budget_ms: float) -> None:
+        samples: list[float] = []
+        for _ in range(queries):
+            word, other = random.choices(self.words, cum_weights=self.cum_weights, k=2)
+            query = random.choice([word, word[:3], f"{word} {other}", f"bench-{random.randint(0, 99_999):06d}"])
+            start = time.perf_counter()
+            search_products(store_id=store_id, query=query, page=random.randint(1, 3))
+            samples.append((time.perf_counter() - start) * 1000)
+
+        samples.sort()
+        p50 = samples[len(samples) // 2]
+        p95 = samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+        verdict = "OK" if p95 <= budget_ms else "OVER BUDGET"
+        self.stdout.write(f"queries={queries} p50={p50:.2f}ms p95={p95:.2f}ms budget={budget_ms:.0f}ms {verdict}")
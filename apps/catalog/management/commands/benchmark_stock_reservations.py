@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from apps.catalog.models import Inventory, Product, StockReservation
+from apps.catalog.services.stock_reservation import InsufficientStockError, commit_stock, place_holds
+
+MAX_ATTEMPTS = 20
+
+
+class Command(BaseCommand):
+    help = "Race N parallel buyers for one SKU (hold, then commit) and check that stock is never oversold."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=50)
+        parser.add_argument("--stock", type=int, default=20)
+        parser.add_argument("--quantity", type=int, default=1, help="Units each buyer takes.")
+        parser.add_argument("--store-id", type=int, default=990_002)
+
+    def handle(self, *args, **options):
+        buyers: int = options["buyers"]
+        stock: int = options["stock"]
+        quantity: int = options["quantity"]
+        store_id: int = options["store_id"]
+        if buyers < 1 or stock < 0 or quantity < 1:
+            raise CommandError("--buyers and --quantity must be positive, --stock non-negative.")
+
+        # Buyers run on their own connections, so the SKU is committed up front and deleted afterwards.
+        product = Product.objects.create(
+            store_id=store_id, sku=f"BENCH-HOLD-{time.time_ns()}", name="Reservation benchmark", price=Decimal("1.00")
+        )
+        Inventory.objects.create(product=product, quantity=stock, in_stock=stock > 0)
+        try:
+            self._run(store_id, product.id, buyers, stock, quantity)
+        finally:
+            product.delete()
+
+    def _run(self, store_id: int, product_id: int, buyers: int, stock: int, quantity: int) -> None:
+        barrier = threading.Barrier(buyers)
+        session_base = 900_000_000 + (time.time_ns() % 1_000_000) * 100
+
+        def buy(index: int) -> tuple[str, float, int]:
+            barrier.wait()
+            start = time.perf_counter()
+            session_id = session_base + index
+            lines = [(product_id, quantity)]
+            attempts = 0
+            try:
+                while True:
+                    attempts += 1
+                    try:
+                        place_holds(store_id=store_id, checkout_session_id=session_id, lines=lines)
+                        commit_stock(lines, StockReservation.objects.filter(checkout_session_id=session_id))
+                        outcome = "sold"
+                    except InsufficientStockError:
+                        outcome = "sold_out"
+                    except OperationalError:
+                        # SQLite serialises writers and reports lock contention instead of waiting.
+                        if attempts < MAX_ATTEMPTS:
+                            time.sleep(0.005 * attempts)
+                            continue
+                        outcome = "error"
+                    return outcome, (time.perf_counter() - start) * 1000, attempts
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=buyers) as pool:
+            results = list(pool.map(buy, range(buyers)))
+        elapsed = time.perf_counter() - started
+
+        outcomes = [outcome for outcome, _ms, _attempts in results]
+        samples = sorted(ms for _outcome, ms, _attempts in results)
+        retries = sum(attempts - 1 for _outcome, _ms, attempts in results)
+        inventory = Inventory.objects.get(product_id=product_id)
+        sold = outcomes.count("sold")
+        expected = min(buyers, stock // quantity)
+
+        p50 = samples[len(samples) // 2]
+        p95 = samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+        self.stdout.write(
+            f"buyers={buyers} stock={stock} sold={sold} sold_out={outcomes.count('sold_out')} "
+            f"errors={outcomes.count('error')} retries={retries}"
+        )
+        self.stdout.write(f"elapsed={elapsed:.2f}s p50={p50:.1f}ms p95={p95:.1f}ms")
+        self.stdout.write(
+            f"remaining quantity={inventory.quantity} reserved={inventory.reserved} in_stock={inventory.in_stock}"
+        )
+
+        consistent = inventory.quantity == stock - sold * quantity and inventory.reserved == 0
+        if not consistent or sold > expected:
+            raise CommandError("Stock is inconsistent: oversold or holds leaked.")
+        if sold != expected and not outcomes.count("error"):
+            raise CommandError(f"Expected {expected} sales, got {sold}.")
+        self.stdout.write("OK: no oversell, no leaked holds")
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.catalog.models import Product
+from apps.catalog.services.search_index import rebuild_store_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product search index for one store (or every store)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store-id", type=int, default=None)
+
+    def handle(self, *args, **options):
+        store_id = options["store_id"]
+        if store_id is not None:
+            store_ids = [store_id]
+        else:
+            store_ids = list(Product.objects.values_list("store_id", flat=True).distinct().order_by("store_id"))
+
+        for sid in store_ids:
+            with transaction.atomic():
+                indexed = rebuild_store_index(sid)
+            self.stdout.write(f"store {sid}: indexed {indexed} products")
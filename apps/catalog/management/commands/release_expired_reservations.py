@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.services.stock_reservation import SWEEP_BATCH_SIZE, release_expired
+
+
+class Command(BaseCommand):
+    help = "Release checkout stock holds past their expiry (run every minute or so from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=SWEEP_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+        released = release_expired(batch_size=batch_size)
+        self.stdout.write(f"released {released} expired reservations")
@@ -0,0 +1,109 @@
+import re
+
+from django.db import migrations
+
+# Self-contained snapshot of the index schema and of `normalize_arabic` as of this migration; later changes
+# to `apps.catalog.services.search_index` ship their own migration (or `rebuild_search_index`).
+BATCH_SIZE = 500
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS catalog_product_fts USING fts5("
+    "store_key, name, sku, descriptions, categories, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+]
+SQLITE_DROP = ["DROP TABLE IF EXISTS catalog_product_fts"]
+SQLITE_INSERT = (
+    "INSERT INTO catalog_product_fts (rowid, store_key, name, sku, descriptions, categories) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+
+POSTGRES_CREATE = [
+    "CREATE TABLE IF NOT EXISTS catalog_product_search ("
+    "product_id bigint PRIMARY KEY REFERENCES catalog_product (id) ON DELETE CASCADE, "
+    "store_id integer NOT NULL, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS catalog_search_store_idx ON catalog_product_search (store_id)",
+    "CREATE INDEX IF NOT EXISTS catalog_search_doc_idx ON catalog_product_search USING GIN (document)",
+]
+POSTGRES_DROP = ["DROP TABLE IF EXISTS catalog_product_search"]
+POSTGRES_INSERT = (
+    "INSERT INTO catalog_product_search (product_id, store_id, document) VALUES (%s, %s, "
+    "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'A') || "
+    "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C')) "
+    "ON CONFLICT (product_id) DO NOTHING"
+)
+
+_FOLD_TABLE = str.maketrans(
+    {
+        "\u0623": "\u0627",  # alef with hamza above -> alef
+        "\u0625": "\u0627",  # alef with hamza below -> alef
+        "\u0622": "\u0627",  # alef with madda -> alef
+        "\u0671": "\u0627",  # alef wasla -> alef
+        "\u0649": "\u064a",  # alef maqsura -> ya
+        "\u0629": "\u0647",  # ta marbuta -> ha
+        "\u0640": None,  # tatweel
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    }
+)
+# Harakat, tanween, shadda, sukun, Quranic marks and superscript alef.
+_DIACRITICS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+
+
+def _normalize(text):
+    if not text:
+        return ""
+    return _DIACRITICS_RE.sub("", text).translate(_FOLD_TABLE).casefold()
+
+
+def _rows(products, vendor):
+    for product in products:
+        name = _normalize(product.name)
+        sku = _normalize(product.sku)
+        descriptions = _normalize(f"{product.description_ar} {product.description_en}")
+        categories = _normalize(" ".join(category.name for category in product.categories.all()))
+        if vendor == "sqlite":
+            yield (product.id, f"s{int(product.store_id)}", name, sku, descriptions, categories)
+        else:
+            yield (product.id, product.store_id, name, sku, categories, descriptions)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        statements, insert = SQLITE_CREATE, SQLITE_INSERT
+    elif connection.vendor == "postgresql":
+        statements, insert = POSTGRES_CREATE, POSTGRES_INSERT
+    else:
+        return
+    Product = apps.get_model("catalog", "Product")
+    product_ids = list(Product.objects.using(connection.alias).order_by("id").values_list("id", flat=True))
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        for start in range(0, len(product_ids), BATCH_SIZE):
+            chunk = product_ids[start : start + BATCH_SIZE]
+            products = (
+                Product.objects.using(connection.alias).filter(id__in=chunk).prefetch_related("categories")
+            )
+            rows = list(_rows(products, connection.vendor))
+            if rows:
+                cursor.executemany(insert, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    statements = {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0004_product_descriptions"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
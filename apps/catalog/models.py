@@ -2,11 +2,11 @@
 Catalog models (MVP).
 
 AR:
-- هذا الملف يحتوي موديلات الكتالوج: التصنيفات، المنتجات، والمخزون.
+- هذا الملف يحتوي موديلات الكتالوج: التصنيفات، المنتجات، المخزون، وحجوزات المخزون المؤقتة.
 - عزل المتاجر يتم عبر `store_id` (Tenant column).
 
 EN:
-- Contains catalog models: categories, products, and inventory.
+- Contains catalog models: categories, products, inventory, and time-limited stock reservations.
 - Tenant isolation is implemented via `store_id`.
 """
 
@@ -57,7 +57,40 @@ class Inventory(models.Model):
 
     product = models.OneToOneField(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    # Units held by active checkout reservations; available stock is `quantity - reserved`.
+    reserved = models.PositiveIntegerField(default=0)
     in_stock = models.BooleanField(default=True)
 
     def __str__(self) -> str:
         return f"{self.product} - qty={self.quantity}"
+
+
+class StockReservation(models.Model):
+    """Time-limited stock hold placed when a checkout session enters payment."""
+
+    STATUS_HELD = "held"
+    STATUS_COMMITTED = "committed"
+    STATUS_RELEASED = "released"
+
+    STATUS_CHOICES = [
+        (STATUS_HELD, "Held"),
+        (STATUS_COMMITTED, "Committed"),
+        (STATUS_RELEASED, "Released"),
+    ]
+
+    store_id = models.IntegerField(db_index=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_reservations")
+    checkout_session_id = models.IntegerField(db_index=True)
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_HELD)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"StockReservation(product={self.product_id}, qty={self.quantity}, status={self.status})"
@@ -1,3 +1,19 @@
 
 from rest_framework import serializers
 from .models import Product, Category
+
+
+class ProductListSerializer(serializers.ModelSerializer):
+    quantity = serializers.SerializerMethodField()
+    category_ids = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = ["id", "sku", "name", "price", "is_active", "image", "quantity", "category_ids"]
+
+    def get_quantity(self, obj) -> int:
+        inventory = getattr(obj, "inventory", None)
+        return inventory.quantity if inventory is not None else 0
+
+    def get_category_ids(self, obj) -> list[int]:
+        return [category.id for category in obj.categories.all()]
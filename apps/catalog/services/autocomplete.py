@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+"""
+Storefront search-box autocomplete.
+
+AR:
+- فهرس بادئات (prefix) في ذاكرة كل worker لكل متجر: أسماء المنتجات و SKU وأسماء التصنيفات، مرتبة حسب المبيعات.
+- يُبنى عند أول طلب للمتجر، ويُحدَّث تدريجيًا من سجل تغييرات مشترك في الـ cache بعد كل كتابة على المنتجات.
+- ميزانية ذاكرة مشتركة بين المتاجر مع إخراج الأقل استخدامًا (LRU).
+
+EN:
+- Per-worker, per-tenant prefix index (sorted key array + `bisect`) over product names, SKUs and
+  category names, weighted by units sold.
+- Built lazily on a tenant's first lookup; product writes append to a shared change log
+  (`record_product_changes`) which every worker replays incrementally on its next lookup.
+- Indexes share an LRU memory budget (`AUTOCOMPLETE_MEMORY_BUDGET_BYTES`).
+"""
+
+import heapq
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from apps.orders.models import OrderItem
+
+from ..models import Category, Product
+from .text_normalization import normalize_arabic
+
+KIND_PRODUCT = "product"
+KIND_CATEGORY = "category"
+# Index entry refs are (source, object id); a product contributes a name row and a SKU row.
+_REF_SKU = "sku"
+
+# Orders in these states did not turn into sales.
+_UNSOLD_STATUSES = ("pending", "cancelled")
+_CHANGE_LOG_LENGTH = 200
+_MEMO_PREFIX_LENGTH = 2
+_HIGH = "\U0010ffff"
+# Rough per-entry/per-key overhead of Python objects, used for the memory budget.
+_ENTRY_OVERHEAD_BYTES = 200
+_KEY_OVERHEAD_BYTES = 120
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    kind: str
+    object_id: int
+    label: str
+    weight: float
+
+
+@dataclass
+class PrefixIndex:
+    """Immutable after construction: updates build a new index (copy-on-write)."""
+
+    store_id: int
+    seq: int
+    built_at: float
+    entries: dict[tuple[str, int], Suggestion]
+    keys: list[str]
+    refs: list[tuple[str, int]]
+    size_bytes: int = 0
+    _memo: dict[tuple[str, int], list[Suggestion]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, store_id: int, seq: int, entries: dict[tuple[str, int], Suggestion]) -> "PrefixIndex":
+        pairs: list[tuple[str, tuple[str, int]]] = []
+        size = 0
+        for ref, entry in entries.items():
+            keys = _keys_for(entry)
+            size += _entry_size(entry, keys)
+            pairs.extend((key, ref) for key in keys)
+        pairs.sort()
+        return cls(
+            store_id=store_id,
+            seq=seq,
+            built_at=time.monotonic(),
+            entries=entries,
+            keys=[key for key, _ in pairs],
+            refs=[ref for _, ref in pairs],
+            size_bytes=size,
+        )
+
+    def with_products(
+        self, seq: int, product_ids: set[int], fresh: dict[tuple[str, int], Suggestion]
+    ) -> "PrefixIndex":
+        """
+        Copy the arrays (a memcpy of pointers) and splice only the changed products' keys in/out
+        with `bisect`, instead of re-sorting the whole store.
+        """
+        entries = dict(self.entries)
+        keys = list(self.keys)
+        refs = list(self.refs)
+        size = self.size_bytes
+        for product_id in product_ids:
+            for ref in ((KIND_PRODUCT, product_id), (_REF_SKU, product_id)):
+                old = entries.pop(ref, None)
+                if old is None:
+                    continue
+                old_keys = _keys_for(old)
+                size -= _entry_size(old, old_keys)
+                for key in old_keys:
+                    position = bisect_left(keys, key)
+                    while position < len(keys) and keys[position] == key and refs[position] != ref:
+                        position += 1
+                    if position < len(keys) and keys[position] == key:
+                        del keys[position]
+                        del refs[position]
+        for ref, entry in fresh.items():
+            entries[ref] = entry
+            new_keys = _keys_for(entry)
+            size += _entry_size(entry, new_keys)
+            for key in new_keys:
+                position = bisect_left(keys, key)
+                keys.insert(position, key)
+                refs.insert(position, ref)
+        return PrefixIndex(
+            store_id=self.store_id,
+            seq=seq,
+            built_at=self.built_at,
+            entries=entries,
+            keys=keys,
+            refs=refs,
+            size_bytes=size,
+        )
+
+    def lookup(self, prefix: str, limit: int) -> list[Suggestion]:
+        memo_key = (prefix, limit)
+        if len(prefix) <= _MEMO_PREFIX_LENGTH and memo_key in self._memo:
+            return self._memo[memo_key]
+
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _HIGH, lo)
+        ranked = heapq.nlargest(
+            limit * 2,
+            (self.entries[ref] for ref in set(self.refs[lo:hi])),
+            key=lambda entry: (entry.weight, entry.object_id, entry.label),
+        )
+        best: list[Suggestion] = []
+        seen: set[tuple[str, int]] = set()
+        for entry in ranked:
+            # A product matching on both its name and its SKU is suggested once.
+            if (entry.kind, entry.object_id) not in seen:
+                seen.add((entry.kind, entry.object_id))
+                best.append(entry)
+        best = best[:limit]
+
+        if len(prefix) <= _MEMO_PREFIX_LENGTH:
+            # Short prefixes hit the widest key ranges; memoize them per index generation.
+            self._memo[memo_key] = best
+        return best
+
+
+def _entry_size(entry: Suggestion, keys: list[str]) -> int:
+    return len(entry.label) * 2 + _ENTRY_OVERHEAD_BYTES + sum(len(key) * 2 + _KEY_OVERHEAD_BYTES for key in keys)
+
+
+def _keys_for(entry: Suggestion) -> list[str]:
+    """Every word start of the label, so "قهوة عربية" matches both "قه" and "عر"."""
+    words = normalize_arabic(entry.label).split()
+    keys = {" ".join(words[i:]) for i in range(len(words))}
+    return [key for key in keys if key]
+
+
+def _sales_weights(store_id: int, product_ids: Iterable[int] | None = None) -> dict[int, int]:
+    items = OrderItem.objects.filter(order__store_id=store_id).exclude(order__status__in=_UNSOLD_STATUSES)
+    if product_ids is not None:
+        items = items.filter(product_id__in=list(product_ids))
+    rows = items.values("product_id").annotate(units=Sum("quantity"))
+    return {row["product_id"]: row["units"] or 0 for row in rows}
+
+
+def _weight(units: int) -> float:
+    return round(math.log1p(max(units, 0)), 4)
+
+
+def _product_entries(store_id: int, product_ids: Iterable[int] | None = None) -> dict[tuple[str, int], Suggestion]:
+    products = Product.objects.filter(store_id=store_id, is_active=True)
+    if product_ids is not None:
+        products = products.filter(id__in=list(product_ids))
+    sales = _sales_weights(store_id, product_ids)
+    entries: dict[tuple[str, int], Suggestion] = {}
+    for product_id, name, sku in products.values_list("id", "name", "sku"):
+        weight = _weight(sales.get(product_id, 0))
+        entries[(KIND_PRODUCT, product_id)] = Suggestion(KIND_PRODUCT, product_id, name, weight)
+        if sku:
+            entries[(_REF_SKU, product_id)] = Suggestion(KIND_PRODUCT, product_id, sku, weight)
+    return entries
+
+
+def _category_entries(store_id: int) -> dict[tuple[str, int], Suggestion]:
+    sales = _sales_weights(store_id)
+    totals: dict[int, int] = {}
+    for category_id, product_id in Product.categories.through.objects.filter(
+        category__store_id=store_id
+    ).values_list("category_id", "product_id"):
+        totals[category_id] = totals.get(category_id, 0) + sales.get(product_id, 0)
+    return {
+        (KIND_CATEGORY, category_id): Suggestion(
+            KIND_CATEGORY, category_id, name, _weight(totals.get(category_id, 0))
+        )
+        for category_id, name in Category.objects.filter(store_id=store_id).values_list("id", "name")
+    }
+
+
+def _seq_key(store_id: int) -> str:
+    return f"autocomplete:seq:{store_id}"
+
+
+def _log_key(store_id: int) -> str:
+    return f"autocomplete:changes:{store_id}"
+
+
+def _current_seq(store_id: int) -> int:
+    return int(cache.get(_seq_key(store_id)) or 0)
+
+
+def _append_change(store_id: int, product_ids: list[int] | None) -> None:
+    key = _seq_key(store_id)
+    cache.add(key, 0, None)
+    try:
+        seq = int(cache.incr(key))
+    except ValueError:
+        cache.set(key, 1, None)
+        seq = 1
+    log = list(cache.get(_log_key(store_id)) or ())
+    log.append((seq, product_ids))
+    cache.set(_log_key(store_id), log[-_CHANGE_LOG_LENGTH:], None)
+
+
+def record_product_changes(store_id: int | None, product_ids: Iterable[int] | None) -> None:
+    """
+    Publish changed product ids (None = full rebuild, e.g. category renames) once the
+    transaction commits, so no worker replays a change it cannot see yet.
+    """
+    if not store_id:
+        return
+    ids = None if product_ids is None else sorted({int(pid) for pid in product_ids if pid})
+    if ids is not None and not ids:
+        return
+    transaction.on_commit(lambda: _append_change(store_id, ids))
+
+
+def _memory_budget() -> int:
+    return int(getattr(settings, "AUTOCOMPLETE_MEMORY_BUDGET_BYTES", 128 * 1024 * 1024) or 0)
+
+
+def _rebuild_seconds() -> int:
+    # Sales weights drift as orders come in; rebuild periodically even without product writes.
+    return int(getattr(settings, "AUTOCOMPLETE_REBUILD_SECONDS", 3600) or 3600)
+
+
+class AutocompleteRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: OrderedDict[int, PrefixIndex] = OrderedDict()
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __contains__(self, store_id: int) -> bool:
+        return store_id in self._indexes
+
+    def _store(self, index: PrefixIndex) -> None:
+        with self._lock:
+            previous = self._indexes.pop(index.store_id, None)
+            if previous is not None:
+                self._size -= previous.size_bytes
+            self._indexes[index.store_id] = index
+            self._size += index.size_bytes
+            budget = _memory_budget()
+            while budget and self._size > budget and len(self._indexes) > 1:
+                _, evicted = self._indexes.popitem(last=False)
+                self._size -= evicted.size_bytes
+
+    def _build(self, store_id: int, seq: int) -> PrefixIndex:
+        entries = _product_entries(store_id)
+        entries.update(_category_entries(store_id))
+        return PrefixIndex.build(store_id, seq, entries)
+
+    def _refresh(self, index: PrefixIndex, seq: int) -> PrefixIndex:
+        if seq < index.seq:
+            # The shared counter was evicted/reset; nothing in the log can be trusted.
+            return self._build(index.store_id, seq)
+        log = cache.get(_log_key(index.store_id)) or ()
+        pending = [(entry_seq, ids) for entry_seq, ids in log if entry_seq > index.seq]
+        expected = list(range(index.seq + 1, seq + 1))
+        if [entry_seq for entry_seq, _ in pending] != expected or any(ids is None for _, ids in pending):
+            # Log was truncated, lost a concurrent append, or asked for a full rebuild.
+            return self._build(index.store_id, seq)
+        changed = {pid for _, ids in pending for pid in ids}
+        return index.with_products(seq, changed, _product_entries(index.store_id, changed))
+
+    def get_index(self, store_id: int) -> PrefixIndex:
+        seq = _current_seq(store_id)
+        with self._lock:
+            index = self._indexes.get(store_id)
+            if index is not None:
+                self._indexes.move_to_end(store_id)
+
+        if index is None or time.monotonic() - index.built_at > _rebuild_seconds():
+            index = self._build(store_id, seq)
+        elif index.seq != seq:
+            index = self._refresh(index, seq)
+        else:
+            return index
+        self._store(index)
+        return index
+
+    def suggest(self, store_id: int, query: str, *, limit: int = 8) -> list[Suggestion]:
+        prefix = " ".join(normalize_arabic(query).split())
+        if not prefix:
+            return []
+        return self.get_index(store_id).lookup(prefix, max(1, min(limit, 20)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._size = 0
+
+
+registry = AutocompleteRegistry()
+
+
+def suggest(store_id: int, query: str, *, limit: int = 8) -> list[Suggestion]:
+    return registry.suggest(store_id, query, limit=limit)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+"""
+Merchant product list.
+
+AR:
+- قائمة منتجات المتجر (الأحدث أولاً) مع تصفية بالحالة (نشط/غير نشط) وبالـ SKU أو الاسم.
+- التصفح بمؤشر على id ضمن المتجر بدلاً من عرض كل المنتجات في صفحة واحدة.
+
+EN:
+- Newest-first store products filtered by status (active/inactive) and SKU or name.
+- Keyset pagination on id within the store instead of rendering the whole catalog at once.
+"""
+
+from dataclasses import dataclass
+from typing import Mapping
+
+from django.db.models import Q
+
+from apps.catalog.models import Product
+from apps.tenants.services.keyset_pagination import KeysetPage, paginate_keyset
+
+PRODUCT_LIST_KEYS = ("id",)
+PRODUCT_STATUSES = ("active", "inactive")
+
+
+@dataclass(frozen=True)
+class ProductListFilters:
+    status: str = ""
+    q: str = ""
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, str]) -> "ProductListFilters":
+        status = (params.get("status") or "").strip()
+        return cls(
+            status=status if status in PRODUCT_STATUSES else "",
+            q=(params.get("q") or "").strip(),
+        )
+
+    def as_params(self) -> dict[str, str]:
+        return {key: value for key, value in {"status": self.status, "q": self.q}.items() if value}
+
+
+def filter_products(store_id: int, filters: ProductListFilters):
+    qs = Product.objects.filter(store_id=store_id)
+    if filters.status:
+        qs = qs.filter(is_active=filters.status == "active")
+    if filters.q:
+        qs = qs.filter(Q(sku__iexact=filters.q) | Q(name__icontains=filters.q))
+    return qs
+
+
+def list_products(
+    *,
+    store_id: int,
+    filters: ProductListFilters | None = None,
+    cursor: str = "",
+    page_size: int | None = None,
+) -> KeysetPage:
+    qs = (
+        filter_products(store_id, filters or ProductListFilters())
+        .select_related("inventory")
+        .prefetch_related("categories")
+    )
+    return paginate_keyset(qs, keys=PRODUCT_LIST_KEYS, cursor=cursor, page_size=page_size)
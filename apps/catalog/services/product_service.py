@@ -4,9 +4,12 @@ from typing import Iterable
 
 from django.db import IntegrityError, transaction
 
+from apps.subscriptions.models import StoreUsageCounter
 from apps.subscriptions.services.entitlement_service import SubscriptionEntitlementService
+from apps.subscriptions.services.usage_counter_service import UsageCounterService
 
 from ..models import Category, Inventory, Product
+from .search_index import index_products
 
 
 class ProductService:
@@ -41,11 +44,9 @@ class ProductService:
         if not sku:
             raise ValueError("SKU is required")
 
-        current_products = Product.objects.filter(store_id=store_id).count()
         SubscriptionEntitlementService.assert_within_limit(
             store_id=store_id,
             limit_field="max_products",
-            current_usage=current_products,
             increment=1,
         )
 
@@ -62,6 +63,7 @@ class ProductService:
             )
         except IntegrityError as exc:
             raise ValueError("SKU already exists for this store") from exc
+        UsageCounterService.increment(store_id, StoreUsageCounter.METRIC_PRODUCTS)
 
         if category_ids:
             product.categories.set(category_ids)
@@ -73,6 +75,9 @@ class ProductService:
             defaults={"quantity": quantity, "in_stock": quantity > 0},
         )
 
+        # The product's post_save already refreshed autocomplete and the catalog version; categories are set
+        # afterwards, so their names are indexed here.
+        index_products([product.id])
         return product
 
     @staticmethod
@@ -129,4 +134,7 @@ class ProductService:
             defaults={"quantity": quantity, "in_stock": quantity > 0},
         )
 
+        # The product's post_save already refreshed autocomplete and the catalog version; categories are set
+        # afterwards, so their names are indexed here.
+        index_products([product.id])
         return product
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+"""
+Per-store product search index.
+
+AR:
+- فهرس نصي كامل للمنتجات (الاسم/SKU/الوصف/أسماء التصنيفات) مقسّم حسب `store_id`.
+- SQLite: جدول FTS5، PostgreSQL: جدول tsvector مع فهرس GIN؛ كلاهما خلف نفس الواجهة.
+- النص يُوحَّد (`normalize_arabic`) قبل الفهرسة وقبل البحث.
+- التحديث تدريجي: `index_products` من `post_save` للمنتج (أي حفظ، بما فيه لوحة الإدارة) ومن مسارات الكتابة التي
+  تغيّر التصنيفات أو تستخدم `bulk_create` (ProductService / الاستيراد / الذكاء الاصطناعي).
+
+EN:
+- Full-text index over product name, SKU, descriptions and category names, partitioned by `store_id`.
+- SQLite uses an FTS5 virtual table; PostgreSQL uses a tsvector table with a GIN index. Both sit
+  behind `SearchBackend`, selected from the connection vendor (`CATALOG_SEARCH_BACKEND=auto`).
+- Text is normalized with `normalize_arabic` on both the indexing and the query side.
+- Updates are incremental: the Product `post_save` receiver (any save, admin included) and the write
+  paths that change categories or bulk-create call `index_products` inside their transaction, so the
+  index commits (or rolls back) together with the product row.
+- Result pages are cached under the store catalog version (`storefront_cache.bump_catalog_version`).
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Prefetch
+
+from apps.tenants.services.storefront_cache import get_catalog_version
+
+from ..models import Category, Product
+from .text_normalization import normalize_arabic, search_tokens
+
+SQLITE_TABLE = "catalog_product_fts"
+POSTGRES_TABLE = "catalog_product_search"
+INDEX_BATCH_SIZE = 500
+# Counting every hit of a broad query costs as much as ranking it; totals stop at this value ("1000+").
+COUNT_LIMIT = 1000
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    product_id: int
+    store_id: int
+    name: str
+    sku: str
+    descriptions: str
+    categories: str
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    product_ids: list[int]
+    total: int
+    page: int
+    page_size: int
+    total_capped: bool = False
+
+    @property
+    def has_next(self) -> bool:
+        return self.total_capped or self.page * self.page_size < self.total
+
+
+class SearchBackend:
+    """Storage/query strategy for the product index (one instance per process)."""
+
+    name = ""
+
+    def create_schema(self, cursor) -> None:
+        raise NotImplementedError
+
+    def drop_schema(self, cursor) -> None:
+        raise NotImplementedError
+
+    def upsert(self, documents: list[SearchDocument]) -> None:
+        raise NotImplementedError
+
+    def delete(self, product_ids: list[int]) -> None:
+        raise NotImplementedError
+
+    def delete_store(self, store_id: int) -> None:
+        raise NotImplementedError
+
+    def search(self, *, store_id: int, tokens: list[str], limit: int, offset: int) -> tuple[list[int], int]:
+        """Ranked ids for one page, plus the hit count (counted up to `COUNT_LIMIT + 1`)."""
+        raise NotImplementedError
+
+
+class SqliteFtsBackend(SearchBackend):
+    """
+    FTS5 table keyed by `rowid = product_id`. The store is an indexed token column (`s<store_id>`),
+    so each query intersects posting lists with the store partition instead of scanning matches.
+    """
+
+    name = "sqlite_fts5"
+    # bm25 column weights: store_key, name, sku, descriptions, categories.
+    _WEIGHTS = "0.0, 10.0, 6.0, 1.0, 3.0"
+
+    def create_schema(self, cursor) -> None:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            "store_key, name, sku, descriptions, categories, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+
+    def drop_schema(self, cursor) -> None:
+        cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+
+    @staticmethod
+    def _store_key(store_id: int) -> str:
+        return f"s{int(store_id)}"
+
+    def upsert(self, documents: list[SearchDocument]) -> None:
+        if not documents:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [(doc.product_id,) for doc in documents]
+            )
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, store_key, name, sku, descriptions, categories) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [
+                    (
+                        doc.product_id,
+                        self._store_key(doc.store_id),
+                        doc.name,
+                        doc.sku,
+                        doc.descriptions,
+                        doc.categories,
+                    )
+                    for doc in documents
+                ],
+            )
+
+    def delete(self, product_ids: list[int]) -> None:
+        if not product_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [(pid,) for pid in product_ids])
+
+    def delete_store(self, store_id: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s",
+                [f'store_key : "{self._store_key(store_id)}"'],
+            )
+
+    def search(self, *, store_id: int, tokens: list[str], limit: int, offset: int) -> tuple[list[int], int]:
+        terms = " AND ".join(f'"{token}"*' for token in tokens)
+        match = f'store_key : "{self._store_key(store_id)}" AND ({terms})'
+        # CROSS JOIN pins the FTS table as the outer loop; otherwise SQLite may walk the store's
+        # products and re-evaluate MATCH for each of them.
+        base = (
+            f"FROM {SQLITE_TABLE} CROSS JOIN catalog_product p ON p.id = {SQLITE_TABLE}.rowid "
+            f"WHERE {SQLITE_TABLE} MATCH %s AND p.store_id = %s AND p.is_active"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {SQLITE_TABLE}.rowid {base} "
+                f"ORDER BY bm25({SQLITE_TABLE}, {self._WEIGHTS}), {SQLITE_TABLE}.rowid DESC LIMIT %s OFFSET %s",
+                [match, store_id, limit, offset],
+            )
+            product_ids = [row[0] for row in cursor.fetchall()]
+            if offset == 0 and len(product_ids) < limit:
+                return product_ids, len(product_ids)
+            cursor.execute(f"SELECT COUNT(*) FROM (SELECT 1 {base} LIMIT %s)", [match, store_id, COUNT_LIMIT + 1])
+            total = cursor.fetchone()[0]
+        return product_ids, total
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector document per product (`simple` config over pre-normalized text) with a GIN index."""
+
+    name = "postgres_tsvector"
+
+    def create_schema(self, cursor) -> None:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+            "product_id bigint PRIMARY KEY REFERENCES catalog_product (id) ON DELETE CASCADE, "
+            "store_id integer NOT NULL, "
+            "document tsvector NOT NULL)"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS catalog_search_store_idx ON {POSTGRES_TABLE} (store_id)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS catalog_search_doc_idx ON {POSTGRES_TABLE} USING GIN (document)")
+
+    def drop_schema(self, cursor) -> None:
+        cursor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+    def upsert(self, documents: list[SearchDocument]) -> None:
+        if not documents:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (product_id, store_id, document) VALUES (%s, %s, "
+                "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C')) "
+                "ON CONFLICT (product_id) DO UPDATE SET store_id = EXCLUDED.store_id, document = EXCLUDED.document",
+                [
+                    (doc.product_id, doc.store_id, doc.name, doc.sku, doc.categories, doc.descriptions)
+                    for doc in documents
+                ],
+            )
+
+    def delete(self, product_ids: list[int]) -> None:
+        if not product_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE product_id = ANY(%s)", [list(product_ids)])
+
+    def delete_store(self, store_id: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE store_id = %s", [store_id])
+
+    def search(self, *, store_id: int, tokens: list[str], limit: int, offset: int) -> tuple[list[int], int]:
+        query = " & ".join(f"{token}:*" for token in tokens)
+        base = (
+            f"FROM {POSTGRES_TABLE} s JOIN catalog_product p ON p.id = s.product_id "
+            "WHERE s.store_id = %s AND p.is_active AND s.document @@ to_tsquery('simple', %s)"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT s.product_id {base} "
+                "ORDER BY ts_rank_cd(s.document, to_tsquery('simple', %s)) DESC, s.product_id DESC "
+                "LIMIT %s OFFSET %s",
+                [store_id, query, query, limit, offset],
+            )
+            product_ids = [row[0] for row in cursor.fetchall()]
+            if offset == 0 and len(product_ids) < limit:
+                return product_ids, len(product_ids)
+            cursor.execute(f"SELECT COUNT(*) FROM (SELECT 1 {base} LIMIT %s) hits", [store_id, query, COUNT_LIMIT + 1])
+            total = cursor.fetchone()[0]
+        return product_ids, total
+
+
+_BACKENDS: dict[str, type[SearchBackend]] = {
+    "sqlite": SqliteFtsBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def backend_for_vendor(vendor: str) -> SearchBackend | None:
+    backend_cls = _BACKENDS.get(vendor)
+    return backend_cls() if backend_cls else None
+
+
+def get_search_backend() -> SearchBackend:
+    configured = getattr(settings, "CATALOG_SEARCH_BACKEND", "auto") or "auto"
+    vendor = connection.vendor if configured == "auto" else configured
+    backend = backend_for_vendor(vendor)
+    if backend is None:
+        raise ImproperlyConfigured(f"No catalog search backend for database vendor '{vendor}'.")
+    return backend
+
+
+def _write_backend() -> SearchBackend | None:
+    """Write paths must not fail on databases without a search backend; they just skip indexing."""
+    try:
+        return get_search_backend()
+    except ImproperlyConfigured:
+        return None
+
+
+def build_documents(products: Iterable[Product]) -> list[SearchDocument]:
+    """Products must have `categories` prefetched (see `_products_for_indexing`)."""
+    return [
+        SearchDocument(
+            product_id=product.id,
+            store_id=product.store_id,
+            name=normalize_arabic(product.name),
+            sku=normalize_arabic(product.sku),
+            descriptions=normalize_arabic(f"{product.description_ar} {product.description_en}"),
+            categories=normalize_arabic(" ".join(category.name for category in product.categories.all())),
+        )
+        for product in products
+    ]
+
+
+def _products_for_indexing():
+    return Product.objects.only(
+        "id", "store_id", "name", "sku", "description_ar", "description_en"
+    ).prefetch_related(Prefetch("categories", queryset=Category.objects.only("id", "name")))
+
+
+def index_products(product_ids: Iterable[int]) -> int:
+    """(Re)index the given products; ids that no longer exist are removed from the index."""
+    product_ids = sorted({int(pid) for pid in product_ids if pid})
+    if not product_ids:
+        return 0
+    backend = _write_backend()
+    if backend is None:
+        return 0
+    indexed = 0
+    for start in range(0, len(product_ids), INDEX_BATCH_SIZE):
+        chunk = product_ids[start : start + INDEX_BATCH_SIZE]
+        documents = build_documents(_products_for_indexing().filter(id__in=chunk))
+        backend.upsert(documents)
+        missing = set(chunk) - {doc.product_id for doc in documents}
+        backend.delete(sorted(missing))
+        indexed += len(documents)
+    return indexed
+
+
+def remove_products(product_ids: Iterable[int]) -> None:
+    backend = _write_backend()
+    if backend is not None:
+        backend.delete(sorted({int(pid) for pid in product_ids if pid}))
+
+
+def rebuild_store_index(store_id: int) -> int:
+    get_search_backend().delete_store(store_id)
+    product_ids = Product.objects.filter(store_id=store_id).values_list("id", flat=True)
+    return index_products(product_ids)
+
+
+def _result_cache_seconds() -> int:
+    return int(getattr(settings, "CATALOG_SEARCH_CACHE_SECONDS", 300) or 300)
+
+
+def _page_size(page_size: int | None) -> int:
+    default = int(getattr(settings, "CATALOG_SEARCH_PAGE_SIZE", 24) or 24)
+    return max(1, min(int(page_size or default), 100))
+
+
+def _result_cache_key(store_id: int, tokens: list[str], page: int, page_size: int) -> str:
+    digest = hashlib.md5(" ".join(tokens).encode("utf-8")).hexdigest()
+    return f"catalog_search:{store_id}:{get_catalog_version(store_id)}:{page}:{page_size}:{digest}"
+
+
+def search_products(*, store_id: int, query: str, page: int = 1, page_size: int | None = None) -> SearchPage:
+    """
+    Ranked product ids of active products matching every query token (prefix match).
+
+    Query popularity is heavily skewed, so pages are cached under the store's catalog version
+    (bumped by every catalog write); broad head queries are then ranked once per version.
+    """
+    page = max(int(page or 1), 1)
+    page_size = _page_size(page_size)
+    tokens = search_tokens(query)
+    if not tokens:
+        return SearchPage(product_ids=[], total=0, page=page, page_size=page_size)
+
+    cache_key = _result_cache_key(store_id, tokens, page, page_size)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    offset = (page - 1) * page_size
+    product_ids, total = get_search_backend().search(
+        store_id=store_id, tokens=tokens, limit=page_size, offset=offset
+    )
+    total = max(total, offset + len(product_ids))
+    result = SearchPage(
+        product_ids=product_ids,
+        total=min(total, COUNT_LIMIT),
+        page=page,
+        page_size=page_size,
+        total_capped=total > COUNT_LIMIT,
+    )
+    cache.set(cache_key, result, timeout=_result_cache_seconds())
+    return result
+
+
+def load_ranked_products(store_id: int, product_ids: list[int]) -> list[Product]:
+    """Load result rows, keeping the ranked order."""
+    by_id = {product.id: product for product in Product.objects.filter(store_id=store_id, id__in=product_ids)}
+    return [by_id[pid] for pid in product_ids if pid in by_id]
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+"""
+Stock reservations.
+
+AR:
+- عند دخول جلسة الدفع مرحلة PAYMENT تُحجز الكميات مؤقتاً (`StockReservation`) ويُزاد `Inventory.reserved`،
+  فالمتاح للبيع هو `quantity - reserved`.
+- الحجز، والخصم عند نجاح الدفع، وتحرير الحجوزات المنتهية: كل منها UPDATE واحد مشروط على كل صفوف المخزون
+  المعنية (CASE لكل منتج) بدلاً من استعلام لكل سطر.
+- `in_stock` و `Product.is_active` يُعاد حسابهما بـ UPDATE واحد لكل جدول.
+
+EN:
+- Checkout places time-limited holds (`StockReservation`) when it enters PAYMENT and bumps
+  `Inventory.reserved`; sellable stock is `quantity - reserved`.
+- Placing holds, committing them on payment and releasing expired ones are each one conditional UPDATE
+  over all affected inventory rows (a CASE per product) instead of a statement per line.
+- `in_stock` / `Product.is_active` are recomputed with one UPDATE per table.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Case, Exists, ExpressionWrapper, F, IntegerField, OuterRef, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..models import Inventory, Product, StockReservation
+
+SWEEP_BATCH_SIZE = 500
+
+
+class InsufficientStockError(ValueError):
+    pass
+
+
+def reservation_ttl() -> timedelta:
+    return timedelta(seconds=max(1, int(getattr(settings, "STOCK_RESERVATION_TTL_SECONDS", 900) or 900)))
+
+
+def _per_product(lines: Iterable[tuple[int, int]]) -> dict[int, int]:
+    amounts: dict[int, int] = {}
+    for product_id, quantity in lines:
+        if quantity > 0:
+            amounts[product_id] = amounts.get(product_id, 0) + quantity
+    return amounts
+
+
+def _case(amounts: dict[int, int]) -> Case:
+    return Case(
+        *[When(product_id=product_id, then=Value(amount)) for product_id, amount in amounts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _shortage_error(needed: dict[int, int], held: dict[int, int]) -> InsufficientStockError:
+    """Name the first short product; only runs on the failure path."""
+    rows = {inv.product_id: inv for inv in Inventory.objects.filter(product_id__in=needed).select_related("product")}
+    for product_id, quantity in needed.items():
+        inventory = rows.get(product_id)
+        if inventory is None:
+            product = Product.objects.filter(id=product_id).first()
+            return InsufficientStockError(f"No inventory for product '{product or product_id}'")
+        available = inventory.quantity - inventory.reserved + held.get(product_id, 0)
+        if available < quantity:
+            return InsufficientStockError(f"Insufficient stock for '{inventory.product}' (available {available})")
+    return InsufficientStockError("Insufficient stock")
+
+
+def _held_rows(reservations, *, lock: bool = True) -> list[tuple[int, int, int]]:
+    if reservations is None:
+        return []
+    if lock:
+        reservations = reservations.select_for_update()
+    return list(reservations.filter(status=StockReservation.STATUS_HELD).values_list("id", "product_id", "quantity"))
+
+
+def _available_qs(product_ids, needed: dict[int, int], held: dict[int, int]):
+    """Inventory rows that can cover `needed` once this caller's own holds are counted back in."""
+    return (
+        Inventory.objects.filter(product_id__in=product_ids)
+        .alias(available=F("quantity") - F("reserved") + _case(held))
+        .filter(available__gte=_case(needed))
+    )
+
+
+def check_available(lines: Iterable[tuple[int, int]], reservations=None) -> None:
+    """Raise `InsufficientStockError` unless every line is covered by free stock plus the given holds."""
+    needed = _per_product(lines)
+    held = _per_product((product_id, qty) for _id, product_id, qty in _held_rows(reservations, lock=False))
+    if needed and _available_qs(needed, needed, held).count() != len(needed):
+        raise _shortage_error(needed, held)
+
+
+def _release(rows: list[tuple[int, int, int]]) -> int:
+    if not rows:
+        return 0
+    amounts = _per_product((product_id, qty) for _id, product_id, qty in rows)
+    Inventory.objects.filter(product_id__in=amounts).update(reserved=Greatest(F("reserved") - _case(amounts), Value(0)))
+    return StockReservation.objects.filter(id__in=[row[0] for row in rows]).update(
+        status=StockReservation.STATUS_RELEASED, updated_at=timezone.now()
+    )
+
+
+@transaction.atomic
+def release_holds(checkout_session_ids) -> int:
+    """Release the active holds of the given checkout session ids (an iterable or a values() subquery)."""
+    reservations = StockReservation.objects.filter(checkout_session_id__in=checkout_session_ids)
+    return _release(_held_rows(reservations))
+
+
+@transaction.atomic
+def place_holds(
+    *,
+    store_id: int,
+    checkout_session_id: int,
+    lines: Iterable[tuple[int, int]],
+    ttl: timedelta | None = None,
+) -> list[StockReservation]:
+    """
+    Hold `lines` ((product_id, quantity) pairs) for one checkout session, replacing its earlier holds.
+    All-or-nothing: a single short product raises `InsufficientStockError` and nothing stays reserved.
+    """
+    release_holds([checkout_session_id])
+    needed = _per_product(lines)
+    if not needed:
+        return []
+
+    updated = _available_qs(needed, needed, {}).update(reserved=F("reserved") + _case(needed))
+    if updated != len(needed):
+        raise _shortage_error(needed, {})
+
+    expires_at = timezone.now() + (ttl or reservation_ttl())
+    return StockReservation.objects.bulk_create(
+        [
+            StockReservation(
+                store_id=store_id,
+                product_id=product_id,
+                checkout_session_id=checkout_session_id,
+                quantity=quantity,
+                expires_at=expires_at,
+            )
+            for product_id, quantity in needed.items()
+        ]
+    )
+
+
+def refresh_stock_flags(product_ids) -> list[int]:
+    """Recompute `in_stock` and `Product.is_active` from quantities. Returns products whose flag flipped."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+    Inventory.objects.filter(product_id__in=product_ids).update(
+        in_stock=ExpressionWrapper(Q(quantity__gt=0), output_field=BooleanField())
+    )
+    toggled = list(
+        Product.objects.filter(id__in=product_ids)
+        .filter(Q(is_active=True, inventory__quantity=0) | Q(is_active=False, inventory__quantity__gt=0))
+        .values_list("id", flat=True)
+    )
+    if toggled:
+        Product.objects.filter(id__in=toggled).update(
+            is_active=Exists(Inventory.objects.filter(product_id=OuterRef("pk"), quantity__gt=0))
+        )
+    return toggled
+
+
+@transaction.atomic
+def commit_stock(lines: Iterable[tuple[int, int]], reservations=None) -> list[int]:
+    """
+    Decrement stock for a paid order in one UPDATE, consuming the order's active holds (`reservations`).
+    Lines without a hold are taken from free stock. Returns the product ids whose active flag flipped.
+    """
+    needed = _per_product(lines)
+    rows = _held_rows(reservations)
+    held = _per_product((product_id, qty) for _id, product_id, qty in rows)
+    product_ids = set(needed) | set(held)
+    if not product_ids:
+        return []
+
+    updated = _available_qs(product_ids, needed, held).update(
+        quantity=F("quantity") - _case(needed),
+        reserved=Greatest(F("reserved") - _case(held), Value(0)),
+    )
+    if updated != len(product_ids):
+        raise _shortage_error(needed, held)
+
+    if rows:
+        StockReservation.objects.filter(id__in=[row[0] for row in rows]).update(
+            status=StockReservation.STATUS_COMMITTED, updated_at=timezone.now()
+        )
+    return refresh_stock_flags(product_ids)
+
+
+def release_expired(*, batch_size: int = SWEEP_BATCH_SIZE, now: datetime | None = None) -> int:
+    """Release holds past `expires_at` in batches (one short transaction each). Returns holds released."""
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(status=StockReservation.STATUS_HELD, expires_at__lte=now)
+                .order_by("id")
+                .values_list("id", "product_id", "quantity")[:batch_size]
+            )
+            released += _release(rows)
+        if len(rows) < batch_size:
+            return released
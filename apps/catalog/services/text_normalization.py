@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+"""
+Search text normalization.
+
+AR:
+- توحيد أشكال الألف (أ/إ/آ/ٱ → ا) والياء (ى → ي) والتاء المربوطة (ة → ه)، وحذف التشكيل والتطويل.
+- يُطبَّق نفس التوحيد على النص المفهرس وعلى استعلام البحث.
+
+EN:
+- Folds alef variants, alef maqsura and ta marbuta, strips harakat/tatweel, maps Arabic-Indic digits
+  and case-folds Latin text.
+- The same function is applied to indexed documents and to user queries.
+"""
+
+import re
+
+_FOLD_TABLE = str.maketrans(
+    {
+        "\u0623": "\u0627",  # alef with hamza above -> alef
+        "\u0625": "\u0627",  # alef with hamza below -> alef
+        "\u0622": "\u0627",  # alef with madda -> alef
+        "\u0671": "\u0627",  # alef wasla -> alef
+        "\u0649": "\u064a",  # alef maqsura -> ya
+        "\u0629": "\u0647",  # ta marbuta -> ha
+        "\u0640": None,  # tatweel
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    }
+)
+
+# Harakat, tanween, shadda, sukun, Quranic marks and superscript alef.
+_DIACRITICS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_arabic(text: str) -> str:
+    if not text:
+        return ""
+    return _DIACRITICS_RE.sub("", text).translate(_FOLD_TABLE).casefold()
+
+
+def search_tokens(text: str, *, limit: int = 8) -> list[str]:
+    """Normalized word tokens of a user query (deduplicated, order kept)."""
+    tokens: list[str] = []
+    for token in _TOKEN_RE.findall(normalize_arabic(text)):
+        if token not in tokens:
+            tokens.append(token)
+        if len(tokens) >= limit:
+            break
+    return tokens
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.catalog.models import Category, Product
+from apps.catalog.services.autocomplete import record_product_changes
+from apps.catalog.services.search_index import index_products, remove_products
+from apps.tenants.services.storefront_cache import bump_catalog_version
+
+
+# Fields of a product's search document; category names are reindexed by the write paths that set them.
+SEARCH_FIELDS = frozenset({"store", "store_id", "name", "sku", "description_ar", "description_en"})
+
+
+@receiver(post_save, sender=Product)
+def _product_saved(sender, instance: Product, update_fields=None, **kwargs):
+    # Covers every save (services, admin, shell). Saves that touch no indexed field skip the reindex but
+    # still refresh autocomplete and cached listings (price, stock and image are shown there).
+    if update_fields is None or SEARCH_FIELDS.intersection(update_fields):
+        index_products([instance.pk])
+    record_product_changes(instance.store_id, [instance.pk])
+    bump_catalog_version(instance.store_id)
+
+
+@receiver(post_delete, sender=Product)
+def _product_deleted(sender, instance: Product, **kwargs):
+    remove_products([instance.pk])
+    record_product_changes(instance.store_id, [instance.pk])
+    bump_catalog_version(instance.store_id)
+
+
+@receiver(post_save, sender=Category)
+def _category_saved(sender, instance: Category, created: bool, **kwargs):
+    if not created:
+        # Category names are part of each product's search document.
+        index_products(instance.products.values_list("id", flat=True))
+        bump_catalog_version(instance.store_id)
+    # Category names are autocomplete entries (new categories included).
+    record_product_changes(instance.store_id, None)
+
+
+@receiver(pre_delete, sender=Category)
+def _category_pre_delete(sender, instance: Category, **kwargs):
+    instance._indexed_product_ids = list(instance.products.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def _category_deleted(sender, instance: Category, **kwargs):
+    index_products(getattr(instance, "_indexed_product_ids", ()))
+    record_product_changes(instance.store_id, None)
+    bump_catalog_version(instance.store_id)
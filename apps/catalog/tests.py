@@ -1,3 +1,318 @@
-from django.test import TestCase
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.cart.models import Cart
+from apps.catalog.models import Category, Inventory, Product, StockReservation
+from apps.catalog.services.autocomplete import registry as autocomplete_registry
+from apps.catalog.services.autocomplete import suggest
+from apps.catalog.services.product_service import ProductService
+from apps.catalog.services.search_index import search_products
+from apps.catalog.services.stock_reservation import InsufficientStockError, place_holds, release_expired
+from apps.checkout.models import CheckoutSession
+from apps.catalog.services.text_normalization import normalize_arabic, search_tokens
+from apps.customers.models import Customer
+from apps.orders.models import Order, OrderItem
+from apps.orders.services.order_lifecycle_service import OrderLifecycleService
+from apps.orders.services.order_service import OrderService
+from apps.subscriptions.models import SubscriptionPlan
+from apps.subscriptions.services.subscription_service import SubscriptionService
+from apps.tenants.models import Tenant, TenantMembership
+from apps.tenants.services.storefront_cache import get_catalog_version
+from wasla_sore import web_views
+
+
+class ArabicNormalizationTests(TestCase):
+    def test_folds_letter_variants_and_strips_diacritics(self):
+        self.assertEqual(normalize_arabic("إِبْرِيقٌ"), "ابريق")
+        self.assertEqual(normalize_arabic("آلة مصطفى"), "اله مصطفي")
+        self.assertEqual(normalize_arabic("قهـــوة ٣"), "قهوه 3")
+        self.assertEqual(search_tokens("Coffee  قهوة قهوه"), ["coffee", "قهوه"])
+
+
+class ProductSearchIndexTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="searchable", name="Searchable", is_active=True)
+        self.other = Tenant.objects.create(slug="other-search", name="Other", is_active=True)
+        plan = SubscriptionPlan.objects.create(name="Search plan", max_products=100)
+        for tenant in (self.tenant, self.other):
+            SubscriptionService.subscribe_store(tenant.id, plan)
+        self.category = Category.objects.create(store_id=self.tenant.id, name="مشروبات")
+        self.kettle = ProductService.create_product(
+            store_id=self.tenant.id, sku="KET-1", name="إبريق شاي", price=50, quantity=3, categories=[self.category]
+        )
+        self.coffee = ProductService.create_product(
+            store_id=self.tenant.id, sku="COF-1", name="قهوة عربية", price=30, quantity=3
+        )
+        ProductService.create_product(store_id=self.other.id, sku="KET-9", name="ابريق", price=10, quantity=1)
+
+    def _ids(self, query: str, store_id: int | None = None) -> list[int]:
+        return search_products(store_id=store_id or self.tenant.id, query=query).product_ids
+
+    def test_matches_normalized_prefixes_within_store_only(self):
+        self.assertEqual(self._ids("ابريق"), [self.kettle.id])
+        self.assertEqual(self._ids("قهوه عرب"), [self.coffee.id])
+        self.assertEqual(self._ids("cof"), [self.coffee.id])
+        self.assertEqual(self._ids("مشروب"), [self.kettle.id])
+        other_ids = self._ids("ابريق", self.other.id)
+        self.assertEqual(len(other_ids), 1)
+        self.assertNotIn(self.kettle.id, other_ids)
+
+    def test_updates_are_indexed_incrementally(self):
+        ProductService.update_product(
+            store_id=self.tenant.id, product=self.coffee, sku="COF-1", name="هيل", price=30, quantity=0
+        )
+        self.assertEqual(self._ids("قهوه"), [])
+        self.assertEqual(self._ids("هيل"), [])  # out of stock products are inactive
+
+        self.category.name = "أدوات"
+        self.category.save()
+        self.assertEqual(self._ids("ادوات"), [self.kettle.id])
+
+        self.kettle.delete()
+        self.assertEqual(self._ids("ادوات"), [])
+
+    def test_saves_outside_the_service_layer_are_indexed(self):
+        version = get_catalog_version(self.tenant.id)
+        self.kettle.name = "غلاية"
+        self.kettle.save()
+        self.assertEqual(self._ids("غلايه"), [self.kettle.id])
+        self.assertGreater(get_catalog_version(self.tenant.id), version)
+
+    def test_ranks_name_matches_first_and_paginates(self):
+        ProductService.create_product(
+            store_id=self.tenant.id, sku="X-1", name="هدية", price=5, quantity=1, categories=[self.category]
+        )
+        cold = ProductService.create_product(
+            store_id=self.tenant.id, sku="X-2", name="مشروبات باردة", price=5, quantity=1
+        )
+        page = search_products(store_id=self.tenant.id, query="مشروبات", page=1, page_size=1)
+        self.assertEqual(page.total, 3)
+        self.assertTrue(page.has_next)
+        self.assertEqual(page.product_ids, [cold.id])
+        self.assertEqual(len(search_products(store_id=self.tenant.id, query="مشروبات", page=2, page_size=2).product_ids), 1)
+
+    @override_settings(ALLOWED_HOSTS=[".w-sala.com"])
+    def test_search_api_is_public_and_tenant_scoped(self):
+        response = Client(HTTP_HOST="searchable.w-sala.com").get("/api/catalog/search/", {"q": "إبريق"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["results"][0]["sku"], "KET-1")
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        autocomplete_registry.clear()
+        self.tenant = Tenant.objects.create(slug="typeahead", name="Typeahead", is_active=True)
+        plan = SubscriptionPlan.objects.create(name="Typeahead plan", max_products=100)
+        SubscriptionService.subscribe_store(self.tenant.id, plan)
+        self.plain = ProductService.create_product(
+            store_id=self.tenant.id, sku="QH-1", name="قهوة سادة", price=20, quantity=5
+        )
+        self.bestseller = ProductService.create_product(
+            store_id=self.tenant.id, sku="QH-2", name="قهوة عربية", price=25, quantity=50
+        )
+        Category.objects.create(store_id=self.tenant.id, name="قهوة مختصة")
+        customer = Customer.objects.create(store_id=self.tenant.id, email="c@example.com", full_name="C")
+        order = Order.objects.create(store_id=self.tenant.id, order_number="AC-1", customer=customer, status="paid")
+        OrderItem.objects.create(order=order, product=self.bestseller, quantity=12, price=25)
+
+    def _labels(self, query: str) -> list[str]:
+        return [item.label for item in suggest(self.tenant.id, query)]
+
+    def test_prefix_matches_word_starts_ranked_by_sales(self):
+        labels = self._labels("قهو")
+        self.assertEqual(labels[0], "قهوة عربية")
+        self.assertIn("قهوة سادة", labels)
+        self.assertEqual(self._labels("عرب"), ["قهوة عربية"])
+        self.assertEqual(self._labels("qh-1"), ["QH-1"])
+        self.assertEqual(self._labels("مختص"), ["قهوة مختصة"])
+
+    def test_product_writes_refresh_the_loaded_index_incrementally(self):
+        index = autocomplete_registry.get_index(self.tenant.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductService.create_product(store_id=self.tenant.id, sku="TM-1", name="تمر سكري", price=30, quantity=2)
+            ProductService.update_product(
+                store_id=self.tenant.id, product=self.plain, sku="QH-1", name="هيل", price=20, quantity=5
+            )
+
+        self.assertEqual(self._labels("تمر"), ["تمر سكري"])
+        self.assertEqual(self._labels("هيل"), ["هيل"])
+        self.assertNotIn("قهوة سادة", self._labels("قهو"))
+        refreshed = autocomplete_registry.get_index(self.tenant.id)
+        self.assertGreater(refreshed.seq, index.seq)
+        self.assertEqual(refreshed.built_at, index.built_at)
+
+    def test_memory_budget_evicts_least_recently_used_tenant(self):
+        other = Tenant.objects.create(slug="typeahead-2", name="Other", is_active=True)
+        autocomplete_registry.get_index(self.tenant.id)
+        with override_settings(AUTOCOMPLETE_MEMORY_BUDGET_BYTES=1):
+            autocomplete_registry.get_index(other.id)
+        self.assertNotIn(self.tenant.id, autocomplete_registry)
+        self.assertIn(other.id, autocomplete_registry)
+
+    @override_settings(ALLOWED_HOSTS=[".w-sala.com"])
+    def test_autocomplete_endpoint(self):
+        response = Client(HTTP_HOST="typeahead.w-sala.com").get("/api/catalog/autocomplete/", {"q": "قه", "limit": 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0], {"type": "product", "id": self.bestseller.id, "label": "قهوة عربية"})
+
+
+@override_settings(ALLOWED_HOSTS=[".w-sala.com"])
+class ProductListingTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="lister", name="Lister", is_active=True)
+        plan = SubscriptionPlan.objects.create(name="Listing plan", max_products=100)
+        SubscriptionService.subscribe_store(self.tenant.id, plan)
+        self.products = [
+            ProductService.create_product(
+                store_id=self.tenant.id, sku=f"LS-{index}", name=f"Item {index}", price=5, quantity=index % 2
+            )
+            for index in range(5)
+        ]
+        self.user = get_user_model().objects.create_user(username="product-lister", password="pass12345")
+        TenantMembership.objects.create(tenant=self.tenant, user=self.user)
+
+    def test_product_list_api_filters_and_pages(self):
+        client = APIClient(HTTP_HOST="lister.w-sala.com")
+        client.force_authenticate(user=self.user)
+
+        first = client.get("/api/catalog/products/", {"page_size": 2}).json()["data"]
+        self.assertEqual([item["sku"] for item in first["items"]], ["LS-4", "LS-3"])
+        self.assertEqual(first["total"], 5)
+        rest = client.get("/api/catalog/products/", {"page_size": 10, "cursor": first["next_cursor"]}).json()["data"]
+        self.assertEqual([item["sku"] for item in rest["items"]], ["LS-2", "LS-1", "LS-0"])
+
+        active = client.get("/api/catalog/products/", {"status": "active"}).json()["data"]
+        self.assertEqual([item["sku"] for item in active["items"]], ["LS-3", "LS-1"])
+        by_sku = client.get("/api/catalog/products/", {"q": "ls-2"}).json()["data"]
+        self.assertEqual([item["id"] for item in by_sku["items"]], [self.products[2].id])
+
+    @override_settings(MERCHANT_LIST_PAGE_SIZE=2)
+    def test_web_product_list_renders_one_page_with_next_link(self):
+        request = RequestFactory().get("/products/", {"status": "inactive"}, HTTP_HOST="lister.w-sala.com")
+        request.user = self.user
+        request.session = SessionStore()
+        request.tenant = self.tenant
+        response = web_views.product_list(request)
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn("LS-4", content)
+        self.assertIn("LS-2", content)
+        self.assertNotIn("LS-0", content)
+        self.assertNotIn("LS-3", content)
+        self.assertIn("status=inactive&amp;cursor=", content)
+
+
+class StockReservationTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="holder", name="Holder", is_active=True)
+        self.mug, self.pen = Product.objects.bulk_create(
+            [
+                Product(store_id=self.tenant.id, sku="MUG", name="Mug", price=Decimal("5.00")),
+                Product(store_id=self.tenant.id, sku="PEN", name="Pen", price=Decimal("1.00")),
+            ]
+        )
+        Inventory.objects.bulk_create(
+            [Inventory(product=self.mug, quantity=3, in_stock=True), Inventory(product=self.pen, quantity=10, in_stock=True)]
+        )
+        self.customer = Customer.objects.create(store_id=self.tenant.id, email="holder@example.com", full_name="Holder")
+
+    def _inventory(self, product) -> Inventory:
+        return Inventory.objects.get(product=product)
+
+    def _session_order(self, lines):
+        cart = Cart.objects.create(store_id=self.tenant.id, session_key=f"cart-{Cart.objects.count()}")
+        order = Order.objects.create(store_id=self.tenant.id, order_number=f"SR-{cart.id}", customer=self.customer)
+        OrderItem.objects.bulk_create(
+            [OrderItem(order=order, product=product, quantity=qty, price=product.price) for product, qty in lines]
+        )
+        session = CheckoutSession.objects.create(
+            store_id=self.tenant.id, cart=cart, status=CheckoutSession.STATUS_PAYMENT, order=order
+        )
+        return session, order
+
+    def test_holds_are_all_or_nothing_and_reduce_available_stock(self):
+        place_holds(store_id=self.tenant.id, checkout_session_id=901, lines=[(self.mug.id, 2), (self.pen.id, 1)])
+        self.assertEqual(self._inventory(self.mug).reserved, 2)
+
+        with self.assertRaisesMessage(InsufficientStockError, "available 1"):
+            place_holds(store_id=self.tenant.id, checkout_session_id=902, lines=[(self.pen.id, 4), (self.mug.id, 2)])
+        self.assertEqual(self._inventory(self.pen).reserved, 1)
+        self.assertFalse(StockReservation.objects.filter(checkout_session_id=902).exists())
+
+        # Re-entering payment replaces the session's earlier holds.
+        place_holds(store_id=self.tenant.id, checkout_session_id=901, lines=[(self.mug.id, 3)])
+        self.assertEqual(self._inventory(self.mug).reserved, 3)
+        self.assertEqual(self._inventory(self.pen).reserved, 0)
+        self.assertEqual(StockReservation.objects.filter(status=StockReservation.STATUS_HELD).count(), 1)
+
+    def test_payment_commits_holds_and_flips_stock_flags(self):
+        session, order = self._session_order([(self.mug, 3), (self.pen, 2)])
+        place_holds(store_id=self.tenant.id, checkout_session_id=session.id, lines=[(self.mug.id, 3), (self.pen.id, 2)])
+        # Another buyer cannot take held units, but the holder's own payment can.
+        other_session, other_order = self._session_order([(self.mug, 1)])
+        with self.assertRaises(ValueError):
+            OrderService.mark_as_paid(other_order)
+
+        with CaptureQueriesContext(connection) as ctx:
+            OrderService.mark_as_paid(order)
+        stock_writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "catalog_inventory"')]
+        self.assertEqual(len(stock_writes), 2)  # decrement + in_stock recompute, whatever the line count
+
+        mug, pen = self._inventory(self.mug), self._inventory(self.pen)
+        self.assertEqual((mug.quantity, mug.reserved, mug.in_stock), (0, 0, False))
+        self.assertEqual((pen.quantity, pen.reserved, pen.in_stock), (8, 0, True))
+        self.assertFalse(Product.objects.get(id=self.mug.id).is_active)
+        self.assertEqual(
+            set(StockReservation.objects.filter(checkout_session_id=session.id).values_list("status", flat=True)),
+            {StockReservation.STATUS_COMMITTED},
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.status, "paid")
+
+    def test_orders_without_holds_still_take_free_stock(self):
+        place_holds(store_id=self.tenant.id, checkout_session_id=999, lines=[(self.pen.id, 4)])
+        _session, order = self._session_order([(self.pen, 6)])
+        CheckoutSession.objects.filter(order=order).update(order=None)
+        OrderService.mark_as_paid(order)
+        pen = self._inventory(self.pen)
+        self.assertEqual((pen.quantity, pen.reserved), (4, 4))
+
+    def test_sweeper_releases_only_expired_holds_and_cancel_releases_order_holds(self):
+        place_holds(store_id=self.tenant.id, checkout_session_id=901, lines=[(self.mug.id, 1)], ttl=timedelta(seconds=1))
+        place_holds(store_id=self.tenant.id, checkout_session_id=902, lines=[(self.mug.id, 1)])
+        session, order = self._session_order([(self.pen, 5)])
+        place_holds(store_id=self.tenant.id, checkout_session_id=session.id, lines=[(self.pen.id, 5)])
+
+        released = release_expired(batch_size=1, now=timezone.now() + timedelta(seconds=5))
+        self.assertEqual(released, 1)
+        self.assertEqual(self._inventory(self.mug).reserved, 1)
+        self.assertEqual(
+            StockReservation.objects.get(checkout_session_id=901).status, StockReservation.STATUS_RELEASED
+        )
+
+        OrderLifecycleService.transition(order=order, new_status="cancelled")
+        self.assertEqual(self._inventory(self.pen).reserved, 0)
 
-# Create your tests here.
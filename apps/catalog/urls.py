@@ -1,2 +1,10 @@
 
 from django.urls import path
+
+from .views.api import ProductListAPI, ProductSearchAPI, autocomplete
+
+urlpatterns = [
+    path("catalog/products/", ProductListAPI.as_view()),
+    path("catalog/search/", ProductSearchAPI.as_view()),
+    path("catalog/autocomplete/", autocomplete),
+]
@@ -1,2 +1,103 @@
+from __future__ import annotations
 
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
+
+from apps.cart.interfaces.api.responses import api_response
+from apps.tenants.models import Tenant
+from apps.tenants.services.keyset_pagination import InvalidCursorError
+
+from ..serializers import ProductListSerializer
+from ..services.autocomplete import suggest
+from ..services.product_listing import ProductListFilters, list_products
+from ..services.search_index import load_ranked_products, search_products
+
+
+def _int_param(request, name: str, default: int) -> int:
+    try:
+        return int(request.query_params.get(name) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+class ProductSearchAPI(APIView):
+    """Public storefront search: ranked, paginated active products of the current store."""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        tenant = getattr(request, "tenant", None)
+        if not isinstance(tenant, Tenant):
+            return api_response(success=False, errors=["tenant_required"], status_code=status.HTTP_404_NOT_FOUND)
+
+        result = search_products(
+            store_id=tenant.id,
+            query=request.query_params.get("q", ""),
+            page=_int_param(request, "page", 1),
+            page_size=_int_param(request, "page_size", 0) or None,
+        )
+        products = load_ranked_products(tenant.id, result.product_ids)
+        data = {
+            "page": result.page,
+            "page_size": result.page_size,
+            "total": result.total,
+            "total_capped": result.total_capped,
+            "has_next": result.has_next,
+            "results": [
+                {
+                    "id": product.id,
+                    "name": product.name,
+                    "sku": product.sku,
+                    "price": str(product.price),
+                    "image_url": product.image.url if product.image else "",
+                }
+                for product in products
+            ],
+        }
+        return api_response(success=True, data=data)
+
+
+class ProductListAPI(APIView):
+    """Merchant product list (all statuses): `?status=active|inactive&q=&cursor=&page_size=`."""
+
+    def get(self, request):
+        try:
+            page = list_products(
+                store_id=request.tenant.id,
+                filters=ProductListFilters.from_params(request.query_params),
+                cursor=request.query_params.get("cursor", ""),
+                page_size=_int_param(request, "page_size", 0) or None,
+            )
+        except InvalidCursorError:
+            return api_response(success=False, errors=["invalid_cursor"], status_code=status.HTTP_400_BAD_REQUEST)
+        data = {
+            "items": ProductListSerializer(page.items, many=True).data,
+            "next_cursor": page.next_cursor,
+            "has_next": page.has_next,
+            "page_size": page.page_size,
+            "total": page.total,
+            "total_capped": page.total_capped,
+        }
+        return api_response(success=True, data=data)
+
+
+@require_GET
+def autocomplete(request: HttpRequest) -> JsonResponse:
+    """
+    Search-box suggestions. A plain Django view (no DRF negotiation/auth) because it runs on every
+    keystroke and answers from the in-memory prefix index.
+    """
+    tenant = getattr(request, "tenant", None)
+    if not isinstance(tenant, Tenant):
+        return JsonResponse({"success": False, "data": None, "errors": ["tenant_required"]}, status=404)
+
+    try:
+        limit = int(request.GET.get("limit") or 8)
+    except (TypeError, ValueError):
+        limit = 8
+    suggestions = suggest(tenant.id, request.GET.get("q", ""), limit=limit)
+    data = [{"type": item.kind, "id": item.object_id, "label": item.label} for item in suggestions]
+    return JsonResponse({"success": True, "data": data, "errors": []})
@@ -5,13 +5,14 @@ from decimal import Decimal
 
 from django.db import transaction
 
-from apps.cart.application.use_cases.get_cart import GetCartUseCase
+from apps.cart.domain.errors import CartAccessDeniedError
+from apps.cart.domain.policies import assert_cart_access, safe_decimal
+from apps.cart.infrastructure.repositories import list_cart_items
 from apps.checkout.domain.errors import InvalidCheckoutStateError
 from apps.checkout.models import CheckoutSession
 from apps.customers.models import Customer
 from apps.orders.models import Order
 from apps.orders.services.order_service import OrderService
-from apps.catalog.models import Product
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.analytics.application.telemetry import TelemetryService, actor_from_tenant_ctx
 from apps.analytics.domain.types import ObjectRef
@@ -28,7 +29,8 @@ class CreateOrderFromCheckoutUseCase:
     @transaction.atomic
     def execute(cmd: CreateOrderFromCheckoutCommand) -> Order:
         session = (
-            CheckoutSession.objects.select_for_update()
+            CheckoutSession.objects.select_for_update(of=("self",))
+            .select_related("cart")
             .filter(id=cmd.session_id, store_id=cmd.tenant_ctx.tenant_id)
             .first()
         )
@@ -39,8 +41,14 @@ class CreateOrderFromCheckoutUseCase:
         if session.status != CheckoutSession.STATUS_PAYMENT:
             raise InvalidCheckoutStateError("Checkout is not ready for payment.")
 
-        cart_summary = GetCartUseCase.execute(cmd.tenant_ctx)
-        if not cart_summary.items:
+        try:
+            assert_cart_access(session.cart, cmd.tenant_ctx)
+        except CartAccessDeniedError as exc:
+            raise InvalidCheckoutStateError("Checkout session not found.") from exc
+
+        # The session already points at its cart: load the items once, with their products.
+        cart_items = list(list_cart_items(session.cart_id))
+        if not cart_items:
             raise InvalidCheckoutStateError("Cart is empty.")
 
         address = session.shipping_address_json or {}
@@ -60,61 +68,45 @@ class CreateOrderFromCheckoutUseCase:
             customer.save(update_fields=["full_name"])
 
         items = []
-        for item in cart_summary.items:
+        for cart_item in cart_items:
+            if cart_item.product.store_id != cmd.tenant_ctx.tenant_id:
+                raise InvalidCheckoutStateError("Product not found for order.")
             items.append(
                 {
-                    "product": None,
-                    "quantity": item.quantity,
-                    "price": item.unit_price,
-                    "product_id": item.product_id,
+                    "product": cart_item.product,
+                    "quantity": cart_item.quantity,
+                    "price": safe_decimal(cart_item.unit_price_snapshot),
                 }
             )
 
-        product_map = {
-            p.id: p
-            for p in Product.objects.filter(
-                store_id=cmd.tenant_ctx.tenant_id, id__in=[i["product_id"] for i in items]
-            )
-        }
-        for item in items:
-            product = product_map.get(item["product_id"])
-            if not product:
-                raise InvalidCheckoutStateError("Product not found for order.")
-            item["product"] = product
-
-        order = OrderService.create_order(customer, items, store_id=cmd.tenant_ctx.tenant_id)
-
         totals = session.totals_json or {}
-        total_amount = Decimal(str(totals.get("total") or order.total_amount))
-        order.total_amount = total_amount
-        order.currency = cmd.tenant_ctx.currency
-        order.payment_status = "pending"
-        order.customer_name = full_name
-        order.customer_email = email
-        order.customer_phone = phone
-        order.shipping_address_json = address
-        order.shipping_method_code = session.shipping_method_code
-        order.save(
-            update_fields=[
-                "total_amount",
-                "currency",
-                "payment_status",
-                "customer_name",
-                "customer_email",
-                "customer_phone",
-                "shipping_address_json",
-                "shipping_method_code",
-            ]
+        order_fields = {
+            "currency": cmd.tenant_ctx.currency,
+            "payment_status": "pending",
+            "customer_name": full_name,
+            "customer_email": email,
+            "customer_phone": phone,
+            "shipping_address_json": address,
+            "shipping_method_code": session.shipping_method_code,
+        }
+        if totals.get("total"):
+            order_fields["total_amount"] = Decimal(str(totals["total"]))
+        order = OrderService.create_order(
+            customer, items, store_id=cmd.tenant_ctx.tenant_id, order_fields=order_fields
         )
 
         session.order = order
         session.status = CheckoutSession.STATUS_CONFIRMED
         session.save(update_fields=["order", "status", "updated_at"])
-        TelemetryService.track(
-            event_name="order.placed",
-            tenant_ctx=cmd.tenant_ctx,
-            actor_ctx=actor_from_tenant_ctx(tenant_ctx=cmd.tenant_ctx, actor_type="CUSTOMER"),
-            object_ref=ObjectRef(object_type="ORDER", object_id=order.id),
-            properties={"total_amount": str(order.total_amount), "currency": order.currency},
+
+        # Telemetry is not part of the order: record it once the transaction has committed.
+        transaction.on_commit(
+            lambda: TelemetryService.track(
+                event_name="order.placed",
+                tenant_ctx=cmd.tenant_ctx,
+                actor_ctx=actor_from_tenant_ctx(tenant_ctx=cmd.tenant_ctx, actor_type="CUSTOMER"),
+                object_ref=ObjectRef(object_type="ORDER", object_id=order.id),
+                properties={"total_amount": str(order.total_amount), "currency": order.currency},
+            )
         )
         return order
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 
 from django.db import transaction
 
+from apps.catalog.services.stock_reservation import release_holds
 from apps.checkout.domain.errors import InvalidCheckoutStateError
 from apps.checkout.domain.policies import validate_address
 from apps.checkout.models import CheckoutSession
@@ -36,6 +37,8 @@ class SaveShippingAddressUseCase:
         session.shipping_address_json = validate_address(cmd.address)
         session.status = CheckoutSession.STATUS_SHIPPING
         session.save(update_fields=["shipping_address_json", "status", "updated_at"])
+        # Back to the shipping step: holds are placed again when a method is selected.
+        release_holds([session.id])
         TelemetryService.track(
             event_name="checkout.address_saved",
             tenant_ctx=cmd.tenant_ctx,
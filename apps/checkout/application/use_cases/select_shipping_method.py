@@ -6,6 +6,7 @@ from decimal import Decimal
 from django.db import transaction
 
 from apps.cart.application.use_cases.get_cart import GetCartUseCase
+from apps.catalog.services.stock_reservation import InsufficientStockError, place_holds
 from apps.checkout.domain.errors import InvalidCheckoutStateError
 from apps.checkout.domain.policies import compute_totals
 from apps.checkout.infrastructure.shipping_options import list_shipping_methods
@@ -49,6 +50,15 @@ class SelectShippingMethodUseCase:
         session.totals_json = {k: str(v) for k, v in totals.items()}
         session.status = CheckoutSession.STATUS_PAYMENT
         session.save(update_fields=["shipping_method_code", "totals_json", "status", "updated_at"])
+        # Hold the cart's stock for the payment window; expired holds are freed by `release_expired_reservations`.
+        try:
+            place_holds(
+                store_id=session.store_id,
+                checkout_session_id=session.id,
+                lines=[(item.product_id, item.quantity) for item in cart_summary.items],
+            )
+        except InsufficientStockError as exc:
+            raise InvalidCheckoutStateError(str(exc)) from exc
         TelemetryService.track(
             event_name="checkout.shipping_selected",
             tenant_ctx=cmd.tenant_ctx,
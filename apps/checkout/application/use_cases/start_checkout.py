@@ -6,6 +6,7 @@ from decimal import Decimal
 from django.db import transaction
 
 from apps.cart.application.use_cases.get_cart import GetCartUseCase
+from apps.cart.infrastructure.repositories import get_cart_store
 from apps.checkout.domain.errors import EmptyCartError
 from apps.checkout.domain.policies import compute_totals
 from apps.checkout.models import CheckoutSession
@@ -26,10 +27,12 @@ class StartCheckoutUseCase:
         cart_summary = GetCartUseCase.execute(cmd.tenant_ctx)
         if not cart_summary.items:
             raise EmptyCartError("Cart is empty.")
+        # Checkout reads `Cart` / `CartItem`: write a cache-resident guest cart through from here on.
+        cart_id = get_cart_store().flush(cmd.tenant_ctx, pin=True)
 
         session = (
             CheckoutSession.objects.select_for_update()
-            .filter(cart_id=cart_summary.cart_id, store_id=cmd.tenant_ctx.tenant_id)
+            .filter(cart_id=cart_id, store_id=cmd.tenant_ctx.tenant_id)
             .order_by("-id")
             .first()
         )
@@ -39,7 +42,7 @@ class StartCheckoutUseCase:
         totals = compute_totals(subtotal=cart_summary.subtotal, shipping_fee=Decimal("0"))
         created = CheckoutSession.objects.create(
             store_id=cmd.tenant_ctx.tenant_id,
-            cart_id=cart_summary.cart_id,
+            cart_id=cart_id,
             status=CheckoutSession.STATUS_ADDRESS,
             totals_json={k: str(v) for k, v in totals.items()},
         )
@@ -47,7 +50,7 @@ class StartCheckoutUseCase:
             event_name="checkout.started",
             tenant_ctx=cmd.tenant_ctx,
             actor_ctx=actor_from_tenant_ctx(tenant_ctx=cmd.tenant_ctx, actor_type="CUSTOMER"),
-            object_ref=ObjectRef(object_type="CART", object_id=cart_summary.cart_id),
+            object_ref=ObjectRef(object_type="CART", object_id=cart_id),
             properties={"subtotal": str(cart_summary.subtotal)},
         )
         return created
@@ -4,11 +4,13 @@ from decimal import Decimal
 
 from apps.checkout.domain.dtos import ShippingMethodDTO
 from apps.tenants.models import StoreShippingSettings
+from apps.tenants.services.settings_bundle import get_tenant_settings
 
 
 def list_shipping_methods(*, tenant_id: int) -> list[ShippingMethodDTO]:
-    settings = StoreShippingSettings.objects.filter(tenant_id=tenant_id, is_enabled=True).first()
-    if not settings:
+    bundle = get_tenant_settings(tenant_id)
+    settings = bundle.shipping if bundle else None
+    if not settings or not settings.is_enabled:
         return [ShippingMethodDTO(code="pickup", label="Pickup", fee=Decimal("0"))]
 
     if settings.fulfillment_mode == StoreShippingSettings.MODE_MANUAL_DELIVERY:
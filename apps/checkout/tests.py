@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.cart.models import Cart, CartItem
+from apps.analytics.models import Event
+from apps.catalog.models import Inventory, Product
+from apps.checkout.application.use_cases.create_order_from_checkout import (
+    CreateOrderFromCheckoutCommand,
+    CreateOrderFromCheckoutUseCase,
+)
+from apps.checkout.models import CheckoutSession
+from apps.customers.models import Customer
+from apps.orders.models import OrderItem
+from apps.subscriptions.models import StoreUsageCounter, SubscriptionPlan
+from apps.subscriptions.services.entitlement_snapshot import get_entitlements
+from apps.subscriptions.services.subscription_service import SubscriptionService
+from apps.subscriptions.services.usage_counter_service import UsageCounterService
+from apps.tenants.domain.tenant_context import TenantContext
+from apps.tenants.models import Tenant
+
+
+# Session lock, cart items, customer, usage counter, order INSERT, counter UPDATE, items bulk INSERT,
+# session UPDATE, plus savepoints for the nested atomic blocks.
+CHECKOUT_QUERY_BUDGET = 12
+
+
+class CheckoutQueryBudgetTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="budget", name="Budget", is_active=True)
+        plan = SubscriptionPlan.objects.create(name="Budget plan", max_orders_monthly=1000)
+        SubscriptionService.subscribe_store(self.tenant.id, plan)
+        self.products = Product.objects.bulk_create(
+            [Product(store_id=self.tenant.id, sku=f"B-{i}", name=f"Item {i}", price=Decimal("3.00")) for i in range(50)]
+        )
+        Inventory.objects.bulk_create([Inventory(product=p, quantity=100, in_stock=True) for p in self.products])
+        # Steady state: returning customer, warm entitlement snapshot and usage counter.
+        Customer.objects.create(store_id=self.tenant.id, email="buyer@example.com", full_name="Buyer")
+        get_entitlements(self.tenant.id)
+        UsageCounterService.get(self.tenant.id, StoreUsageCounter.METRIC_ORDERS_MONTHLY)
+
+    def _checkout(self, item_count: int, session_key: str):
+        tenant_ctx = TenantContext(tenant_id=self.tenant.id, currency="SAR", user_id=None, session_key=session_key)
+        cart = Cart.objects.create(store_id=self.tenant.id, session_key=session_key)
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product=p, quantity=2, unit_price_snapshot=p.price) for p in self.products[:item_count]]
+        )
+        session = CheckoutSession.objects.create(
+            store_id=self.tenant.id,
+            cart=cart,
+            status=CheckoutSession.STATUS_PAYMENT,
+            shipping_address_json={"email": "buyer@example.com", "full_name": "Buyer", "phone": "0500000000"},
+            shipping_method_code="standard",
+            totals_json={"total": str(Decimal("6.00") * item_count + 15)},
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            order = CreateOrderFromCheckoutUseCase.execute(
+                CreateOrderFromCheckoutCommand(tenant_ctx=tenant_ctx, session_id=session.id)
+            )
+        return order, ctx
+
+    def test_query_count_is_flat_in_cart_size(self):
+        counts = []
+        for size in (1, 10, 50):
+            with self.captureOnCommitCallbacks(execute=False):
+                order, ctx = self._checkout(size, f"session-{size}")
+            counts.append(len(ctx.captured_queries))
+            self.assertLessEqual(len(ctx.captured_queries), CHECKOUT_QUERY_BUDGET, f"{size}-item cart")
+            self.assertEqual(OrderItem.objects.filter(order=order).count(), size)
+        self.assertEqual(len(set(counts)), 1, counts)
+
+    def test_order_is_written_fully_populated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order, _ = self._checkout(3, "session-full")
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal("33.00"))
+        self.assertEqual(
+            (order.customer_email, order.customer_phone, order.shipping_method_code, order.payment_status),
+            ("buyer@example.com", "0500000000", "standard", "pending"),
+        )
+        self.assertEqual(CheckoutSession.objects.get(order=order).status, CheckoutSession.STATUS_CONFIRMED)
+        self.assertTrue(Event.objects.filter(event_name="order.placed", object_id=str(order.id)).exists())
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+"""
+Shared cache version stamps.
+
+AR:
+- كل cache مشترك بين الـ workers يُبطَل برفع رقم إصدار في الـ cache بدل حذف مفاتيحه واحداً واحداً.
+- يبدأ الإصدار المفقود (أول تشغيل أو بعد الإخلاء) بقيمة زمنية حتى لا يعود أبداً إلى نسخة قديمة مخزّنة.
+
+EN:
+- Cross-worker caches are invalidated by bumping a version stamp in the cache instead of deleting entries.
+- A missing stamp (first boot or evicted) is seeded with a time-based value, so it never points back at an
+  entry cached under an older version.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def current_versions(*keys: str) -> tuple[int, ...]:
+    """The stamps of `keys`, in order, seeding any that are missing; one cache read when all are present."""
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            seed = time.time_ns()
+            cache.add(key, seed, None)
+            values[key] = cache.get(key, seed)
+    return tuple(int(values[key]) for key in keys)
+
+
+def current_version(key: str) -> int:
+    return current_versions(key)[0]
+
+
+def bump_version(key: str) -> None:
+    """Invalidate everything cached under `key`'s current stamp."""
+
+    def _incr() -> None:
+        cache.add(key, time.time_ns(), None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+    # Bump now for the writing worker, and again on commit so no worker caches data read mid-transaction.
+    _incr()
+    transaction.on_commit(_incr, robust=True)
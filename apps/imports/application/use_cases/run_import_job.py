@@ -8,11 +8,16 @@ from django.db import transaction
 from django.utils.text import slugify
 
 from apps.catalog.models import Category, Inventory, Product
+from apps.catalog.services.autocomplete import record_product_changes
+from apps.catalog.services.search_index import index_products
 from apps.imports.domain.errors import ImportJobNotFoundError
 from apps.imports.domain.policies import parse_decimal, parse_int, sanitize_text
 from apps.imports.infrastructure.csv_utils import iter_csv_rows
 from apps.imports.infrastructure.storage import list_import_images, open_import_file
 from apps.imports.models import ImportJob, ImportRowError
+from apps.subscriptions.models import StoreUsageCounter
+from apps.subscriptions.services.usage_counter_service import UsageCounterService
+from apps.tenants.services.storefront_cache import bump_catalog_version
 
 
 @dataclass(frozen=True)
@@ -47,6 +52,7 @@ class RunImportJobUseCase:
             Product.objects.filter(store_id=job.store_id).values_list("sku", flat=True)
         )
         created_rows = 0
+        created_product_ids: list[int] = []
         failed_rows = job.failed_rows
 
         category_cache: dict[str, Category] = {}
@@ -105,6 +111,7 @@ class RunImportJobUseCase:
                     )
 
                     created_rows += 1
+                    created_product_ids.append(product.id)
             except Exception as exc:
                 failed_rows += 1
                 ImportRowError.objects.create(
@@ -115,6 +122,13 @@ class RunImportJobUseCase:
                     raw_value=str(exc),
                 )
 
+        # One batched index update for the whole file instead of one per row.
+        index_products(created_product_ids)
+        record_product_changes(job.store_id, created_product_ids)
+        if created_product_ids:
+            bump_catalog_version(job.store_id)
+            UsageCounterService.increment(job.store_id, StoreUsageCounter.METRIC_PRODUCTS, len(created_product_ids))
+
         job.success_rows = created_rows
         job.failed_rows = failed_rows
         job.status = ImportJob.STATUS_COMPLETED if created_rows > 0 else ImportJob.STATUS_FAILED
@@ -6,5 +6,5 @@ class ImportStartForm(forms.Form):
     images = forms.FileField(
         required=False,
         label="Images",
-        widget=forms.ClearableFileInput(attrs={"multiple": True}),
+        widget=forms.FileInput(),
     )
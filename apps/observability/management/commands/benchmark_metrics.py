@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from apps.observability.metrics import MetricsRegistry
+from apps.observability.middleware import timing
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the per-request overhead of TimingMiddleware metrics recording."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50000)
+        parser.add_argument("--routes", type=int, default=50, help="Distinct route names to spread requests over.")
+
+    def handle(self, *args, **options):
+        iterations: int = options["iterations"]
+        routes = [f"bench:view_{i}" for i in range(max(options["routes"], 1))]
+        registry = MetricsRegistry(worker_id="benchmark")
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            registry.observe(
+                route=routes[i % len(routes)],
+                method="GET",
+                status_class="2xx",
+                tenant="",
+                latency_ms=float(i % 700),
+            )
+        observe_us = (time.perf_counter() - start) / iterations * 1e6
+
+        request = RequestFactory().get("/bench/")
+        request._start_time = time.monotonic()
+        original = timing.registry
+        timing.registry = registry
+        try:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                timing._record_metrics(request, status_code=200)
+            record_us = (time.perf_counter() - start) / iterations * 1e6
+        finally:
+            timing.registry = original
+            registry.stop()
+
+        self.stdout.write(f"registry.observe: {observe_us:.2f} us/request")
+        self.stdout.write(f"middleware record (route lookup + observe + flush check): {record_us:.2f} us/request")
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+"""
+In-process metrics registry.
+
+- Counters + fixed-bucket latency histograms aggregated in worker memory (no cache round trip per request).
+- Every `METRICS_FLUSH_SECONDS`, a daemon heartbeat thread publishes the worker's cumulative snapshot to the
+  cache, idle or not, so a live worker's counters never drop out of the merged totals; `/metrics` merges all
+  live worker snapshots and renders the Prometheus text format. A snapshot only expires once its process is gone.
+- Components register gauge providers (`register_gauges`); their values ride along in the snapshot and are
+  rendered per worker.
+"""
+
+import math
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+# Upper bounds in milliseconds; the implicit last bucket is +Inf.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+
+WORKERS_CACHE_KEY = "metrics:workers"
+WORKERS_LOCK_KEY = "metrics:workers:lock"
+WORKERS_LOCK_SECONDS = 5
+WORKER_CACHE_KEY_PREFIX = "metrics:worker:"
+
+# (route, method, status_class, tenant)
+SeriesKey = tuple[str, str, str, str]
+
+
+def _flush_seconds() -> int:
+    return int(getattr(settings, "METRICS_FLUSH_SECONDS", 15) or 15)
+
+
+class MetricsRegistry:
+    def __init__(
+        self, worker_id: str | None = None, *, flush_seconds: float | None = None, background: bool = True
+    ):
+        self._fixed_worker_id = worker_id
+        self._flush_seconds = flush_seconds
+        self.background = background
+        self._gauges: dict[str, Callable[[], dict[str, float]]] = {}
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        # Also runs in a forked child: the parent's counts and heartbeat thread belong to the parent.
+        self._pid = os.getpid()
+        self.worker_id = self._fixed_worker_id or f"{socket.gethostname()}:{self._pid}"
+        self._lock = threading.Lock()
+        self._counts: dict[SeriesKey, int] = {}
+        self._sums: dict[SeriesKey, float] = {}
+        self._buckets: dict[SeriesKey, list[int]] = {}
+        self._last_flush = time.monotonic()
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    @property
+    def flush_seconds(self) -> float:
+        return self._flush_seconds or _flush_seconds()
+
+    def _check_fork(self) -> None:
+        if os.getpid() != self._pid:
+            self._reset_state()
+
+    def register_gauges(self, prefix: str, provider: Callable[[], dict[str, float]]) -> None:
+        """`provider()` is read at snapshot time; its keys are exported as `wasla_{prefix}_{key}`."""
+        with self._lock:
+            self._gauges[prefix] = provider
+
+    def _gauge_values(self) -> dict[str, float]:
+        values: dict[str, float] = {}
+        for prefix, provider in list(self._gauges.items()):
+            try:
+                values.update({f"{prefix}_{name}": float(value) for name, value in provider().items()})
+            except Exception:
+                continue
+        return values
+
+    def observe(self, *, route: str, method: str, status_class: str, tenant: str, latency_ms: float) -> None:
+        self._check_fork()
+        key = (route, method, status_class, tenant)
+        bucket_index = bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+        with self._lock:
+            buckets = self._buckets.get(key)
+            if buckets is None:
+                buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+                self._buckets[key] = buckets
+                self._counts[key] = 0
+                self._sums[key] = 0.0
+            buckets[bucket_index] += 1
+            self._counts[key] += 1
+            self._sums[key] += latency_ms
+
+    def snapshot(self) -> dict:
+        gauges = self._gauge_values()
+        with self._lock:
+            return {
+                "worker": self.worker_id,
+                "gauges": gauges,
+                "series": [
+                    [list(key), self._counts[key], self._sums[key], list(self._buckets[key])]
+                    for key in self._counts
+                ],
+            }
+
+    def maybe_flush(self) -> None:
+        """Called after every request: starts the heartbeat thread, or flushes inline without one."""
+        self._check_fork()
+        if self.background:
+            self._ensure_thread()
+            return
+        now = time.monotonic()
+        if now - self._last_flush < self.flush_seconds:
+            return
+        self._last_flush = now
+        self.flush()
+
+    def flush(self) -> None:
+        """Publish this worker's cumulative snapshot so `/metrics` in any worker can merge it."""
+        # Outlives a few missed heartbeats, so only a worker that exited ever expires.
+        timeout = max(1, math.ceil(self.flush_seconds * 4))
+        try:
+            cache.set(f"{WORKER_CACHE_KEY_PREFIX}{self.worker_id}", self.snapshot(), timeout=timeout)
+            self._update_workers()
+        except Exception:
+            # Metrics must never break request handling.
+            return
+
+    def _update_workers(self) -> None:
+        workers = list(cache.get(WORKERS_CACHE_KEY) or ())
+        live = cache.get_many([f"{WORKER_CACHE_KEY_PREFIX}{worker}" for worker in workers])
+        if self.worker_id in workers and len(live) == len(workers):
+            return
+        # Read-modify-write under a short lock so concurrent flushes never drop each other from the list;
+        # a worker that misses the lock retries on its next heartbeat.
+        if not cache.add(WORKERS_LOCK_KEY, self.worker_id, timeout=WORKERS_LOCK_SECONDS):
+            return
+        try:
+            workers = list(cache.get(WORKERS_CACHE_KEY) or ())
+            live = cache.get_many([f"{WORKER_CACHE_KEY_PREFIX}{worker}" for worker in workers])
+            # Drop workers whose snapshot expired (exited or scaled down).
+            alive = sorted(
+                {worker for worker in workers if f"{WORKER_CACHE_KEY_PREFIX}{worker}" in live} | {self.worker_id}
+            )
+            if alive != workers:
+                cache.set(WORKERS_CACHE_KEY, alive, timeout=None)
+        finally:
+            cache.delete(WORKERS_LOCK_KEY)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.flush()
+            finally:
+                connection.close()
+            self._stopped.wait(self.flush_seconds)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="metrics-heartbeat", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat thread (tests and benchmarks); the last snapshot then expires on its own."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+            self._buckets.clear()
+
+
+registry = MetricsRegistry()
+
+
+def collect_snapshots() -> list[dict]:
+    """This worker's live snapshot plus the last published snapshot of every other worker."""
+    snapshots = [registry.snapshot()]
+    try:
+        workers = [worker for worker in (cache.get(WORKERS_CACHE_KEY) or ()) if worker != registry.worker_id]
+        if workers:
+            published = cache.get_many([f"{WORKER_CACHE_KEY_PREFIX}{worker}" for worker in workers])
+            snapshots.extend(published.values())
+    except Exception:
+        pass
+    return snapshots
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict[SeriesKey, tuple[int, float, list[int]]]:
+    merged: dict[SeriesKey, tuple[int, float, list[int]]] = {}
+    for snapshot in snapshots:
+        for key, count, total, buckets in snapshot.get("series", ()):
+            key = tuple(key)
+            if key in merged:
+                prev_count, prev_total, prev_buckets = merged[key]
+                merged[key] = (
+                    prev_count + count,
+                    prev_total + total,
+                    [a + b for a, b in zip(prev_buckets, buckets)],
+                )
+            else:
+                merged[key] = (count, total, list(buckets))
+    return merged
+
+
+def estimate_quantile(buckets: list[int], quantile: float) -> float:
+    """Linear interpolation inside the bucket holding the target rank (Prometheus `histogram_quantile`)."""
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    rank = quantile * total
+    cumulative = 0
+    for index, count in enumerate(buckets):
+        if cumulative + count >= rank and count:
+            if index >= len(LATENCY_BUCKETS_MS):
+                return float(LATENCY_BUCKETS_MS[-1])
+            lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+            upper = LATENCY_BUCKETS_MS[index]
+            return lower + (upper - lower) * ((rank - cumulative) / count)
+        cumulative += count
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+def _labels(**labels: str) -> str:
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_gauges(snapshots: list[dict]) -> str:
+    """Component gauges, one sample per worker (depths and high watermarks do not sum meaningfully)."""
+    by_name: dict[str, list[tuple[str, float]]] = {}
+    for snapshot in snapshots:
+        for name, value in (snapshot.get("gauges") or {}).items():
+            by_name.setdefault(name, []).append((snapshot.get("worker", ""), value))
+    lines = []
+    for name, samples in sorted(by_name.items()):
+        lines.append(f"# TYPE wasla_{name} gauge")
+        for worker, value in sorted(samples):
+            lines.append(f"wasla_{name}{_labels(worker=worker)} {value:g}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def render_prometheus(merged: dict[SeriesKey, tuple[int, float, list[int]]]) -> str:
+    lines = [
+        "# HELP wasla_http_requests_total Total HTTP requests.",
+        "# TYPE wasla_http_requests_total counter",
+    ]
+    for (route, method, status_class, tenant), (count, _, _) in sorted(merged.items()):
+        lines.append(
+            "wasla_http_requests_total"
+            f"{_labels(route=route, method=method, status_class=status_class, tenant=tenant)} {count}"
+        )
+
+    lines += [
+        "# HELP wasla_http_request_duration_ms HTTP request latency in milliseconds.",
+        "# TYPE wasla_http_request_duration_ms histogram",
+    ]
+    for (route, method, status_class, tenant), (count, total, buckets) in sorted(merged.items()):
+        base = dict(route=route, method=method, status_class=status_class, tenant=tenant)
+        cumulative = 0
+        for upper, bucket_count in zip(LATENCY_BUCKETS_MS, buckets):
+            cumulative += bucket_count
+            lines.append(f"wasla_http_request_duration_ms_bucket{_labels(**base, le=f'{upper:g}')} {cumulative}")
+        lines.append(f"wasla_http_request_duration_ms_bucket{_labels(**base, le='+Inf')} {count}")
+        lines.append(f"wasla_http_request_duration_ms_sum{_labels(**base)} {total:.3f}")
+        lines.append(f"wasla_http_request_duration_ms_count{_labels(**base)} {count}")
+
+    per_view: dict[tuple[str, str], list[int]] = {}
+    for (route, method, _, _), (_, _, buckets) in merged.items():
+        current = per_view.get((route, method))
+        per_view[(route, method)] = list(buckets) if current is None else [a + b for a, b in zip(current, buckets)]
+
+    lines += [
+        "# HELP wasla_http_request_latency_ms Estimated per-view latency quantiles in milliseconds.",
+        "# TYPE wasla_http_request_latency_ms gauge",
+    ]
+    for (route, method), buckets in sorted(per_view.items()):
+        for quantile in QUANTILES:
+            value = estimate_quantile(buckets, quantile)
+            lines.append(
+                f"wasla_http_request_latency_ms{_labels(route=route, method=method, quantile=f'{quantile:g}')} "
+                f"{value:.3f}"
+            )
+    return "\n".join(lines) + "\n"
@@ -3,10 +3,11 @@ from __future__ import annotations
 import logging
 from time import monotonic
 
-from django.core.cache import cache
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 
 from apps.observability.logging import bind_request_context
+from apps.observability.metrics import registry
 logger = logging.getLogger("wasla.request")
 
 
@@ -16,7 +17,8 @@ class TimingMiddleware(MiddlewareMixin):
 
     def process_exception(self, request, exception):
         latency_ms = _compute_latency_ms(request)
-        _increment_metrics(status_code=500)
+        _record_metrics(request, status_code=500)
+        request._metrics_recorded = True
         logger.error(
             "request_error",
             extra={"status_code": 500, "latency_ms": latency_ms, "error_code": type(exception).__name__},
@@ -36,7 +38,8 @@ class TimingMiddleware(MiddlewareMixin):
         latency_ms = _compute_latency_ms(request)
         response["X-Response-Time-ms"] = str(latency_ms)
         status_code = getattr(response, "status_code", 200)
-        _increment_metrics(status_code=status_code)
+        if not getattr(request, "_metrics_recorded", False):
+            _record_metrics(request, status_code=status_code)
         logger.info(
             "request_complete",
             extra={"status_code": status_code, "latency_ms": latency_ms},
@@ -51,13 +54,24 @@ def _compute_latency_ms(request) -> int:
     return int((monotonic() - start) * 1000)
 
 
-def _increment_metrics(*, status_code: int):
-    try:
-        cache.incr("metrics:requests:total", 1)
-    except Exception:
-        cache.set("metrics:requests:total", 1, timeout=None)
-    key = f"metrics:requests:status:{status_code}"
-    try:
-        cache.incr(key, 1)
-    except Exception:
-        cache.set(key, 1, timeout=None)
+def _route_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route or "unnamed"
+
+
+def _record_metrics(request, *, status_code: int):
+    start = getattr(request, "_start_time", None)
+    latency_ms = (monotonic() - start) * 1000 if start else 0.0
+    tenant = ""
+    if getattr(settings, "METRICS_TENANT_LABELS", False):
+        tenant = str(getattr(getattr(request, "tenant", None), "id", None) or "")
+    registry.observe(
+        route=_route_name(request),
+        method=request.method or "GET",
+        status_class=f"{int(status_code) // 100}xx",
+        tenant=tenant,
+        latency_ms=latency_ms,
+    )
+    registry.maybe_flush()
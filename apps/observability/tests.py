@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from apps.observability.metrics import (
+    WORKERS_CACHE_KEY,
+    WORKERS_LOCK_KEY,
+    MetricsRegistry,
+    collect_snapshots,
+    estimate_quantile,
+    merge_snapshots,
+    registry,
+    render_prometheus,
+)
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_quantiles_from_histogram(self):
+        metrics = MetricsRegistry(worker_id="w1")
+        for latency in [3] * 90 + [80] * 9 + [3000]:
+            metrics.observe(route="web:home", method="GET", status_class="2xx", tenant="", latency_ms=latency)
+
+        merged = merge_snapshots([metrics.snapshot()])
+        count, total, buckets = merged[("web:home", "GET", "2xx", "")]
+        self.assertEqual(count, 100)
+        self.assertEqual(total, 3 * 90 + 80 * 9 + 3000)
+        self.assertLessEqual(estimate_quantile(buckets, 0.5), 5)
+        self.assertTrue(50 < estimate_quantile(buckets, 0.95) <= 100)
+        self.assertTrue(2500 < estimate_quantile(buckets, 0.995) <= 5000)
+
+    def test_merge_sums_worker_snapshots(self):
+        w1, w2 = MetricsRegistry(worker_id="w1"), MetricsRegistry(worker_id="w2")
+        w1.observe(route="a", method="GET", status_class="2xx", tenant="", latency_ms=1)
+        w2.observe(route="a", method="GET", status_class="2xx", tenant="", latency_ms=20)
+        w2.observe(route="b", method="POST", status_class="5xx", tenant="", latency_ms=20)
+        merged = merge_snapshots([w1.snapshot(), w2.snapshot()])
+        self.assertEqual(merged[("a", "GET", "2xx", "")][0], 2)
+        self.assertEqual(merged[("b", "POST", "5xx", "")][0], 1)
+
+        text = render_prometheus(merged)
+        self.assertIn('wasla_http_requests_total{route="a",method="GET",status_class="2xx",tenant=""} 2', text)
+        self.assertIn('le="+Inf"} 2', text)
+        self.assertIn('wasla_http_request_latency_ms{route="b",method="POST",quantile="0.99"}', text)
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        registry.reset()
+
+    def test_requests_are_recorded_by_route_name(self):
+        self.client.get("/healthz")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn('route="healthz",method="GET",status_class="2xx"', response.content.decode())
+
+    def test_flushed_worker_snapshots_are_merged(self):
+        other = MetricsRegistry(worker_id="other-worker")
+        other.observe(route="web:dashboard", method="GET", status_class="2xx", tenant="", latency_ms=42)
+        other.flush()
+        response = self.client.get("/metrics", {"format": "json"})
+        self.assertEqual(response.json()["requests_by_status_class"].get("2xx"), 1)
+
+    def test_idle_worker_is_still_reported_after_the_flush_ttl(self):
+        idle = MetricsRegistry(worker_id="idle-worker", flush_seconds=0.05)
+        self.addCleanup(idle.stop)
+        idle.observe(route="web:dashboard", method="GET", status_class="2xx", tenant="", latency_ms=42)
+        idle.maybe_flush()
+
+        # The snapshot TTL is 1s here; no request reaches the idle worker past it, only its heartbeat.
+        time.sleep(1.5)
+        merged = merge_snapshots(collect_snapshots())
+        self.assertEqual(merged[("web:dashboard", "GET", "2xx", "")][0], 1)
+
+    def test_worker_list_is_only_rewritten_under_the_lock(self):
+        workers = [MetricsRegistry(worker_id=f"w{index}", background=False) for index in range(3)]
+        workers[0].flush()
+        # Another worker is mid-update: w1 must not overwrite the list it read, and retries on its next flush.
+        cache.add(WORKERS_LOCK_KEY, "w2", timeout=5)
+        workers[1].flush()
+        self.assertEqual(cache.get(WORKERS_CACHE_KEY), ["w0"])
+        cache.delete(WORKERS_LOCK_KEY)
+        workers[1].flush()
+        workers[2].flush()
+        self.assertEqual(cache.get(WORKERS_CACHE_KEY), ["w0", "w1", "w2"])
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from django.core.cache import cache
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_GET
 
+from apps.observability.metrics import collect_snapshots, merge_snapshots, render_gauges, render_prometheus
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 @require_GET
 def metrics(request):
-    total = cache.get("metrics:requests:total") or 0
-    statuses = {}
-    for code in (200, 201, 204, 400, 401, 403, 404, 409, 429, 500):
-        statuses[str(code)] = cache.get(f"metrics:requests:status:{code}") or 0
-    return JsonResponse({"requests_total": total, "requests_by_status": statuses})
+    snapshots = collect_snapshots()
+    merged = merge_snapshots(snapshots)
+    if request.GET.get("format") == "json":
+        total = 0
+        statuses: dict[str, int] = {}
+        for (_, _, status_class, _), (count, _, _) in merged.items():
+            total += count
+            statuses[status_class] = statuses.get(status_class, 0) + count
+        return JsonResponse({"requests_total": total, "requests_by_status_class": statuses})
+    return HttpResponse(render_prometheus(merged) + render_gauges(snapshots), content_type=PROMETHEUS_CONTENT_TYPE)
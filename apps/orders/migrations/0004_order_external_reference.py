@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_store_id_alter_customer_email_and_more'),
+        ('orders', '0003_order_checkout_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='external_channel',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='external_id',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('external_id', ''), _negated=True), fields=('store_id', 'external_channel', 'external_id'), name='uq_order_store_external'),
+        ),
+    ]
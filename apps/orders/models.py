@@ -4,13 +4,17 @@ Orders models (MVP).
 AR:
 - الطلب يمثل عملية شراء داخل متجر (`store_id`).
 - OrderItem يمثل بنود الطلب المرتبطة بمنتجات الكتالوج.
+- طلبات القنوات الخارجية (الأسواق) تحمل `external_channel` و `external_id` فريدين داخل المتجر.
 
 EN:
 - Order represents a purchase within a store (`store_id`).
 - OrderItem represents line items linked to catalog products.
+- Orders pushed from external channels (marketplaces) carry an `external_channel` / `external_id`
+  pair that is unique within the store.
 """
 
 from django.db import models
+from django.db.models import Q
 
 
 class Order(models.Model):
@@ -40,12 +44,21 @@ class Order(models.Model):
     customer_phone = models.CharField(max_length=32, blank=True, default="")
     shipping_address_json = models.JSONField(default=dict, blank=True)
     shipping_method_code = models.CharField(max_length=64, blank=True, default="")
+    external_channel = models.CharField(max_length=32, blank=True, default="")
+    external_id = models.CharField(max_length=64, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self) -> str:
         return self.order_number
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["store_id", "external_channel", "external_id"],
+                condition=~Q(external_id=""),
+                name="uq_order_store_external",
+            ),
+        ]
         indexes = [
             models.Index(fields=["store_id", "created_at"]),
             models.Index(fields=["store_id", "status"]),
@@ -15,6 +15,24 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class OrderListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "order_number",
+            "status",
+            "payment_status",
+            "total_amount",
+            "currency",
+            "customer_id",
+            "customer_name",
+            "customer_email",
+            "customer_phone",
+            "created_at",
+        ]
+
+
 class OrderCreateItemInputSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
     quantity = serializers.IntegerField(min_value=1)
@@ -28,3 +46,27 @@ class OrderCreateInputSerializer(serializers.Serializer):
         if not items:
             raise serializers.ValidationError("At least one item is required.")
         return items
+
+
+class OrderIngestItemSerializer(serializers.Serializer):
+    sku = serializers.CharField(max_length=64)
+    quantity = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, required=False)
+
+
+class OrderIngestOrderSerializer(serializers.Serializer):
+    external_id = serializers.CharField(max_length=64)
+    customer_email = serializers.EmailField()
+    customer_name = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    customer_phone = serializers.CharField(max_length=32, required=False, allow_blank=True, default="")
+    currency = serializers.CharField(max_length=10, required=False, default="SAR")
+    shipping_address = serializers.DictField(required=False, default=dict)
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, required=False)
+    items = OrderIngestItemSerializer(many=True, allow_empty=False)
+
+
+class OrderIngestInputSerializer(serializers.Serializer):
+    """Envelope only; each order is validated on its own so one bad order does not fail the batch."""
+
+    channel = serializers.SlugField(max_length=32)
+    orders = serializers.ListField(child=serializers.DictField(), allow_empty=False)
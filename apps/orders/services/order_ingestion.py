@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+"""
+External-channel order ingestion.
+
+AR:
+- استيراد دفعة من طلبات الأسواق الخارجية (حتى `ORDER_INGEST_MAX_BATCH_SIZE` طلب) في معاملة واحدة.
+- التحقق من كل الـ SKUs باستعلام واحد للدفعة، وفحص حد الاشتراك مرة واحدة، والإدراج بـ `bulk_create` للطلبات والبنود.
+- النتيجة لكل طلب: created / duplicate / rejected مع الأخطاء؛ إعادة إرسال نفس `external_id` لا تكرر الطلب حتى لو وصل الإرسالان في الوقت نفسه.
+
+EN:
+- Ingest a batch of marketplace orders (up to `ORDER_INGEST_MAX_BATCH_SIZE`) in one transaction.
+- All SKUs are validated with one query per batch, the subscription limit is checked once, and orders and
+  items are written with `bulk_create`.
+- Each order gets a result (created / duplicate / rejected with errors); re-pushing an `external_id`
+  never creates a second order, even when two pushes of it run concurrently.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Sequence
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.analytics.application.telemetry import TelemetryService, actor_from_tenant_ctx
+from apps.analytics.infrastructure.fraud_features import record_order_amounts
+from apps.analytics.infrastructure.store_stats import bump_store_stats
+from apps.catalog.models import Product
+from apps.customers.models import Customer
+from apps.subscriptions.models import StoreUsageCounter
+from apps.subscriptions.services.entitlement_service import SubscriptionEntitlementService
+from apps.subscriptions.services.exceptions import SubscriptionLimitExceededError
+from apps.subscriptions.services.usage_counter_service import UsageCounterService
+from apps.tenants.domain.tenant_context import TenantContext
+
+from ..models import Order, OrderItem
+from .pricing_service import PricingService
+
+STATUS_CREATED = "created"
+STATUS_DUPLICATE = "duplicate"
+STATUS_REJECTED = "rejected"
+
+
+def max_batch_size() -> int:
+    return max(1, int(getattr(settings, "ORDER_INGEST_MAX_BATCH_SIZE", 1000) or 1000))
+
+
+@dataclass(frozen=True)
+class IngestLine:
+    sku: str
+    quantity: int
+    price: Decimal | None = None
+
+
+@dataclass(frozen=True)
+class IngestOrder:
+    external_id: str
+    customer_email: str
+    items: tuple[IngestLine, ...]
+    customer_name: str = ""
+    customer_phone: str = ""
+    currency: str = "SAR"
+    shipping_address: dict = field(default_factory=dict)
+    total_amount: Decimal | None = None
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    external_id: str
+    status: str
+    order_id: int | None = None
+    order_number: str = ""
+    errors: tuple[str, ...] = ()
+
+
+def _ensure_customers(store_id: int, orders: Sequence[IngestOrder]) -> dict[str, Customer]:
+    names = {order.customer_email: order.customer_name or order.customer_email for order in orders}
+    customers = {c.email: c for c in Customer.objects.filter(store_id=store_id, email__in=names)}
+    missing = [email for email in names if email not in customers]
+    if missing:
+        Customer.objects.bulk_create(
+            [Customer(store_id=store_id, email=email, full_name=names[email]) for email in missing],
+            ignore_conflicts=True,
+        )
+        customers.update({c.email: c for c in Customer.objects.filter(store_id=store_id, email__in=missing)})
+    return customers
+
+
+@transaction.atomic
+def ingest_orders(
+    *,
+    store_id: int,
+    channel: str,
+    orders: Sequence[IngestOrder],
+    actor_user_id: int | None = None,
+) -> list[IngestResult]:
+    """
+    Create pending orders for `channel`. Results are in input order. Raises `ValueError` for a batch over
+    the size limit and `NoActiveSubscriptionError` when the store has no plan; every other problem is
+    reported per order.
+    """
+    if len(orders) > max_batch_size():
+        raise ValueError(f"Batch too large (max {max_batch_size()} orders)")
+
+    results: list[IngestResult | None] = [None] * len(orders)
+    existing = dict(
+        Order.objects.filter(
+            store_id=store_id, external_channel=channel, external_id__in=[o.external_id for o in orders]
+        ).values_list("external_id", "id")
+    )
+    products = {
+        p.sku: p
+        for p in Product.objects.filter(
+            store_id=store_id, is_active=True, sku__in={line.sku for o in orders for line in o.items}
+        )
+    }
+
+    accepted: list[int] = []
+    seen: set[str] = set()
+    for index, order in enumerate(orders):
+        if order.external_id in existing:
+            results[index] = IngestResult(order.external_id, STATUS_DUPLICATE, order_id=existing[order.external_id])
+            continue
+        if order.external_id in seen:
+            results[index] = IngestResult(order.external_id, STATUS_REJECTED, errors=("duplicate_in_batch",))
+            continue
+        seen.add(order.external_id)
+        unknown = sorted({line.sku for line in order.items if line.sku not in products})
+        if not order.items or unknown:
+            errors = tuple(f"unknown_sku:{sku}" for sku in unknown) or ("no_items",)
+            results[index] = IngestResult(order.external_id, STATUS_REJECTED, errors=errors)
+            continue
+        accepted.append(index)
+
+    # One limit check for the whole batch; orders past the remaining allowance are rejected in input order.
+    try:
+        SubscriptionEntitlementService.assert_within_limit(
+            store_id=store_id, limit_field="max_orders_monthly", increment=len(accepted)
+        )
+    except SubscriptionLimitExceededError as exc:
+        allowance = max(exc.limit - exc.usage, 0)
+        for index in accepted[allowance:]:
+            results[index] = IngestResult(orders[index].external_id, STATUS_REJECTED, errors=("limit_exceeded",))
+        accepted = accepted[:allowance]
+
+    if accepted:
+        customers = _ensure_customers(store_id, [orders[index] for index in accepted])
+        new_orders: list[Order] = []
+        line_items: list[list[dict]] = []
+        for index in accepted:
+            order = orders[index]
+            items = [
+                {
+                    "product": products[line.sku],
+                    "quantity": line.quantity,
+                    "price": line.price if line.price is not None else products[line.sku].price,
+                }
+                for line in order.items
+            ]
+            customer = customers[order.customer_email]
+            line_items.append(items)
+            new_orders.append(
+                Order(
+                    store_id=store_id,
+                    order_number=str(uuid.uuid4())[:12],
+                    customer=customer,
+                    status="pending",
+                    total_amount=order.total_amount if order.total_amount is not None else PricingService.calculate_total(items),
+                    currency=order.currency,
+                    customer_name=order.customer_name or customer.full_name,
+                    customer_email=order.customer_email,
+                    customer_phone=order.customer_phone,
+                    shipping_address_json=order.shipping_address,
+                    external_channel=channel,
+                    external_id=order.external_id,
+                )
+            )
+        # A concurrent push of the same external ids may have committed since `existing` was read: its rows
+        # win the `uq_order_store_external` conflict, ours are skipped and reported as duplicates.
+        Order.objects.bulk_create(new_orders, batch_size=500, ignore_conflicts=True)
+        ids = dict(
+            Order.objects.filter(store_id=store_id, order_number__in=[o.order_number for o in new_orders]).values_list(
+                "order_number", "id"
+            )
+        )
+        raced = [index for index, order in zip(accepted, new_orders) if order.order_number not in ids]
+        if raced:
+            winners = dict(
+                Order.objects.filter(
+                    store_id=store_id,
+                    external_channel=channel,
+                    external_id__in=[orders[index].external_id for index in raced],
+                ).values_list("external_id", "id")
+            )
+            for index in raced:
+                external_id = orders[index].external_id
+                results[index] = IngestResult(external_id, STATUS_DUPLICATE, order_id=winners.get(external_id))
+            kept = [position for position, order in enumerate(new_orders) if order.order_number in ids]
+            accepted = [accepted[position] for position in kept]
+            line_items = [line_items[position] for position in kept]
+            new_orders = [new_orders[position] for position in kept]
+        for order in new_orders:
+            order.pk = ids[order.order_number]
+
+    if accepted:
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(order=order, product=item["product"], quantity=item["quantity"], price=item["price"])
+                for order, items in zip(new_orders, line_items)
+                for item in items
+            ],
+            batch_size=1000,
+        )
+        UsageCounterService.increment(store_id, StoreUsageCounter.METRIC_ORDERS_MONTHLY, len(new_orders))
+        for index, order in zip(accepted, new_orders):
+            results[index] = IngestResult(
+                order.external_id, STATUS_CREATED, order_id=order.id, order_number=order.order_number
+            )
+
+        tenant_ctx = TenantContext(
+            tenant_id=store_id, currency=new_orders[0].currency, user_id=actor_user_id, session_key=None
+        )
+        created = len(new_orders)
+        amounts = [order.total_amount for order in new_orders]
+        transaction.on_commit(lambda: record_order_amounts(store_id, amounts), robust=True)
+        bump_store_stats(store_id, orders=created)
+        transaction.on_commit(
+            lambda: TelemetryService.track(
+                event_name="orders.ingested",
+                tenant_ctx=tenant_ctx,
+                actor_ctx=actor_from_tenant_ctx(tenant_ctx=tenant_ctx, actor_type="MERCHANT"),
+                properties={"channel": channel, "created": created},
+            )
+        )
+    return results
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from django.db import transaction
 
+from apps.analytics.infrastructure.store_stats import bump_store_stats
+from apps.catalog.services.stock_reservation import release_holds
 from apps.wallet.services.wallet_service import WalletService
 
 from ..models import Order
@@ -37,8 +39,12 @@ class OrderLifecycleService:
         order.status = resolved_new_status
         order.save(update_fields=["status"])
 
+        if resolved_new_status == "cancelled":
+            release_holds(order.checkout_sessions.values("id"))
+
         if resolved_new_status == "delivered":
-            order.shipments.exclude(status__in=["delivered", "cancelled"]).update(status="delivered")
+            delivered = order.shipments.exclude(status__in=["delivered", "cancelled"]).update(status="delivered")
+            bump_store_stats(order.store_id, active_shipments=-delivered)
 
         if resolved_new_status == "completed":
             wallet = WalletService.get_or_create_wallet(order.store_id)
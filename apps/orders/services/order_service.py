@@ -1,10 +1,13 @@
 import uuid
 from django.db import transaction
-from django.db.models import F
-from django.utils import timezone
 
-from apps.catalog.models import Inventory
+from apps.catalog.models import StockReservation
+from apps.catalog.services.autocomplete import record_product_changes
+from apps.catalog.services.stock_reservation import check_available, commit_stock
+from apps.subscriptions.models import StoreUsageCounter
 from apps.subscriptions.services.entitlement_service import SubscriptionEntitlementService
+from apps.subscriptions.services.usage_counter_service import UsageCounterService
+from apps.tenants.services.storefront_cache import bump_catalog_version
 
 from ..models import Order, OrderItem
 from .pricing_service import PricingService
@@ -13,7 +16,11 @@ from .pricing_service import PricingService
 class OrderService:
     @staticmethod
     @transaction.atomic
-    def create_order(customer, items, store_id: int | None = None):
+    def create_order(customer, items, store_id: int | None = None, *, order_fields: dict | None = None):
+        """
+        Create a pending order and its items. `order_fields` (e.g. checkout contact/shipping details or a
+        final `total_amount`) are written in the same INSERT; items go in one bulk INSERT.
+        """
         resolved_store_id = store_id if store_id is not None else getattr(customer, "store_id", 1)
         customer_store_id = getattr(customer, "store_id", resolved_store_id)
         if customer_store_id != resolved_store_id:
@@ -25,60 +32,49 @@ class OrderService:
             if product_store_id != resolved_store_id:
                 raise ValueError("Product store does not match order store")
 
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        if month_start.month == 12:
-            next_month_start = month_start.replace(year=month_start.year + 1, month=1)
-        else:
-            next_month_start = month_start.replace(month=month_start.month + 1)
-
-        current_orders = Order.objects.filter(
-            store_id=resolved_store_id,
-            created_at__gte=month_start,
-            created_at__lt=next_month_start,
-        ).count()
         SubscriptionEntitlementService.assert_within_limit(
             store_id=resolved_store_id,
             limit_field="max_orders_monthly",
-            current_usage=current_orders,
             increment=1,
         )
 
-        total = PricingService.calculate_total(items)
+        fields = {"status": "pending", "total_amount": PricingService.calculate_total(items)}
+        fields.update(order_fields or {})
         order = Order.objects.create(
             store_id=resolved_store_id,
             order_number=str(uuid.uuid4())[:12],
             customer=customer,
-            status="pending",
-            total_amount=total
+            **fields,
+        )
+        UsageCounterService.increment(resolved_store_id, StoreUsageCounter.METRIC_ORDERS_MONTHLY)
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    product=item["product"],
+                    quantity=item["quantity"],
+                    price=item["price"],
+                )
+                for item in items
+            ]
         )
-        for item in items:
-            OrderItem.objects.create(
-                order=order,
-                product=item["product"],
-                quantity=item["quantity"],
-                price=item["price"]
-            )
         return order
 
     @staticmethod
-    def validate_stock(order) -> None:
-        items = list(order.items.select_related("product"))
-        if not items:
+    def _stock_lines(order) -> list[tuple[int, int]]:
+        lines = list(order.items.values_list("product_id", "quantity"))
+        if not lines:
             raise ValueError("Order has no items")
+        return lines
 
-        inventory_map = {
-            inv.product_id: inv
-            for inv in Inventory.objects.filter(product_id__in=[item.product_id for item in items])
-        }
-        for item in items:
-            inventory = inventory_map.get(item.product_id)
-            if not inventory:
-                raise ValueError(f"No inventory for product '{item.product}'")
-            if inventory.quantity < item.quantity:
-                raise ValueError(
-                    f"Insufficient stock for '{item.product}' (available {inventory.quantity})"
-                )
+    @staticmethod
+    def _reservations(order):
+        """Active checkout holds placed for this order's checkout sessions."""
+        return StockReservation.objects.filter(checkout_session_id__in=order.checkout_sessions.values("id"))
+
+    @staticmethod
+    def validate_stock(order) -> None:
+        check_available(OrderService._stock_lines(order), OrderService._reservations(order))
 
     @staticmethod
     @transaction.atomic
@@ -86,29 +82,12 @@ class OrderService:
         if order.status != "pending":
             raise ValueError("Order must be pending to mark as paid")
 
-        OrderService.validate_stock(order)
-
-        items = list(order.items.select_related("product"))
-        for item in items:
-            updated = Inventory.objects.filter(
-                product_id=item.product_id,
-                quantity__gte=item.quantity,
-            ).update(quantity=F("quantity") - item.quantity)
-            if updated == 0:
-                raise ValueError(f"Insufficient stock for '{item.product}'")
-
-        for inventory in Inventory.objects.filter(product_id__in=[i.product_id for i in items]).select_related(
-            "product"
-        ):
-            quantity = inventory.quantity
-            in_stock = quantity > 0
-            if inventory.in_stock != in_stock:
-                inventory.in_stock = in_stock
-                inventory.save(update_fields=["in_stock"])
+        toggled_product_ids = commit_stock(OrderService._stock_lines(order), OrderService._reservations(order))
 
-            if inventory.product.is_active != in_stock:
-                inventory.product.is_active = in_stock
-                inventory.product.save(update_fields=["is_active"])
+        # The storefront grid lists active products only; plain quantity changes do not alter it.
+        if toggled_product_ids:
+            record_product_changes(order.store_id, toggled_product_ids)
+            bump_catalog_version(order.store_id)
 
         order.status = "paid"
         if hasattr(order, "payment_status"):
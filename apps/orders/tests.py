@@ -2,14 +2,29 @@ from __future__ import annotations
 
 import uuid
 from decimal import Decimal
+from unittest import mock
 
-from django.test import TestCase
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
 from apps.catalog.models import Product
 from apps.customers.models import Customer
-from apps.orders.models import Order
+from apps.orders.models import Order, OrderItem
+from apps.orders.services import order_ingestion
+from apps.orders.services.order_ingestion import IngestLine, IngestOrder, ingest_orders
 from apps.orders.services.order_lifecycle_service import OrderLifecycleService
+from apps.orders.services.order_listing import OrderListFilters, list_orders
 from apps.shipping.models import Shipment
+from apps.subscriptions.models import StoreUsageCounter, SubscriptionPlan
+from apps.subscriptions.services.subscription_service import SubscriptionService
+from apps.subscriptions.services.usage_counter_service import UsageCounterService
+from apps.tenants.models import Tenant, TenantMembership
 from apps.wallet.models import Wallet
 
 
@@ -80,3 +95,177 @@ class OrderLifecycleServiceTests(TestCase):
         OrderLifecycleService.transition(order=order, new_status="completed")
         wallet.refresh_from_db()
         self.assertEqual(str(wallet.balance), "25.00")
+
+
+class OrderListingTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tenant = Tenant.objects.create(slug="listing", name="Listing", is_active=True)
+        self.customer = Customer.objects.create(store_id=self.tenant.id, email="buyer@example.com", full_name="Buyer")
+        self.orders = []
+        for index in range(5):
+            order = Order.objects.create(
+                store_id=self.tenant.id,
+                order_number=f"LST-{index}",
+                customer=self.customer,
+                status="paid" if index % 2 else "pending",
+                customer_phone=f"0500000{index:03d}",
+            )
+            self.orders.append(order)
+        # Two orders share a timestamp so the id tiebreaker is exercised.
+        Order.objects.filter(id__in=[self.orders[1].id, self.orders[2].id]).update(
+            created_at=datetime(2026, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+        )
+        Order.objects.filter(id=self.orders[0].id).update(created_at=datetime(2026, 3, 1, 9, 0, tzinfo=dt_timezone.utc))
+        other_store = Tenant.objects.create(slug="listing-other", name="Other", is_active=True)
+        other = Customer.objects.create(store_id=other_store.id, email="buyer@example.com", full_name="X")
+        Order.objects.create(store_id=other_store.id, order_number="OTHER-1", customer=other)
+
+    def test_cursor_walks_every_order_once_newest_first(self):
+        seen, cursor = [], ""
+        while True:
+            page = list_orders(store_id=self.tenant.id, cursor=cursor, page_size=2)
+            seen.extend(order.id for order in page.items)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = [self.orders[4].id, self.orders[3].id, self.orders[2].id, self.orders[1].id, self.orders[0].id]
+        self.assertEqual(seen, expected)
+        self.assertEqual(page.total, 5)
+
+    def test_filters_by_status_dates_and_customer(self):
+        def ids(**params):
+            page = list_orders(store_id=self.tenant.id, filters=OrderListFilters.from_params(params))
+            return sorted(order.id for order in page.items)
+
+        self.assertEqual(ids(status="paid"), sorted([self.orders[1].id, self.orders[3].id]))
+        self.assertEqual(ids(date_from="2026-03-10", date_to="2026-03-10"), sorted([self.orders[1].id, self.orders[2].id]))
+        self.assertEqual(ids(customer="LST-3"), [self.orders[3].id])
+        self.assertEqual(ids(customer="050 000 0004"), [self.orders[4].id])
+        self.assertEqual(len(ids(customer="BUYER@example.com")), 5)
+        self.assertEqual(ids(status="bogus"), sorted(order.id for order in self.orders))
+
+    @override_settings(MERCHANT_LIST_COUNT_LIMIT=3)
+    def test_total_is_capped_on_large_stores(self):
+        page = list_orders(store_id=self.tenant.id, page_size=2)
+        self.assertEqual((page.total, page.total_capped), (3, True))
+
+    @override_settings(ALLOWED_HOSTS=[".w-sala.com"])
+    def test_order_list_api_pages_with_cursor(self):
+        user = get_user_model().objects.create_user(username="lister", password="pass12345")
+        TenantMembership.objects.create(tenant=self.tenant, user=user)
+        client = APIClient(HTTP_HOST="listing.w-sala.com")
+        client.force_authenticate(user=user)
+
+        first = client.get("/api/orders/", {"page_size": 3}).json()["data"]
+        self.assertEqual([item["order_number"] for item in first["items"]], ["LST-4", "LST-3", "LST-2"])
+        second = client.get("/api/orders/", {"page_size": 3, "cursor": first["next_cursor"]}).json()["data"]
+        self.assertEqual([item["order_number"] for item in second["items"]], ["LST-1", "LST-0"])
+        self.assertFalse(second["has_next"])
+        self.assertEqual(client.get("/api/orders/", {"cursor": "not-a-cursor"}).status_code, 400)
+
+
+class OrderIngestionTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="channels", name="Channels", is_active=True)
+        self.plan = SubscriptionPlan.objects.create(name="Channel plan", max_orders_monthly=1000)
+        SubscriptionService.subscribe_store(self.tenant.id, self.plan)
+        Product.objects.bulk_create(
+            [Product(store_id=self.tenant.id, sku=f"CH-{i}", name=f"Item {i}", price=Decimal("7.00")) for i in range(3)]
+        )
+
+    def _orders(self, count: int, prefix: str = "ext") -> list[IngestOrder]:
+        return [
+            IngestOrder(
+                external_id=f"{prefix}-{i}",
+                customer_email=f"buyer{i % 4}@example.com",
+                customer_name=f"Buyer {i % 4}",
+                items=(IngestLine(sku="CH-0", quantity=2), IngestLine(sku="CH-1", quantity=1, price=Decimal("5.00"))),
+            )
+            for i in range(count)
+        ]
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        # Warm the entitlement snapshot, the usage counter and the four customers.
+        ingest_orders(store_id=self.tenant.id, channel="amazon", orders=self._orders(4, "warm"))
+        counts = []
+        for size, prefix in ((5, "small"), (60, "large")):
+            with CaptureQueriesContext(connection) as ctx:
+                results = ingest_orders(store_id=self.tenant.id, channel="amazon", orders=self._orders(size, prefix))
+            counts.append(len(ctx.captured_queries))
+            self.assertEqual({result.status for result in results}, {"created"})
+        self.assertEqual(counts[0], counts[1], counts)
+
+        order = Order.objects.get(external_channel="amazon", external_id="large-7")
+        self.assertEqual(order.total_amount, Decimal("19.00"))
+        self.assertEqual(order.customer.email, "buyer3@example.com")
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 2)
+        self.assertEqual(UsageCounterService.get(self.tenant.id, StoreUsageCounter.METRIC_ORDERS_MONTHLY), 69)
+
+    def test_reports_per_order_results(self):
+        ingest_orders(store_id=self.tenant.id, channel="noon", orders=self._orders(1))
+        self.plan.max_orders_monthly = 3
+        self.plan.save()
+        batch = self._orders(5)
+        batch[1] = IngestOrder(external_id="bad", customer_email="x@example.com", items=(IngestLine("NOPE", 1),))
+        results = ingest_orders(store_id=self.tenant.id, channel="noon", orders=batch + batch[2:3])
+
+        self.assertEqual(
+            [(r.external_id, r.status, r.errors) for r in results],
+            [
+                ("ext-0", "duplicate", ()),
+                ("bad", "rejected", ("unknown_sku:NOPE",)),
+                ("ext-2", "created", ()),
+                ("ext-3", "created", ()),
+                ("ext-4", "rejected", ("limit_exceeded",)),
+                ("ext-2", "rejected", ("duplicate_in_batch",)),
+            ],
+        )
+        self.assertEqual(Order.objects.filter(store_id=self.tenant.id).count(), 3)
+
+    def test_orders_created_by_a_concurrent_push_are_reported_as_duplicates(self):
+        batch = self._orders(3, "race")
+        customer = Customer.objects.create(store_id=self.tenant.id, email="first@example.com", full_name="First")
+        ensure_customers = order_ingestion._ensure_customers
+
+        def _concurrent_push(store_id, pending):
+            # The other push commits `race-1` after this one has read the existing external ids.
+            winner = Order.objects.create(
+                store_id=store_id,
+                order_number="RACE-WINNER",
+                customer=customer,
+                external_channel="noon",
+                external_id="race-1",
+            )
+            self.winner_id = winner.id
+            return ensure_customers(store_id, pending)
+
+        with mock.patch.object(order_ingestion, "_ensure_customers", side_effect=_concurrent_push):
+            results = ingest_orders(store_id=self.tenant.id, channel="noon", orders=batch)
+
+        self.assertEqual([r.status for r in results], ["created", "duplicate", "created"])
+        self.assertEqual(results[1].order_id, self.winner_id)
+        self.assertEqual(Order.objects.filter(store_id=self.tenant.id, external_id="race-1").count(), 1)
+        self.assertEqual(OrderItem.objects.filter(order__store_id=self.tenant.id).count(), 4)
+        self.assertEqual(UsageCounterService.get(self.tenant.id, StoreUsageCounter.METRIC_ORDERS_MONTHLY), 2)
+
+    @override_settings(ALLOWED_HOSTS=[".w-sala.com"])
+    def test_ingest_api_validates_each_order(self):
+        user = get_user_model().objects.create_user(username="channel-sync", password="pass12345")
+        TenantMembership.objects.create(tenant=self.tenant, user=user)
+        client = APIClient(HTTP_HOST="channels.w-sala.com")
+        client.force_authenticate(user=user)
+        payload = {
+            "channel": "amazon",
+            "orders": [
+                {"external_id": "A-1", "customer_email": "a@example.com", "items": [{"sku": "CH-2", "quantity": 3}]},
+                {"external_id": "A-2", "customer_email": "not-an-email", "items": [{"sku": "CH-2", "quantity": 1}]},
+            ],
+        }
+        data = client.post("/api/orders/ingest/", payload, format="json").json()["data"]
+        self.assertEqual((data["created"], data["rejected"]), (1, 1))
+        self.assertTrue(data["results"][1]["errors"][0].startswith("customer_email:"))
+        self.assertEqual(Order.objects.get(id=data["results"][0]["order_id"]).total_amount, Decimal("21.00"))
+
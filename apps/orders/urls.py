@@ -1,7 +1,9 @@
 
 from django.urls import path
-from .views.api import OrderCreateAPI
+from .views.api import OrderCreateAPI, OrderIngestAPI, OrderListAPI
 
 urlpatterns = [
+    path("orders/", OrderListAPI.as_view()),
+    path("orders/ingest/", OrderIngestAPI.as_view()),
     path("customers/<int:customer_id>/orders/create/", OrderCreateAPI.as_view()),
 ]
@@ -5,11 +5,49 @@ from django.shortcuts import get_object_or_404
 
 from apps.customers.models import Customer
 from apps.catalog.models import Product
+from ..services.order_ingestion import IngestLine, IngestOrder, IngestResult, STATUS_REJECTED, ingest_orders, max_batch_size
+from ..services.order_listing import OrderListFilters, list_orders
 from ..services.order_service import OrderService
-from ..serializers import OrderCreateInputSerializer, OrderSerializer
+from ..serializers import (
+    OrderCreateInputSerializer,
+    OrderIngestInputSerializer,
+    OrderIngestOrderSerializer,
+    OrderListSerializer,
+    OrderSerializer,
+)
+from apps.cart.interfaces.api.responses import api_response
 from apps.analytics.application.telemetry import TelemetryService, actor_from_request
 from apps.analytics.domain.types import ObjectRef
 from apps.tenants.domain.tenant_context import TenantContext
+from apps.tenants.services.keyset_pagination import InvalidCursorError
+
+
+class OrderListAPI(APIView):
+    """Merchant order list: `?status=&date_from=&date_to=&customer=&cursor=&page_size=`."""
+
+    def get(self, request):
+        try:
+            page_size = int(request.query_params.get("page_size") or 0) or None
+        except (TypeError, ValueError):
+            page_size = None
+        try:
+            page = list_orders(
+                store_id=request.tenant.id,
+                filters=OrderListFilters.from_params(request.query_params),
+                cursor=request.query_params.get("cursor", ""),
+                page_size=page_size,
+            )
+        except InvalidCursorError:
+            return api_response(success=False, errors=["invalid_cursor"], status_code=status.HTTP_400_BAD_REQUEST)
+        data = {
+            "items": OrderListSerializer(page.items, many=True).data,
+            "next_cursor": page.next_cursor,
+            "has_next": page.has_next,
+            "page_size": page.page_size,
+            "total": page.total,
+            "total_capped": page.total_capped,
+        }
+        return api_response(success=True, data=data)
 
 
 class OrderCreateAPI(APIView):
@@ -60,3 +98,83 @@ class OrderCreateAPI(APIView):
         )
 
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+
+
+class OrderIngestAPI(APIView):
+    """
+    Batch ingestion of external-channel orders:
+    `{"channel": "amazon", "orders": [{"external_id", "customer_email", "items": [{"sku", "quantity", "price"?}], ...}]}`.
+    Responds with one result per order (created / duplicate / rejected).
+    """
+
+    def post(self, request):
+        envelope = OrderIngestInputSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+        payload = envelope.validated_data["orders"]
+        if len(payload) > max_batch_size():
+            return api_response(
+                success=False,
+                errors=[f"Batch too large (max {max_batch_size()} orders)"],
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results: list[IngestResult | None] = [None] * len(payload)
+        valid: list[tuple[int, IngestOrder]] = []
+        for index, raw in enumerate(payload):
+            serializer = OrderIngestOrderSerializer(data=raw)
+            if not serializer.is_valid():
+                results[index] = IngestResult(
+                    str(raw.get("external_id", "")),
+                    STATUS_REJECTED,
+                    errors=tuple(f"{name}:{error}" for name, errors in serializer.errors.items() for error in errors),
+                )
+                continue
+            data = serializer.validated_data
+            valid.append(
+                (
+                    index,
+                    IngestOrder(
+                        external_id=data["external_id"],
+                        customer_email=data["customer_email"],
+                        customer_name=data["customer_name"],
+                        customer_phone=data["customer_phone"],
+                        currency=data["currency"],
+                        shipping_address=data["shipping_address"],
+                        total_amount=data.get("total_amount"),
+                        items=tuple(
+                            IngestLine(sku=item["sku"], quantity=item["quantity"], price=item.get("price"))
+                            for item in data["items"]
+                        ),
+                    ),
+                )
+            )
+
+        try:
+            ingested = ingest_orders(
+                store_id=request.tenant.id,
+                channel=envelope.validated_data["channel"],
+                orders=[order for _index, order in valid],
+                actor_user_id=request.user.id,
+            )
+        except ValueError as exc:
+            return api_response(success=False, errors=[str(exc)], status_code=status.HTTP_400_BAD_REQUEST)
+        for (index, _order), result in zip(valid, ingested):
+            results[index] = result
+
+        counts = {"created": 0, "duplicate": 0, "rejected": 0}
+        for result in results:
+            counts[result.status] += 1
+        data = {
+            **counts,
+            "results": [
+                {
+                    "external_id": result.external_id,
+                    "status": result.status,
+                    "order_id": result.order_id,
+                    "order_number": result.order_number,
+                    "errors": list(result.errors),
+                }
+                for result in results
+            ],
+        }
+        return api_response(success=True, data=data)
@@ -21,6 +21,7 @@ from apps.settlements.application.use_cases.credit_order_payment import (
 from apps.webhooks.models import WebhookEvent
 from apps.analytics.application.telemetry import TelemetryService, actor_from_tenant_ctx
 from apps.analytics.domain.types import ObjectRef
+from apps.analytics.infrastructure.fraud_features import record_failed_payment
 from apps.tenants.domain.tenant_context import TenantContext
 
 
@@ -104,6 +105,8 @@ class HandleWebhookEventUseCase:
         if verified.status == "failed":
             intent.status = "failed"
             intent.save(update_fields=["status"])
+            store_id, created_at = intent.store_id, intent.created_at
+            transaction.on_commit(lambda: record_failed_payment(store_id, at=created_at), robust=True)
             order = Order.objects.select_for_update().filter(id=intent.order_id, store_id=intent.store_id).first()
             if order:
                 order.payment_status = "failed"
@@ -1,18 +1,17 @@
 
 from django.db import transaction
 from ..models import InstalledPlugin
-from apps.subscriptions.services.subscription_service import SubscriptionService
-from apps.subscriptions.services.feature_policy import FeaturePolicy
+from apps.subscriptions.services.entitlement_snapshot import get_entitlements
 
 class PluginInstallationService:
     @staticmethod
     @transaction.atomic
     def install_plugin(store_id, plugin):
-        subscription = SubscriptionService.get_active_subscription(store_id)
-        if not subscription:
+        entitlements = get_entitlements(store_id)
+        if not entitlements.has_subscription:
             raise ValueError("No active subscription")
 
-        if not FeaturePolicy.can_use(subscription, "plugins"):
+        if not entitlements.can_use("plugins"):
             raise ValueError("Plugins not allowed for this plan")
 
         installed, created = InstalledPlugin.objects.get_or_create(
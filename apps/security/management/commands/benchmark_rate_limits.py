@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.security.rate_limiter import LocalCounterStore, RateLimiter, RateLimitRule
+
+
+def _synthetic_rules(count: int) -> list[RateLimitRule]:
+    return [
+        RateLimitRule(
+            key=f"bench{i}",
+            pattern=rf"^/bench/{i}/|^/api/bench/{i}/",
+            methods=("POST",),
+            limit=1_000_000,
+            window=60,
+        )
+        for i in range(count)
+    ]
+
+
+def _naive_match(rules: list[RateLimitRule], path: str, method: str) -> RateLimitRule | None:
+    for rule in rules:
+        if rule.matches(path, method):
+            return rule
+    return None
+
+
+class Command(BaseCommand):
+    help = "Benchmark rate limiter dispatch cost as the rule count grows (combined regex vs per-rule scan)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument("--rule-counts", default="5,50,500", help="Comma-separated rule counts.")
+
+    def handle(self, *args, **options):
+        iterations: int = options["iterations"]
+        rule_counts = [int(item) for item in options["rule_counts"].split(",") if item.strip()]
+        paths = ["/store/products/42/", "/api/cart/add/", "/dashboard/orders/"]
+
+        self.stdout.write(f"{'rules':>6} {'engine us/req':>14} {'scan us/req':>12} {'engine+incr us/req':>19}")
+        for count in rule_counts:
+            rules = _synthetic_rules(count)
+            limiter = RateLimiter(rules, LocalCounterStore())
+            hot_path = f"/api/bench/{count - 1}/"
+
+            start = time.perf_counter()
+            for i in range(iterations):
+                limiter.match(paths[i % len(paths)], "POST")
+            engine_us = (time.perf_counter() - start) / iterations * 1e6
+
+            start = time.perf_counter()
+            for i in range(iterations):
+                _naive_match(rules, paths[i % len(paths)], "POST")
+            scan_us = (time.perf_counter() - start) / iterations * 1e6
+
+            start = time.perf_counter()
+            for i in range(iterations):
+                rule = limiter.match(hot_path, "POST")
+                limiter.hit(rule, f"ip{i % 64}")
+            hit_us = (time.perf_counter() - start) / iterations * 1e6
+
+            self.stdout.write(f"{count:>6} {engine_us:>14.2f} {scan_us:>12.2f} {hit_us:>19.2f}")
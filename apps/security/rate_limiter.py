@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+"""
+Reusable rate limiter engine.
+
+- Rules are compiled once (per settings change) into a per-method literal-prefix index, so
+  dispatch cost does not grow with the number of rules.
+- Counters use atomic `incr` so concurrent workers never under-count.
+- Algorithms: `fixed_window` and `sliding_window` (weighted two-window counter).
+- Counter stores are pluggable: `LocalCounterStore` (in-process) or `CacheCounterStore` (shared cache).
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+ALGORITHM_FIXED_WINDOW = "fixed_window"
+ALGORITHM_SLIDING_WINDOW = "sliding_window"
+ALGORITHMS = (ALGORITHM_FIXED_WINDOW, ALGORITHM_SLIDING_WINDOW)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    key: str
+    pattern: str
+    methods: tuple[str, ...]
+    limit: int
+    window: int
+    message_key: str = "rate_limited"
+    algorithm: str = ALGORITHM_FIXED_WINDOW
+
+    def matches(self, path: str, method: str) -> bool:
+        if method.upper() not in self.methods:
+            return False
+        return re.search(self.pattern, path) is not None
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    count: int
+    retry_after: int
+
+
+class CounterStore:
+    """Atomic counters with a TTL. `incr` creates the key when missing."""
+
+    def incr(self, key: str, ttl: int) -> int:
+        raise NotImplementedError
+
+    def get(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class LocalCounterStore(CounterStore):
+    """Per-process counters; exact and lock-free for readers, but not shared across workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[str, tuple[int, float]] = {}
+        self._ops = 0
+
+    def incr(self, key: str, ttl: int) -> int:
+        now = time.monotonic()
+        with self._lock:
+            value, expires_at = self._values.get(key, (0, 0.0))
+            if expires_at <= now:
+                value, expires_at = 0, now + ttl
+            value += 1
+            self._values[key] = (value, expires_at)
+            self._ops += 1
+            if self._ops % 1024 == 0:
+                self._purge(now)
+            return value
+
+    def get(self, key: str) -> int:
+        item = self._values.get(key)
+        if item is None or item[1] <= time.monotonic():
+            return 0
+        return item[0]
+
+    def _purge(self, now: float) -> None:
+        expired = [key for key, (_, expires_at) in self._values.items() if expires_at <= now]
+        for key in expired:
+            del self._values[key]
+
+
+class CacheCounterStore(CounterStore):
+    """Counters in the Django cache (shared across workers when the backend is Redis/Memcached)."""
+
+    def __init__(self, cache_backend=None):
+        self._cache = cache_backend or cache
+
+    def incr(self, key: str, ttl: int) -> int:
+        # `add` is a no-op when the key exists; `incr` is atomic on shared backends.
+        self._cache.add(key, 0, timeout=ttl)
+        try:
+            return int(self._cache.incr(key))
+        except ValueError:
+            # Key expired between add and incr.
+            self._cache.add(key, 1, timeout=ttl)
+            return 1
+
+    def get(self, key: str) -> int:
+        return int(self._cache.get(key) or 0)
+
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("*?{")
+
+
+def _split_alternatives(pattern: str) -> list[str]:
+    """Split a regex on top-level `|` (ignoring groups, classes and escapes)."""
+    parts: list[str] = []
+    depth = 0
+    in_class = False
+    current: list[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            current.append(pattern[i : i + 2])
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            parts.append("".join(current))
+            current = []
+            i += 1
+            continue
+        current.append(char)
+        i += 1
+    parts.append("".join(current))
+    return parts
+
+
+def _literal_prefix(alternative: str) -> str:
+    """Literal text following a leading `^` (empty when the alternative is not anchored)."""
+    if not alternative.startswith("^"):
+        return ""
+    prefix: list[str] = []
+    i = 1
+    while i < len(alternative):
+        char = alternative[i]
+        if char == "\\" and i + 1 < len(alternative) and not alternative[i + 1].isalnum():
+            literal, step = alternative[i + 1], 2
+        elif char in _REGEX_META:
+            break
+        else:
+            literal, step = char, 1
+        if i + step < len(alternative) and alternative[i + step] in _QUANTIFIERS:
+            break
+        prefix.append(literal)
+        i += step
+    return "".join(prefix)
+
+
+@dataclass(frozen=True)
+class _MethodDispatch:
+    prefix_index: dict[str, tuple]
+    prefix_lengths: tuple[int, ...]
+    fallback: tuple
+    fallback_combined: re.Pattern | None
+
+
+class RateLimiter:
+    def __init__(self, rules: list[RateLimitRule], store: CounterStore):
+        self.rules = tuple(rules)
+        self.store = store
+        self._dispatch = self._compile_dispatch(self.rules)
+
+    @staticmethod
+    def _compile_dispatch(rules: tuple[RateLimitRule, ...]) -> dict[str, _MethodDispatch]:
+        """
+        Index rules per HTTP method by the literal prefix of each anchored alternative
+        (`^/api/events` -> "/api/events"), so a lookup costs one dict probe per distinct
+        prefix length instead of one regex per rule. Rules with an unanchored alternative
+        go to a fallback list guarded by a single combined regex.
+        """
+        per_method: dict[str, list[tuple[int, RateLimitRule]]] = {}
+        for index, rule in enumerate(rules):
+            for method in rule.methods:
+                per_method.setdefault(method.upper(), []).append((index, rule))
+
+        dispatch: dict[str, _MethodDispatch] = {}
+        for method, items in per_method.items():
+            prefix_index: dict[str, list] = {}
+            fallback: list[tuple[int, RateLimitRule, re.Pattern]] = []
+            for index, rule in items:
+                alternatives = _split_alternatives(rule.pattern)
+                prefixes = [_literal_prefix(alternative) for alternative in alternatives]
+                if not all(prefixes):
+                    fallback.append((index, rule, re.compile(rule.pattern)))
+                    continue
+                for prefix, alternative in zip(prefixes, alternatives):
+                    prefix_index.setdefault(prefix, []).append((index, rule, re.compile(alternative)))
+
+            fallback_combined = None
+            if fallback:
+                try:
+                    fallback_combined = re.compile("|".join(f"(?:{rule.pattern})" for _, rule, _ in fallback))
+                except re.error:
+                    fallback_combined = None
+
+            dispatch[method] = _MethodDispatch(
+                prefix_index={prefix: tuple(entries) for prefix, entries in prefix_index.items()},
+                prefix_lengths=tuple(sorted({len(prefix) for prefix in prefix_index})),
+                fallback=tuple(fallback),
+                fallback_combined=fallback_combined,
+            )
+        return dispatch
+
+    def match(self, path: str, method: str) -> RateLimitRule | None:
+        dispatch = self._dispatch.get((method or "GET").upper())
+        if dispatch is None:
+            return None
+
+        best_index = len(self.rules)
+        best_rule = None
+        path_length = len(path)
+        for length in dispatch.prefix_lengths:
+            if length > path_length:
+                break
+            for index, rule, pattern in dispatch.prefix_index.get(path[:length], ()):
+                if index < best_index and pattern.match(path) is not None:
+                    best_index, best_rule = index, rule
+
+        if dispatch.fallback and (
+            dispatch.fallback_combined is None or dispatch.fallback_combined.search(path) is not None
+        ):
+            # Keep first-rule-wins semantics across both lookups.
+            for index, rule, pattern in dispatch.fallback:
+                if index >= best_index:
+                    break
+                if pattern.search(path) is not None:
+                    return rule
+        return best_rule
+
+    def hit(self, rule: RateLimitRule, identifier: str, *, now: float | None = None) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        window = max(int(rule.window), 1)
+        bucket = int(now // window)
+        base_key = f"rl:{rule.key}:{identifier}"
+
+        if rule.algorithm == ALGORITHM_SLIDING_WINDOW:
+            current = self.store.incr(f"{base_key}:{bucket}", window * 2)
+            previous = self.store.get(f"{base_key}:{bucket - 1}")
+            elapsed = (now % window) / window
+            count = int(previous * (1 - elapsed)) + current
+        else:
+            count = self.store.incr(f"{base_key}:{bucket}", window)
+
+        allowed = count <= rule.limit
+        retry_after = 0 if allowed else max(int(window - (now % window)), 1)
+        return RateLimitDecision(allowed=allowed, count=count, retry_after=retry_after)
+
+
+def build_rules(raw: list[dict]) -> list[RateLimitRule]:
+    rules: list[RateLimitRule] = []
+    for item in raw:
+        algorithm = item.get("algorithm", ALGORITHM_FIXED_WINDOW)
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        rules.append(
+            RateLimitRule(
+                key=item["key"],
+                pattern=item["pattern"],
+                methods=tuple(method.upper() for method in item.get("methods", ["POST"])),
+                limit=int(item.get("limit", 10)),
+                window=int(item.get("window", 60)),
+                message_key=item.get("message_key", "rate_limited"),
+                algorithm=algorithm,
+            )
+        )
+    return rules
+
+
+def build_store(name: str) -> CounterStore:
+    if name == "local":
+        return LocalCounterStore()
+    if name == "cache":
+        return CacheCounterStore()
+    raise ValueError(f"Unknown rate limit store: {name}")
+
+
+_lock = threading.Lock()
+_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    limiter = _limiter
+    if limiter is not None:
+        return limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                build_rules(getattr(settings, "SECURITY_RATE_LIMITS", [])),
+                build_store(getattr(settings, "SECURITY_RATE_LIMIT_STORE", "cache")),
+            )
+        return _limiter
+
+
+def reset_rate_limiter() -> None:
+    global _limiter
+    with _lock:
+        _limiter = None
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(sender, setting, **kwargs):
+    if setting in ("SECURITY_RATE_LIMITS", "SECURITY_RATE_LIMIT_STORE"):
+        reset_rate_limiter()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.security.rate_limiter import (
+    ALGORITHM_SLIDING_WINDOW,
+    CacheCounterStore,
+    LocalCounterStore,
+    RateLimiter,
+    RateLimitRule,
+    build_rules,
+)
+
+RULES = [
+    {"key": "login", "pattern": r"^/auth/login/|^/accounts/login/", "methods": ["POST"], "limit": 2, "window": 60},
+    {"key": "api", "pattern": r"^/api/", "methods": ["POST"], "limit": 100, "window": 60},
+    {"key": "events", "pattern": r"^/api/events", "methods": ["POST"], "limit": 1, "window": 60},
+    {"key": "anywhere", "pattern": r"export", "methods": ["GET"], "limit": 1, "window": 60},
+]
+
+
+class RateLimiterEngineTests(SimpleTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.limiter = RateLimiter(build_rules(RULES), LocalCounterStore())
+
+    def test_match_keeps_first_rule_wins_order(self):
+        self.assertEqual(self.limiter.match("/accounts/login/", "POST").key, "login")
+        self.assertEqual(self.limiter.match("/api/events", "POST").key, "api")
+        self.assertIsNone(self.limiter.match("/accounts/login/", "GET"))
+        self.assertIsNone(self.limiter.match("/store/", "POST"))
+        self.assertEqual(self.limiter.match("/dashboard/export/", "GET").key, "anywhere")
+
+    def test_fixed_window_blocks_after_limit(self):
+        rule = self.limiter.match("/auth/login/", "POST")
+        decisions = [self.limiter.hit(rule, "ip1", now=120.0) for _ in range(3)]
+        self.assertEqual([d.allowed for d in decisions], [True, True, False])
+        self.assertEqual(decisions[-1].retry_after, 60)
+        self.assertTrue(self.limiter.hit(rule, "ip1", now=180.0).allowed)
+
+    def test_sliding_window_weights_previous_window(self):
+        rule = RateLimitRule(
+            key="s", pattern="", methods=("POST",), limit=2, window=60, algorithm=ALGORITHM_SLIDING_WINDOW
+        )
+        self.limiter.hit(rule, "ip", now=60.0)
+        self.limiter.hit(rule, "ip", now=61.0)
+        # 15s into the next window, 75% of the previous two hits still count (int(1.5) == 1).
+        self.assertTrue(self.limiter.hit(rule, "ip", now=135.0).allowed)
+        self.assertFalse(self.limiter.hit(rule, "ip", now=136.0).allowed)
+        self.assertTrue(self.limiter.hit(rule, "other", now=136.0).allowed)
+
+    def test_concurrent_hits_are_counted_exactly(self):
+        rule = RateLimitRule(key="c", pattern="", methods=("POST",), limit=10_000, window=60)
+        for store in (LocalCounterStore(), CacheCounterStore()):
+            limiter = RateLimiter([rule], store)
+            threads = [
+                threading.Thread(target=lambda: [limiter.hit(rule, "ip", now=30.0) for _ in range(200)])
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(limiter.hit(rule, "ip", now=30.0).count, 1601)
+
+
+class RateLimitMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    @override_settings(SECURITY_RATE_LIMITS=RULES, SECURITY_RATE_LIMIT_STORE="cache")
+    def test_middleware_returns_429_with_retry_after(self):
+        responses = [self.client.post("/auth/login/") for _ in range(3)]
+        self.assertNotEqual(responses[1].status_code, 429)
+        self.assertEqual(responses[2].status_code, 429)
+        self.assertTrue(responses[2].has_header("Retry-After"))
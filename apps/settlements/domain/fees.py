@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Iterable
 
-from apps.subscriptions.services.subscription_service import SubscriptionService
+from apps.subscriptions.services.entitlement_snapshot import get_entitlements
 
 
 @dataclass(frozen=True)
@@ -19,36 +19,12 @@ def _to_decimal(value) -> Decimal:
 
 def resolve_fee_policy(store_id: int) -> FeePolicy:
     """
-    Resolve settlement fee policy from the active subscription plan (if any).
-    Supports:
-    - features as dict with settlement_fee_percent / settlement_fee_flat
-    - features as list of dicts with same keys
+    Resolve settlement fee policy from the active subscription plan (if any), via the cached
+    entitlement snapshot. Plan features may carry settlement_fee_percent / settlement_fee_flat
+    either as a dict or as a list of dicts.
     """
-    percent = Decimal("0")
-    flat = Decimal("0")
-
-    subscription = SubscriptionService.get_active_subscription(store_id)
-    plan = getattr(subscription, "plan", None)
-    features = getattr(plan, "features", None) if plan else None
-
-    if isinstance(features, dict):
-        percent = _to_decimal(features.get("settlement_fee_percent") or percent)
-        flat = _to_decimal(features.get("settlement_fee_flat") or flat)
-    elif isinstance(features, list):
-        for item in features:
-            if not isinstance(item, dict):
-                continue
-            if "settlement_fee_percent" in item:
-                percent = _to_decimal(item.get("settlement_fee_percent"))
-            if "settlement_fee_flat" in item:
-                flat = _to_decimal(item.get("settlement_fee_flat"))
-
-    if percent < 0:
-        percent = Decimal("0")
-    if flat < 0:
-        flat = Decimal("0")
-
-    return FeePolicy(percent=percent, flat=flat)
+    entitlements = get_entitlements(store_id)
+    return FeePolicy(percent=entitlements.settlement_fee_percent, flat=entitlements.settlement_fee_flat)
 
 
 def allocate_fees(order_amounts: Iterable[Decimal], *, policy: FeePolicy) -> list[Decimal]:
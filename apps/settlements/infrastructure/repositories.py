@@ -3,12 +3,12 @@ from __future__ import annotations
 from decimal import Decimal
 
 from apps.settlements.models import LedgerAccount, Settlement
-from apps.tenants.models import Tenant
+from apps.tenants.services.settings_bundle import get_tenant_settings
 
 
 def get_tenant_currency(store_id: int) -> str:
-    tenant = Tenant.objects.filter(id=store_id).first()
-    return getattr(tenant, "currency", "SAR") if tenant else "SAR"
+    bundle = get_tenant_settings(store_id)
+    return bundle.currency if bundle else "SAR"
 
 
 def get_or_create_ledger_account(*, store_id: int, currency: str | None = None) -> LedgerAccount:
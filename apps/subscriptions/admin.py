@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import StoreSubscription, SubscriptionPlan
+from .models import StoreSubscription, StoreUsageCounter, SubscriptionPlan
 
 
 @admin.register(SubscriptionPlan)
@@ -26,3 +26,12 @@ class StoreSubscriptionAdmin(admin.ModelAdmin):
     list_filter = ("status", "plan")
     search_fields = ("store_id", "plan__name")
     ordering = ("-created_at",)
+
+
+@admin.register(StoreUsageCounter)
+class StoreUsageCounterAdmin(admin.ModelAdmin):
+    list_display = ("id", "store_id", "metric", "period", "value", "updated_at")
+    list_filter = ("metric",)
+    search_fields = ("store_id",)
+    ordering = ("store_id", "metric", "-period")
+
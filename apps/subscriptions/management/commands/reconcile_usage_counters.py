@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.subscriptions.models import StoreUsageCounter
+from apps.subscriptions.services.usage_counter_service import UsageCounterService, month_period
+from apps.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Recompute store usage counters (products, monthly orders, staff users) from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store-id", type=int, default=None)
+        parser.add_argument("--period", default="", help="Monthly period to recompute (YYYY-MM). Defaults to the current month.")
+
+    def handle(self, *args, **options):
+        period = options["period"] or month_period()
+        if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", period):
+            raise CommandError("--period must look like YYYY-MM.")
+
+        store_id = options["store_id"]
+        if store_id is not None:
+            store_ids = [store_id]
+        else:
+            store_ids = list(Tenant.objects.values_list("id", flat=True).order_by("id"))
+
+        drifted = 0
+        for sid in store_ids:
+            for metric, _label in StoreUsageCounter.METRIC_CHOICES:
+                previous, actual = UsageCounterService.reconcile(sid, metric, period)
+                if previous != actual:
+                    drifted += 1
+                    self.stdout.write(f"store {sid}: {metric} {previous} -> {actual}")
+        self.stdout.write(f"reconciled {len(store_ids)} stores, {drifted} counters corrected")
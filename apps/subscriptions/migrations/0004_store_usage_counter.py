@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0003_seed_default_plans'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreUsageCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_id', models.IntegerField()),
+                ('metric', models.CharField(choices=[('products', 'Products'), ('orders_monthly', 'Orders (monthly)'), ('staff_users', 'Staff users')], max_length=32)),
+                ('period', models.CharField(blank=True, default='', help_text='YYYY-MM for monthly metrics, empty for running totals.', max_length=7)),
+                ('value', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('store_id', 'metric', 'period'), name='uq_usage_counter_store_metric_period')],
+            },
+        ),
+    ]
@@ -4,10 +4,12 @@ Subscriptions models (MVP).
 AR:
 - تعريف خطط الاشتراك (Features + limits).
 - ربط متجر بخطة عبر StoreSubscription.
+- StoreUsageCounter: عدّادات الاستخدام (منتجات/طلبات الشهر/الموظفين) لفحص الحدود دون COUNT(*).
 
 EN:
 - Defines subscription plans (features + limits).
 - Links a store to a plan via StoreSubscription.
+- StoreUsageCounter: maintained usage counters (products / monthly orders / staff) for O(1) limit checks.
 """
 
 from django.db import models
@@ -73,3 +75,40 @@ class StoreSubscription(models.Model):
         indexes = [
             models.Index(fields=["store_id", "status"]),
         ]
+
+
+class StoreUsageCounter(models.Model):
+    """Maintained usage value for one store metric (and period, for monthly metrics)."""
+
+    METRIC_PRODUCTS = "products"
+    METRIC_ORDERS_MONTHLY = "orders_monthly"
+    METRIC_STAFF_USERS = "staff_users"
+
+    METRIC_CHOICES = [
+        (METRIC_PRODUCTS, "Products"),
+        (METRIC_ORDERS_MONTHLY, "Orders (monthly)"),
+        (METRIC_STAFF_USERS, "Staff users"),
+    ]
+
+    store_id = models.IntegerField()
+    metric = models.CharField(max_length=32, choices=METRIC_CHOICES)
+    period = models.CharField(
+        max_length=7,
+        blank=True,
+        default="",
+        help_text="YYYY-MM for monthly metrics, empty for running totals.",
+    )
+    value = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        suffix = f" {self.period}" if self.period else ""
+        return f"Store {self.store_id} {self.metric}{suffix} = {self.value}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["store_id", "metric", "period"], name="uq_usage_counter_store_metric_period"
+            ),
+        ]
+
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+from .entitlement_snapshot import EntitlementSnapshot, get_entitlements
 from .exceptions import (
     NoActiveSubscriptionError,
     SubscriptionFeatureNotAllowedError,
     SubscriptionLimitExceededError,
 )
-from .feature_policy import FeaturePolicy
 from .subscription_service import SubscriptionService
+from .usage_counter_service import UsageCounterService
 
 
 class SubscriptionEntitlementService:
@@ -25,10 +26,22 @@ class SubscriptionEntitlementService:
             raise NoActiveSubscriptionError("Subscription plan is not active")
         return plan
 
+    @staticmethod
+    def get_entitlements_or_raise(store_id: int) -> EntitlementSnapshot:
+        """Cached equivalent of `get_active_plan_or_raise` for limit and feature checks."""
+        entitlements = get_entitlements(store_id)
+        if not entitlements.has_subscription:
+            raise NoActiveSubscriptionError("No active subscription for this store")
+        if not entitlements.plan_is_active:
+            raise NoActiveSubscriptionError("Subscription plan is not active")
+        return entitlements
+
     @staticmethod
     def assert_feature_enabled(store_id: int, feature_name: str) -> None:
-        subscription = SubscriptionEntitlementService.get_active_subscription_or_raise(store_id)
-        if not FeaturePolicy.can_use(subscription, feature_name):
+        entitlements = get_entitlements(store_id)
+        if not entitlements.has_subscription:
+            raise NoActiveSubscriptionError("No active subscription for this store")
+        if not entitlements.can_use(feature_name):
             raise SubscriptionFeatureNotAllowedError(
                 f"Feature '{feature_name}' is not allowed for this plan"
             )
@@ -38,13 +51,16 @@ class SubscriptionEntitlementService:
         *,
         store_id: int,
         limit_field: str,
-        current_usage: int,
+        current_usage: int | None = None,
         increment: int = 1,
     ) -> None:
-        plan = SubscriptionEntitlementService.get_active_plan_or_raise(store_id)
-        limit = getattr(plan, limit_field, None)
+        """Raise when `increment` more would exceed the plan limit; usage defaults to the store's counter."""
+        entitlements = SubscriptionEntitlementService.get_entitlements_or_raise(store_id)
+        limit = entitlements.limit(limit_field)
         if limit is None:
             return
+        if current_usage is None:
+            current_usage = UsageCounterService.for_limit(store_id, limit_field)
         if current_usage + increment > limit:
             raise SubscriptionLimitExceededError(limit_field, int(limit), int(current_usage))
 
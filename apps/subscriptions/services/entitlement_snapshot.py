@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+"""
+Entitlement snapshot.
+
+AR:
+- لقطة ثابتة لاشتراك المتجر الفعّال: حدود الخطة، مجموعة المميزات، رسوم التسوية، وتاريخ انتهاء الصلاحية.
+- تُخزَّن في الـ cache لكل متجر حتى `end_date` كحد أقصى، وتُبطَل عند الاشتراك أو تعديل الخطط.
+- فحص الميزة يصبح بحثاً في مجموعة (set) دون استعلام قاعدة بيانات.
+
+EN:
+- Immutable view of a store's active subscription: plan limits, enabled feature set, settlement fee
+  terms and the date it is valid until.
+- Cached per store (never past `end_date`) and invalidated by `subscribe_store`, subscription writes
+  and plan edits.
+- Feature checks become set lookups with no database round trip.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.version_stamps import bump_version, current_versions
+
+from .subscription_service import SubscriptionService
+
+PLANS_VERSION_KEY = "subscriptions:entitlements:plans_version"
+
+LIMIT_FIELDS = ("max_products", "max_orders_monthly", "max_staff_users")
+
+
+@dataclass(frozen=True)
+class EntitlementSnapshot:
+    store_id: int
+    subscription_id: int | None
+    status: str
+    plan_id: int | None
+    plan_name: str
+    plan_is_active: bool
+    limits: tuple[tuple[str, int | None], ...]
+    features: frozenset[str]
+    settlement_fee_percent: Decimal
+    settlement_fee_flat: Decimal
+    valid_until: date | None
+
+    @property
+    def has_subscription(self) -> bool:
+        return self.subscription_id is not None
+
+    def is_current(self, today: date | None = None) -> bool:
+        return self.valid_until is None or self.valid_until >= (today or date.today())
+
+    def can_use(self, feature_name: str) -> bool:
+        return self.status == "active" and feature_name in self.features
+
+    def limit(self, limit_field: str) -> int | None:
+        return dict(self.limits).get(limit_field)
+
+
+def _to_decimal(value) -> Decimal:
+    try:
+        return Decimal(str(value or "0"))
+    except InvalidOperation:
+        return Decimal("0")
+
+
+def _feature_terms(features) -> tuple[frozenset[str], Decimal, Decimal]:
+    """
+    Enabled feature names plus settlement fee terms. `features` is either a dict or a list of
+    names / dicts carrying `settlement_fee_percent` and `settlement_fee_flat`.
+    """
+    percent = Decimal("0")
+    flat = Decimal("0")
+    names: set[str] = set()
+    if isinstance(features, dict):
+        names.update(str(key) for key in features)
+        percent = _to_decimal(features.get("settlement_fee_percent") or percent)
+        flat = _to_decimal(features.get("settlement_fee_flat") or flat)
+    elif isinstance(features, list):
+        for item in features:
+            if isinstance(item, str):
+                names.add(item)
+                continue
+            if not isinstance(item, dict):
+                continue
+            if "settlement_fee_percent" in item:
+                percent = _to_decimal(item.get("settlement_fee_percent"))
+            if "settlement_fee_flat" in item:
+                flat = _to_decimal(item.get("settlement_fee_flat"))
+    return frozenset(names), max(percent, Decimal("0")), max(flat, Decimal("0"))
+
+
+def build_snapshot(store_id: int) -> EntitlementSnapshot:
+    subscription = SubscriptionService.get_active_subscription(store_id)
+    if subscription is None:
+        return EntitlementSnapshot(
+            store_id=store_id,
+            subscription_id=None,
+            status="",
+            plan_id=None,
+            plan_name="",
+            plan_is_active=False,
+            limits=(),
+            features=frozenset(),
+            settlement_fee_percent=Decimal("0"),
+            settlement_fee_flat=Decimal("0"),
+            valid_until=None,
+        )
+
+    plan = subscription.plan
+    features, fee_percent, fee_flat = _feature_terms(plan.features)
+    return EntitlementSnapshot(
+        store_id=store_id,
+        subscription_id=subscription.id,
+        status=subscription.status,
+        plan_id=plan.id,
+        plan_name=plan.name,
+        plan_is_active=bool(getattr(plan, "is_active", True)),
+        limits=tuple((field, getattr(plan, field, None)) for field in LIMIT_FIELDS),
+        features=features,
+        settlement_fee_percent=fee_percent,
+        settlement_fee_flat=fee_flat,
+        valid_until=subscription.end_date,
+    )
+
+
+def _version_key(store_id: int) -> str:
+    return f"subscriptions:entitlements:version:{store_id}"
+
+
+def _snapshot_key(store_id: int, version: str) -> str:
+    return f"subscriptions:entitlements:{store_id}:{version}"
+
+
+def _cache_seconds() -> int:
+    return int(getattr(settings, "SUBSCRIPTION_ENTITLEMENTS_CACHE_SECONDS", 3600) or 3600)
+
+
+def _timeout_for(snapshot: EntitlementSnapshot) -> int:
+    timeout = _cache_seconds()
+    if snapshot.valid_until is not None:
+        # `get_active_subscription` keeps a subscription through its end date (local date).
+        expires_at = datetime.combine(snapshot.valid_until + timedelta(days=1), datetime.min.time())
+        timeout = min(timeout, max(1, int((expires_at - datetime.now()).total_seconds())))
+    return timeout
+
+
+def _current_version(store_id: int) -> str:
+    store_version, plans_version = current_versions(_version_key(store_id), PLANS_VERSION_KEY)
+    return f"{store_version}.{plans_version}"
+
+
+def get_entitlements(store_id: int) -> EntitlementSnapshot:
+    key = _snapshot_key(store_id, _current_version(store_id))
+    snapshot = cache.get(key)
+    if snapshot is not None and snapshot.is_current():
+        return snapshot
+    snapshot = build_snapshot(store_id)
+    cache.set(key, snapshot, timeout=_timeout_for(snapshot))
+    return snapshot
+
+
+def invalidate_entitlements(store_id: int | None) -> None:
+    if store_id:
+        bump_version(_version_key(store_id))
+
+
+def invalidate_all_entitlements() -> None:
+    """Plans are shared by many stores; bump the global stamp instead of every store."""
+    bump_version(PLANS_VERSION_KEY)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+"""
+Store usage counters.
+
+AR:
+- عدّاد لكل (متجر، مقياس، فترة) يُحدَّث بزيادة ذرية `F()` داخل نفس معاملة الكتابة (إنشاء منتج/طلب/عضو).
+- فحص حدود الخطة يقرأ صفاً واحداً بدلاً من COUNT(*) على جداول المتجر.
+- إذا لم يوجد صف بعد يُبذر من العدّ الفعلي مرة واحدة، وأمر `reconcile_usage_counters` يعيد حساب القيم.
+
+EN:
+- One row per (store, metric, period), bumped with atomic `F()` updates inside the writing transaction
+  (product / order / membership writes).
+- Plan limit checks read a single row instead of COUNT(*) over the store's tables.
+- A missing row is seeded once from the real count; `reconcile_usage_counters` recomputes drifted values.
+"""
+
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.catalog.models import Product
+from apps.orders.models import Order
+from apps.tenants.models import TenantMembership
+
+from ..models import StoreUsageCounter
+
+LIMIT_FIELD_METRICS = {
+    "max_products": StoreUsageCounter.METRIC_PRODUCTS,
+    "max_orders_monthly": StoreUsageCounter.METRIC_ORDERS_MONTHLY,
+    "max_staff_users": StoreUsageCounter.METRIC_STAFF_USERS,
+}
+
+MONTHLY_METRICS = {StoreUsageCounter.METRIC_ORDERS_MONTHLY}
+
+
+def month_period(moment: datetime | None = None) -> str:
+    return (moment or timezone.now()).strftime("%Y-%m")
+
+
+def _month_bounds(period: str) -> tuple[datetime, datetime]:
+    year, month = (int(part) for part in period.split("-"))
+    start = timezone.now().replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)
+    if month == 12:
+        return start, start.replace(year=year + 1, month=1)
+    return start, start.replace(month=month + 1)
+
+
+class UsageCounterService:
+    @staticmethod
+    def compute(store_id: int, metric: str, period: str = "") -> int:
+        """Authoritative usage from the source tables (used for seeding and reconciliation)."""
+        if metric == StoreUsageCounter.METRIC_PRODUCTS:
+            return Product.objects.filter(store_id=store_id).count()
+        if metric == StoreUsageCounter.METRIC_ORDERS_MONTHLY:
+            start, end = _month_bounds(period or month_period())
+            return Order.objects.filter(store_id=store_id, created_at__gte=start, created_at__lt=end).count()
+        if metric == StoreUsageCounter.METRIC_STAFF_USERS:
+            return TenantMembership.objects.filter(tenant_id=store_id, is_active=True).count()
+        raise ValueError(f"Unknown usage metric: {metric}")
+
+    @staticmethod
+    def _period_for(metric: str, period: str | None) -> str:
+        if metric in MONTHLY_METRICS:
+            return period or month_period()
+        return ""
+
+    @staticmethod
+    def _seed(store_id: int, metric: str, period: str) -> int:
+        counter, _ = StoreUsageCounter.objects.get_or_create(
+            store_id=store_id,
+            metric=metric,
+            period=period,
+            defaults={"value": UsageCounterService.compute(store_id, metric, period)},
+        )
+        return counter.value
+
+    @staticmethod
+    def get(store_id: int, metric: str, period: str | None = None) -> int:
+        period = UsageCounterService._period_for(metric, period)
+        value = (
+            StoreUsageCounter.objects.filter(store_id=store_id, metric=metric, period=period)
+            .values_list("value", flat=True)
+            .first()
+        )
+        if value is None:
+            return UsageCounterService._seed(store_id, metric, period)
+        return value
+
+    @staticmethod
+    def for_limit(store_id: int, limit_field: str) -> int:
+        metric = LIMIT_FIELD_METRICS.get(limit_field)
+        if metric is None:
+            raise ValueError(f"No usage counter for limit '{limit_field}'")
+        return UsageCounterService.get(store_id, metric)
+
+    @staticmethod
+    def increment(store_id: int, metric: str, amount: int = 1, *, period: str | None = None) -> None:
+        """
+        Apply `amount` (negative to decrement) in the caller's transaction. Call it after the write:
+        when no row exists yet it is seeded from the source tables, which already include that write.
+        """
+        if not store_id or not amount:
+            return
+        period = UsageCounterService._period_for(metric, period)
+        updated = StoreUsageCounter.objects.filter(store_id=store_id, metric=metric, period=period).update(
+            value=F("value") + amount, updated_at=timezone.now()
+        )
+        if not updated:
+            UsageCounterService._seed(store_id, metric, period)
+
+    @staticmethod
+    @transaction.atomic
+    def reconcile(store_id: int, metric: str, period: str | None = None) -> tuple[int, int]:
+        """Recompute one counter from the source tables. Returns (previous, current) values."""
+        period = UsageCounterService._period_for(metric, period)
+        actual = UsageCounterService.compute(store_id, metric, period)
+        counter, created = StoreUsageCounter.objects.select_for_update().get_or_create(
+            store_id=store_id, metric=metric, period=period, defaults={"value": actual}
+        )
+        if created:
+            return actual, actual
+        previous = counter.value
+        if previous != actual:
+            counter.value = actual
+            counter.save(update_fields=["value", "updated_at"])
+        return previous, actual
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.catalog.models import Product
+from apps.orders.models import Order
+from apps.subscriptions.models import StoreSubscription, StoreUsageCounter, SubscriptionPlan
+from apps.subscriptions.services.entitlement_snapshot import invalidate_all_entitlements, invalidate_entitlements
+from apps.subscriptions.services.usage_counter_service import UsageCounterService, month_period
+from apps.tenants.models import Tenant, TenantMembership
+
+
+@receiver(post_save, sender=StoreSubscription)
+@receiver(post_delete, sender=StoreSubscription)
+def _subscription_changed(sender, instance: StoreSubscription, **kwargs):
+    # Covers `subscribe_store` (its bulk expiry is followed by a create for the same store) and admin edits.
+    invalidate_entitlements(instance.store_id)
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def _plan_changed(sender, instance: SubscriptionPlan, **kwargs):
+    invalidate_all_entitlements()
+
+
+@receiver(post_save, sender=Tenant)
+def _tenant_created(sender, instance: Tenant, created: bool, **kwargs):
+    if created:
+        # Never serve a snapshot cached for an earlier store that had the same id.
+        invalidate_entitlements(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+def _product_deleted(sender, instance: Product, **kwargs):
+    UsageCounterService.increment(instance.store_id, StoreUsageCounter.METRIC_PRODUCTS, -1)
+
+
+@receiver(post_delete, sender=Order)
+def _order_deleted(sender, instance: Order, **kwargs):
+    UsageCounterService.increment(
+        instance.store_id,
+        StoreUsageCounter.METRIC_ORDERS_MONTHLY,
+        -1,
+        period=month_period(instance.created_at),
+    )
+
+
+@receiver(post_save, sender=TenantMembership)
+def _membership_saved(sender, instance: TenantMembership, created: bool, **kwargs):
+    if created:
+        if instance.is_active:
+            UsageCounterService.increment(instance.tenant_id, StoreUsageCounter.METRIC_STAFF_USERS)
+        return
+    # Updates may flip `is_active`; memberships per store are few, so recount.
+    UsageCounterService.reconcile(instance.tenant_id, StoreUsageCounter.METRIC_STAFF_USERS)
+
+
+@receiver(post_delete, sender=TenantMembership)
+def _membership_deleted(sender, instance: TenantMembership, **kwargs):
+    if instance.is_active:
+        UsageCounterService.increment(instance.tenant_id, StoreUsageCounter.METRIC_STAFF_USERS, -1)
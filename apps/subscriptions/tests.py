@@ -2,17 +2,28 @@ import uuid
 from datetime import date, timedelta
 from decimal import Decimal
 
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
 from apps.catalog.services.product_service import ProductService
 from apps.customers.models import Customer
 from apps.orders.services.order_service import OrderService
-from apps.subscriptions.models import StoreSubscription, SubscriptionPlan
+from apps.subscriptions.models import StoreSubscription, StoreUsageCounter, SubscriptionPlan
+from apps.settlements.domain.fees import resolve_fee_policy
+from apps.subscriptions.services.entitlement_service import SubscriptionEntitlementService
+from apps.subscriptions.services.entitlement_snapshot import _timeout_for, get_entitlements
+from apps.subscriptions.services.subscription_service import SubscriptionService
 from apps.subscriptions.services.exceptions import (
     NoActiveSubscriptionError,
+    SubscriptionFeatureNotAllowedError,
     SubscriptionLimitExceededError,
 )
-from apps.tenants.models import Tenant
+from apps.subscriptions.services.usage_counter_service import UsageCounterService
+from apps.tenants.models import Tenant, TenantMembership
 
 
 class SubscriptionLimitEnforcementTests(TestCase):
@@ -96,3 +107,109 @@ class SubscriptionLimitEnforcementTests(TestCase):
                 price=Decimal("1.00"),
                 quantity=1,
             )
+
+
+class StoreUsageCounterTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(slug=f"t-{uuid.uuid4().hex[:8]}", name="Counted", is_active=True)
+        self.plan = SubscriptionPlan.objects.create(
+            name=f"CounterPlan-{uuid.uuid4().hex[:8]}",
+            max_products=3,
+            max_orders_monthly=10,
+            max_staff_users=2,
+        )
+        StoreSubscription.objects.create(
+            store_id=self.tenant.id,
+            plan=self.plan,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status="active",
+        )
+
+    def _counter(self, metric: str) -> int:
+        return UsageCounterService.get(self.tenant.id, metric)
+
+    def test_writes_maintain_counters(self):
+        products = [
+            ProductService.create_product(
+                store_id=self.tenant.id, sku=f"SKU-{i}", name=f"P{i}", price=Decimal("5.00"), quantity=3
+            )
+            for i in range(2)
+        ]
+        customer = Customer.objects.create(store_id=self.tenant.id, email="c@example.com", full_name="C")
+        order = OrderService.create_order(
+            customer, [{"product": products[0], "quantity": 1, "price": Decimal("5.00")}], store_id=self.tenant.id
+        )
+        self.assertEqual(self._counter(StoreUsageCounter.METRIC_PRODUCTS), 2)
+        self.assertEqual(self._counter(StoreUsageCounter.METRIC_ORDERS_MONTHLY), 1)
+
+        order.delete()
+        products[1].delete()
+        self.assertEqual(self._counter(StoreUsageCounter.METRIC_PRODUCTS), 1)
+        self.assertEqual(self._counter(StoreUsageCounter.METRIC_ORDERS_MONTHLY), 0)
+
+        user = get_user_model().objects.create_user(username=f"staff-{uuid.uuid4().hex[:6]}", password="pass12345")
+        membership = TenantMembership.objects.create(tenant=self.tenant, user=user, role=TenantMembership.ROLE_STAFF)
+        self.assertEqual(self._counter(StoreUsageCounter.METRIC_STAFF_USERS), 1)
+        membership.is_active = False
+        membership.save()
+        self.assertEqual(self._counter(StoreUsageCounter.METRIC_STAFF_USERS), 0)
+
+    def test_limit_check_reads_the_counter(self):
+        ProductService.create_product(store_id=self.tenant.id, sku="SKU-1", name="P1", price=Decimal("5.00"), quantity=1)
+        StoreUsageCounter.objects.filter(store_id=self.tenant.id, metric=StoreUsageCounter.METRIC_PRODUCTS).update(value=3)
+
+        with self.assertNumQueries(1):  # counter row only; entitlements come from the cached snapshot
+            with self.assertRaises(SubscriptionLimitExceededError):
+                SubscriptionEntitlementService.assert_within_limit(store_id=self.tenant.id, limit_field="max_products")
+
+        out = StringIO()
+        call_command("reconcile_usage_counters", store_id=self.tenant.id, stdout=out)
+        self.assertIn("products 3 -> 1", out.getvalue())
+        SubscriptionEntitlementService.assert_within_limit(store_id=self.tenant.id, limit_field="max_products")
+
+
+class EntitlementSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug=f"t-{uuid.uuid4().hex[:8]}", name="Entitled", is_active=True)
+        self.basic = SubscriptionPlan.objects.create(name=f"Basic-{uuid.uuid4().hex[:8]}", features=["wallet"])
+        self.pro = SubscriptionPlan.objects.create(
+            name=f"Pro-{uuid.uuid4().hex[:8]}",
+            features=["wallet", "plugins", {"settlement_fee_percent": "2.5", "settlement_fee_flat": "1"}],
+            max_products=500,
+        )
+
+    def test_feature_checks_are_served_from_the_snapshot(self):
+        SubscriptionService.subscribe_store(self.tenant.id, self.basic)
+        SubscriptionEntitlementService.assert_feature_enabled(self.tenant.id, "wallet")
+        with self.assertNumQueries(0):
+            SubscriptionEntitlementService.assert_feature_enabled(self.tenant.id, "wallet")
+            with self.assertRaises(SubscriptionFeatureNotAllowedError):
+                SubscriptionEntitlementService.assert_feature_enabled(self.tenant.id, "plugins")
+
+    def test_subscribe_store_and_plan_edits_invalidate(self):
+        SubscriptionService.subscribe_store(self.tenant.id, self.basic)
+        self.assertIsNone(get_entitlements(self.tenant.id).limit("max_products"))
+
+        SubscriptionService.subscribe_store(self.tenant.id, self.pro)
+        entitlements = get_entitlements(self.tenant.id)
+        self.assertTrue(entitlements.can_use("plugins"))
+        self.assertEqual(entitlements.limit("max_products"), 500)
+        policy = resolve_fee_policy(self.tenant.id)
+        self.assertEqual((policy.percent, policy.flat), (Decimal("2.5"), Decimal("1")))
+
+        self.pro.features = ["wallet"]
+        self.pro.save()
+        self.assertFalse(get_entitlements(self.tenant.id).can_use("plugins"))
+
+    def test_snapshot_never_outlives_the_subscription(self):
+        with self.assertRaises(NoActiveSubscriptionError):
+            SubscriptionEntitlementService.assert_feature_enabled(self.tenant.id, "wallet")
+        StoreSubscription.objects.create(
+            store_id=self.tenant.id, plan=self.basic, start_date=date.today(), end_date=date.today(), status="active"
+        )
+        entitlements = get_entitlements(self.tenant.id)
+        self.assertTrue(entitlements.can_use("wallet"))
+        self.assertLessEqual(_timeout_for(entitlements), 24 * 3600)
+
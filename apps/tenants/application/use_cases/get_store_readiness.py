@@ -11,7 +11,8 @@ from apps.tenants.domain.readiness import (
     StoreReadinessResult,
     StoreReadinessSnapshot,
 )
-from apps.tenants.models import StorePaymentSettings, StoreProfile, StoreShippingSettings, Tenant
+from apps.tenants.models import StoreProfile, Tenant
+from apps.tenants.services.settings_bundle import get_tenant_settings
 
 
 @dataclass(frozen=True)
@@ -26,8 +27,9 @@ class GetStoreReadinessUseCase:
         EnsureTenantOwnershipPolicy.ensure_is_owner(user=cmd.user, tenant=cmd.tenant)
 
         profile = StoreProfile.objects.filter(tenant=cmd.tenant).first()
-        payment = StorePaymentSettings.objects.filter(tenant=cmd.tenant).first()
-        shipping = StoreShippingSettings.objects.filter(tenant=cmd.tenant).first()
+        bundle = get_tenant_settings(cmd.tenant.id)
+        payment = bundle.payment if bundle else None
+        shipping = bundle.shipping if bundle else None
 
         active_products = Product.objects.filter(store_id=cmd.tenant.id, is_active=True).count()
 
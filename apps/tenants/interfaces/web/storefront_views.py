@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import render
+from django.utils.translation import get_language
 from django.views.decorators.http import require_GET
 
 from apps.catalog.models import Product
@@ -9,6 +10,11 @@ from apps.tenants.application.policies.ownership import EnsureTenantOwnershipPol
 from apps.tenants.domain.errors import StoreAccessDeniedError, StoreInactiveError
 from apps.tenants.domain.visibility import StorefrontState, get_storefront_state
 from apps.tenants.models import Tenant
+from apps.tenants.services.storefront_cache import (
+    fragment_cache_seconds,
+    get_catalog_version,
+    serve_cached_page,
+)
 
 
 def _get_tenant_from_request(request: HttpRequest) -> Tenant:
@@ -18,6 +24,14 @@ def _get_tenant_from_request(request: HttpRequest) -> Tenant:
     return tenant
 
 
+def _is_cacheable_visit(request: HttpRequest) -> bool:
+    """Anonymous visits without pending flash messages render identically for every visitor."""
+    if getattr(request.user, "is_authenticated", False):
+        return False
+    messages = getattr(request, "_messages", None)
+    return not (messages is not None and len(messages))
+
+
 @require_GET
 def storefront_home(request: HttpRequest) -> HttpResponse:
     tenant = _get_tenant_from_request(request)
@@ -39,19 +53,35 @@ def storefront_home(request: HttpRequest) -> HttpResponse:
             preview = True
             state = StorefrontState.LIVE
 
-    if state == StorefrontState.MAINTENANCE:
-        return render(request, "storefront/maintenance.html", {"tenant": tenant})
-    if state == StorefrontState.COMING_SOON:
-        return render(request, "storefront/coming_soon.html", {"tenant": tenant})
+    def _render() -> HttpResponse:
+        if state == StorefrontState.MAINTENANCE:
+            return render(request, "storefront/maintenance.html", {"tenant": tenant})
+        if state == StorefrontState.COMING_SOON:
+            return render(request, "storefront/coming_soon.html", {"tenant": tenant})
 
-    products = (
-        Product.objects.filter(store_id=tenant.id, is_active=True)
-        .order_by("-id")
-        .only("id", "name", "price", "image", "sku")[:24]
-    )
-    return render(
-        request,
-        "storefront/home.html",
-        {"tenant": tenant, "products": products, "preview": preview},
-    )
+        # Lazy queryset: only evaluated when the product-grid fragment is not cached.
+        products = (
+            Product.objects.filter(store_id=tenant.id, is_active=True)
+            .order_by("-id")
+            .only("id", "name", "price", "image", "sku")[:24]
+        )
+        return render(
+            request,
+            "storefront/home.html",
+            {
+                "tenant": tenant,
+                "products": products,
+                "preview": preview,
+                "catalog_version": get_catalog_version(tenant.id),
+                "fragment_cache_seconds": fragment_cache_seconds(),
+            },
+        )
 
+    if preview or not _is_cacheable_visit(request):
+        return _render()
+    return serve_cached_page(
+        tenant_id=tenant.id,
+        language=get_language() or "",
+        state=state.value,
+        render=_render,
+    )
@@ -18,8 +18,17 @@ from django.conf import settings
 from django.db.utils import OperationalError, ProgrammingError
 from django.utils import translation
 
-from .models import Tenant
-from .services.domain_resolution import resolve_tenant_by_host
+from .services.domain_resolution import (
+    resolve_tenant_by_host,
+    resolve_tenant_by_id,
+    resolve_tenant_by_slug,
+)
+
+
+def _remember_store_id(request, store_id: int) -> None:
+    # Only touch the session when the value changes, to avoid a session write per request.
+    if request.session.get("store_id") != store_id:
+        request.session["store_id"] = store_id
 
 
 class TenantMiddleware:
@@ -41,6 +50,8 @@ class TenantMiddleware:
         2) DEBUG querystring (`store_id` / `tenant_id`) -> stored in session
         3) session `store_id`
         4) domain / subdomain
+
+        All lookups go through the in-process routing table (no SQL on the hot path).
         """
         tenant = None
 
@@ -58,14 +69,14 @@ class TenantMiddleware:
 
             try:
                 if header_store_id is not None:
-                    tenant = Tenant.objects.filter(id=header_store_id, is_active=True).first()
+                    tenant = resolve_tenant_by_id(header_store_id)
                 else:
-                    tenant = Tenant.objects.filter(slug=raw_header, is_active=True).first()
+                    tenant = resolve_tenant_by_slug(raw_header)
                     if not tenant:
                         tenant = resolve_tenant_by_host(raw_header)
 
                 if tenant:
-                    request.session["store_id"] = tenant.id
+                    _remember_store_id(request, tenant.id)
                     return tenant
             except (OperationalError, ProgrammingError):
                 return None
@@ -90,14 +101,14 @@ class TenantMiddleware:
 
         try:
             if store_id is not None:
-                tenant = Tenant.objects.filter(id=store_id, is_active=True).first()
+                tenant = resolve_tenant_by_id(store_id)
                 if tenant:
                     return tenant
 
             if host:
                 tenant = resolve_tenant_by_host(host)
                 if tenant:
-                    request.session["store_id"] = tenant.id
+                    _remember_store_id(request, tenant.id)
                     return tenant
 
         except (OperationalError, ProgrammingError):
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+"""
+Keyset (cursor) pagination for store-scoped merchant lists.
+
+AR:
+- بدلاً من OFFSET تُجلب الصفحة التالية بشرط "أقدم من آخر صف معروض" على مفاتيح الترتيب (مثل created_at ثم id)،
+  فتبقى تكلفة الصفحة ثابتة مهما كان عمق التصفح وتستفيد من فهارس (store_id, ...).
+- المؤشر (cursor) نص base64 غير شفاف يحمل قيم مفاتيح آخر صف.
+- العدد الإجمالي يُحسب حتى حد أقصى فقط (مثل "10000+") بدلاً من COUNT(*) كامل على المتاجر الكبيرة.
+
+EN:
+- Instead of OFFSET, the next page is fetched with a "strictly after the last row shown" predicate on
+  the ordering keys (e.g. created_at then id), so page cost stays flat at any depth and the
+  (store_id, ...) indexes drive the scan.
+- The cursor is an opaque base64 token carrying the last row's key values.
+- Totals are counted up to a cap only ("10000+") instead of a full COUNT(*) on large stores.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q, QuerySet
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    items: list
+    next_cursor: str
+    page_size: int
+    total: int
+    total_capped: bool
+
+    @property
+    def has_next(self) -> bool:
+        return bool(self.next_cursor)
+
+
+def list_page_size(page_size: int | None = None) -> int:
+    default = int(getattr(settings, "MERCHANT_LIST_PAGE_SIZE", 50) or 50)
+    return max(1, min(int(page_size or default), 200))
+
+
+def list_count_limit() -> int:
+    return int(getattr(settings, "MERCHANT_LIST_COUNT_LIMIT", 10000) or 10000)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *, model: type[models.Model], keys: Sequence[str]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor.") from exc
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursorError("Invalid cursor.")
+
+    decoded: list[Any] = []
+    for key, value in zip(keys, values):
+        field = model._meta.get_field(key)
+        try:
+            if isinstance(field, models.DateTimeField):
+                decoded.append(datetime.fromisoformat(value))
+            else:
+                decoded.append(field.to_python(value))
+        except (ValueError, TypeError, ValidationError) as exc:
+            raise InvalidCursorError("Invalid cursor.") from exc
+    return decoded
+
+
+def _after(keys: Sequence[str], values: Sequence[Any]) -> Q:
+    # (k1 < v1) OR (k1 = v1 AND k2 < v2) OR ... for a descending ordering on every key.
+    condition = Q()
+    for position, key in enumerate(keys):
+        branch = Q(**{f"{key}__lt": values[position]})
+        for prev_key, prev_value in zip(keys[:position], values[:position]):
+            branch &= Q(**{prev_key: prev_value})
+        condition |= branch
+    return condition
+
+
+def capped_count(queryset: QuerySet, limit: int) -> tuple[int, bool]:
+    """Count rows up to `limit`; the second item is True when there are more."""
+    total = queryset.order_by()[: limit + 1].count()
+    return min(total, limit), total > limit
+
+
+def paginate_keyset(
+    queryset: QuerySet,
+    *,
+    keys: Sequence[str],
+    cursor: str = "",
+    page_size: int | None = None,
+) -> KeysetPage:
+    """
+    One page of `queryset` ordered by `keys` descending (the last key must be unique, e.g. `id`).
+    Raises InvalidCursorError for a malformed cursor.
+    """
+    page_size = list_page_size(page_size)
+    total, total_capped = capped_count(queryset, list_count_limit())
+
+    page_qs = queryset.order_by(*[f"-{key}" for key in keys])
+    if cursor:
+        page_qs = page_qs.filter(_after(keys, decode_cursor(cursor, model=queryset.model, keys=keys)))
+
+    rows = list(page_qs[: page_size + 1])
+    next_cursor = ""
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, key) for key in keys])
+    return KeysetPage(
+        items=rows,
+        next_cursor=next_cursor,
+        page_size=page_size,
+        total=total,
+        total_capped=total_capped,
+    )
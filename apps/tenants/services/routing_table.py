@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+"""
+In-process host -> tenant routing table.
+
+AR:
+- يحمّل كل worker جدولاً واحداً يربط (الدومين/الـ slug/الـ subdomain/الـ id) بلقطة ثابتة للمتجر.
+- يتم إبطال الجدول عبر مفتاح إصدار مشترك في الـ cache، فلا يحتاج المسار الساخن لأي استعلام SQL.
+
+EN:
+- Each worker loads one table mapping (custom domain / legacy domain / slug / subdomain / id)
+  to an immutable tenant snapshot.
+- Invalidation goes through a shared version key in the cache, so the steady-state
+  hot path issues zero SQL for tenant resolution across all workers.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from apps.core.version_stamps import bump_version, current_version
+from apps.tenants.domain.policies import normalize_domain
+from apps.tenants.models import StoreDomain, Tenant
+
+ROUTING_VERSION_CACHE_KEY = "tenant_routing:version"
+
+_ACTIVE_DOMAIN_STATUSES = (StoreDomain.STATUS_ACTIVE, StoreDomain.STATUS_SSL_ACTIVE)
+
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    """Immutable copy of a tenant row; `to_tenant()` materializes a fresh model instance."""
+
+    id: int
+    slug: str
+    field_names: tuple[str, ...]
+    values: tuple
+
+    @classmethod
+    def from_tenant(cls, tenant: Tenant, field_names: tuple[str, ...]) -> "TenantSnapshot":
+        return cls(
+            id=tenant.id,
+            slug=tenant.slug,
+            field_names=field_names,
+            values=tuple(getattr(tenant, name) for name in field_names),
+        )
+
+    def to_tenant(self) -> Tenant:
+        # `from_db` marks the instance as persisted, so callers may still `.save()` it.
+        return Tenant.from_db("default", list(self.field_names), list(self.values))
+
+
+@dataclass(frozen=True)
+class TenantRoutingTable:
+    version: str
+    loaded_at: float
+    by_id: dict[int, TenantSnapshot]
+    by_host: dict[str, int]
+    by_slug: dict[str, int]
+    by_subdomain: dict[str, int]
+
+    def get_by_id(self, tenant_id: int) -> TenantSnapshot | None:
+        return self.by_id.get(tenant_id)
+
+    def get_by_slug(self, slug: str) -> TenantSnapshot | None:
+        tenant_id = self.by_slug.get(slug)
+        return self.by_id.get(tenant_id) if tenant_id is not None else None
+
+    def get_by_host(self, host: str) -> TenantSnapshot | None:
+        """
+        Same precedence as the former SQL resolution:
+        StoreDomain (ACTIVE/SSL_ACTIVE) -> legacy `Tenant.domain` -> slug/subdomain under base domain.
+        """
+        tenant_id = self.by_host.get(host)
+        if tenant_id is not None:
+            return self.by_id.get(tenant_id)
+
+        base_domain = normalize_domain(getattr(settings, "WASSLA_BASE_DOMAIN", ""))
+        if base_domain and host.endswith(f".{base_domain}"):
+            sub = host[: -(len(base_domain) + 1)]
+            sub = sub.split(".")[0] if sub else ""
+            if sub:
+                tenant_id = self.by_slug.get(sub)
+                if tenant_id is None:
+                    tenant_id = self.by_subdomain.get(sub)
+                if tenant_id is not None:
+                    return self.by_id.get(tenant_id)
+        return None
+
+
+_lock = threading.Lock()
+_table: TenantRoutingTable | None = None
+
+
+def _max_age_seconds() -> int:
+    return int(getattr(settings, "TENANT_ROUTING_TABLE_MAX_AGE_SECONDS", 300) or 300)
+
+
+def _current_version() -> str:
+    return str(current_version(ROUTING_VERSION_CACHE_KEY))
+
+
+def _load_table(version: str) -> TenantRoutingTable:
+    field_names = tuple(field.attname for field in Tenant._meta.concrete_fields)
+
+    by_id: dict[int, TenantSnapshot] = {}
+    by_slug: dict[str, int] = {}
+    by_subdomain: dict[str, int] = {}
+    legacy_domains: dict[str, int] = {}
+    for tenant in Tenant.objects.filter(is_active=True).order_by("id"):
+        snapshot = TenantSnapshot.from_tenant(tenant, field_names)
+        by_id[tenant.id] = snapshot
+        by_slug.setdefault(tenant.slug, tenant.id)
+        subdomain = (tenant.subdomain or "").strip()
+        if subdomain:
+            by_subdomain.setdefault(subdomain, tenant.id)
+        legacy = normalize_domain(tenant.domain or "")
+        if legacy:
+            legacy_domains.setdefault(legacy, tenant.id)
+
+    by_host: dict[str, int] = {}
+    domain_rows = (
+        StoreDomain.objects.filter(status__in=_ACTIVE_DOMAIN_STATUSES, tenant__is_active=True)
+        .order_by("id")
+        .values_list("domain", "tenant_id")
+    )
+    for domain, tenant_id in domain_rows:
+        normalized = normalize_domain(domain)
+        if normalized:
+            by_host.setdefault(normalized, tenant_id)
+    for domain, tenant_id in legacy_domains.items():
+        by_host.setdefault(domain, tenant_id)
+
+    return TenantRoutingTable(
+        version=version,
+        loaded_at=time.monotonic(),
+        by_id=by_id,
+        by_host=by_host,
+        by_slug=by_slug,
+        by_subdomain=by_subdomain,
+    )
+
+
+def get_routing_table() -> TenantRoutingTable:
+    """
+    Return this worker's routing table, reloading only when the shared version changed
+    or the table is older than `TENANT_ROUTING_TABLE_MAX_AGE_SECONDS` (a safety net for
+    queryset `.update()` calls that bypass signals).
+    """
+    global _table
+
+    version = _current_version()
+    table = _table
+    if table is not None and table.version == version and time.monotonic() - table.loaded_at < _max_age_seconds():
+        return table
+
+    with _lock:
+        table = _table
+        if table is not None and table.version == version and time.monotonic() - table.loaded_at < _max_age_seconds():
+            return table
+        table = _load_table(version)
+        _table = table
+        return table
+
+
+def bump_routing_version() -> None:
+    """
+    Invalidate the routing table in every worker.
+
+    Bumped immediately (so the writing worker sees its own change) and again on commit
+    (so other workers never cache a table loaded before the write became visible).
+    """
+    bump_version(ROUTING_VERSION_CACHE_KEY)
+
+
+def reset_routing_table() -> None:
+    """Drop this worker's table (the next lookup reloads it)."""
+    global _table
+    with _lock:
+        _table = None
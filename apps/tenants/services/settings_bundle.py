@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+"""
+Tenant settings bundle.
+
+AR:
+- لقطة واحدة ثابتة لإعدادات المتجر (العملة/اللغة/الهوية/الثيم/الشحن/الدفع/البريد) تُحمَّل دفعة واحدة وتُخزَّن في الـ cache.
+- يتم إبطالها عبر رقم إصدار لكل متجر عند حفظ أي من هذه الجداول.
+
+EN:
+- One immutable per-tenant configuration snapshot (currency, language, branding, theme, shipping,
+  payment, email) loaded in one batch and cached.
+- Invalidated through a per-tenant version stamp bumped on save of any source model.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.version_stamps import bump_version, current_versions
+from apps.emails.models import TenantEmailSettings
+from apps.tenants.models import StorePaymentSettings, StoreShippingSettings, Tenant
+from apps.themes.models import StoreBranding, Theme
+
+THEMES_VERSION_KEY = "tenant_settings:themes_version"
+
+
+@dataclass(frozen=True)
+class BrandingSettings:
+    theme_code: str
+    logo_url: str
+    primary_color: str
+    secondary_color: str
+    accent_color: str
+    font_family: str
+
+
+@dataclass(frozen=True)
+class ThemeSettings:
+    code: str
+    name_key: str
+    preview_image_path: str
+
+
+@dataclass(frozen=True)
+class ShippingSettings:
+    fulfillment_mode: str
+    origin_city: str
+    delivery_fee_flat: Decimal | None
+    free_shipping_threshold: Decimal | None
+    is_enabled: bool
+
+
+@dataclass(frozen=True)
+class PaymentSettings:
+    # Secrets (merchant key / webhook secret) are deliberately not part of the cached bundle.
+    mode: str
+    provider_name: str
+    is_enabled: bool
+
+
+@dataclass(frozen=True)
+class EmailSettings:
+    provider: str
+    from_email: str
+    from_name: str
+    is_enabled: bool
+
+
+@dataclass(frozen=True)
+class TenantSettingsBundle:
+    tenant_id: int
+    version: str
+    currency: str
+    language: str
+    branding: BrandingSettings | None
+    theme: ThemeSettings | None
+    shipping: ShippingSettings | None
+    payment: PaymentSettings | None
+    email: EmailSettings | None
+
+
+def _version_key(tenant_id: int) -> str:
+    return f"tenant_settings:version:{tenant_id}"
+
+
+def _bundle_key(tenant_id: int, version: str) -> str:
+    return f"tenant_settings:bundle:{tenant_id}:{version}"
+
+
+def _cache_seconds() -> int:
+    return int(getattr(settings, "TENANT_SETTINGS_CACHE_SECONDS", 3600) or 3600)
+
+
+def _current_version(tenant_id: int) -> str:
+    tenant_version, themes_version = current_versions(_version_key(tenant_id), THEMES_VERSION_KEY)
+    return f"{tenant_version}.{themes_version}"
+
+
+def _load_bundle(tenant_id: int, version: str) -> TenantSettingsBundle | None:
+    tenant = (
+        Tenant.objects.select_related("shipping_settings", "payment_settings", "email_settings")
+        .filter(id=tenant_id)
+        .first()
+    )
+    if not tenant:
+        return None
+
+    branding = StoreBranding.objects.filter(store_id=tenant_id).first()
+    theme = None
+    if branding and branding.theme_code:
+        theme = Theme.objects.filter(code=branding.theme_code, is_active=True).first()
+
+    try:
+        shipping = tenant.shipping_settings
+    except StoreShippingSettings.DoesNotExist:
+        shipping = None
+    try:
+        payment = tenant.payment_settings
+    except StorePaymentSettings.DoesNotExist:
+        payment = None
+    try:
+        email = tenant.email_settings
+    except TenantEmailSettings.DoesNotExist:
+        email = None
+
+    return TenantSettingsBundle(
+        tenant_id=tenant.id,
+        version=version,
+        currency=tenant.currency or "SAR",
+        language=tenant.language or "",
+        branding=BrandingSettings(
+            theme_code=branding.theme_code,
+            logo_url=branding.logo_path.url if branding.logo_path else "",
+            primary_color=branding.primary_color,
+            secondary_color=branding.secondary_color,
+            accent_color=branding.accent_color,
+            font_family=branding.font_family,
+        )
+        if branding
+        else None,
+        theme=ThemeSettings(code=theme.code, name_key=theme.name_key, preview_image_path=theme.preview_image_path)
+        if theme
+        else None,
+        shipping=ShippingSettings(
+            fulfillment_mode=shipping.fulfillment_mode,
+            origin_city=shipping.origin_city,
+            delivery_fee_flat=shipping.delivery_fee_flat,
+            free_shipping_threshold=shipping.free_shipping_threshold,
+            is_enabled=shipping.is_enabled,
+        )
+        if shipping
+        else None,
+        payment=PaymentSettings(mode=payment.mode, provider_name=payment.provider_name, is_enabled=payment.is_enabled)
+        if payment
+        else None,
+        email=EmailSettings(
+            provider=email.provider,
+            from_email=email.from_email,
+            from_name=email.from_name,
+            is_enabled=email.is_enabled,
+        )
+        if email
+        else None,
+    )
+
+
+def get_tenant_settings(tenant_id: int) -> TenantSettingsBundle | None:
+    version = _current_version(tenant_id)
+    key = _bundle_key(tenant_id, version)
+    bundle = cache.get(key)
+    if bundle is not None:
+        return bundle
+    bundle = _load_bundle(tenant_id, version)
+    if bundle is not None:
+        cache.set(key, bundle, timeout=_cache_seconds())
+    return bundle
+
+
+def get_request_tenant_settings(request) -> TenantSettingsBundle | None:
+    """Request-memoized variant (context processors may run several times per request)."""
+    tenant_id = getattr(getattr(request, "tenant", None), "id", None)
+    if not tenant_id:
+        return None
+    memo = getattr(request, "_tenant_settings_bundle", None)
+    if memo is not None and memo.tenant_id == tenant_id:
+        return memo
+    bundle = get_tenant_settings(tenant_id)
+    request._tenant_settings_bundle = bundle
+    return bundle
+
+
+def invalidate_tenant_settings(tenant_id: int | None) -> None:
+    if tenant_id:
+        bump_version(_version_key(tenant_id))
+
+
+def invalidate_all_tenant_settings() -> None:
+    """Theme rows are shared across tenants; bump the global stamp instead of every tenant."""
+    bump_version(THEMES_VERSION_KEY)
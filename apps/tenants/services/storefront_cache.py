@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+"""
+Storefront page cache.
+
+AR:
+- تخزين صفحة المتجر الرئيسية كاملة للزوار المجهولين، وتخزين شبكة المنتجات كجزء (fragment) لمسار المعاينة.
+- المفاتيح تتضمن المتجر واللغة وحالة المتجر ورقم إصدار الكتالوج الذي يُرفع عند تعديل المنتجات أو المخزون أو الهوية.
+- عند انتهاء الصلاحية يُقدَّم آخر نسخة (stale) بينما يعيد طلب واحد فقط بناء الصفحة.
+
+EN:
+- Full-response cache of storefront home for anonymous visitors; product-grid fragment cache for the preview path.
+- Keys include tenant id, language, storefront state and a per-tenant catalog version bumped on
+  product, inventory-visibility and branding writes.
+- Stale-while-revalidate: once an entry is outdated, the last rendered copy keeps being served while
+  a single request (holding a short lock) re-renders it.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from apps.core.version_stamps import bump_version, current_version
+
+CACHE_STATUS_HEADER = "X-Storefront-Cache"
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    version: int
+    rendered_at: float
+    status: int
+    content_type: str
+    content: bytes
+
+
+def _catalog_version_key(tenant_id: int) -> str:
+    return f"storefront:catalog_version:{tenant_id}"
+
+
+def _page_key(tenant_id: int, language: str, state: str, version: int) -> str:
+    return f"storefront:page:{tenant_id}:{language}:{state}:{version}"
+
+
+def _stale_key(tenant_id: int, language: str, state: str) -> str:
+    return f"storefront:page:{tenant_id}:{language}:{state}:stale"
+
+
+def _rebuild_lock_key(tenant_id: int, language: str, state: str) -> str:
+    return f"storefront:page:{tenant_id}:{language}:{state}:lock"
+
+
+def page_cache_seconds() -> int:
+    return int(getattr(settings, "STOREFRONT_CACHE_SECONDS", 300) or 300)
+
+
+def stale_seconds() -> int:
+    return int(getattr(settings, "STOREFRONT_CACHE_STALE_SECONDS", 600) or 0)
+
+
+def fragment_cache_seconds() -> int:
+    return int(getattr(settings, "STOREFRONT_FRAGMENT_CACHE_SECONDS", 300) or 300)
+
+
+def get_catalog_version(tenant_id: int) -> int:
+    return current_version(_catalog_version_key(tenant_id))
+
+
+def bump_catalog_version(tenant_id: int | None) -> None:
+    if tenant_id:
+        bump_version(_catalog_version_key(tenant_id))
+
+
+def _to_response(entry: CachedPage, status: str) -> HttpResponse:
+    response = HttpResponse(entry.content, status=entry.status, content_type=entry.content_type)
+    response[CACHE_STATUS_HEADER] = status
+    return response
+
+
+def serve_cached_page(
+    *,
+    tenant_id: int,
+    language: str,
+    state: str,
+    render: Callable[[], HttpResponse],
+) -> HttpResponse:
+    """
+    Return the cached page for (tenant, language, state, catalog version), falling back to the last
+    rendered copy while one request re-renders it, and to `render()` on a cold miss.
+    """
+    version = get_catalog_version(tenant_id)
+    page_key = _page_key(tenant_id, language, state, version)
+    stale_key = _stale_key(tenant_id, language, state)
+    entries = cache.get_many([page_key, stale_key])
+
+    entry = entries.get(page_key)
+    if entry is not None:
+        return _to_response(entry, "HIT")
+
+    lock_key = _rebuild_lock_key(tenant_id, language, state)
+    stale = entries.get(stale_key)
+    if stale is not None and not cache.add(lock_key, 1, timeout=30):
+        # Another request is already re-rendering this page.
+        return _to_response(stale, "STALE")
+
+    try:
+        response = render()
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            entry = CachedPage(
+                version=version,
+                rendered_at=time.time(),
+                status=response.status_code,
+                content_type=response.get("Content-Type", "text/html; charset=utf-8"),
+                content=response.content,
+            )
+            cache.set(page_key, entry, timeout=page_cache_seconds())
+            if stale_seconds():
+                cache.set(stale_key, entry, timeout=page_cache_seconds() + stale_seconds())
+    finally:
+        if stale is not None:
+            cache.delete(lock_key)
+
+    response[CACHE_STATUS_HEADER] = "MISS"
+    return response
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import post_delete, pre_save, post_save
 from django.dispatch import receiver
 
-from apps.tenants.models import Tenant
+from apps.emails.models import TenantEmailSettings
+from apps.tenants.models import StoreDomain, StorePaymentSettings, StoreShippingSettings, Tenant
 from apps.tenants.services.audit_service import TenantAuditService
+from apps.tenants.services.routing_table import bump_routing_version
+from apps.tenants.services.settings_bundle import invalidate_all_tenant_settings, invalidate_tenant_settings
+from apps.tenants.services.storefront_cache import bump_catalog_version
+from apps.themes.models import StoreBranding, Theme
 
 
 @receiver(pre_save, sender=Tenant)
@@ -19,6 +24,10 @@ def _tenant_pre_save(sender, instance: Tenant, **kwargs):
 
 @receiver(post_save, sender=Tenant)
 def _tenant_post_save(sender, instance: Tenant, created: bool, **kwargs):
+    bump_routing_version()
+    invalidate_tenant_settings(instance.pk)
+    # Name/logo/state render into the cached storefront page.
+    bump_catalog_version(instance.pk)
     if created:
         TenantAuditService.record_action(instance, "tenant_created")
         return
@@ -26,3 +35,32 @@ def _tenant_post_save(sender, instance: Tenant, created: bool, **kwargs):
     was_active = getattr(instance, "_pre_save_is_active", None)
     if was_active is True and instance.is_active is False:
         TenantAuditService.record_action(instance, "tenant_deactivated")
+
+
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=StoreDomain)
+@receiver(post_delete, sender=StoreDomain)
+def _routing_changed(sender, **kwargs):
+    bump_routing_version()
+
+
+@receiver(post_save, sender=StoreShippingSettings)
+@receiver(post_delete, sender=StoreShippingSettings)
+@receiver(post_save, sender=StorePaymentSettings)
+@receiver(post_delete, sender=StorePaymentSettings)
+@receiver(post_save, sender=TenantEmailSettings)
+@receiver(post_delete, sender=TenantEmailSettings)
+def _tenant_settings_changed(sender, instance, **kwargs):
+    invalidate_tenant_settings(instance.tenant_id)
+
+
+@receiver(post_save, sender=StoreBranding)
+@receiver(post_delete, sender=StoreBranding)
+def _store_branding_changed(sender, instance: StoreBranding, **kwargs):
+    invalidate_tenant_settings(instance.store_id)
+
+
+@receiver(post_save, sender=Theme)
+@receiver(post_delete, sender=Theme)
+def _theme_changed(sender, instance: Theme, **kwargs):
+    invalidate_all_tenant_settings()
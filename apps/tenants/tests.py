@@ -1,10 +1,24 @@
 from __future__ import annotations
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
 from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
 
+from apps.catalog.services.product_service import ProductService
 from apps.subscriptions.models import SubscriptionPlan
-from apps.tenants.models import Tenant
+from apps.subscriptions.services.subscription_service import SubscriptionService
+from apps.tenants.models import StoreDomain, StoreShippingSettings, Tenant
+from apps.tenants.services.domain_resolution import (
+    invalidate_domain_cache,
+    resolve_tenant_by_host,
+    resolve_tenant_by_id,
+)
+from apps.tenants.services.routing_table import get_routing_table
+from apps.tenants.services.settings_bundle import get_tenant_settings
+from apps.tenants.services.storefront_cache import CACHE_STATUS_HEADER, bump_catalog_version
+from apps.themes.models import StoreBranding, Theme
 from apps.tenants.application.use_cases.user_flows.buyer_flow import BuyerFlowValidator
 from apps.tenants.application.use_cases.user_flows.merchant_flow import MerchantFlowValidator
 from apps.tenants.application.use_cases.user_flows.admin_flow import AdminFlowValidator
@@ -45,3 +59,124 @@ class FlowValidatorTests(TestCase):
     def test_admin_flow_passes_with_audit(self):
         report = AdminFlowValidator().run(client=self.client, tenant_slug=self.tenant.slug)
         self.assertTrue(report.passed)
+
+
+@override_settings(WASSLA_BASE_DOMAIN="w-sala.com", ALLOWED_HOSTS=["*"])
+class TenantRoutingTableTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tenant = Tenant.objects.create(slug="routed", name="Routed", is_active=True, subdomain="shop1")
+        StoreDomain.objects.create(tenant=self.tenant, domain="routed.example.sa", status=StoreDomain.STATUS_ACTIVE)
+
+    def test_resolves_custom_domain_slug_and_subdomain(self):
+        self.assertEqual(resolve_tenant_by_host("routed.example.sa").id, self.tenant.id)
+        self.assertEqual(resolve_tenant_by_host("routed.w-sala.com").id, self.tenant.id)
+        self.assertEqual(resolve_tenant_by_host("shop1.w-sala.com").id, self.tenant.id)
+        self.assertIsNone(resolve_tenant_by_host("unknown.example.sa"))
+
+    def test_steady_state_resolution_runs_no_queries(self):
+        get_routing_table()
+        with CaptureQueriesContext(connection) as ctx:
+            tenant = resolve_tenant_by_host("routed.example.sa")
+            by_id = resolve_tenant_by_id(self.tenant.id)
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertIsInstance(tenant, Tenant)
+        self.assertEqual(tenant.name, "Routed")
+        self.assertIsNot(tenant, by_id)
+
+    def test_tenant_save_invalidates_table(self):
+        get_routing_table()
+        self.tenant.is_active = False
+        self.tenant.save(update_fields=["is_active"])
+        self.assertIsNone(resolve_tenant_by_host("routed.example.sa"))
+
+    def test_domain_disable_invalidates_table(self):
+        self.assertIsNotNone(resolve_tenant_by_host("routed.example.sa"))
+        StoreDomain.objects.filter(domain="routed.example.sa").update(status=StoreDomain.STATUS_DISABLED)
+        invalidate_domain_cache("routed.example.sa")
+        self.assertIsNone(resolve_tenant_by_host("routed.example.sa"))
+
+    def test_middleware_resolves_host_without_tenant_queries(self):
+        client = Client(HTTP_HOST="routed.example.sa")
+        client.get("/healthz")
+        get_routing_table()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get("/healthz")
+        self.assertEqual(response.status_code, 200)
+        tenant_queries = [q for q in ctx.captured_queries if "tenants_" in q["sql"]]
+        self.assertEqual(tenant_queries, [])
+
+
+class TenantSettingsBundleTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tenant = Tenant.objects.create(slug="bundled", name="Bundled", currency="USD", language="en")
+        Theme.objects.create(code="bundle-test", name_key="theme.bundle_test")
+        StoreBranding.objects.create(store_id=self.tenant.id, theme_code="bundle-test", primary_color="#112233")
+        self.shipping = StoreShippingSettings.objects.create(
+            tenant=self.tenant,
+            fulfillment_mode=StoreShippingSettings.MODE_MANUAL_DELIVERY,
+            delivery_fee_flat="15.00",
+        )
+
+    def test_bundle_is_cached_after_first_load(self):
+        bundle = get_tenant_settings(self.tenant.id)
+        self.assertEqual(bundle.currency, "USD")
+        self.assertEqual(bundle.branding.primary_color, "#112233")
+        self.assertEqual(bundle.theme.code, "bundle-test")
+        self.assertEqual(bundle.shipping.fulfillment_mode, StoreShippingSettings.MODE_MANUAL_DELIVERY)
+        self.assertIsNone(bundle.payment)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(get_tenant_settings(self.tenant.id), bundle)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_saving_a_source_model_invalidates_bundle(self):
+        get_tenant_settings(self.tenant.id)
+        self.shipping.is_enabled = False
+        self.shipping.save()
+        self.assertFalse(get_tenant_settings(self.tenant.id).shipping.is_enabled)
+
+        Theme.objects.filter(code="bundle-test").update(is_active=False)
+        Theme.objects.create(code="bundle-other", name_key="theme.bundle_other")
+        self.assertIsNone(get_tenant_settings(self.tenant.id).theme)
+
+
+@override_settings(ALLOWED_HOSTS=[".w-sala.com"])
+class StorefrontCacheTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="cached", name="Cached", is_active=True, is_published=True)
+        plan = SubscriptionPlan.objects.create(name="Storefront cache", max_products=100, max_orders_monthly=100)
+        SubscriptionService.subscribe_store(self.tenant.id, plan)
+        ProductService.create_product(store_id=self.tenant.id, sku="SKU-1", name="First Lamp", price=10, quantity=5)
+        self.client = Client(HTTP_HOST="cached.w-sala.com")
+
+    def test_anonymous_home_is_served_from_cache(self):
+        first = self.client.get("/store/")
+        self.assertEqual(first[CACHE_STATUS_HEADER], "MISS")
+        self.assertContains(first, "First Lamp")
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get("/store/")
+        self.assertEqual(second[CACHE_STATUS_HEADER], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual([q for q in ctx.captured_queries if "catalog_product" in q["sql"]], [])
+
+    def test_product_write_bumps_catalog_version(self):
+        self.client.get("/store/")
+        ProductService.create_product(store_id=self.tenant.id, sku="SKU-2", name="Second Lamp", price=12, quantity=1)
+
+        response = self.client.get("/store/")
+        self.assertEqual(response[CACHE_STATUS_HEADER], "MISS")
+        self.assertContains(response, "Second Lamp")
+
+    def test_stale_copy_is_served_while_another_request_rebuilds(self):
+        self.client.get("/store/")
+        bump_catalog_version(self.tenant.id)
+        cache.add(f"storefront:page:{self.tenant.id}:ar:live:lock", 1, timeout=30)
+
+        response = self.client.get("/store/")
+        self.assertEqual(response[CACHE_STATUS_HEADER], "STALE")
+        self.assertContains(response, "First Lamp")
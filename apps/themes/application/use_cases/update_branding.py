@@ -6,6 +6,7 @@ from django.db import transaction
 
 from apps.tenants.domain.tenant_context import TenantContext
 from apps.tenants.models import Tenant
+from apps.tenants.services.storefront_cache import bump_catalog_version
 from apps.themes.domain.policies import validate_brand_colors, validate_font_family
 from apps.themes.models import StoreBranding, Theme
 
@@ -63,4 +64,5 @@ class UpdateBrandingUseCase:
                 tenant.secondary_color = colors["secondary_color"]
             tenant.save(update_fields=["logo", "primary_color", "secondary_color", "updated_at"])
 
+        bump_catalog_version(cmd.tenant_ctx.tenant_id)
         return branding
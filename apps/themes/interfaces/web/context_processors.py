@@ -1,18 +1,13 @@
 from __future__ import annotations
 
-from apps.themes.models import StoreBranding, Theme
+from apps.tenants.services.settings_bundle import get_request_tenant_settings
 
 
 def branding_meta(request):
-    tenant = getattr(request, "tenant", None)
-    tenant_id = getattr(tenant, "id", None)
-    if not tenant_id:
+    bundle = get_request_tenant_settings(request)
+    if bundle is None:
         return {}
-    branding = StoreBranding.objects.filter(store_id=tenant_id).first()
-    theme = None
-    if branding and branding.theme_code:
-        theme = Theme.objects.filter(code=branding.theme_code, is_active=True).first()
     return {
-        "store_branding": branding,
-        "store_theme": theme,
+        "store_branding": bundle.branding,
+        "store_theme": bundle.theme,
     }
@@ -17,6 +17,7 @@ urlpatterns = [
     path("", include("apps.orders.urls")),
     path("", include("apps.payments.urls")),
     path("", include("apps.payments.interfaces.api.urls")),
+    path("", include("apps.catalog.urls")),
     path("", include("apps.cart.interfaces.api.urls")),
     path("", include("apps.checkout.interfaces.api.urls")),
     path("", include("apps.webhooks.interfaces.api.urls")),
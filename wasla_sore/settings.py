@@ -73,6 +73,8 @@ CUSTOM_DOMAIN_VERIFY_MIN_INTERVAL_SECONDS = int(
 )
 CUSTOM_DOMAIN_DNS_CACHE_SECONDS = int(os.getenv("CUSTOM_DOMAIN_DNS_CACHE_SECONDS", "300") or "300")
 CUSTOM_DOMAIN_CACHE_SECONDS = int(os.getenv("CUSTOM_DOMAIN_CACHE_SECONDS", "300") or "300")
+# In-process host -> tenant routing table (invalidated via a shared cache version key).
+TENANT_ROUTING_TABLE_MAX_AGE_SECONDS = int(os.getenv("TENANT_ROUTING_TABLE_MAX_AGE_SECONDS", "300") or "300")
 
 # SSL/Certbot
 CUSTOM_DOMAIN_SSL_ENABLED = _env_bool("CUSTOM_DOMAIN_SSL_ENABLED", "0")
@@ -310,6 +312,9 @@ SECURITY_CSP_ENABLED = _env_bool("SECURITY_CSP_ENABLED", "1")
 DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("DATA_UPLOAD_MAX_MEMORY_SIZE", str(10 * 1024 * 1024)))
 FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", str(10 * 1024 * 1024)))
 
+# "cache" shares counters across workers (needs a shared CACHES backend); "local" is per-process.
+SECURITY_RATE_LIMIT_STORE = os.getenv("SECURITY_RATE_LIMIT_STORE", "cache").strip().lower() or "cache"
+
 SECURITY_RATE_LIMITS = [
     {
         "key": "login",
@@ -343,6 +348,15 @@ SECURITY_RATE_LIMITS = [
         "window": 60,
         "message_key": "rate_limited",
     },
+    {
+        # Counted per batch request; each carries up to ANALYTICS_INGEST_MAX_EVENTS events.
+        "key": "events_batch",
+        "pattern": r"^/api/events/batch",
+        "methods": ["POST"],
+        "limit": 60,
+        "window": 60,
+        "message_key": "rate_limited",
+    },
     {
         "key": "events",
         "pattern": r"^/api/events",
@@ -391,7 +405,84 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini").strip() or "gpt-4o-mini"
 # Analytics
 ANALYTICS_HASH_SALT = os.getenv("ANALYTICS_HASH_SALT", SECRET_KEY).strip() or SECRET_KEY
 ANALYTICS_WAREHOUSE_ENABLED = _env_bool("ANALYTICS_WAREHOUSE_ENABLED", "0")
+# Columnar event warehouse (needs pyarrow): Parquet files partitioned by date/tenant, written per worker batch.
+ANALYTICS_WAREHOUSE_DIR = os.getenv("ANALYTICS_WAREHOUSE_DIR", str(BASE_DIR / "var" / "warehouse")).strip()
+ANALYTICS_WAREHOUSE_BATCH_SIZE = int(os.getenv("ANALYTICS_WAREHOUSE_BATCH_SIZE", "1000") or "1000")
+ANALYTICS_WAREHOUSE_FLUSH_SECONDS = int(os.getenv("ANALYTICS_WAREHOUSE_FLUSH_SECONDS", "60") or "60")
 ANALYTICS_PLATFORM_TENANT_ID = int(os.getenv("ANALYTICS_PLATFORM_TENANT_ID", "0") or "0")
+# Event sink: "sync" inserts each event in the caller's transaction; "buffered" queues events per worker on
+# commit and bulk-inserts them from a background thread (optionally journaled to ANALYTICS_SPOOL_DIR).
+ANALYTICS_EVENT_SINK = os.getenv("ANALYTICS_EVENT_SINK", "sync").strip().lower() or "sync"
+ANALYTICS_BUFFER_MAX_EVENTS = int(os.getenv("ANALYTICS_BUFFER_MAX_EVENTS", "10000") or "10000")
+ANALYTICS_BUFFER_FLUSH_SIZE = int(os.getenv("ANALYTICS_BUFFER_FLUSH_SIZE", "500") or "500")
+ANALYTICS_BUFFER_FLUSH_SECONDS = int(os.getenv("ANALYTICS_BUFFER_FLUSH_SECONDS", "2") or "2")
+ANALYTICS_SPOOL_DIR = os.getenv("ANALYTICS_SPOOL_DIR", "").strip()
+# Experiments: "stored" reads/writes ExperimentAssignment per call; "stateless" hashes against per-worker cached
+# definitions and bulk-logs exposures (once per identity per window) from a background thread.
+ANALYTICS_EXPERIMENT_ASSIGNMENT = os.getenv("ANALYTICS_EXPERIMENT_ASSIGNMENT", "stored").strip().lower() or "stored"
+ANALYTICS_EXPERIMENTS_MAX_AGE_SECONDS = int(os.getenv("ANALYTICS_EXPERIMENTS_MAX_AGE_SECONDS", "300") or "300")
+ANALYTICS_EXPOSURE_WINDOW_SECONDS = int(os.getenv("ANALYTICS_EXPOSURE_WINDOW_SECONDS", "3600") or "3600")
+ANALYTICS_EXPOSURE_FLUSH_SECONDS = int(os.getenv("ANALYTICS_EXPOSURE_FLUSH_SECONDS", "5") or "5")
+# KPI rollups (`roll_up_events`): events younger than this are left for the next run.
+ANALYTICS_ROLLUP_LAG_SECONDS = int(os.getenv("ANALYTICS_ROLLUP_LAG_SECONDS", "60") or "0")
+# Batch ingestion (`/api/events/batch`): events per request and decompressed body size.
+ANALYTICS_INGEST_MAX_EVENTS = int(os.getenv("ANALYTICS_INGEST_MAX_EVENTS", "100") or "100")
+ANALYTICS_INGEST_MAX_BYTES = int(os.getenv("ANALYTICS_INGEST_MAX_BYTES", "262144") or "262144")
+# Revenue rollups (`roll_up_orders`): the last N days are recomputed on every run to pick up late payments.
+ANALYTICS_ORDER_ROLLUP_RESTATE_DAYS = int(os.getenv("ANALYTICS_ORDER_ROLLUP_RESTATE_DAYS", "3") or "3")
+# Co-purchase recommender (`build_recommendations`): neighbours kept per product, and the weight of a visitor's
+# cart/view events as a basket relative to an order (0 = orders only).
+ANALYTICS_RECS_TOP_K = int(os.getenv("ANALYTICS_RECS_TOP_K", "20") or "20")
+ANALYTICS_RECS_EVENT_WEIGHT = float(os.getenv("ANALYTICS_RECS_EVENT_WEIGHT", "0") or "0")
+# Recommendation snapshots are served for this long before one request recomputes them; HOME is precomputed by
+# `precompute_recommendations`, which also prunes superseded snapshots and any older than the retention.
+# Recomputes are coalesced across workers only with a shared CACHES backend (LocMem coalesces per process).
+ANALYTICS_RECS_SNAPSHOT_TTL_SECONDS = int(os.getenv("ANALYTICS_RECS_SNAPSHOT_TTL_SECONDS", "3600") or "3600")
+ANALYTICS_RECS_SNAPSHOT_RETENTION_DAYS = int(os.getenv("ANALYTICS_RECS_SNAPSHOT_RETENTION_DAYS", "7") or "7")
+
+# Tenant settings bundle (branding/theme/shipping/payment/email snapshot), invalidated by version stamp.
+TENANT_SETTINGS_CACHE_SECONDS = int(os.getenv("TENANT_SETTINGS_CACHE_SECONDS", "3600") or "3600")
+
+# Storefront home cache: full page for anonymous visitors, product-grid fragment for previews.
+# Entries are keyed by a per-tenant catalog version; the last copy is served stale while one request re-renders.
+STOREFRONT_CACHE_SECONDS = int(os.getenv("STOREFRONT_CACHE_SECONDS", "300") or "300")
+STOREFRONT_CACHE_STALE_SECONDS = int(os.getenv("STOREFRONT_CACHE_STALE_SECONDS", "600") or "0")
+STOREFRONT_FRAGMENT_CACHE_SECONDS = int(os.getenv("STOREFRONT_FRAGMENT_CACHE_SECONDS", "300") or "300")
+
+# Product search index: "auto" picks SQLite FTS5 or PostgreSQL tsvector from the database vendor.
+CATALOG_SEARCH_BACKEND = os.getenv("CATALOG_SEARCH_BACKEND", "auto").strip() or "auto"
+CATALOG_SEARCH_PAGE_SIZE = int(os.getenv("CATALOG_SEARCH_PAGE_SIZE", "24") or "24")
+CATALOG_SEARCH_CACHE_SECONDS = int(os.getenv("CATALOG_SEARCH_CACHE_SECONDS", "300") or "300")
+
+# Cached per-store entitlement snapshot (plan limits/features/fees); never kept past the subscription end date.
+SUBSCRIPTION_ENTITLEMENTS_CACHE_SECONDS = int(os.getenv("SUBSCRIPTION_ENTITLEMENTS_CACHE_SECONDS", "3600") or "3600")
+
+# Cart storage: "db" writes every cart change to Cart/CartItem; "cache" keeps guest carts in CACHES (needs a
+# shared backend such as Redis) and persists them at checkout start or via `flush_guest_carts`.
+CART_STORE_BACKEND = os.getenv("CART_STORE_BACKEND", "db").strip().lower() or "db"
+CART_CACHE_TTL_SECONDS = int(os.getenv("CART_CACHE_TTL_SECONDS", str(7 * 24 * 3600)) or str(7 * 24 * 3600))
+
+# Checkout stock holds: placed on entering payment, released by `release_expired_reservations` after this.
+STOCK_RESERVATION_TTL_SECONDS = int(os.getenv("STOCK_RESERVATION_TTL_SECONDS", "900") or "900")
+
+# External-channel order ingestion (`POST /api/orders/ingest/`): orders accepted per request.
+ORDER_INGEST_MAX_BATCH_SIZE = int(os.getenv("ORDER_INGEST_MAX_BATCH_SIZE", "1000") or "1000")
+
+# Merchant product/order lists: keyset page size and the cap on counted rows (shown as "N+" above it).
+MERCHANT_LIST_PAGE_SIZE = int(os.getenv("MERCHANT_LIST_PAGE_SIZE", "50") or "50")
+MERCHANT_LIST_COUNT_LIMIT = int(os.getenv("MERCHANT_LIST_COUNT_LIMIT", "10000") or "10000")
+
+# Storefront autocomplete: per-worker in-memory prefix indexes, LRU-evicted across tenants within this budget.
+AUTOCOMPLETE_MEMORY_BUDGET_BYTES = int(os.getenv("AUTOCOMPLETE_MEMORY_BUDGET_BYTES", str(128 * 1024 * 1024)) or "0")
+AUTOCOMPLETE_REBUILD_SECONDS = int(os.getenv("AUTOCOMPLETE_REBUILD_SECONDS", "3600") or "3600")
+
+# Onboarding redirect: cache lifetime of a user's resolved "DASHBOARD" next step (signals invalidate earlier).
+ONBOARDING_NEXT_STEP_CACHE_SECONDS = int(os.getenv("ONBOARDING_NEXT_STEP_CACHE_SECONDS", "3600") or "3600")
+
+# Metrics (in-process registry, merged across workers through the cache); each worker publishes its snapshot
+# from a heartbeat thread every METRICS_FLUSH_SECONDS, and snapshots expire 4 heartbeats after a worker exits.
+METRICS_FLUSH_SECONDS = int(os.getenv("METRICS_FLUSH_SECONDS", "15") or "15")
+METRICS_TENANT_LABELS = _env_bool("METRICS_TENANT_LABELS", "0")
 
 # Logging
 LOGGING = {
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
-from datetime import date
 from decimal import Decimal
+from urllib.parse import urlencode
 
 from django import forms
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.db.models import Sum
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_GET, require_http_methods, require_POST
 
+from apps.analytics.infrastructure.store_stats import store_stats_for_day
 from apps.catalog.models import Category, Inventory, Product
+from apps.catalog.services.product_listing import ProductListFilters, list_products
 from apps.catalog.services.product_service import ProductService
 from apps.customers.models import Customer
 from apps.orders.models import Order
 from apps.orders.services.order_lifecycle_service import OrderLifecycleService
+from apps.orders.services.order_listing import OrderListFilters, list_orders
 from apps.orders.services.order_service import OrderService
 from apps.payments.models import Payment
 from apps.payments.services.payment_service import PaymentService
@@ -34,6 +36,7 @@ from apps.tenants.interfaces.web.decorators import tenant_access_required
 from apps.tenants.domain.policies import normalize_domain
 from apps.tenants.interfaces.web.forms import CustomDomainForm, StoreSettingsForm
 from apps.tenants.models import StoreDomain
+from apps.tenants.services.keyset_pagination import InvalidCursorError, KeysetPage
 
 
 def _get_store_id(request: HttpRequest) -> int:
@@ -44,6 +47,12 @@ def _get_store_id(request: HttpRequest) -> int:
     raise PermissionDenied("Tenant context is required.")
 
 
+def _next_page_query(params: dict[str, str], page: KeysetPage) -> str:
+    if not page.has_next:
+        return ""
+    return urlencode({**params, "cursor": page.next_cursor})
+
+
 class ProductForm(forms.ModelForm):
     quantity = forms.IntegerField(min_value=0, label="Stock quantity")
 
@@ -183,18 +192,7 @@ def dashboard(request: HttpRequest) -> HttpResponse:
     store_id = _get_store_id(request)
     tenant = request.tenant
     store_profile = getattr(tenant, "store_profile", None)
-    today = date.today()
-
-    revenue_today = (
-        Payment.objects.filter(
-            order__store_id=store_id, status="success", created_at__date=today
-        ).aggregate(total=Sum("amount"))["total"]
-        or Decimal("0.00")
-    )
-    orders_today = Order.objects.filter(store_id=store_id, created_at__date=today).count()
-    active_shipments = Shipment.objects.filter(order__store_id=store_id).exclude(
-        status__in=["delivered", "cancelled"]
-    ).count()
+    stats = store_stats_for_day(store_id)
 
     wallet = WalletService.get_or_create_wallet(store_id)
     categories = Category.objects.filter(store_id=store_id).order_by("name")[:12]
@@ -208,14 +206,12 @@ def dashboard(request: HttpRequest) -> HttpResponse:
         "store_id": store_id,
         "tenant": tenant,
         "store_profile": store_profile,
-        "revenue_today": revenue_today,
-        "orders_today": orders_today,
+        "revenue_today": stats.revenue,
+        "orders_today": stats.orders,
         "wallet": wallet,
-        "active_shipments": active_shipments,
-        "products_count": Product.objects.filter(store_id=store_id).count(),
-        "pending_reviews": Review.objects.filter(
-            product__store_id=store_id, status="pending"
-        ).count(),
+        "active_shipments": stats.active_shipments,
+        "products_count": stats.products,
+        "pending_reviews": stats.pending_reviews,
         "categories": categories,
         "latest_products": latest_products,
     }
@@ -227,13 +223,21 @@ def dashboard(request: HttpRequest) -> HttpResponse:
 @tenant_access_required
 def product_list(request: HttpRequest) -> HttpResponse:
     store_id = _get_store_id(request)
-    products = (
-        Product.objects.filter(store_id=store_id)
-        .prefetch_related("categories")
-        .select_related("inventory")
-        .order_by("-id")
-    )
-    return render(request, "web/products/list.html", {"products": products, "store_id": store_id})
+    filters = ProductListFilters.from_params(request.GET)
+    try:
+        page = list_products(store_id=store_id, filters=filters, cursor=request.GET.get("cursor", ""))
+    except InvalidCursorError:
+        page = list_products(store_id=store_id, filters=filters)
+    context = {
+        "products": page.items,
+        "page": page,
+        "filters": filters,
+        "status_choices": [("active", "Active"), ("inactive", "Inactive")],
+        "first_page_query": urlencode(filters.as_params()),
+        "next_page_query": _next_page_query(filters.as_params(), page),
+        "store_id": store_id,
+    }
+    return render(request, "web/products/list.html", context)
 
 
 @login_required
@@ -297,10 +301,21 @@ def product_edit(request: HttpRequest, product_id: int) -> HttpResponse:
 @tenant_access_required
 def order_list(request: HttpRequest) -> HttpResponse:
     store_id = _get_store_id(request)
-    orders = (
-        Order.objects.filter(store_id=store_id).select_related("customer").order_by("-created_at")
-    )
-    return render(request, "web/orders/list.html", {"orders": orders, "store_id": store_id})
+    filters = OrderListFilters.from_params(request.GET)
+    try:
+        page = list_orders(store_id=store_id, filters=filters, cursor=request.GET.get("cursor", ""))
+    except InvalidCursorError:
+        page = list_orders(store_id=store_id, filters=filters)
+    context = {
+        "orders": page.items,
+        "page": page,
+        "filters": filters,
+        "status_choices": Order.STATUS_CHOICES,
+        "first_page_query": urlencode(filters.as_params()),
+        "next_page_query": _next_page_query(filters.as_params(), page),
+        "store_id": store_id,
+    }
+    return render(request, "web/orders/list.html", context)
 
 
 @login_required